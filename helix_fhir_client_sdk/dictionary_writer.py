@@ -19,8 +19,13 @@ def convert_dict_to_str(obj: Any) -> str:
         # Standard objects with __dict__
         instance_variables = obj.__dict__
     elif hasattr(obj, "__slots__"):
-        # Objects using __slots__
-        instance_variables = {slot: getattr(obj, slot) for slot in obj.__slots__ if hasattr(obj, slot)}
+        # Objects using __slots__ (subclasses only list their own slots so include the base classes too)
+        instance_variables = {
+            slot: getattr(obj, slot)
+            for cls in reversed(type(obj).__mro__)
+            for slot in getattr(cls, "__slots__", [])
+            if hasattr(obj, slot)
+        }
     else:
         # Fallback to using inspect to get object attributes
         instance_variables = {
@@ -179,6 +179,8 @@ class FhirAuthMixin(FhirClientProtocol):
             log_all_url_results=self._log_all_response_urls,
             access_token=self._access_token,
             access_token_expiry_date=self._access_token_expiry_date,
+            host_resilience_registry=self._host_resilience_registry,
+            maximum_time_to_retry_on_429=self._maximum_time_to_retry_on_429,
             refresh_token_func=self._refresh_token_function,
             tracer_request_func=self._trace_request_function,
         ) as client:
@@ -281,6 +283,8 @@ class FhirAuthMixin(FhirClientProtocol):
             log_all_url_results=self._log_all_response_urls,
             access_token=self._access_token,
             access_token_expiry_date=self._access_token_expiry_date,
+            host_resilience_registry=self._host_resilience_registry,
+            maximum_time_to_retry_on_429=self._maximum_time_to_retry_on_429,
             refresh_token_func=self._refresh_token_function,
             tracer_request_func=self._trace_request_function,
         ) as client:
@@ -30,7 +30,6 @@ from opentelemetry import trace
 from opentelemetry.trace import Status, StatusCode
 from requests.adapters import BaseAdapter
 
-from helix_fhir_client_sdk.dictionary_writer import convert_dict_to_str
 from helix_fhir_client_sdk.fhir_auth_mixin import FhirAuthMixin
 from helix_fhir_client_sdk.fhir_delete_mixin import FhirDeleteMixin
 from helix_fhir_client_sdk.fhir_merge_mixin import FhirMergeMixin
@@ -50,13 +49,23 @@ from helix_fhir_client_sdk.graph.simulated_graph_processor_mixin import (
 )
 from helix_fhir_client_sdk.open_telemetry.span_names import FhirClientSdkOpenTelemetrySpanNames
 from helix_fhir_client_sdk.queue.request_queue_mixin import RequestQueueMixin
+from helix_fhir_client_sdk.queue.request_scheduler import RequestPriority, RequestScheduler
 from helix_fhir_client_sdk.responses.fhir_client_protocol import FhirClientProtocol
 from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
 from helix_fhir_client_sdk.structures.get_access_token_result import (
     GetAccessTokenResult,
 )
+from helix_fhir_client_sdk.structures.raw_sink_result import RawSinkResult
+from helix_fhir_client_sdk.structures.streaming_batch_size import StreamingBatchSize
+from helix_fhir_client_sdk.structures.streaming_queue_sizes import StreamingQueueSizes
 from helix_fhir_client_sdk.utilities.async_runner import AsyncRunner
 from helix_fhir_client_sdk.utilities.fhir_client_logger import FhirClientLogger
+from helix_fhir_client_sdk.utilities.host_resilience.adaptive_concurrency_registry import AdaptiveConcurrencyRegistry
+from helix_fhir_client_sdk.utilities.host_resilience.hedging_policy import HedgingPolicy
+from helix_fhir_client_sdk.utilities.host_resilience.host_resilience_registry import HostResilienceRegistry
+from helix_fhir_client_sdk.utilities.http_request_timing import HttpRequestTiming
+from helix_fhir_client_sdk.utilities.offloaded_json_parser import OffloadedJsonParser
+from helix_fhir_client_sdk.utilities.raw_sinks.fhir_raw_sink import FhirRawSink
 
 TRACER = trace.get_tracer(__name__)
 
@@ -131,6 +140,12 @@ class FhirClient(
 
         self._retry_count: int = 2
         self._exclude_status_codes_from_retry: list[int] | None = None
+        self._host_resilience_registry: HostResilienceRegistry | None = None
+        self._adaptive_concurrency_registry: AdaptiveConcurrencyRegistry | None = None
+        self._request_scheduler: RequestScheduler | None = None
+        self._request_priority: RequestPriority = RequestPriority.NORMAL
+        self._request_caller: str | None = None
+        self._hedging_policy: HedgingPolicy | None = None
 
         self._uuid = uuid.uuid4()
         self._log_level: str | None = environ.get("LOGLEVEL")
@@ -138,6 +153,9 @@ class FhirClient(
         self._refresh_token_function: RefreshTokenFunction = self.authenticate_async_wrapper()
         self._trace_request_function: TraceRequestFunction | None = None
         self._chunk_size: int = 1024
+        self._streaming_batch_size: StreamingBatchSize | None = None
+        self._streaming_queue_sizes: StreamingQueueSizes | None = None
+        self._json_parser: OffloadedJsonParser | None = None
 
         self._compress: bool = True
 
@@ -318,6 +336,66 @@ class FhirClient(
         self._retry_count = count
         return self
 
+    def host_resilience(self, registry: HostResilienceRegistry | None) -> FhirClient:
+        """
+        Shares a retry budget and a circuit breaker per host across all the requests of the clients that use the
+        same registry.  Retries are dropped once the budget of the host is exhausted and requests fail fast with
+        CircuitBreakerOpenError while the host is unhealthy.
+
+
+        :param registry: registry to use e.g., HostResilienceRegistry.default().  None to retry every request on its own.
+        """
+        self._host_resilience_registry = registry
+        return self
+
+    def adaptive_concurrency(self, registry: AdaptiveConcurrencyRegistry | None) -> FhirClient:
+        """
+        Limits the concurrent requests to each host with a limit that adapts to the load: it grows while requests
+        complete in time and is cut when the host returns 429 or 503, fails or is slower than the target latency.
+        All the clients that use the same registry (including clones) share the limit of a host.  When set, this is
+        used instead of set_max_concurrent_requests().
+
+
+        :param registry: registry to use e.g., AdaptiveConcurrencyRegistry.default().  None for a fixed limit.
+        """
+        self._adaptive_concurrency_registry = registry
+        return self
+
+    def hedge_requests(self, policy: HedgingPolicy | None) -> FhirClient:
+        """
+        Sends a read (GET) a second time when it takes longer than a percentile of the recent latencies of the host
+        and uses whichever response comes first, cancelling the other.  The policy limits the share of requests that
+        are sent twice.  Share one policy between clients so the limit applies to all of them.
+
+
+        :param policy: policy to use e.g., HedgingPolicy(percentile=0.95).  None to send each read once.
+        """
+        self._hedging_policy = policy
+        return self
+
+    def request_scheduler(
+        self,
+        scheduler: RequestScheduler | None,
+        *,
+        priority: RequestPriority = RequestPriority.NORMAL,
+        caller: str | None = None,
+    ) -> FhirClient:
+        """
+        Sends the requests of this client through a scheduler shared with other clients so that, when they have to
+        wait, interactive requests go before background ones and callers of the same priority take turns.  The
+        scheduler is applied before set_max_concurrent_requests() and adaptive_concurrency().
+
+
+        :param scheduler: scheduler shared by the clients.  None to send requests in the order they are made.
+        :param priority: priority class of the requests of this client
+        :param caller: caller (e.g., tenant or job) the requests are sent for.  Callers get a share of the requests
+                        of their priority class in proportion to their weight in the scheduler.
+        """
+        self._request_scheduler = scheduler
+        self._request_priority = priority
+        self._request_caller = caller
+        return self
+
     def logger(self, logger: Logger) -> FhirClient:
         """
         Logger to use for logging calls to the FHIR server
@@ -448,6 +526,38 @@ class FhirClient(
         self._chunk_size = size
         return self
 
+    def streaming_batch_size(self, batch_size: StreamingBatchSize | None) -> FhirClient:
+        """
+        When streaming, yields the resources in batches (one FhirGetBundleResponse per batch) instead of one response
+        per resource.  Larger batches cost less per resource but each batch is returned later.
+
+        :param batch_size: resources or bytes per batch.  StreamingBatchSize() yields one batch per chunk received.
+                           None yields one response per resource.
+        """
+        self._streaming_batch_size = batch_size
+        return self
+
+    def streaming_queue_sizes(self, queue_sizes: StreamingQueueSizes | None) -> FhirClient:
+        """
+        When streaming, reads from the network, parses the resources and returns them to the caller in separate
+        stages connected by bounded queues.  Reading then continues while the caller processes the resources, and a
+        slow caller slows down the reading once the queues are full.
+
+        :param queue_sizes: depths of the queues.  None reads, parses and returns the resources in one coroutine.
+        """
+        self._streaming_queue_sizes = queue_sizes
+        return self
+
+    def json_parser(self, parser: OffloadedJsonParser | None) -> FhirClient:
+        """
+        Parses large (non-streamed) pages with this parser, e.g., in a process pool so the event loop is not blocked.
+        The parser records how long parsing blocked the event loop in parser.statistics.
+
+        :param parser: parser to use.  None parses the pages with json.loads on the event loop.
+        """
+        self._json_parser = parser
+        return self
+
     def last_page(self, last_page: int) -> FhirClient:
         """
         Sets the last page number
@@ -638,13 +748,12 @@ class FhirClient(
         :return: response
         """
         with TRACER.start_as_current_span(FhirClientSdkOpenTelemetrySpanNames.GET):
-            instance_variables_text = convert_dict_to_str(FhirClientLogger.get_variables_to_log(vars(self)))
             if self._logger:
                 # self._logger.info(f"LOGLEVEL: {self._log_level}")
-                self._logger.debug(f"parameters: {instance_variables_text}")
+                FhirClientLogger.log_variables(logger=self._logger, level=logging.DEBUG, vars_dict=vars(self))
             else:
                 self._internal_logger.debug(f"LOGLEVEL (InternalLogger): {self._log_level}")
-                self._internal_logger.debug(f"parameters: {instance_variables_text}")
+                FhirClientLogger.log_variables(logger=self._internal_logger, level=logging.DEBUG, vars_dict=vars(self))
             ids: list[str] | None = None
             if self._id:
                 ids = self._id if isinstance(self._id, list) else [self._id]
@@ -675,13 +784,12 @@ class FhirClient(
 
         :return: response
         """
-        instance_variables_text = convert_dict_to_str(FhirClientLogger.get_variables_to_log(vars(self)))
         if self._logger:
             # self._logger.info(f"LOGLEVEL: {self._log_level}")
-            self._logger.debug(f"parameters: {instance_variables_text}")
+            FhirClientLogger.log_variables(logger=self._logger, level=logging.DEBUG, vars_dict=vars(self))
         else:
             self._internal_logger.debug(f"LOGLEVEL (InternalLogger): {self._log_level}")
-            self._internal_logger.debug(f"parameters: {instance_variables_text}")
+            FhirClientLogger.log_variables(logger=self._internal_logger, level=logging.DEBUG, vars_dict=vars(self))
         ids: list[str] | None = None
         if self._id:
             ids = self._id if isinstance(self._id, list) else [self._id]
@@ -693,6 +801,39 @@ class FhirClient(
             resource_type=None,
         )
 
+    async def get_raw_to_sink_async(
+        self,
+        sink: FhirRawSink,
+        *,
+        split_lines: bool = False,
+    ) -> RawSinkResult:
+        """
+        Issues a GET call and writes the raw bytes of the responses to the sink without decoding or parsing them.
+        Follows the next links of Bundle pages by reading only the "link" element of each page.  Since the resources
+        are not parsed, limit is not applied and the resources are not expanded, separated or filtered.
+
+        :param sink: where to write the bytes e.g., an AsyncFileSink
+        :param split_lines: write each NDJSON line (ending with its newline) separately instead of the chunks as
+                            received
+
+        :return: result
+        """
+        FhirClientLogger.log_variables(
+            logger=self._logger or self._internal_logger, level=logging.DEBUG, vars_dict=vars(self)
+        )
+        ids: list[str] | None = None
+        if self._id:
+            ids = self._id if isinstance(self._id, list) else [self._id]
+        return await self._get_raw_to_sink_with_session_async(
+            sink=sink,
+            split_lines=split_lines,
+            page_number=None,
+            ids=ids,
+            id_above=None,
+            additional_parameters=None,
+            resource_type=None,
+        )
+
     async def get_streaming_async(
         self,
         *,
@@ -707,13 +848,12 @@ class FhirClient(
         """
         span = TRACER.start_span(FhirClientSdkOpenTelemetrySpanNames.GET_STREAMING)
         try:
-            instance_variables_text = convert_dict_to_str(FhirClientLogger.get_variables_to_log(vars(self)))
             if self._logger:
                 # self._logger.info(f"LOGLEVEL: {self._log_level}")
-                self._logger.info(f"parameters: {instance_variables_text}")
+                FhirClientLogger.log_variables(logger=self._logger, level=logging.INFO, vars_dict=vars(self))
             else:
                 self._internal_logger.info(f"LOGLEVEL (InternalLogger): {self._log_level}")
-                self._internal_logger.info(f"parameters: {instance_variables_text}")
+                FhirClientLogger.log_variables(logger=self._internal_logger, level=logging.INFO, vars_dict=vars(self))
             ids: list[str] | None = None
             if self._id:
                 ids = self._id if isinstance(self._id, list) else [self._id]
@@ -863,7 +1003,8 @@ class FhirClient(
         timeout = aiohttp.ClientTimeout(total=60 * 60, sock_read=240)
         session: ClientSession = aiohttp.ClientSession(
             connector=TCPConnector(ssl=ssl_context),
-            trace_configs=[trace_config],
+            # the timing hooks only read the clock so they are always on
+            trace_configs=[trace_config, HttpRequestTiming.create_trace_config()],
             headers={"Connection": "keep-alive"},
             timeout=timeout,
         )
@@ -930,6 +1071,9 @@ class FhirClient(
         fhir_client._refresh_token_function = self._refresh_token_function
         fhir_client._exclude_status_codes_from_retry = self._exclude_status_codes_from_retry
         fhir_client._chunk_size = self._chunk_size
+        fhir_client._streaming_batch_size = self._streaming_batch_size
+        fhir_client._streaming_queue_sizes = self._streaming_queue_sizes
+        fhir_client._json_parser = self._json_parser
         fhir_client._expand_fhir_bundle = self._expand_fhir_bundle
         fhir_client._separate_bundle_resources = self._separate_bundle_resources
         fhir_client._use_data_streaming = self._use_data_streaming
@@ -945,6 +1089,12 @@ class FhirClient(
         fhir_client._use_post_for_search = self._use_post_for_search
         fhir_client._maximum_time_to_retry_on_429 = self._maximum_time_to_retry_on_429
         fhir_client._retry_count = self._retry_count
+        fhir_client._host_resilience_registry = self._host_resilience_registry
+        fhir_client._adaptive_concurrency_registry = self._adaptive_concurrency_registry
+        fhir_client._request_scheduler = self._request_scheduler
+        fhir_client._request_priority = self._request_priority
+        fhir_client._request_caller = self._request_caller
+        fhir_client._hedging_policy = self._hedging_policy
         fhir_client._throw_exception_on_error = self._throw_exception_on_error
         fhir_client._trace_request_function = self._trace_request_function
         fhir_client._log_all_response_urls = self._log_all_response_urls
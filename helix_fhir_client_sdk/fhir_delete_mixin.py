@@ -1,5 +1,12 @@
 import json
+from collections.abc import AsyncGenerator, AsyncIterable, Iterable
+from contextlib import aclosing
+from typing import Any, Literal
 
+from compressedfhir.fhir.fhir_bundle import FhirBundle
+from compressedfhir.fhir.fhir_bundle_entry import FhirBundleEntry
+from compressedfhir.fhir.fhir_bundle_entry_list import FhirBundleEntryList
+from compressedfhir.fhir.fhir_bundle_entry_request import FhirBundleEntryRequest
 from furl import furl
 from opentelemetry import trace
 from opentelemetry.trace import Status, StatusCode
@@ -11,6 +18,10 @@ from helix_fhir_client_sdk.responses.fhir_delete_response import FhirDeleteRespo
 from helix_fhir_client_sdk.structures.get_access_token_result import (
     GetAccessTokenResult,
 )
+from helix_fhir_client_sdk.utilities.async_parallel_processor.v1.async_parallel_processor import (
+    AsyncParallelProcessor,
+    ParallelFunctionContext,
+)
 from helix_fhir_client_sdk.utilities.async_runner import AsyncRunner
 from helix_fhir_client_sdk.utilities.retryable_aiohttp_client import (
     RetryableAioHttpClient,
@@ -55,20 +66,7 @@ class FhirDeleteMixin(FhirClientProtocol):
                 if access_token:
                     headers["Authorization"] = f"Bearer {access_token}"
 
-                async with RetryableAioHttpClient(
-                    fn_get_session=self._fn_create_http_session or self.create_http_session,
-                    caller_managed_session=self._fn_create_http_session is not None,
-                    refresh_token_func=self._refresh_token_function,
-                    retries=self._retry_count,
-                    exclude_status_codes_from_retry=self._exclude_status_codes_from_retry,
-                    use_data_streaming=self._use_data_streaming,
-                    compress=False,
-                    throw_exception_on_error=self._throw_exception_on_error,
-                    log_all_url_results=self._log_all_response_urls,
-                    access_token=self._access_token,
-                    access_token_expiry_date=self._access_token_expiry_date,
-                    tracer_request_func=self._trace_request_function,
-                ) as client:
+                async with self._create_delete_client() as client:
                     response: RetryableAioHttpResponse = await client.delete(url=full_uri.tostr(), headers=headers)
                     request_id = response.response_headers.get("X-Request-ID", None)
                     self._internal_logger.debug(f"X-Request-ID={request_id}")
@@ -108,8 +106,6 @@ class FhirDeleteMixin(FhirClientProtocol):
         """
         if not self._resource:
             raise ValueError("delete requires a FHIR resource type")
-        full_uri: furl = furl(self._url)
-        full_uri /= self._resource
         full_url = await self.build_url(
             id_above=None,
             page_number=None,
@@ -117,19 +113,212 @@ class FhirDeleteMixin(FhirClientProtocol):
             additional_parameters=additional_parameters,
             resource_type=self._resource,
         )
-        # setup retry
-        # set up headers
-        headers: dict[str, str] = {}
-        headers.update(self._additional_request_headers)
-        self._internal_logger.debug(f"Request headers: {headers}")
+        access_token_result: GetAccessTokenResult = await self.get_access_token_async()
+        access_token: str | None = access_token_result.access_token
+        headers: dict[str, str] = self._get_delete_headers(access_token=access_token)
+
+        async with self._create_delete_client() as client:
+            return await self._delete_by_url_async(
+                client=client,
+                url=full_url,
+                resource_type=self._resource,
+                headers=headers,
+                access_token=access_token,
+            )
+
+    async def delete_by_queries_async(
+        self,
+        *,
+        queries: AsyncIterable[list[str]] | Iterable[list[str]],
+        max_concurrent_requests: int | None = None,
+    ) -> FhirDeleteResponse:
+        """
+        Deletes the resources matching each query, sending up to max_concurrent_requests (or the client's
+        max_concurrent_requests) queries at the same time over one HTTP session.  The deleted counts of all the
+        queries are added up in the returned response.
+
 
+        :param queries: additional parameters of each query e.g., [["subject=Patient/1"], ["subject=Patient/2"]]
+        :param max_concurrent_requests: (Optional) maximum number of requests to send at the same time
+        :return: single response with the total count of deleted resources
+        """
+        resource_type: str | None = self._resource
+        if not resource_type:
+            raise ValueError("delete requires a FHIR resource type")
         access_token_result: GetAccessTokenResult = await self.get_access_token_async()
         access_token: str | None = access_token_result.access_token
-        # set access token in request if present
-        if access_token:
-            headers["Authorization"] = f"Bearer {access_token}"
+        headers: dict[str, str] = self._get_delete_headers(access_token=access_token)
+
+        async def delete_query_async(
+            *,
+            context: ParallelFunctionContext,
+            row: list[str],
+            parameters: RetryableAioHttpClient | None,
+            additional_parameters: dict[str, Any] | None,
+        ) -> FhirDeleteResponse:
+            assert parameters is not None and resource_type
+            full_url: str = await self.build_url(
+                id_above=None,
+                page_number=None,
+                ids=None,
+                additional_parameters=row,
+                resource_type=resource_type,
+            )
+            return await self._delete_by_url_async(
+                client=parameters,
+                url=full_url,
+                resource_type=resource_type,
+                headers=headers,
+                access_token=access_token,
+            )
 
-        async with RetryableAioHttpClient(
+        async with self._create_delete_client() as client:
+            async with aclosing(
+                AsyncParallelProcessor(
+                    name="delete_by_queries_async",
+                    max_concurrent_tasks=max_concurrent_requests or self._max_concurrent_requests or 1,
+                ).process_stream_in_parallel(
+                    rows=queries,
+                    process_row_fn=delete_query_async,
+                    parameters=client,
+                    log_level=self._log_level,
+                )
+            ) as responses:
+                return await self._sum_delete_responses_async(
+                    responses=responses,
+                    url=(furl(self._url) / resource_type).tostr(),
+                    resource_type=resource_type,
+                    access_token=access_token,
+                )
+
+    async def delete_resources_by_ids_async(
+        self,
+        *,
+        ids: AsyncIterable[str] | Iterable[str],
+        resource_type: str | None = None,
+        max_url_length: int = 2000,
+        max_concurrent_requests: int | None = None,
+        bundle_type: Literal["transaction", "batch"] | None = None,
+        bundle_size: int = 100,
+    ) -> FhirDeleteResponse:
+        """
+        Deletes a large number of resources by id.  The ids are read incrementally so they can come from a
+        database cursor or a file without being held in memory.
+
+        By default, ids are packed into comma-separated DELETE urls of up to max_url_length characters.  If
+        bundle_type is set, ids are instead packed bundle_size at a time into a transaction or batch Bundle of DELETE
+        entries that is POSTed to the base url.
+
+        Up to max_concurrent_requests (or the client's max_concurrent_requests) requests run at the same time over
+        one HTTP session and the deleted counts of all the requests are added up in the returned response.
+
+
+        :param ids: ids of the resources to delete
+        :param resource_type: (Optional) resource type to delete.  Defaults to the client's resource.
+        :param max_url_length: maximum length of each DELETE url
+        :param max_concurrent_requests: (Optional) maximum number of requests to send at the same time
+        :param bundle_type: (Optional) "transaction" or "batch" to send the DELETEs inside Bundles
+        :param bundle_size: number of ids to put in each Bundle when bundle_type is set
+        :return: single response with the total count of deleted resources
+        """
+        assert self._url, "No FHIR server url was set"
+        resource_type = resource_type or self._resource
+        if not resource_type:
+            raise ValueError("delete requires a FHIR resource type")
+        assert bundle_size > 0, "bundle_size must be greater than 0"
+
+        base_url: str = (furl(self._url) / resource_type).tostr()
+        concurrency: int = max_concurrent_requests or self._max_concurrent_requests or 1
+        access_token_result: GetAccessTokenResult = await self.get_access_token_async()
+        headers: dict[str, str] = self._get_delete_headers(access_token=access_token_result.access_token)
+        if bundle_type:
+            headers["Content-Type"] = "application/fhir+json"
+
+        async def delete_chunk_async(
+            *,
+            context: ParallelFunctionContext,
+            row: list[str],
+            parameters: RetryableAioHttpClient | None,
+            additional_parameters: dict[str, Any] | None,
+        ) -> FhirDeleteResponse:
+            assert parameters is not None and resource_type
+            if bundle_type:
+                return await self._delete_bundle_async(
+                    client=parameters, ids=row, resource_type=resource_type, bundle_type=bundle_type, headers=headers
+                )
+            return await self._delete_ids_async(
+                client=parameters,
+                url=f"{base_url}/{','.join(row)}",
+                count=len(row),
+                resource_type=resource_type,
+                headers=headers,
+            )
+
+        async with self._create_delete_client() as client:
+            async with aclosing(
+                AsyncParallelProcessor(
+                    name="delete_resources_by_ids_async", max_concurrent_tasks=concurrency
+                ).process_stream_in_parallel(
+                    rows=self._chunk_ids_async(
+                        ids=ids,
+                        max_url_length=None if bundle_type else max_url_length - len(base_url) - 1,
+                        max_ids_per_chunk=bundle_size if bundle_type else None,
+                    ),
+                    process_row_fn=delete_chunk_async,
+                    parameters=client,
+                    log_level=self._log_level,
+                )
+            ) as responses:
+                result: FhirDeleteResponse = await self._sum_delete_responses_async(
+                    responses=responses,
+                    url=base_url,
+                    resource_type=resource_type,
+                    access_token=access_token_result.access_token,
+                )
+
+        if self._logger:
+            self._logger.info(f"Deleted {result.count} {resource_type} resources")
+        return result
+
+    @staticmethod
+    async def _sum_delete_responses_async(
+        *,
+        responses: AsyncIterable[FhirDeleteResponse],
+        url: str,
+        resource_type: str,
+        access_token: str | None,
+    ) -> FhirDeleteResponse:
+        """
+        Adds up the deleted counts of the responses of a bulk delete.  Only the counts, the status of the last
+        failed request and the distinct errors are kept, not the response texts, so memory does not grow with the
+        number of requests.
+        """
+        count: int = 0
+        status: int = 200
+        # a dict keeps the errors distinct and in the order they were first seen
+        errors: dict[str, None] = {}
+        async for response in responses:
+            count += response.count or 0
+            if response.error:
+                status = response.status
+                errors.update(dict.fromkeys(response.error.split(",")))
+        return FhirDeleteResponse(
+            request_id=None,
+            url=url,
+            responses="",
+            error=",".join(errors) if errors else None,
+            access_token=access_token,
+            status=status,
+            resource_type=resource_type,
+            count=count,
+        )
+
+    def _create_delete_client(self) -> RetryableAioHttpClient:
+        """
+        Creates the client used to send deletes.  One client (and so one HTTP session) is shared by all the
+        requests of a bulk delete.
+        """
+        return RetryableAioHttpClient(
             fn_get_session=self._fn_create_http_session or self.create_http_session,
             caller_managed_session=self._fn_create_http_session is not None,
             refresh_token_func=self._refresh_token_function,
@@ -141,29 +330,205 @@ class FhirDeleteMixin(FhirClientProtocol):
             log_all_url_results=self._log_all_response_urls,
             access_token=self._access_token,
             access_token_expiry_date=self._access_token_expiry_date,
+            host_resilience_registry=self._host_resilience_registry,
+            maximum_time_to_retry_on_429=self._maximum_time_to_retry_on_429,
             tracer_request_func=self._trace_request_function,
-        ) as client:
-            response: RetryableAioHttpResponse = await client.delete(url=full_url, headers=headers)
-            request_id = response.response_headers.get("X-Request-ID", None)
-            self._internal_logger.debug(f"X-Request-ID={request_id}")
-            if response.status == 200:
-                if self._logger:
-                    self._logger.info(f"Successfully deleted: {full_uri}")
-
-            deleted_count: int | None = None
-            response_text = await response.get_text_async()
-            if response_text and response_text.startswith("{"):
-                # '{"deleted":0}'
-                deleted_info = json.loads(response_text)
-                deleted_count = deleted_info.get("deleted", None)
-
-            return FhirDeleteResponse(
-                request_id=request_id,
-                url=full_url,
-                responses=response_text,
-                error=f"{response.status}" if not response.status == 200 else None,
-                access_token=access_token,
-                status=response.status,
-                count=deleted_count,
-                resource_type=self._resource,
-            )
+        )
+
+    def _get_delete_headers(self, *, access_token: str | None) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        headers.update(self._additional_request_headers)
+        self._internal_logger.debug(f"Request headers: {headers}")
+        # set access token in request if present
+        if access_token:
+            headers["Authorization"] = f"Bearer {access_token}"
+        return headers
+
+    @staticmethod
+    def _parse_deleted_count(response_text: str | None) -> int | None:
+        """
+        Returns the number of deleted resources reported by the server e.g., '{"deleted":0}'
+        """
+        if response_text and response_text.startswith("{"):
+            deleted_info = json.loads(response_text)
+            deleted_count: int | None = deleted_info.get("deleted", None)
+            return deleted_count
+        return None
+
+    @staticmethod
+    async def _chunk_ids_async(
+        *,
+        ids: AsyncIterable[str] | Iterable[str],
+        max_url_length: int | None,
+        max_ids_per_chunk: int | None,
+    ) -> AsyncGenerator[list[str], None]:
+        """
+        Groups the ids into chunks whose comma-joined length fits in max_url_length and that have at most
+        max_ids_per_chunk ids.  A chunk always has at least one id.
+        """
+
+        async def iterate() -> AsyncGenerator[str, None]:
+            if isinstance(ids, AsyncIterable):
+                async for id_ in ids:
+                    yield id_
+            else:
+                for id_ in ids:
+                    yield id_
+
+        chunk: list[str] = []
+        chunk_length: int = 0
+        async for id_ in iterate():
+            if not id_:
+                continue
+            # +1 for the comma
+            new_length: int = chunk_length + len(id_) + (1 if chunk else 0)
+            if chunk and (
+                (max_url_length is not None and new_length > max_url_length)
+                or (max_ids_per_chunk is not None and len(chunk) >= max_ids_per_chunk)
+            ):
+                yield chunk
+                chunk = []
+                new_length = len(id_)
+            chunk.append(id_)
+            chunk_length = new_length
+        if chunk:
+            yield chunk
+
+    async def _delete_by_url_async(
+        self,
+        *,
+        client: RetryableAioHttpClient,
+        url: str,
+        resource_type: str,
+        headers: dict[str, str],
+        access_token: str | None,
+    ) -> FhirDeleteResponse:
+        """
+        Sends one DELETE for a search url and reads the number of deleted resources reported by the server
+        """
+        response: RetryableAioHttpResponse = await client.delete(url=url, headers=headers)
+        request_id = response.response_headers.get("X-Request-ID", None)
+        self._internal_logger.debug(f"X-Request-ID={request_id}")
+        if response.status == 200:
+            if self._logger:
+                self._logger.info(f"Successfully deleted: {url}")
+
+        response_text = await response.get_text_async()
+        deleted_count: int | None = self._parse_deleted_count(response_text)
+
+        return FhirDeleteResponse(
+            request_id=request_id,
+            url=url,
+            responses=response_text,
+            error=f"{response.status}" if not response.status == 200 else None,
+            access_token=access_token,
+            status=response.status,
+            count=deleted_count,
+            resource_type=resource_type,
+        )
+
+    async def _delete_ids_async(
+        self,
+        *,
+        client: RetryableAioHttpClient,
+        url: str,
+        count: int,
+        resource_type: str,
+        headers: dict[str, str],
+    ) -> FhirDeleteResponse:
+        """
+        Sends one DELETE for a comma-separated list of ids.  If the server does not report how many resources were
+        deleted, every id is counted on success.
+        """
+        with TRACER.start_as_current_span(FhirClientSdkOpenTelemetrySpanNames.DELETE) as span:
+            span.set_attribute(FhirClientSdkOpenTelemetryAttributeNames.URL, self._url or "")
+            span.set_attribute(FhirClientSdkOpenTelemetryAttributeNames.RESOURCE, resource_type)
+            span.set_attribute(FhirClientSdkOpenTelemetryAttributeNames.BATCH_SIZE, count)
+            try:
+                response: RetryableAioHttpResponse = await client.delete(url=url, headers=headers)
+                request_id = response.response_headers.get("X-Request-ID", None)
+                self._internal_logger.debug(f"X-Request-ID={request_id}")
+                response_text: str = await response.get_text_async()
+                deleted_count: int | None = self._parse_deleted_count(response_text)
+                if deleted_count is None and response.status == 200:
+                    deleted_count = count
+                return FhirDeleteResponse(
+                    request_id=request_id,
+                    url=url,
+                    responses=response_text,
+                    error=f"{response.status}" if not response.status == 200 else None,
+                    access_token=None,
+                    status=response.status,
+                    count=deleted_count,
+                    resource_type=resource_type,
+                )
+            except Exception as e:
+                span.record_exception(e)
+                span.set_status(Status(StatusCode.ERROR, str(e)))
+                raise
+
+    async def _delete_bundle_async(
+        self,
+        *,
+        client: RetryableAioHttpClient,
+        ids: list[str],
+        resource_type: str,
+        bundle_type: Literal["transaction", "batch"],
+        headers: dict[str, str],
+    ) -> FhirDeleteResponse:
+        """
+        POSTs a transaction or batch Bundle of DELETE entries to the base url and counts the entries of the returned
+        Bundle that succeeded.
+        """
+        bundle: FhirBundle = FhirBundle(
+            type_=bundle_type,
+            entry=FhirBundleEntryList(
+                [
+                    FhirBundleEntry(
+                        resource=None, request=FhirBundleEntryRequest(method="DELETE", url=f"{resource_type}/{id_}")
+                    )
+                    for id_ in ids
+                ]
+            ),
+        )
+        with TRACER.start_as_current_span(FhirClientSdkOpenTelemetrySpanNames.DELETE) as span:
+            span.set_attribute(FhirClientSdkOpenTelemetryAttributeNames.URL, self._url or "")
+            span.set_attribute(FhirClientSdkOpenTelemetryAttributeNames.RESOURCE, resource_type)
+            span.set_attribute(FhirClientSdkOpenTelemetryAttributeNames.BATCH_SIZE, len(ids))
+            try:
+                response: RetryableAioHttpResponse = await client.post(
+                    url=self._url or "", data=bundle.json(), headers=headers
+                )
+                request_id = response.response_headers.get("X-Request-ID", None)
+                self._internal_logger.debug(f"X-Request-ID={request_id}")
+                response_text: str = await response.get_text_async()
+                deleted_count: int = 0
+                errors: list[str] = []
+                if response.status == 200 and response_text.startswith("{"):
+                    for entry in json.loads(response_text).get("entry", []):
+                        # status is e.g. "204 No Content"
+                        entry_status: str = str(entry.get("response", {}).get("status", "500")).split(" ")[0]
+                        if entry_status.startswith("2"):
+                            deleted_count += 1
+                        else:
+                            errors.append(entry_status)
+                return FhirDeleteResponse(
+                    request_id=request_id,
+                    url=self._url or "",
+                    responses=response_text,
+                    error=(
+                        f"{response.status}"
+                        if not response.status == 200
+                        else ",".join(sorted(set(errors)))
+                        if errors
+                        else None
+                    ),
+                    access_token=None,
+                    status=response.status,
+                    count=deleted_count,
+                    resource_type=resource_type,
+                )
+            except Exception as e:
+                span.record_exception(e)
+                span.set_status(Status(StatusCode.ERROR, str(e)))
+                raise
@@ -1,4 +1,5 @@
 import json
+import logging
 import time
 from collections.abc import AsyncGenerator, Generator
 from typing import (
@@ -122,12 +123,7 @@ class FhirMergeMixin(FhirClientProtocol):
                 self._internal_logger.debug(
                     f"Calling $merge on {self._url} with client_id={self._client_id} and scopes={self._auth_scopes}"
                 )
-                instance_variables_text = convert_dict_to_str(FhirClientLogger.get_variables_to_log(vars(self)))
-                if self._internal_logger:
-                    self._internal_logger.info(f"parameters: {instance_variables_text}")
-                else:
-                    self._internal_logger.info(f"LOGLEVEL (InternalLogger): {self._log_level}")
-                    self._internal_logger.info(f"parameters: {instance_variables_text}")
+                FhirClientLogger.log_variables(logger=self._internal_logger, level=logging.INFO, vars_dict=vars(self))
 
                 request_id: str | None = None
                 response_status: int | None = None
@@ -198,6 +194,8 @@ class FhirMergeMixin(FhirClientProtocol):
                                     log_all_url_results=self._log_all_response_urls,
                                     access_token=self._access_token,
                                     access_token_expiry_date=self._access_token_expiry_date,
+                                    host_resilience_registry=self._host_resilience_registry,
+                                    maximum_time_to_retry_on_429=self._maximum_time_to_retry_on_429,
                                 ) as client:
                                     # should we check if it exists and do a POST then?
                                     response: RetryableAioHttpResponse = await client.post(
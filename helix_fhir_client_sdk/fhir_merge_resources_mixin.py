@@ -1,7 +1,9 @@
 import json
+import logging
 import time
 from collections import deque
 from collections.abc import AsyncGenerator
+from pathlib import Path
 from typing import Any, cast
 from urllib import parse
 
@@ -16,6 +18,7 @@ from helix_fhir_client_sdk.exceptions.fhir_sender_exception import FhirSenderExc
 from helix_fhir_client_sdk.exceptions.fhir_validation_exception import (
     FhirValidationException,
 )
+from helix_fhir_client_sdk.fixers.fix_fhir_bundle import FhirBundleFixer
 from helix_fhir_client_sdk.responses.fhir_client_protocol import FhirClientProtocol
 from helix_fhir_client_sdk.responses.merge.base_fhir_merge_resource_response_entry import (
     BaseFhirMergeResourceResponseEntry,
@@ -32,7 +35,15 @@ from helix_fhir_client_sdk.responses.merge.fhir_merge_response_entry_issue impor
 from helix_fhir_client_sdk.structures.get_access_token_result import (
     GetAccessTokenResult,
 )
+from helix_fhir_client_sdk.utilities.async_parallel_processor.v1.async_parallel_processor import (
+    AsyncParallelProcessor,
+    ParallelFunctionContext,
+)
 from helix_fhir_client_sdk.utilities.fhir_client_logger import FhirClientLogger
+from helix_fhir_client_sdk.utilities.fhir_resource_file_reader import (
+    FhirResourceFileBatch,
+    FhirResourceFileReader,
+)
 from helix_fhir_client_sdk.utilities.retryable_aiohttp_client import (
     RetryableAioHttpClient,
 )
@@ -118,6 +129,8 @@ class FhirMergeResourcesMixin(FhirClientProtocol):
                 log_all_url_results=self._log_all_response_urls,
                 access_token=self._access_token,
                 access_token_expiry_date=self._access_token_expiry_date,
+                host_resilience_registry=self._host_resilience_registry,
+                maximum_time_to_retry_on_429=self._maximum_time_to_retry_on_429,
             ) as client:
                 http_post_start = time.time()
                 response: RetryableAioHttpResponse = await client.post(
@@ -255,12 +268,7 @@ class FhirMergeResourcesMixin(FhirClientProtocol):
         self._internal_logger.debug(
             f"Calling $merge on {self._url} with client_id={self._client_id} and scopes={self._auth_scopes}"
         )
-        instance_variables_text = convert_dict_to_str(FhirClientLogger.get_variables_to_log(vars(self)))
-        if self._internal_logger:
-            self._internal_logger.debug(f"parameters: {instance_variables_text}")
-        else:
-            self._internal_logger.info(f"LOGLEVEL (InternalLogger): {self._log_level}")
-            self._internal_logger.info(f"parameters: {instance_variables_text}")
+        FhirClientLogger.log_variables(logger=self._internal_logger, level=logging.DEBUG, vars_dict=vars(self))
 
         request_id: str | None = None
         response_status: int | None = None
@@ -312,6 +320,8 @@ class FhirMergeResourcesMixin(FhirClientProtocol):
                         log_all_url_results=self._log_all_response_urls,
                         access_token=self._access_token,
                         access_token_expiry_date=self._access_token_expiry_date,
+                        host_resilience_registry=self._host_resilience_registry,
+                        maximum_time_to_retry_on_429=self._maximum_time_to_retry_on_429,
                     ) as client:
                         # should we check if it exists and do a POST then?
                         response: RetryableAioHttpResponse = await client.post(
@@ -460,12 +470,7 @@ class FhirMergeResourcesMixin(FhirClientProtocol):
         self._internal_logger.debug(
             f"Calling $merge on {self._url} with client_id={self._client_id} and scopes={self._auth_scopes}"
         )
-        instance_variables_text = convert_dict_to_str(FhirClientLogger.get_variables_to_log(vars(self)))
-        if self._internal_logger:
-            self._internal_logger.debug(f"parameters: {instance_variables_text}")
-        else:
-            self._internal_logger.info(f"LOGLEVEL (InternalLogger): {self._log_level}")
-            self._internal_logger.info(f"parameters: {instance_variables_text}")
+        FhirClientLogger.log_variables(logger=self._internal_logger, level=logging.DEBUG, vars_dict=vars(self))
 
         request_id: str | None = None
         response_status: int | None = None
@@ -529,6 +534,8 @@ class FhirMergeResourcesMixin(FhirClientProtocol):
                             log_all_url_results=self._log_all_response_urls,
                             access_token=self._access_token,
                             access_token_expiry_date=self._access_token_expiry_date,
+                            host_resilience_registry=self._host_resilience_registry,
+                            maximum_time_to_retry_on_429=self._maximum_time_to_retry_on_429,
                         ) as client:
                             # should we check if it exists and do a POST then?
                             response: RetryableAioHttpResponse = await client.post(
@@ -654,6 +661,104 @@ class FhirMergeResourcesMixin(FhirClientProtocol):
                 )
             raise e
 
+    async def merge_resources_from_files_async(
+        self,
+        *,
+        paths: list[str | Path],
+        id_: str | None = None,
+        fixer: FhirBundleFixer | None = None,
+        max_batch_size_in_bytes: int = 1024 * 1024,
+        max_resources_per_batch: int | None = None,
+        max_concurrent_batches: int = 4,
+    ) -> AsyncGenerator[FhirMergeResourceResponse, None]:
+        """
+        Streams resources from NDJSON or JSON Bundle files (optionally gzipped) into $merge without loading all
+        of them into memory.  Resources are grouped by resource type into batches of up to max_batch_size_in_bytes
+        and up to max_concurrent_batches batches are posted at the same time.  Responses are yielded as batches
+        complete (not in file order) and throughput is logged after each batch.
+
+
+        :param paths: files to read.  .json files hold a Bundle, a list or a single resource; anything else is
+                        read as NDJSON
+        :param id_: id of the resource to merge
+        :param fixer: (Optional) FhirBundleFixer to apply to each resource (or each Bundle) before sending
+        :param max_batch_size_in_bytes: send a batch once its resources add up to this many bytes
+        :param max_resources_per_batch: (Optional) send a batch once it has this many resources
+        :param max_concurrent_batches: maximum number of batches being sent at the same time
+        :return: async generator of responses
+        """
+        assert self._url, "No FHIR server url was set"
+        assert max_concurrent_batches > 0, "max_concurrent_batches must be greater than 0"
+
+        def fix_payload(payload: dict[str, Any]) -> dict[str, Any]:
+            assert fixer is not None
+            fixed_payload, results = fixer.fix(payload)
+            for label, _, errors in results:
+                for error in errors:
+                    self._internal_logger.warning(f"Unfixable issue in {label}: {error}")
+            return fixed_payload
+
+        reader: FhirResourceFileReader = FhirResourceFileReader(
+            max_batch_size_in_bytes=max_batch_size_in_bytes,
+            max_resources_per_batch=max_resources_per_batch,
+            fn_fix_payload=fix_payload if fixer else None,
+        )
+
+        async def merge_batch_async(
+            *,
+            context: ParallelFunctionContext,
+            row: FhirResourceFileBatch,
+            parameters: None,
+            additional_parameters: dict[str, Any] | None,
+        ) -> tuple[FhirResourceFileBatch, list[FhirMergeResourceResponse]]:
+            client: FhirClientProtocol = self.clone().resource(row.resource_type)
+            resources: FhirResourceList = FhirResourceList(
+                [FhirResource(initial_dict=r, storage_mode=self._storage_mode) for r in row.resources]
+            )
+            return row, [
+                r
+                async for r in client.merge_resources_async(
+                    id_=id_,
+                    resources_to_merge=resources,
+                    batch_size=None,
+                )
+            ]
+
+        start_time: float = time.time()
+        total_resources: int = 0
+        total_bytes: int = 0
+
+        def log_throughput(batch: FhirResourceFileBatch) -> None:
+            nonlocal total_resources, total_bytes
+            total_resources += len(batch.resources)
+            total_bytes += batch.size_in_bytes
+            total_time: float = max(time.time() - start_time, 0.001)
+            message: str = (
+                f"Merged {batch.resource_type}: {len(batch.resources):,}"
+                + f" | Total Resources: {total_resources:,}"
+                + f" | Resources/sec: {(total_resources / total_time):,.2f}"
+                + f" | Total MB: {(total_bytes / (1024 * 1024)):,.2f}"
+                + f" | MB/sec: {(total_bytes / (1024 * 1024) / total_time):,.2f}"
+            )
+            if self._logger:
+                self._logger.info(message)
+            else:
+                self._internal_logger.info(message)
+
+        # batches are only read from the files when one of the max_concurrent_batches slots is free so we only hold
+        # that many batches in memory
+        async for completed_batch, responses in AsyncParallelProcessor(
+            name="merge_resources_from_files_async", max_concurrent_tasks=max_concurrent_batches
+        ).process_stream_in_parallel(
+            rows=reader.read_batches_async(paths=[Path(p) for p in paths]),
+            process_row_fn=merge_batch_async,
+            parameters=None,
+            log_level=self._log_level,
+        ):
+            log_throughput(completed_batch)
+            for response in responses:
+                yield response
+
     async def validate_resource(
         self,
         *,
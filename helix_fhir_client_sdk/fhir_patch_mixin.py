@@ -84,6 +84,8 @@ class FhirPatchMixin(FhirClientProtocol):
                         log_all_url_results=self._log_all_response_urls,
                         access_token=self._access_token,
                         access_token_expiry_date=self._access_token_expiry_date,
+                        host_resilience_registry=self._host_resilience_registry,
+                        maximum_time_to_retry_on_429=self._maximum_time_to_retry_on_429,
                     ) as client:
                         response: RetryableAioHttpResponse = await client.patch(
                             url=full_uri.url, json=deserialized_data, headers=headers
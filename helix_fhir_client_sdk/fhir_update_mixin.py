@@ -1,5 +1,12 @@
+import json
 from collections.abc import AsyncGenerator
+from contextlib import aclosing
+from typing import Any, Literal
 
+from compressedfhir.fhir.fhir_bundle import FhirBundle
+from compressedfhir.fhir.fhir_bundle_entry import FhirBundleEntry
+from compressedfhir.fhir.fhir_bundle_entry_list import FhirBundleEntryList
+from compressedfhir.fhir.fhir_bundle_entry_request import FhirBundleEntryRequest
 from compressedfhir.fhir.fhir_resource import FhirResource
 from compressedfhir.fhir.fhir_resource_list import FhirResourceList
 from furl import furl
@@ -13,7 +20,12 @@ from helix_fhir_client_sdk.responses.fhir_update_response import FhirUpdateRespo
 from helix_fhir_client_sdk.structures.get_access_token_result import (
     GetAccessTokenResult,
 )
+from helix_fhir_client_sdk.utilities.async_parallel_processor.v1.async_parallel_processor import (
+    AsyncParallelProcessor,
+    ParallelFunctionContext,
+)
 from helix_fhir_client_sdk.utilities.async_runner import AsyncRunner
+from helix_fhir_client_sdk.utilities.list_chunker import ListChunker
 from helix_fhir_client_sdk.utilities.retryable_aiohttp_client import (
     RetryableAioHttpClient,
 )
@@ -34,30 +46,92 @@ class FhirUpdateMixin(FhirClientProtocol):
         if not resource.id:
             raise ValueError("Resource ID is required for update")
         json_data = resource.json()
-        response = await self.update_async(json_data=json_data, id_=resource.id)
+        response = await self.update_async(json_data=json_data, id_=resource.id, resource_type=resource.resource_type)
         if response.error:
             raise ValueError(f"Failed to update resource: {response.error}")
         return response
 
-    async def update_resources_async(self, *, resources: FhirResourceList) -> AsyncGenerator[FhirUpdateResponse, None]:
+    async def update_resources_async(
+        self,
+        *,
+        resources: FhirResourceList,
+        max_concurrent_requests: int | None = None,
+        bundle_type: Literal["transaction", "batch"] | None = None,
+        bundle_size: int = 100,
+    ) -> AsyncGenerator[FhirUpdateResponse, None]:
         """
         Update the resources. This will completely overwrite the resources. We recommend using merge()
             instead since that does proper merging.
 
+        By default, one PUT is sent per resource, one at a time, over one HTTP session.  If max_concurrent_requests
+        is set, up to that many requests run at the same time and the responses are yielded as they complete
+        instead of in order.
+
+        If bundle_type is set, resources are instead packed bundle_size at a time into a FHIR transaction or batch
+        Bundle of PUT entries that is POSTed to the base url, and one response is yielded for each entry of the
+        returned Bundle.
+
         :param resources: list of resources to update
+        :param max_concurrent_requests: (Optional) maximum number of requests to send at the same time
+        :param bundle_type: (Optional) "transaction" or "batch" to send the PUTs inside Bundles
+        :param bundle_size: number of resources to put in each Bundle when bundle_type is set
         :return: generator of FhirUpdateResponses
         """
         resource: FhirResource
         for resource in resources:
             if not resource.id:
                 raise ValueError("Resource ID is required for update")
-            json_data = resource.json()
-            response = await self.update_async(json_data=json_data, id_=resource.id)
-            if response.error:
-                raise ValueError(f"Failed to update resource: {response.error}")
-            yield response
 
-    async def update_async(self, *, id_: str | None = None, json_data: str) -> FhirUpdateResponse:
+        if bundle_type:
+            async for response in self._update_resources_as_bundle_async(
+                resources=resources,
+                bundle_type=bundle_type,
+                bundle_size=bundle_size,
+                max_concurrent_requests=max_concurrent_requests or 1,
+            ):
+                if response.error:
+                    raise ValueError(f"Failed to update resource: {response.error}")
+                yield response
+            return
+
+        access_token_result: GetAccessTokenResult = await self.get_access_token_async()
+
+        async def put_resource_async(
+            *,
+            context: ParallelFunctionContext,
+            row: FhirResource,
+            parameters: RetryableAioHttpClient | None,
+            additional_parameters: dict[str, Any] | None,
+        ) -> FhirUpdateResponse:
+            assert parameters is not None
+            return await self._put_resource_async(
+                client=parameters,
+                id_=row.id,
+                json_data=row.json(),
+                resource_type=row.resource_type or self._resource,
+                access_token=access_token_result.access_token,
+            )
+
+        async with self._create_update_client() as client:
+            # closing the generator waits for the PUTs still running before the session is closed
+            async with aclosing(
+                AsyncParallelProcessor(
+                    name="update_resources_async", max_concurrent_tasks=max_concurrent_requests or 1
+                ).process_stream_in_parallel(
+                    rows=resources,
+                    process_row_fn=put_resource_async,
+                    parameters=client,
+                    log_level=self._log_level,
+                )
+            ) as responses:
+                async for response in responses:
+                    if response.error:
+                        raise ValueError(f"Failed to update resource: {response.error}")
+                    yield response
+
+    async def update_async(
+        self, *, id_: str | None = None, json_data: str, resource_type: str | None = None
+    ) -> FhirUpdateResponse:
         """
         Update the resource.  This will completely overwrite the resource.  We recommend using merge()
             instead since that does proper merging.
@@ -65,82 +139,246 @@ class FhirUpdateMixin(FhirClientProtocol):
 
         :param json_data: data to update the resource with
         :param id_: ID of the resource to update
+        :param resource_type: (Optional) resource type to update.  Defaults to the client's resource.
         :return: FhirUpdateResponse object
         """
         assert self._url, "No FHIR server url was set"
         assert json_data, "Empty string was passed"
         if not id_ and not self._id:
             raise ValueError("update requires the ID of FHIR object to update")
-        if not isinstance(self._id, str):
+        if not id_ and not isinstance(self._id, str):
             raise ValueError("update should have only one id")
-        if not self._resource:
+        resource_type = resource_type or self._resource
+        if not resource_type:
             raise ValueError("update requires a FHIR resource type")
 
+        access_token_result: GetAccessTokenResult = await self.get_access_token_async()
+        # actually make the request
+        async with self._create_update_client() as client:
+            return await self._put_resource_async(
+                client=client,
+                id_=id_,
+                json_data=json_data,
+                resource_type=resource_type,
+                access_token=access_token_result.access_token,
+            )
+
+    def _create_update_client(self) -> RetryableAioHttpClient:
+        """
+        Creates the client used to send updates.  One client (and so one HTTP session) is shared by all the
+        requests of a bulk update.
+        """
+        return RetryableAioHttpClient(
+            fn_get_session=self._fn_create_http_session or self.create_http_session,
+            caller_managed_session=self._fn_create_http_session is not None,
+            refresh_token_func=self._refresh_token_function,
+            tracer_request_func=self._trace_request_function,
+            retries=self._retry_count,
+            exclude_status_codes_from_retry=self._exclude_status_codes_from_retry,
+            use_data_streaming=self._use_data_streaming,
+            send_data_as_chunked=self._send_data_as_chunked,
+            compress=self._compress,
+            throw_exception_on_error=self._throw_exception_on_error,
+            log_all_url_results=self._log_all_response_urls,
+            access_token=self._access_token,
+            access_token_expiry_date=self._access_token_expiry_date,
+            host_resilience_registry=self._host_resilience_registry,
+            maximum_time_to_retry_on_429=self._maximum_time_to_retry_on_429,
+        )
+
+    def _get_update_headers(self, *, access_token: str | None) -> dict[str, str]:
+        headers = {"Content-Type": "application/fhir+json"}
+        headers.update(self._additional_request_headers)
+        self._internal_logger.debug(f"Request headers: {headers}")
+        # set access token in request if present
+        if access_token:
+            headers["Authorization"] = f"Bearer {access_token}"
+        return headers
+
+    async def _put_resource_async(
+        self,
+        *,
+        client: RetryableAioHttpClient,
+        id_: str | None,
+        json_data: str,
+        resource_type: str | None,
+        access_token: str | None,
+    ) -> FhirUpdateResponse:
+        """
+        Sends a PUT for one resource using the passed client
+
+        :param client: client to send the request with
+        :param id_: ID of the resource to update
+        :param json_data: data to update the resource with
+        :param resource_type: resource type to update
+        :param access_token: access token to send
+        :return: FhirUpdateResponse object
+        """
+        assert resource_type
         with TRACER.start_as_current_span(FhirClientSdkOpenTelemetrySpanNames.UPDATE) as span:
             span.set_attribute(FhirClientSdkOpenTelemetryAttributeNames.URL, self._url or "")
-            span.set_attribute(FhirClientSdkOpenTelemetryAttributeNames.RESOURCE, self._resource or "")
+            span.set_attribute(FhirClientSdkOpenTelemetryAttributeNames.RESOURCE, resource_type)
             try:
                 full_uri: furl = furl(self._url)
-                full_uri /= self._resource
+                full_uri /= resource_type
                 full_uri /= id_ or self._id
-                # set up headers
-                headers = {"Content-Type": "application/fhir+json"}
-                headers.update(self._additional_request_headers)
-                self._internal_logger.debug(f"Request headers: {headers}")
-
-                access_token_result: GetAccessTokenResult = await self.get_access_token_async()
-                access_token: str | None = access_token_result.access_token
-                # set access token in request if present
-                if access_token:
-                    headers["Authorization"] = f"Bearer {access_token}"
+                headers: dict[str, str] = self._get_update_headers(access_token=access_token)
 
                 if self._validation_server_url:
                     await AsyncFhirValidator.validate_fhir_resource(
                         fn_get_session=self._fn_create_http_session or self.create_http_session,
                         json_data=json_data,
-                        resource_name=self._resource,
+                        resource_name=resource_type,
                         validation_server_url=self._validation_server_url,
                         access_token=access_token,
                         caller_managed_session=self._fn_create_http_session is not None,
                     )
 
-                # actually make the request
-                async with RetryableAioHttpClient(
-                    fn_get_session=self._fn_create_http_session or self.create_http_session,
-                    caller_managed_session=self._fn_create_http_session is not None,
-                    refresh_token_func=self._refresh_token_function,
-                    tracer_request_func=self._trace_request_function,
-                    retries=self._retry_count,
-                    exclude_status_codes_from_retry=self._exclude_status_codes_from_retry,
-                    use_data_streaming=self._use_data_streaming,
-                    send_data_as_chunked=self._send_data_as_chunked,
-                    compress=self._compress,
-                    throw_exception_on_error=self._throw_exception_on_error,
-                    log_all_url_results=self._log_all_response_urls,
-                    access_token=self._access_token,
-                    access_token_expiry_date=self._access_token_expiry_date,
-                ) as client:
-                    response = await client.put(url=full_uri.url, data=json_data, headers=headers)
-                    request_id = response.response_headers.get("X-Request-ID", None)
-                    self._internal_logger.debug(f"X-Request-ID={request_id}")
-                    if response.status == 200:
-                        if self._logger:
-                            self._logger.info(f"Successfully updated: {full_uri}")
-
-                    return FhirUpdateResponse(
-                        request_id=request_id,
-                        url=full_uri.tostr(),
-                        responses=await response.get_text_async(),
-                        error=f"{response.status}" if not response.status == 200 else None,
-                        access_token=access_token,
-                        status=response.status,
-                        resource_type=self._resource,
-                    )
+                response = await client.put(url=full_uri.url, data=json_data, headers=headers)
+                request_id = response.response_headers.get("X-Request-ID", None)
+                self._internal_logger.debug(f"X-Request-ID={request_id}")
+                if response.status == 200:
+                    if self._logger:
+                        self._logger.info(f"Successfully updated: {full_uri}")
+
+                return FhirUpdateResponse(
+                    request_id=request_id,
+                    url=full_uri.tostr(),
+                    responses=await response.get_text_async(),
+                    error=f"{response.status}" if not response.status == 200 else None,
+                    access_token=access_token,
+                    status=response.status,
+                    resource_type=resource_type,
+                )
             except Exception as e:
                 span.record_exception(e)
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    async def _update_resources_as_bundle_async(
+        self,
+        *,
+        resources: FhirResourceList,
+        bundle_type: Literal["transaction", "batch"],
+        bundle_size: int,
+        max_concurrent_requests: int,
+    ) -> AsyncGenerator[FhirUpdateResponse, None]:
+        """
+        Sends the resources as PUT entries in transaction or batch Bundles POSTed to the base url and yields one
+        response per entry of the returned Bundles.
+        """
+        assert self._url, "No FHIR server url was set"
+        assert bundle_size > 0, "bundle_size must be greater than 0"
+        access_token_result: GetAccessTokenResult = await self.get_access_token_async()
+        access_token: str | None = access_token_result.access_token
+        headers: dict[str, str] = self._get_update_headers(access_token=access_token)
+
+        async def post_bundle_async(
+            *,
+            context: ParallelFunctionContext,
+            row: list[FhirResource],
+            parameters: RetryableAioHttpClient | None,
+            additional_parameters: dict[str, Any] | None,
+        ) -> list[FhirUpdateResponse]:
+            assert parameters is not None
+            chunk: list[FhirResource] = row
+            bundle: FhirBundle = FhirBundle(
+                type_=bundle_type,
+                entry=FhirBundleEntryList(
+                    [
+                        FhirBundleEntry(
+                            resource=r,
+                            request=FhirBundleEntryRequest(
+                                method="PUT", url=f"{r.resource_type or self._resource}/{r.id}"
+                            ),
+                        )
+                        for r in chunk
+                    ]
+                ),
+            )
+            with TRACER.start_as_current_span(FhirClientSdkOpenTelemetrySpanNames.UPDATE) as span:
+                span.set_attribute(FhirClientSdkOpenTelemetryAttributeNames.URL, self._url or "")
+                span.set_attribute(FhirClientSdkOpenTelemetryAttributeNames.BATCH_SIZE, len(chunk))
+                response = await parameters.post(url=self._url or "", data=bundle.json(), headers=headers)
+                request_id: str | None = response.response_headers.get("X-Request-ID", None)
+                response_text: str = await response.get_text_async()
+                return FhirUpdateMixin._parse_bundle_update_response(
+                    resources=chunk,
+                    base_url=self._url or "",
+                    request_id=request_id,
+                    status=response.status,
+                    response_text=response_text,
+                    access_token=access_token,
+                )
+
+        async with self._create_update_client() as client:
+            async with aclosing(
+                AsyncParallelProcessor(
+                    name="update_resources_as_bundle_async", max_concurrent_tasks=max_concurrent_requests
+                ).process_stream_in_parallel(
+                    rows=ListChunker.divide_into_chunks(list(resources), chunk_size=bundle_size),
+                    process_row_fn=post_bundle_async,
+                    parameters=client,
+                    log_level=self._log_level,
+                )
+            ) as responses:
+                update_responses: list[FhirUpdateResponse]
+                async for update_responses in responses:
+                    for update_response in update_responses:
+                        yield update_response
+
+    @staticmethod
+    def _parse_bundle_update_response(
+        *,
+        resources: list[FhirResource],
+        base_url: str,
+        request_id: str | None,
+        status: int,
+        response_text: str,
+        access_token: str | None,
+    ) -> list[FhirUpdateResponse]:
+        """
+        Converts a transaction-response or batch-response Bundle into one FhirUpdateResponse per resource.
+        Entries of the response Bundle are in the same order as the entries of the request Bundle.
+        """
+        entries: list[dict[str, Any]] = []
+        if status == 200 and response_text.startswith("{"):
+            entries = json.loads(response_text).get("entry", [])
+        result: list[FhirUpdateResponse] = []
+        for index, resource in enumerate(resources):
+            url: str = f"{base_url.rstrip('/')}/{resource.resource_type}/{resource.id}"
+            if index >= len(entries):
+                # the whole Bundle failed
+                result.append(
+                    FhirUpdateResponse(
+                        request_id=request_id,
+                        url=url,
+                        responses=response_text,
+                        error=f"{status}" if status != 200 else "Missing entry in response Bundle",
+                        access_token=access_token,
+                        status=status,
+                        resource_type=resource.resource_type,
+                    )
+                )
+                continue
+            entry: dict[str, Any] = entries[index]
+            entry_response: dict[str, Any] = entry.get("response", {})
+            # status is e.g. "200 OK" or "201 Created"
+            entry_status_text: str = str(entry_response.get("status", "500")).split(" ")[0]
+            entry_status: int = int(entry_status_text) if entry_status_text.isnumeric() else 500
+            result.append(
+                FhirUpdateResponse(
+                    request_id=request_id,
+                    url=url,
+                    responses=json.dumps(entry.get("resource") or entry_response.get("outcome") or entry_response),
+                    error=f"{entry_status}" if not 200 <= entry_status < 300 else None,
+                    access_token=access_token,
+                    status=entry_status,
+                    resource_type=resource.resource_type,
+                )
+            )
+        return result
+
     def update(self, json_data: str) -> FhirUpdateResponse:
         """
         Update the resource.  This will completely overwrite the resource.  We recommend using merge()
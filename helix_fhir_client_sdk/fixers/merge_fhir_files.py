@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Stream one or more NDJSON or JSON Bundle files into the bwell FHIR server using $merge.
+
+Files are read incrementally so memory is bounded by the batch size and the number of
+concurrent batches, not by the size of the input:
+  - .ndjson / .jsonl (or any extension other than .json) is read a block of lines at a time
+  - .json holds a Bundle, a list of resources or a single resource and is parsed one file at a time
+  - any of the above may be gzipped (.gz)
+
+Resources are grouped by resource type into batches of up to --batch-size-mb and up to
+--concurrency batches are posted at the same time.  Throughput (resources/sec, MB/sec) is
+reported on stderr as batches complete.
+
+If --meta-source, --owner, --access or --source-assigning-authority is given, every resource
+is passed through FhirBundleFixer (see fix_fhir_bundle.py) before it is sent.
+
+Exit code is 0 when every resource was merged without errors, 1 otherwise.
+
+Usage:
+    python -m helix_fhir_client_sdk.fixers.merge_fhir_files \\
+        --input patients.ndjson observations.ndjson.gz \\
+        --url https://fhir.example.com/4_0_0
+
+    python -m helix_fhir_client_sdk.fixers.merge_fhir_files \\
+        --input bundle.json \\
+        --url https://fhir.example.com/4_0_0 \\
+        --client-id my-client --client-secret my-secret \\
+        --auth-wellknown-url https://auth.example.com/.well-known/openid-configuration \\
+        --meta-source https://example.org --owner my-org \\
+        --batch-size-mb 2 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+from helix_fhir_client_sdk.fhir_client import FhirClient
+from helix_fhir_client_sdk.fixers.fix_fhir_bundle import FhirBundleFixer
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--input",
+        "-i",
+        metavar="PATH",
+        nargs="+",
+        required=True,
+        help="One or more NDJSON (.ndjson, .jsonl) or JSON (.json) files, optionally gzipped.",
+    )
+    parser.add_argument("--url", "-u", metavar="URL", required=True, help="Base url of the FHIR server.")
+    parser.add_argument("--client-id", metavar="ID", help="OAuth client id.")
+    parser.add_argument("--client-secret", metavar="SECRET", help="OAuth client secret.")
+    parser.add_argument("--auth-wellknown-url", metavar="URL", help="Url of the auth server well-known configuration.")
+    parser.add_argument(
+        "--batch-size-mb",
+        metavar="MB",
+        type=float,
+        default=1.0,
+        help="Send a batch once its resources add up to this many megabytes (default: 1).",
+    )
+    parser.add_argument(
+        "--max-resources-per-batch",
+        metavar="N",
+        type=int,
+        help="Send a batch once it has this many resources.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        "-n",
+        metavar="N",
+        type=int,
+        default=4,
+        help="Maximum number of batches sent at the same time (default: 4).",
+    )
+    parser.add_argument("--meta-source", "-s", metavar="URL", help="Fix resources: value for a missing meta.source.")
+    parser.add_argument("--owner", "-o", metavar="CODE", help="Fix resources: code for the owner security tag.")
+    parser.add_argument("--access", "-c", metavar="CODE", help="Fix resources: code for the access security tag.")
+    parser.add_argument(
+        "--source-assigning-authority",
+        "-a",
+        metavar="CODE",
+        help="Fix resources: code for the sourceAssigningAuthority tag.",
+    )
+    return parser
+
+
+async def merge_files_async(args: argparse.Namespace) -> int:
+    paths: list[Path] = [Path(p) for p in args.input]
+    missing: list[Path] = [p for p in paths if not p.exists()]
+    if missing:
+        for path in missing:
+            print(f"ERROR: file not found: {path}", file=sys.stderr)
+        return 1
+
+    logger: logging.Logger = logging.getLogger("merge_fhir_files")
+    logger.addHandler(logging.StreamHandler(sys.stderr))
+    logger.setLevel(logging.INFO)
+
+    fhir_client: FhirClient = FhirClient().url(args.url).logger(logger)
+    if args.client_id and args.client_secret:
+        fhir_client = fhir_client.client_credentials(client_id=args.client_id, client_secret=args.client_secret)
+    if args.auth_wellknown_url:
+        fhir_client = fhir_client.auth_wellknown_url(args.auth_wellknown_url)
+
+    fixer: FhirBundleFixer | None = (
+        FhirBundleFixer(
+            meta_source=args.meta_source,
+            owner=args.owner,
+            access=args.access,
+            source_assigning_authority=args.source_assigning_authority,
+        )
+        if args.meta_source or args.owner or args.access or args.source_assigning_authority
+        else None
+    )
+
+    total_entries: int = 0
+    total_errors: int = 0
+    async for response in fhir_client.merge_resources_from_files_async(
+        paths=list(paths),
+        fixer=fixer,
+        max_batch_size_in_bytes=int(args.batch_size_mb * 1024 * 1024),
+        max_resources_per_batch=args.max_resources_per_batch,
+        max_concurrent_batches=args.concurrency,
+    ):
+        for entry in response.responses:
+            total_entries += 1
+            if entry.errored or entry.issue or entry.error:
+                total_errors += 1
+                print(f"  ! {entry.resource_type}/{entry.id_}: {entry.issue or entry.error}", file=sys.stderr)
+        if response.status != 200:
+            total_errors += 1
+            print(f"  ! {response.url}: HTTP {response.status} {response.error}", file=sys.stderr)
+
+    print(f"\nSummary: {total_entries:,} resource(s) merged, {total_errors:,} error(s).", file=sys.stderr)
+    return 1 if total_errors else 0
+
+
+def main() -> int:
+    parser = build_arg_parser()
+    args = parser.parse_args()
+    return asyncio.run(merge_files_async(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
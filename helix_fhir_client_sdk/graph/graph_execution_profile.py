@@ -0,0 +1,260 @@
+from contextvars import ContextVar, Token
+from typing import Any
+
+from helix_fhir_client_sdk.graph.graph_definition import GraphDefinition, GraphDefinitionLink, GraphDefinitionTarget
+
+_current_target_profile: ContextVar["GraphTargetProfile | None"] = ContextVar(
+    "helix_fhir_client_sdk_graph_target_profile", default=None
+)
+
+
+class GraphTargetProfile:
+    """
+    What it took to get the resources of one target of a graph: the start resources or the target of a link.
+    """
+
+    __slots__ = [
+        "path",
+        "target_type",
+        "params",
+        "request_count",
+        "group_count",
+        "id_count",
+        "resource_count",
+        "cache_hits",
+        "size_in_bytes",
+        "semaphore_wait_seconds",
+        "start_time",
+        "end_time",
+        "children",
+    ]
+
+    def __init__(self, *, path: str | None, target_type: str, params: str | None) -> None:
+        """
+        What it took to get the resources of one target of a graph
+
+        :param path: path of the link the target belongs to (None for the start resources and reverse links)
+        :param target_type: resource type of the target
+        :param params: search parameters of the target (reverse links)
+        """
+        self.path: str | None = path
+        self.target_type: str = target_type
+        self.params: str | None = params
+        self.request_count: int = 0
+        """ requests sent to the server (after the cache) """
+        self.group_count: int = 0
+        """ groups of ids fetched (a group is split in several requests when the server does not support _id) """
+        self.id_count: int = 0
+        """ ids (or parent ids for reverse links) asked for """
+        self.resource_count: int = 0
+        """ resources returned """
+        self.cache_hits: int = 0
+        """ resources found in the RequestCache """
+        self.size_in_bytes: int = 0
+        """ size of the response bodies """
+        self.semaphore_wait_seconds: float = 0.0
+        """ time the requests waited for max_concurrent_requests """
+        self.start_time: float | None = None
+        self.end_time: float | None = None
+        self.children: list[GraphTargetProfile] = []
+        """ profiles of the targets of the links of this target """
+
+    @property
+    def wall_time_seconds(self) -> float:
+        """Time from the start of the first request of this target until the end of the last one"""
+        if self.start_time is None or self.end_time is None:
+            return 0.0
+        return self.end_time - self.start_time
+
+    @property
+    def name(self) -> str:
+        """Resource type of the target with the path or the parameters of the link"""
+        return self.target_type + (f" [{self.path}]" if self.path else "") + (f" ?{self.params}" if self.params else "")
+
+    def record_time(self, *, start_time: float, end_time: float) -> None:
+        """
+        Records that the target was processed from start_time until end_time (time.perf_counter() values)
+
+        :param start_time: start time
+        :param end_time: end time
+        """
+        self.start_time = start_time if self.start_time is None else min(self.start_time, start_time)
+        self.end_time = end_time if self.end_time is None else max(self.end_time, end_time)
+
+    def record_group(self, *, id_count: int, resource_count: int, cache_hits: int) -> None:
+        """
+        Records a group of ids that was fetched
+
+        :param id_count: number of ids asked for
+        :param resource_count: number of resources returned
+        :param cache_hits: number of resources found in the cache
+        """
+        self.group_count += 1
+        self.id_count += id_count
+        self.resource_count += resource_count
+        self.cache_hits += cache_hits
+
+    def record_request(self, *, semaphore_wait_seconds: float, size_in_bytes: int) -> None:
+        """
+        Records a request sent to the server
+
+        :param semaphore_wait_seconds: time the request waited for max_concurrent_requests
+        :param size_in_bytes: size of the response body
+        """
+        self.request_count += 1
+        self.semaphore_wait_seconds += semaphore_wait_seconds
+        self.size_in_bytes += size_in_bytes
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Converts the object to a dictionary
+
+        :return: dictionary
+        """
+        return {
+            "path": self.path,
+            "target_type": self.target_type,
+            "params": self.params,
+            "request_count": self.request_count,
+            "group_count": self.group_count,
+            "id_count": self.id_count,
+            "resource_count": self.resource_count,
+            "cache_hits": self.cache_hits,
+            "size_in_bytes": self.size_in_bytes,
+            "semaphore_wait_seconds": self.semaphore_wait_seconds,
+            "wall_time_seconds": self.wall_time_seconds,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+    @staticmethod
+    def get_current() -> "GraphTargetProfile | None":
+        """
+        Returns the profile of the target being processed by the current task, if the graph is profiled
+        """
+        return _current_target_profile.get()
+
+    @staticmethod
+    def set_current(target_profile: "GraphTargetProfile") -> Token["GraphTargetProfile | None"]:
+        """
+        Makes target_profile the profile of the target being processed by the current task.  The tasks started from
+        this one inherit it.
+
+        :param target_profile: profile of the target
+        :return: token to pass to reset_current()
+        """
+        return _current_target_profile.set(target_profile)
+
+    @staticmethod
+    def reset_current(token: Token["GraphTargetProfile | None"]) -> None:
+        """
+        Restores the profile that was current before set_current()
+
+        :param token: token returned by set_current()
+        """
+        _current_target_profile.reset(token)
+
+
+class GraphExecutionProfile:
+    """
+    Execution profile of a simulated $graph call: a tree with one GraphTargetProfile per target of the graph
+    definition, rooted at the start resources.  Pass one to simulate_graph_async() and read it once the call returns
+    to see which link is slow and to tune request_size, max_concurrent_tasks and the shape of the graph.
+    """
+
+    __slots__ = ["start", "total_seconds", "_target_profiles"]
+
+    def __init__(self) -> None:
+        """
+        Execution profile of a simulated $graph call.  It is filled in by the call it is passed to.
+        """
+        self.start: GraphTargetProfile | None = None
+        """ profile of the start resources (None until the profile is passed to a call) """
+        self.total_seconds: float = 0.0
+        """ duration of the call """
+        self._target_profiles: dict[int, GraphTargetProfile] = {}
+
+    def reset(self, *, graph_definition: GraphDefinition) -> GraphTargetProfile:
+        """
+        Creates an empty profile for each target of graph_definition
+
+        :param graph_definition: graph that is about to be processed
+        :return: profile of the start resources
+        """
+        self._target_profiles = {}
+        self.total_seconds = 0.0
+        self.start = GraphTargetProfile(path=None, target_type=graph_definition.start, params=None)
+        self._add_links(parent=self.start, links=graph_definition.link)
+        return self.start
+
+    def _add_links(self, *, parent: GraphTargetProfile, links: list[GraphDefinitionLink] | None) -> None:
+        for link in links or []:
+            for target in link.target or []:
+                target_profile = GraphTargetProfile(
+                    path=link.path, target_type=target.type_ or "", params=target.params
+                )
+                parent.children.append(target_profile)
+                # the targets are the objects of the graph definition so they identify the node
+                self._target_profiles[id(target)] = target_profile
+                self._add_links(parent=target_profile, links=target.link)
+
+    def get_target_profile(self, target: GraphDefinitionTarget) -> GraphTargetProfile | None:
+        """
+        Returns the profile of target
+
+        :param target: target of the graph definition passed to reset()
+        """
+        return self._target_profiles.get(id(target))
+
+    def get_critical_path(self) -> list[GraphTargetProfile]:
+        """
+        Returns the chain of targets, from the start resources, whose wall times add up to the most.  Each target
+        is only fetched once its parents are, so this chain is what to look at first when the call is slow.
+        """
+        path: list[GraphTargetProfile] = []
+        node: GraphTargetProfile | None = self.start
+        while node is not None:
+            path.append(node)
+            node = max(node.children, key=GraphExecutionProfile._get_chain_seconds, default=None)
+        return path
+
+    @staticmethod
+    def _get_chain_seconds(node: GraphTargetProfile) -> float:
+        return node.wall_time_seconds + max(
+            (GraphExecutionProfile._get_chain_seconds(child) for child in node.children), default=0.0
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Converts the object to a dictionary
+
+        :return: dictionary
+        """
+        return {
+            "total_seconds": self.total_seconds,
+            "start": self.start.to_dict() if self.start else None,
+            "critical_path": [node.name for node in self.get_critical_path()],
+        }
+
+    def to_text(self) -> str:
+        """
+        Returns the tree as text, one target per line.  The targets on the critical path are marked with *.
+        """
+        if self.start is None:
+            return ""
+        critical_path: list[GraphTargetProfile] = self.get_critical_path()
+        lines: list[str] = [f"total: {self.total_seconds:.3f}s"]
+        stack: list[tuple[GraphTargetProfile, int]] = [(self.start, 0)]
+        while stack:
+            node, depth = stack.pop()
+            lines.append(
+                f"{'  ' * depth}{'*' if any(node is n for n in critical_path) else ' '} {node.name}:"
+                f" wall={node.wall_time_seconds:.3f}s"
+                f", requests={node.request_count}"
+                f", ids={node.id_count}"
+                f", resources={node.resource_count}"
+                f", cache_hits={node.cache_hits}"
+                f", bytes={node.size_in_bytes}"
+                f", semaphore_wait={node.semaphore_wait_seconds:.3f}s"
+            )
+            stack.extend((child, depth + 1) for child in reversed(node.children))
+        return "\n".join(lines)
@@ -0,0 +1,102 @@
+from collections import deque
+from typing import Any
+
+from compressedfhir.fhir.fhir_bundle_entry import FhirBundleEntry
+from compressedfhir.fhir.fhir_bundle_entry_list import FhirBundleEntryList
+from compressedfhir.fhir.fhir_resource import FhirResource
+from compressedfhir.utilities.compressed_dict.v1.compressed_dict_storage_mode import (
+    CompressedDictStorageMode,
+)
+
+from helix_fhir_client_sdk.graph.graph_definition import GraphDefinitionLink
+from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+
+
+class GraphFrontier:
+    """
+    Keeps what the streaming graph mode needs to continue the graph once a response has been yielded to the caller.
+
+    Instead of the fetched resources, the frontier keeps the resourceType/id of every resource returned so far (to
+    drop duplicates) and, for the resources whose target has links, a compact copy holding only the resourceType,
+    the id and the top level fields read by the paths of those links.  So memory is bounded by the number of
+    resources still to follow, not by the number of resources returned.
+    """
+
+    __slots__ = ["storage_mode", "_seen_keys"]
+
+    def __init__(self, *, storage_mode: CompressedDictStorageMode) -> None:
+        """
+        Keeps what the streaming graph mode needs to continue the graph
+
+        :param storage_mode: storage mode of the compact resources
+        """
+        self.storage_mode: CompressedDictStorageMode = storage_mode
+        self._seen_keys: set[str] = set()
+
+    @property
+    def resource_count(self) -> int:
+        """Number of distinct resources returned so far"""
+        return len(self._seen_keys)
+
+    def get_entries_to_follow(
+        self, *, response: FhirGetResponse, links: list[GraphDefinitionLink] | None
+    ) -> FhirBundleEntryList:
+        """
+        Returns compact copies of the resources of response that hold what links need and removes the resources
+        returned before from response
+
+        :param response: response that is about to be returned
+        :param links: links that will be followed from the resources of response
+        :return: compact copies of the resources (empty if there are no links)
+        """
+        entries: FhirBundleEntryList = response.get_bundle_entries()
+        entries_to_follow: FhirBundleEntryList = FhirBundleEntryList()
+        if links:
+            # all the resources of the response are followed, even those returned before: links of another target
+            # may lead elsewhere from them.  Resources the request cache skipped are not in the response so they are
+            # only followed from the target that fetched them first.
+            fields: list[str] = ["resourceType", "id", *GraphFrontier.get_fields_read_by_links(links)]
+            for entry in entries:
+                resource: FhirResource | None = entry.resource
+                if resource is None:
+                    continue
+                with resource.transaction():
+                    compact_resource: dict[str, Any] = {
+                        field: value for field in fields if (value := resource.get(field)) is not None
+                    }
+                deque.append(
+                    entries_to_follow,
+                    FhirBundleEntry(
+                        resource=FhirResource(compact_resource, storage_mode=self.storage_mode),
+                        storage_mode=self.storage_mode,
+                    ),
+                )
+
+        def is_duplicate(resource: FhirResource) -> bool:
+            key: str | None = resource.resource_type_and_id
+            if key is None:
+                return False
+            if key in self._seen_keys:
+                return True
+            self._seen_keys.add(key)
+            return False
+
+        # filter the response itself: only a bundle response returns its own list from get_bundle_entries()
+        response.remove_resources(should_remove=is_duplicate)
+        return entries_to_follow
+
+    @staticmethod
+    def get_fields_read_by_links(links: list[GraphDefinitionLink]) -> list[str]:
+        """
+        Returns the top level fields read by the paths of links, e.g., participant for participant.individual[x]
+
+        :param links: links to follow
+        :return: names of the top level fields
+        """
+        fields: list[str] = []
+        for link in links:
+            if link.path:
+                field: str = link.path.split(".")[0].removesuffix("[x]")
+                if field not in fields:
+                    fields.append(field)
+        return fields
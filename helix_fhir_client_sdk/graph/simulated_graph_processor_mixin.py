@@ -1,7 +1,7 @@
 import json
 import time
 from abc import ABC
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Iterable
 from datetime import UTC, datetime
 from logging import Logger
 from typing import Any, cast
@@ -17,10 +17,14 @@ from helix_fhir_client_sdk.graph.graph_definition import (
     GraphDefinitionLink,
     GraphDefinitionTarget,
 )
+from helix_fhir_client_sdk.graph.graph_execution_profile import GraphExecutionProfile, GraphTargetProfile
+from helix_fhir_client_sdk.graph.graph_frontier import GraphFrontier
 from helix_fhir_client_sdk.graph.graph_link_parameters import GraphLinkParameters
 from helix_fhir_client_sdk.graph.graph_target_parameters import GraphTargetParameters
+from helix_fhir_client_sdk.open_telemetry.fhir_client_sdk_metrics import FhirClientSdkMetrics
 from helix_fhir_client_sdk.responses.fhir_client_protocol import FhirClientProtocol
 from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+from helix_fhir_client_sdk.responses.fhir_get_response_accumulator import FhirGetResponseAccumulator
 from helix_fhir_client_sdk.responses.get.fhir_get_bundle_response import (
     FhirGetBundleResponse,
 )
@@ -40,6 +44,7 @@ from helix_fhir_client_sdk.utilities.async_parallel_processor.v1.async_parallel_
     AsyncParallelProcessor,
     ParallelFunctionContext,
 )
+from helix_fhir_client_sdk.utilities.async_stream_prefetcher import AsyncStreamPrefetcher
 from helix_fhir_client_sdk.utilities.cache.request_cache import RequestCache
 from helix_fhir_client_sdk.utilities.cache.request_cache_entry import RequestCacheEntry
 from helix_fhir_client_sdk.utilities.fhir_scope_parser import FhirScopeParser
@@ -82,6 +87,7 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
         input_cache: RequestCache | None = None,
         compare_hash: bool = True,
         append_without_duplicate_removal: bool = False,
+        profile: GraphExecutionProfile | None = None,
     ) -> AsyncGenerator[FhirGetResponse, None]:
         """
         Asynchronously simulate a FHIR $graph query with advanced processing capabilities.
@@ -121,6 +127,7 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
             add_cached_bundles_to_result: Optional flag to add cached bundles to result
             input_cache: Optional cache for resource retrieval
             compare_hash: Flag to compare resource hashes for changes
+            profile: Optional execution profile to fill in with what each target of the graph took
 
         Yields:
             FhirGetResponse objects representing retrieved resources
@@ -158,12 +165,13 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
         # Track resources that don't support ID-based search
         id_search_unsupported_resources: list[str] = []
         cache: RequestCache = input_cache if input_cache is not None else RequestCache()
+        profile_start_time: float = time.perf_counter()
         async with cache:
             # Retrieve start resources based on graph definition
             start: str = graph_definition.start
             parent_response: FhirGetResponse
             cache_hits: int
-            parent_response, cache_hits = await self._get_resources_by_parameters_async(
+            parent_response, cache_hits = await self._get_start_resources_async(
                 resource_type=start,
                 id_=id_,
                 cache=cache,
@@ -172,11 +180,14 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
                 id_search_unsupported_resources=id_search_unsupported_resources,
                 add_cached_bundles_to_result=add_cached_bundles_to_result,
                 compare_hash=compare_hash,
+                start_profile=profile.reset(graph_definition=graph_definition) if profile else None,
             )
 
             # If no parent resources found, yield empty response and exit
             parent_response_resource_count = parent_response.get_resource_count()
             if parent_response_resource_count == 0:
+                if profile:
+                    profile.total_seconds = time.perf_counter() - profile_start_time
                 yield parent_response
                 return  # no resources to process
 
@@ -196,8 +207,11 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
                     + f"cached:{cache_hits}"
                 )
 
-            # now process the graph links
-            child_responses: list[FhirGetResponse] = []
+            # now process the graph links.  The entries of the child responses are collected as they arrive, dropping
+            # duplicates on insert, so the child responses do not have to be kept until all the links are processed.
+            accumulator: FhirGetResponseAccumulator = FhirGetResponseAccumulator(
+                response=parent_response, remove_duplicates=not append_without_duplicate_removal
+            )
             parent_link_map: list[tuple[list[GraphDefinitionLink], FhirBundleEntryList]] = []
 
             # Add initial graph links if defined
@@ -230,21 +244,16 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
                         id_search_unsupported_resources=id_search_unsupported_resources,
                         add_cached_bundles_to_result=add_cached_bundles_to_result,
                         ifModifiedSince=ifModifiedSince,
+                        profile=profile,
                     ):
-                        child_responses.extend(link_responses)
+                        accumulator.add_all(link_responses)
 
                 # Update parent link map for next iteration
                 parent_link_map = new_parent_link_map
 
             start_time = time.time()
             # Combine and process responses
-            if not append_without_duplicate_removal:
-                parent_response = cast(FhirGetBundleResponse, parent_response.extend(child_responses))
-            else:
-                parent_response = cast(
-                    FhirGetBundleResponse,
-                    parent_response._append_without_duplicate_removal(child_responses),
-                )
+            parent_response = cast(FhirGetBundleResponse, accumulator.get_response())
             if logger:
                 logger.info(f"Parent_response.extend time: {time.time() - start_time}")
 
@@ -273,6 +282,9 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
                     f"misses: {cache.cache_misses}"
                 )
 
+            if profile:
+                profile.total_seconds = time.perf_counter() - profile_start_time
+
             # Yield the final response
             yield full_response
 
@@ -349,6 +361,7 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
                 additional_parameters.get("add_cached_bundles_to_result", True) if additional_parameters else True
             ),
             ifModifiedSince=(additional_parameters.get("ifModifiedSince", None) if additional_parameters else None),
+            profile=(additional_parameters.get("profile") if additional_parameters else None),
         ):
             # Collect each link result
             result.append(link_result)
@@ -385,6 +398,7 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
         max_concurrent_tasks: int | None,
         add_cached_bundles_to_result: bool = True,
         ifModifiedSince: datetime | None,
+        profile: GraphExecutionProfile | None = None,
     ) -> AsyncGenerator[FhirGetResponse, None]:
         """
         Process a GraphDefinition link object with advanced traversal capabilities.
@@ -413,6 +427,7 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
             max_concurrent_tasks: Maximum number of concurrent processing tasks
             add_cached_bundles_to_result: Flag to add cached bundles to result
             ifModifiedSince: Optional timestamp for conditional requests
+            profile: Optional execution profile to record what each target took in
 
         Yields:
             FhirGetResponse objects for each processed target
@@ -449,6 +464,7 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
             id_search_unsupported_resources=id_search_unsupported_resources,
             add_cached_bundles_to_result=add_cached_bundles_to_result,
             ifModifiedSince=ifModifiedSince,
+            profile=profile,
         ):
             # Yield each target response individually
             for target_response in target_responses:
@@ -492,36 +508,46 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
         # Initialize result list to store retrieved responses
         result: list[FhirGetResponse] = []
 
-        # Process the target asynchronously and collect responses
-        target_result: FhirGetResponse
-        async for target_result in self._process_target_async(
-            # Target to process
-            target=row,
-            # Path from the parent link
-            path=parameters.path,
-            # Parent bundle entries for context
-            parent_bundle_entries=parameters.parent_bundle_entries,
-            # Logging support
-            logger=parameters.logger,
-            # Caching mechanism
-            cache=parameters.cache,
-            # Scope-based access control
-            scope_parser=parameters.scope_parser,
-            # Parent link map for further graph traversal
-            parent_link_map=(additional_parameters["parent_link_map"] if additional_parameters else []),
-            # Request size configuration
-            request_size=(additional_parameters["request_size"] if additional_parameters else 1),
-            # Track resources with limited ID search capabilities
-            id_search_unsupported_resources=(
-                additional_parameters["id_search_unsupported_resources"] if additional_parameters else []
-            ),
-            add_cached_bundles_to_result=(
-                additional_parameters.get("add_cached_bundles_to_result", True) if additional_parameters else True
-            ),
-            ifModifiedSince=(additional_parameters.get("ifModifiedSince", None) if additional_parameters else None),
-        ):
-            # Collect each target result
-            result.append(target_result)
+        # the requests sent for this target (including by the tasks started from this one) are recorded in its profile
+        profile: GraphExecutionProfile | None = additional_parameters.get("profile") if additional_parameters else None
+        target_profile: GraphTargetProfile | None = profile.get_target_profile(row) if profile else None
+        profile_token = GraphTargetProfile.set_current(target_profile) if target_profile else None
+        start_time: float = time.perf_counter()
+        try:
+            # Process the target asynchronously and collect responses
+            target_result: FhirGetResponse
+            async for target_result in self._process_target_async(
+                # Target to process
+                target=row,
+                # Path from the parent link
+                path=parameters.path,
+                # Parent bundle entries for context
+                parent_bundle_entries=parameters.parent_bundle_entries,
+                # Logging support
+                logger=parameters.logger,
+                # Caching mechanism
+                cache=parameters.cache,
+                # Scope-based access control
+                scope_parser=parameters.scope_parser,
+                # Parent link map for further graph traversal
+                parent_link_map=(additional_parameters["parent_link_map"] if additional_parameters else []),
+                # Request size configuration
+                request_size=(additional_parameters["request_size"] if additional_parameters else 1),
+                # Track resources with limited ID search capabilities
+                id_search_unsupported_resources=(
+                    additional_parameters["id_search_unsupported_resources"] if additional_parameters else []
+                ),
+                add_cached_bundles_to_result=(
+                    additional_parameters.get("add_cached_bundles_to_result", True) if additional_parameters else True
+                ),
+                ifModifiedSince=(additional_parameters.get("ifModifiedSince", None) if additional_parameters else None),
+            ):
+                # Collect each target result
+                result.append(target_result)
+        finally:
+            if target_profile and profile_token:
+                target_profile.record_time(start_time=start_time, end_time=time.perf_counter())
+                GraphTargetProfile.reset_current(profile_token)
 
         # Return the list of retrieved responses
         return result
@@ -591,6 +617,16 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
             id_search_unsupported_resources=id_search_unsupported_resources,
             add_cached_bundles_to_result=add_cached_bundles_to_result,
         )
+        FhirClientSdkMetrics.get().record_graph_link_fan_out(
+            target_type=resource_type, resource_count=child_response.get_resource_count()
+        )
+        target_profile: GraphTargetProfile | None = GraphTargetProfile.get_current()
+        if target_profile:
+            target_profile.record_group(
+                id_count=len(id_ if isinstance(id_, list) else [id_]) if id_ else len(parent_ids),
+                resource_count=child_response.get_resource_count(),
+                cache_hits=cache_hits,
+            )
 
         # Log detailed retrieval information if logger is available
         if logger:
@@ -607,6 +643,56 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
         # Return the retrieved child resources
         return child_response
 
+    async def _get_start_resources_async(
+        self,
+        *,
+        resource_type: str,
+        id_: list[str],
+        cache: RequestCache,
+        scope_parser: FhirScopeParser,
+        logger: Logger | None,
+        id_search_unsupported_resources: list[str],
+        add_cached_bundles_to_result: bool,
+        compare_hash: bool,
+        start_profile: GraphTargetProfile | None,
+    ) -> tuple[FhirGetResponse, int]:
+        """
+        Retrieves the start resources of a graph and records what it took in start_profile
+
+        :param resource_type: resource type of the start resources
+        :param id_: ids of the start resources
+        :param cache: cache to use
+        :param scope_parser: scope parser to use
+        :param logger: logger to use
+        :param id_search_unsupported_resources: list of resources that do not support id search
+        :param add_cached_bundles_to_result: whether to add cached bundles to result
+        :param compare_hash: whether to compare the hash of the resources
+        :param start_profile: profile of the start resources, if the graph is profiled
+        :return: response and number of cache hits
+        """
+        profile_token = GraphTargetProfile.set_current(start_profile) if start_profile else None
+        start_time: float = time.perf_counter()
+        try:
+            response, cache_hits = await self._get_resources_by_parameters_async(
+                resource_type=resource_type,
+                id_=id_,
+                cache=cache,
+                scope_parser=scope_parser,
+                logger=logger,
+                id_search_unsupported_resources=id_search_unsupported_resources,
+                add_cached_bundles_to_result=add_cached_bundles_to_result,
+                compare_hash=compare_hash,
+            )
+        finally:
+            if start_profile and profile_token:
+                start_profile.record_time(start_time=start_time, end_time=time.perf_counter())
+                GraphTargetProfile.reset_current(profile_token)
+        if start_profile:
+            start_profile.record_group(
+                id_count=len(id_), resource_count=response.get_resource_count(), cache_hits=cache_hits
+            )
+        return response, cache_hits
+
     async def _process_target_async(
         self,
         *,
@@ -617,10 +703,11 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
         cache: RequestCache,
         scope_parser: FhirScopeParser,
         parent_link_map: list[tuple[list[GraphDefinitionLink], list[FhirBundleEntry]]],
-        request_size: int,
+        request_size: int | None,
         id_search_unsupported_resources: list[str],
         add_cached_bundles_to_result: bool = True,
         ifModifiedSince: datetime | None = None,
+        frontier: GraphFrontier | None = None,
     ) -> AsyncGenerator[FhirGetResponse, None]:
         """
         Process a GraphDefinition target
@@ -636,6 +723,8 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
         :param request_size: number of resources to request at once
         :param id_search_unsupported_resources: list of resources that do not support id search
         :param ifModifiedSince: ifModifiedSince to use
+        :param frontier: frontier of the streaming graph mode.  If set, compact copies of the children are collected
+                            for the links and the resources returned before are removed from the responses.
         :return: list of FhirGetResponse objects
         """
         children: list[FhirBundleEntry] = []
@@ -655,7 +744,8 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
 
         # forward link and iterate over list
         if path and "[x]" in path and parent_bundle_entries:
-            child_ids = []
+            # a dict keeps the ids in order and checks for duplicates in constant time
+            child_ids: dict[str, None] = {}
             for parent_bundle_entry in parent_bundle_entries:
                 parent_resource = parent_bundle_entry.resource
                 references: list[dict[str, Any]] | dict[str, Any] | str | None = (
@@ -679,18 +769,18 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
                             reference_parts = reference_id.split("/")
                             if target_type in reference_parts:
                                 if reference_parts[-1] and reference_parts[-1] not in child_ids:
-                                    child_ids.append(reference_parts[-1])
+                                    child_ids[reference_parts[-1]] = None
                                 # If we receive a reference like "example.com/Procedure/1234/"
                                 elif (
                                     len(reference_parts) > 2
                                     and reference_parts[-2]
                                     and reference_parts[-2] not in child_ids
                                 ):
-                                    child_ids.append(reference_parts[-2])
+                                    child_ids[reference_parts[-2]] = None
                         if request_size and len(child_ids) == request_size:
                             child_response = await self._process_child_group(
                                 resource_type=target_type,
-                                id_=child_ids,
+                                id_=list(child_ids),
                                 parent_ids=parent_ids,
                                 parent_resource_type=parent_resource_type,
                                 path=path,
@@ -700,14 +790,18 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
                                 id_search_unsupported_resources=id_search_unsupported_resources,
                                 add_cached_bundles_to_result=add_cached_bundles_to_result,
                             )
+                            children.extend(
+                                self._get_child_entries_to_follow(
+                                    child_response=child_response, target=target, frontier=frontier
+                                )
+                            )
                             yield child_response
-                            children.extend(child_response.get_bundle_entries())
-                            child_ids = []
+                            child_ids = {}
                             parent_ids = []
             if child_ids:
                 child_response = await self._process_child_group(
                     resource_type=target_type,
-                    id_=child_ids,
+                    id_=list(child_ids),
                     parent_ids=parent_ids,
                     parent_resource_type=parent_resource_type,
                     path=path,
@@ -717,10 +811,12 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
                     id_search_unsupported_resources=id_search_unsupported_resources,
                     add_cached_bundles_to_result=add_cached_bundles_to_result,
                 )
+                children.extend(
+                    self._get_child_entries_to_follow(child_response=child_response, target=target, frontier=frontier)
+                )
                 yield child_response
-                children.extend(child_response.get_bundle_entries())
         elif path and parent_bundle_entries and target_type:
-            child_ids = []
+            child_ids = {}
             for parent_bundle_entry in parent_bundle_entries:
                 parent_resource = parent_bundle_entry.resource
                 if parent_resource is not None:
@@ -734,18 +830,18 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
                             reference_parts = reference_id.split("/")
                             if target_type in reference_parts:
                                 if reference_parts[-1] and reference_parts[-1] not in child_ids:
-                                    child_ids.append(reference_parts[-1])
+                                    child_ids[reference_parts[-1]] = None
                                 # If we receive a reference like "example.com/Procedure/1234/"
                                 elif (
                                     len(reference_parts) > 2
                                     and reference_parts[-2]
                                     and reference_parts[-2] not in child_ids
                                 ):
-                                    child_ids.append(reference_parts[-2])
+                                    child_ids[reference_parts[-2]] = None
                             if request_size and len(child_ids) == request_size:
                                 child_response = await self._process_child_group(
                                     resource_type=target_type,
-                                    id_=child_ids,
+                                    id_=list(child_ids),
                                     parent_ids=parent_ids,
                                     parent_resource_type=parent_resource_type,
                                     path=path,
@@ -755,14 +851,18 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
                                     id_search_unsupported_resources=id_search_unsupported_resources,
                                     add_cached_bundles_to_result=add_cached_bundles_to_result,
                                 )
+                                children.extend(
+                                    self._get_child_entries_to_follow(
+                                        child_response=child_response, target=target, frontier=frontier
+                                    )
+                                )
                                 yield child_response
-                                children.extend(child_response.get_bundle_entries())
-                                child_ids = []
+                                child_ids = {}
                                 parent_ids = []
             if child_ids:
                 child_response = await self._process_child_group(
                     resource_type=target_type,
-                    id_=child_ids,
+                    id_=list(child_ids),
                     parent_ids=parent_ids,
                     parent_resource_type=parent_resource_type,
                     path=path,
@@ -772,8 +872,10 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
                     id_search_unsupported_resources=id_search_unsupported_resources,
                     add_cached_bundles_to_result=add_cached_bundles_to_result,
                 )
+                children.extend(
+                    self._get_child_entries_to_follow(child_response=child_response, target=target, frontier=frontier)
+                )
                 yield child_response
-                children.extend(child_response.get_bundle_entries())
 
         elif target.params:  # reverse path
             # for a reverse link, get the ids of the current resource, put in a view and
@@ -820,8 +922,12 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
                             id_search_unsupported_resources=id_search_unsupported_resources,
                             add_cached_bundles_to_result=add_cached_bundles_to_result,
                         )
+                        children.extend(
+                            self._get_child_entries_to_follow(
+                                child_response=child_response, target=target, frontier=frontier
+                            )
+                        )
                         yield child_response
-                        children.extend(child_response.get_bundle_entries())
                         parent_ids = []
                 if parent_ids:
                     request_parameters = [f"{property_name}={','.join(parent_ids)}"] + additional_parameters
@@ -837,11 +943,31 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
                         id_search_unsupported_resources=id_search_unsupported_resources,
                         add_cached_bundles_to_result=add_cached_bundles_to_result,
                     )
+                    children.extend(
+                        self._get_child_entries_to_follow(
+                            child_response=child_response, target=target, frontier=frontier
+                        )
+                    )
                     yield child_response
-                    children.extend(child_response.get_bundle_entries())
         if target.link:
             parent_link_map.append((target.link, children))
 
+    @staticmethod
+    def _get_child_entries_to_follow(
+        *, child_response: FhirGetResponse, target: GraphDefinitionTarget, frontier: GraphFrontier | None
+    ) -> Iterable[FhirBundleEntry]:
+        """
+        Returns the entries of child_response to follow the links of target from
+
+        :param child_response: response for target
+        :param target: target the response is for
+        :param frontier: frontier of the streaming graph mode, if used
+        :return: the entries (none if target has no links)
+        """
+        if frontier is not None:
+            return frontier.get_entries_to_follow(response=child_response, links=target.link)
+        return child_response.get_bundle_entries() if target.link else []
+
     async def _get_resources_by_id_one_by_one_async(
         self,
         *,
@@ -1162,6 +1288,7 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
         input_cache: RequestCache | None = None,
         compare_hash: bool = True,
         append_without_duplicate_removal: bool = False,
+        profile: GraphExecutionProfile | None = None,
     ) -> FhirGetResponse:
         """
         Simulates the $graph query on the FHIR server
@@ -1184,6 +1311,7 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
         :param add_cached_bundles_to_result: Optional flag to add cached bundles to result
         :param input_cache: Optional cache to use for input
         :param compare_hash: Optional flag to compare hash of the resources
+        :param profile: Optional GraphExecutionProfile to fill in with what each target of the graph took
         :return: FhirGetResponse
         """
         if contained:
@@ -1215,6 +1343,7 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
                 input_cache=input_cache,
                 compare_hash=compare_hash,
                 append_without_duplicate_removal=append_without_duplicate_removal,
+                profile=profile,
             )
         )
         assert result, "No result returned from simulate_graph_async"
@@ -1238,6 +1367,7 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
         max_concurrent_tasks: int | None = 1,
         sort_resources: bool | None = False,
         input_cache: RequestCache | None = None,
+        profile: GraphExecutionProfile | None = None,
     ) -> AsyncGenerator[FhirGetResponse, None]:
         """
         Simulates the $graph query on the FHIR server
@@ -1258,6 +1388,7 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
         :param max_concurrent_tasks: Optional number of concurrent tasks.  If 1 then the tasks are processed sequentially
         :param sort_resources: Optional flag to sort resources
         :param input_cache: Optional cache to use for input
+        :param profile: Optional GraphExecutionProfile to fill in with what each target of the graph took
         :return: FhirGetResponse
         """
         if contained:
@@ -1285,6 +1416,7 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
             max_concurrent_tasks=max_concurrent_tasks,
             sort_resources=sort_resources,
             input_cache=input_cache,
+            profile=profile,
         ):
             yield r
 
@@ -1308,6 +1440,7 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
         add_cached_bundles_to_result: bool = True,
         input_cache: RequestCache | None = None,
         compare_hash: bool = True,
+        profile: GraphExecutionProfile | None = None,
     ) -> AsyncGenerator[FhirGetResponse, None]:
         """
         Simulates the $graph query yielding results per graph link (resource type) instead
@@ -1333,6 +1466,8 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
         :param add_cached_bundles_to_result: Optional flag to add cached bundles to result
         :param input_cache: Optional cache to use for input
         :param compare_hash: Optional flag to compare hash of the resources
+        :param profile: Optional GraphExecutionProfile to fill in with what each target of the graph took.  It is
+                        complete once the generator is exhausted.
         :return: AsyncGenerator yielding FhirGetResponse per resource type
         """
         if contained:
@@ -1362,6 +1497,7 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
             add_cached_bundles_to_result=add_cached_bundles_to_result,
             input_cache=input_cache,
             compare_hash=compare_hash,
+            profile=profile,
         ):
             yield r
 
@@ -1389,6 +1525,7 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
         add_cached_bundles_to_result: bool = True,
         input_cache: RequestCache | None = None,
         compare_hash: bool = True,
+        profile: GraphExecutionProfile | None = None,
     ) -> AsyncGenerator[FhirGetResponse, None]:
         """
         Core implementation that yields per graph link instead of accumulating all responses.
@@ -1420,11 +1557,12 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
 
         id_search_unsupported_resources: list[str] = []
         cache: RequestCache = input_cache if input_cache is not None else RequestCache()
+        profile_start_time: float = time.perf_counter()
         async with cache:
             start: str = graph_definition.start
             parent_response: FhirGetResponse
             cache_hits: int
-            parent_response, cache_hits = await self._get_resources_by_parameters_async(
+            parent_response, cache_hits = await self._get_start_resources_async(
                 resource_type=start,
                 id_=id_,
                 cache=cache,
@@ -1433,10 +1571,13 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
                 id_search_unsupported_resources=id_search_unsupported_resources,
                 add_cached_bundles_to_result=add_cached_bundles_to_result,
                 compare_hash=compare_hash,
+                start_profile=profile.reset(graph_definition=graph_definition) if profile else None,
             )
 
             parent_response_resource_count = parent_response.get_resource_count()
             if parent_response_resource_count == 0:
+                if profile:
+                    profile.total_seconds = time.perf_counter() - profile_start_time
                 yield parent_response
                 return
 
@@ -1482,6 +1623,7 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
                         id_search_unsupported_resources=id_search_unsupported_resources,
                         add_cached_bundles_to_result=add_cached_bundles_to_result,
                         ifModifiedSince=ifModifiedSince,
+                        profile=profile,
                     ):
                         # Yield each link's responses individually instead of accumulating
                         for link_response in link_responses:
@@ -1490,6 +1632,10 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
 
                 parent_link_map = new_parent_link_map
 
+            if profile:
+                # includes the time the caller took to consume the responses
+                profile.total_seconds = time.perf_counter() - profile_start_time
+
             if logger:
                 logger.info(
                     f"Request Cache for: id_={id_}, "
@@ -1497,3 +1643,202 @@ class SimulatedGraphProcessorMixin(ABC, FhirClientProtocol):
                     f"hits: {cache.cache_hits}, "
                     f"misses: {cache.cache_misses}"
                 )
+
+    # noinspection PyPep8Naming
+    async def simulate_graph_streaming_bounded_async(
+        self,
+        *,
+        id_: list[str] | str,
+        graph_json: dict[str, Any],
+        contained: bool,
+        restrict_to_scope: str | None = None,
+        restrict_to_resources: list[str] | None = None,
+        restrict_to_capability_statement: str | None = None,
+        retrieve_and_restrict_to_capability_statement: bool | None = None,
+        ifModifiedSince: datetime | None = None,
+        eTag: str | None = None,
+        request_size: int | None = 1,
+        max_concurrent_tasks: int | None = 1,
+        max_queued_responses: int = 10,
+        input_cache: RequestCache | None = None,
+        compare_hash: bool = True,
+    ) -> AsyncGenerator[FhirGetResponse, None]:
+        """
+        Simulates the $graph query on the FHIR server and yields each response as soon as it is fetched, keeping
+        memory bounded by the resources still to follow instead of the resources returned.
+
+        Unlike simulate_graph_streaming_async() and simulate_graph_by_resource_type_async(), the fetched resources are
+        not kept for the next level of the graph: only a compact copy (resourceType, id and the fields read by the
+        paths of the links) of the resources whose target has links, and the resourceType/id of the resources
+        returned so far.  A resource is returned only once: it is removed from later responses.  The responses are
+        not merged or sorted.
+
+        A resource is followed only from the target that fetched it first: when another target reaches it later the
+        request cache skips the request, so the links of that target are not followed from it.  E.g., a Practitioner
+        first reached by a target without links is not followed by a later Practitioner target with links.
+
+        :param id_: single id or list of ids (ids can be comma separated too)
+        :param graph_json: definition of a graph to execute
+        :param contained: whether we should return the related resources as top level list or nest them inside their
+                            parent resources in a contained property
+        :param restrict_to_scope: Optional scope to restrict to
+        :param restrict_to_resources: Optional list of resources to restrict to
+        :param restrict_to_capability_statement: Optional capability statement to restrict to
+        :param retrieve_and_restrict_to_capability_statement: Optional capability statement to retrieve and restrict to
+        :param ifModifiedSince: Optional datetime to use for If-Modified-Since header
+        :param eTag: Optional ETag to use for If-None-Match header
+        :param request_size: Optional Count of resources to request in one request
+        :param max_concurrent_tasks: Optional number of targets fetched at the same time.  If 1 then the targets are
+                                        processed sequentially
+        :param max_queued_responses: maximum number of fetched responses waiting for the caller.  When reached, the
+                                        requests wait so a slow caller slows down the requests.
+        :param input_cache: Optional cache to use for input.  By default, a cache that keeps only the status and hash
+                            of each request is used.
+        :param compare_hash: Optional flag to compare the hash of the resources with the hash in the input cache
+        :return: FhirGetResponse
+        """
+        if contained:
+            if not self._additional_parameters:
+                self.additional_parameters([])
+            assert self._additional_parameters is not None
+            self._additional_parameters.append("contained=true")
+
+        async for r in self._process_simulate_graph_streaming_bounded_async(
+            id_=id_,
+            graph_json=graph_json,
+            contained=contained,
+            ifModifiedSince=ifModifiedSince,
+            eTag=eTag,
+            url=self._url,
+            logger=self._logger,
+            auth_scopes=self._auth_scopes,
+            request_size=request_size,
+            max_concurrent_tasks=max_concurrent_tasks,
+            max_queued_responses=max_queued_responses,
+            input_cache=input_cache,
+            compare_hash=compare_hash,
+        ):
+            yield r
+
+    # noinspection PyPep8Naming
+    async def _process_simulate_graph_streaming_bounded_async(
+        self,
+        *,
+        id_: list[str] | str,
+        graph_json: dict[str, Any],
+        contained: bool,
+        ifModifiedSince: datetime | None = None,
+        eTag: str | None = None,
+        logger: Logger | None,
+        url: str | None,
+        auth_scopes: list[str] | None,
+        request_size: int | None = 1,
+        max_concurrent_tasks: int | None,
+        max_queued_responses: int,
+        input_cache: RequestCache | None = None,
+        compare_hash: bool = True,
+    ) -> AsyncGenerator[FhirGetResponse, None]:
+        """
+        Core implementation that yields each response as it arrives and keeps only a GraphFrontier between the
+        levels of the graph.  The targets of a level are processed concurrently into one bounded queue.
+        """
+        assert graph_json, "Graph JSON must be provided"
+        graph_definition: GraphDefinition = GraphDefinition.from_dict(graph_json)
+        assert isinstance(graph_definition, GraphDefinition)
+        assert graph_definition.start, "Graph definition must have a start resource"
+
+        scope_parser: FhirScopeParser = FhirScopeParser(scopes=auth_scopes)
+        self.separate_bundle_resources(False)
+
+        if logger:
+            logger.info(
+                f"FhirClient.simulate_graph_streaming_bounded_async() "
+                f"id_={id_}, "
+                f"contained={contained}, "
+                f"request_size={request_size}, "
+                f"max_concurrent_tasks={max_concurrent_tasks}, "
+                f"max_queued_responses={max_queued_responses}, "
+                f"ifModifiedSince={ifModifiedSince.isoformat() if ifModifiedSince else None}, "
+                f"eTag={eTag}, "
+            )
+
+        if not isinstance(id_, list):
+            id_ = id_.split(",")
+
+        id_search_unsupported_resources: list[str] = []
+        # the cache only skips requests made before: the resources of a cache hit are not added to the response so
+        # keeping them would only cost memory
+        cache: RequestCache = input_cache if input_cache is not None else RequestCache(store_bundle_entries=False)
+        frontier: GraphFrontier = GraphFrontier(storage_mode=self._storage_mode)
+        async with cache:
+            parent_response: FhirGetResponse
+            cache_hits: int
+            parent_response, cache_hits = await self._get_resources_by_parameters_async(
+                resource_type=graph_definition.start,
+                id_=id_,
+                cache=cache,
+                scope_parser=scope_parser,
+                logger=logger,
+                id_search_unsupported_resources=id_search_unsupported_resources,
+                compare_hash=compare_hash,
+            )
+
+            if logger:
+                logger.info(
+                    f"FhirClient.simulate_graph_streaming_bounded_async() "
+                    f"got parent resources: {parent_response.get_resource_count()} "
+                    f"cached:{cache_hits}"
+                )
+
+            parent_bundle_entries: FhirBundleEntryList = frontier.get_entries_to_follow(
+                response=parent_response, links=graph_definition.link
+            )
+            parent_response.url = url or parent_response.url
+            yield parent_response
+            # the caller has the response: do not keep it while the rest of the graph is processed
+            del parent_response
+
+            parent_link_map: list[tuple[list[GraphDefinitionLink], list[FhirBundleEntry]]] = []
+            if graph_definition.link and parent_bundle_entries:
+                parent_link_map.append((graph_definition.link, list(parent_bundle_entries)))
+            del parent_bundle_entries
+
+            while parent_link_map:
+                new_parent_link_map: list[tuple[list[GraphDefinitionLink], list[FhirBundleEntry]]] = []
+                child_response: FhirGetResponse
+                async for child_response in AsyncStreamPrefetcher.merge_async(
+                    (
+                        self._process_target_async(
+                            target=target,
+                            path=link.path,
+                            parent_bundle_entries=FhirBundleEntryList(current_parent_bundle_entries),
+                            logger=logger,
+                            cache=cache,
+                            scope_parser=scope_parser,
+                            parent_link_map=new_parent_link_map,
+                            request_size=request_size,
+                            id_search_unsupported_resources=id_search_unsupported_resources,
+                            ifModifiedSince=ifModifiedSince,
+                            frontier=frontier,
+                        )
+                        for links, current_parent_bundle_entries in parent_link_map
+                        for link in links
+                        for target in link.target
+                    ),
+                    max_queue_size=max_queued_responses,
+                    max_concurrent_sources=max_concurrent_tasks,
+                ):
+                    child_response.url = url or child_response.url
+                    yield child_response
+
+                # only the compact entries of the next level are kept
+                parent_link_map = new_parent_link_map
+
+            if logger:
+                logger.info(
+                    f"Request Cache for: id_={id_}, "
+                    f"start={graph_definition.start}, "
+                    f"hits: {cache.cache_hits}, "
+                    f"misses: {cache.cache_misses}, "
+                    f"resources returned: {frontier.resource_count}"
+                )
@@ -0,0 +1,98 @@
+from typing import Any
+
+import aiohttp
+from aioresponses import aioresponses
+
+from helix_fhir_client_sdk.fhir_client import FhirClient
+from helix_fhir_client_sdk.graph.graph_execution_profile import GraphExecutionProfile, GraphTargetProfile
+from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+
+graph_json: dict[str, Any] = {
+    "id": "1",
+    "name": "Test Graph",
+    "resourceType": "GraphDefinition",
+    "start": "Patient",
+    "link": [
+        {
+            "target": [
+                {
+                    "type": "Encounter",
+                    "params": "patient={ref}",
+                    "link": [{"path": "serviceProvider", "target": [{"type": "Organization"}]}],
+                },
+            ]
+        },
+        {"path": "generalPractitioner[x]", "target": [{"type": "Practitioner"}]},
+    ],
+}
+
+
+def create_bundle(*resources: dict[str, Any]) -> dict[str, Any]:
+    return {"resourceType": "Bundle", "entry": [{"resource": resource} for resource in resources]}
+
+
+async def test_profile_has_a_node_per_target() -> None:
+    patient: dict[str, Any] = {
+        "resourceType": "Patient",
+        "id": "1",
+        "generalPractitioner": [{"reference": "Practitioner/5"}, {"reference": "Practitioner/6"}],
+    }
+    encounters: list[dict[str, Any]] = [
+        {"resourceType": "Encounter", "id": id_, "serviceProvider": {"reference": "Organization/7"}}
+        for id_ in ["8", "9"]
+    ]
+    with aioresponses() as m:
+        m.get("http://example.com/fhir/Patient/1", payload=patient)
+        m.get("http://example.com/fhir/Encounter?patient=1", payload=create_bundle(*encounters))
+        m.get("http://example.com/fhir/Practitioner/5", payload={"resourceType": "Practitioner", "id": "5"})
+        m.get("http://example.com/fhir/Practitioner/6", payload={"resourceType": "Practitioner", "id": "6"})
+        m.get("http://example.com/fhir/Organization/7", payload={"resourceType": "Organization", "id": "7"})
+
+        fhir_client = FhirClient().url("http://example.com/fhir").set_access_token("token")
+        fhir_client.set_max_concurrent_requests(1)
+        fhir_client.create_http_session = lambda: aiohttp.ClientSession()  # type: ignore[method-assign]
+        profile = GraphExecutionProfile()
+        response: FhirGetResponse = await fhir_client.simulate_graph_async(
+            id_="1", graph_json=graph_json, contained=False, max_concurrent_tasks=2, profile=profile
+        )
+
+    assert response.get_resource_count() == 6
+    start = profile.start
+    assert start is not None
+    encounter, practitioner = start.children
+    (organization,) = encounter.children
+    assert (start.name, encounter.name, practitioner.name, organization.name) == (
+        "Patient",
+        "Encounter ?patient={ref}",
+        "Practitioner [generalPractitioner[x]]",
+        "Organization [serviceProvider]",
+    )
+    assert (start.request_count, start.id_count, start.resource_count) == (1, 1, 1)
+    assert (encounter.request_count, encounter.id_count, encounter.resource_count) == (1, 1, 2)
+    # request_size is 1 so each practitioner is requested on its own
+    assert (practitioner.request_count, practitioner.group_count, practitioner.resource_count) == (2, 2, 2)
+    # both encounters point to the same organization so the second one comes from the cache
+    assert (organization.group_count, organization.request_count, organization.cache_hits) == (2, 1, 1)
+    assert all(node.size_in_bytes > 0 and node.wall_time_seconds > 0 for node in [start, encounter, organization])
+    assert profile.total_seconds >= start.wall_time_seconds
+    assert profile.get_critical_path()[0] is start
+    assert len(profile.to_text().splitlines()) == 5
+    assert profile.to_dict()["start"]["children"][0]["resource_count"] == 2
+    # the profile is only current while the graph is processed
+    assert GraphTargetProfile.get_current() is None
+
+
+def test_critical_path_follows_the_slowest_chain() -> None:
+    profile = GraphExecutionProfile()
+    profile.start = GraphTargetProfile(path=None, target_type="Patient", params=None)
+    profile.start.record_time(start_time=0, end_time=1)
+    fast_with_slow_child = GraphTargetProfile(path=None, target_type="Encounter", params="patient={ref}")
+    fast_with_slow_child.record_time(start_time=1, end_time=2)
+    slow_child = GraphTargetProfile(path="serviceProvider", target_type="Organization", params=None)
+    slow_child.record_time(start_time=2, end_time=6)
+    fast_with_slow_child.children.append(slow_child)
+    slow = GraphTargetProfile(path="generalPractitioner[x]", target_type="Practitioner", params=None)
+    slow.record_time(start_time=1, end_time=4)
+    profile.start.children.extend([fast_with_slow_child, slow])
+
+    assert profile.get_critical_path() == [profile.start, fast_with_slow_child, slow_child]
@@ -0,0 +1,156 @@
+import json
+from typing import Any
+
+import aiohttp
+from aioresponses import aioresponses
+from compressedfhir.utilities.compressed_dict.v1.compressed_dict_storage_mode import (
+    CompressedDictStorageMode,
+)
+
+from helix_fhir_client_sdk.fhir_client import FhirClient
+from helix_fhir_client_sdk.graph.graph_definition import GraphDefinitionLink
+from helix_fhir_client_sdk.graph.graph_frontier import GraphFrontier
+from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+from helix_fhir_client_sdk.responses.get.fhir_get_bundle_response import FhirGetBundleResponse
+from helix_fhir_client_sdk.responses.get.fhir_get_single_response import FhirGetSingleResponse
+
+graph_json: dict[str, Any] = {
+    "id": "1",
+    "name": "Test Graph",
+    "resourceType": "GraphDefinition",
+    "start": "Patient",
+    "link": [
+        {
+            "target": [
+                {
+                    "type": "Encounter",
+                    "params": "patient={ref}",
+                    "link": [
+                        {"path": "participant.individual[x]", "target": [{"type": "Practitioner"}]},
+                        {"path": "serviceProvider", "target": [{"type": "Organization"}]},
+                    ],
+                },
+                {"type": "Encounter", "params": "subject={ref}"},
+            ]
+        },
+    ],
+}
+
+
+def create_encounter(id_: str) -> dict[str, Any]:
+    return {
+        "resourceType": "Encounter",
+        "id": id_,
+        "text": {"div": "x" * 1000},
+        "participant": [{"individual": {"reference": "Practitioner/12345"}}],
+        "serviceProvider": {"reference": "Organization/7"},
+    }
+
+
+def create_bundle(*resources: dict[str, Any]) -> dict[str, Any]:
+    return {"resourceType": "Bundle", "entry": [{"resource": resource} for resource in resources]}
+
+
+def create_client() -> FhirClient:
+    fhir_client = FhirClient().url("http://example.com/fhir")
+    fhir_client.create_http_session = lambda: aiohttp.ClientSession()  # type: ignore[method-assign]
+    return fhir_client
+
+
+async def test_streaming_bounded_yields_each_resource_once() -> None:
+    with aioresponses() as m:
+        m.get("http://example.com/fhir/Patient/1", payload={"resourceType": "Patient", "id": "1"})
+        m.get(
+            "http://example.com/fhir/Encounter?patient=1",
+            payload=create_bundle(create_encounter("8"), create_encounter("10")),
+        )
+        # the second target returns an encounter that the first one returned already
+        m.get("http://example.com/fhir/Encounter?subject=1", payload=create_bundle(create_encounter("8")))
+        m.get("http://example.com/fhir/Practitioner/12345", payload={"resourceType": "Practitioner", "id": "12345"})
+        m.get("http://example.com/fhir/Organization/7", payload={"resourceType": "Organization", "id": "7"})
+
+        responses: list[FhirGetResponse] = [
+            response
+            async for response in create_client().simulate_graph_streaming_bounded_async(
+                id_="1", graph_json=graph_json, contained=False, max_concurrent_tasks=2, max_queued_responses=1
+            )
+        ]
+
+    keys: list[str | None] = [
+        entry.resource_type_and_id for response in responses for entry in response.get_bundle_entries()
+    ]
+    assert keys[0] == "Patient/1"
+    assert sorted(key or "" for key in keys) == sorted(
+        ["Patient/1", "Encounter/8", "Encounter/10", "Practitioner/12345", "Organization/7"]
+    )
+    # the yielded resources are complete, not the compact copies used to follow the links
+    encounter = next(r for response in responses for r in response.get_resources() if r["id"] == "10")
+    assert encounter.dict() == create_encounter("10")
+
+
+def test_frontier_keeps_only_the_fields_read_by_the_links() -> None:
+    response: FhirGetResponse = FhirGetBundleResponse(
+        request_id=None,
+        url="http://example.com/fhir",
+        response_text=json.dumps(create_bundle(create_encounter("8"), create_encounter("10"))),
+        error=None,
+        access_token=None,
+        total_count=2,
+        status=200,
+        extra_context_to_return=None,
+        resource_type=None,
+        id_=None,
+        response_headers=None,
+        results_by_url=[],
+        storage_mode=CompressedDictStorageMode(),
+    )
+    links: list[GraphDefinitionLink] = [
+        GraphDefinitionLink.from_dict(link) for link in graph_json["link"][0]["target"][0]["link"]
+    ]
+    frontier = GraphFrontier(storage_mode=CompressedDictStorageMode())
+    frontier.get_entries_to_follow(response=response, links=None)
+    assert frontier.resource_count == 2
+
+    entries = frontier.get_entries_to_follow(response=response, links=links)
+
+    assert [entry.resource.dict() for entry in entries if entry.resource] == [
+        {
+            "resourceType": "Encounter",
+            "id": id_,
+            "participant": [{"individual": {"reference": "Practitioner/12345"}}],
+            "serviceProvider": {"reference": "Organization/7"},
+        }
+        for id_ in ["8", "10"]
+    ]
+    # the resources were returned before so they are removed from the response
+    assert response.get_resource_count() == 0
+
+
+def test_frontier_removes_duplicates_from_single_resource_responses() -> None:
+    def create_practitioner_response() -> FhirGetResponse:
+        return FhirGetSingleResponse(
+            request_id=None,
+            url="http://example.com/fhir/Practitioner/12345",
+            response_text=json.dumps({"resourceType": "Practitioner", "id": "12345"}),
+            error=None,
+            access_token=None,
+            total_count=1,
+            status=200,
+            extra_context_to_return=None,
+            resource_type="Practitioner",
+            id_="12345",
+            response_headers=None,
+            results_by_url=[],
+            storage_mode=CompressedDictStorageMode(),
+        )
+
+    frontier = GraphFrontier(storage_mode=CompressedDictStorageMode())
+    first: FhirGetResponse = create_practitioner_response()
+    frontier.get_entries_to_follow(response=first, links=None)
+    assert first.get_resource_count() == 1
+
+    # the same Practitioner reached through a second Encounter is not returned again
+    second: FhirGetResponse = create_practitioner_response()
+    frontier.get_entries_to_follow(response=second, links=None)
+    assert second.get_resource_count() == 0
+    assert frontier.resource_count == 1
@@ -5,3 +5,24 @@ class FhirClientSdkOpenTelemetryAttributeNames:
     RESOURCE: str = "fhir.client_sdk.resource"
     JSON_DATA_COUNT: str = "fhir.client_sdk.json_data.count"
     BATCH_SIZE: str = "fhir.client_sdk.batch.size"
+    HOST: str = "fhir.client_sdk.host"
+    CIRCUIT_BREAKER_STATE: str = "fhir.client_sdk.circuit_breaker.state"
+    CIRCUIT_BREAKER_PREVIOUS_STATE: str = "fhir.client_sdk.circuit_breaker.previous_state"
+    RETRY_BUDGET_TOKENS: str = "fhir.client_sdk.retry_budget.tokens"
+    RATE_LIMIT_PAUSE_IN_SECONDS: str = "fhir.client_sdk.rate_limit.pause_in_seconds"
+    CONCURRENCY_LIMIT: str = "fhir.client_sdk.concurrency_limit"
+    HEDGE_DELAY_IN_SECONDS: str = "fhir.client_sdk.hedge.delay_in_seconds"
+    HEDGE_WON: str = "fhir.client_sdk.hedge.won"
+    HTTP_METHOD: str = "http.request.method"
+    HTTP_STATUS_CODE: str = "http.response.status_code"
+    ERROR_TYPE: str = "error.type"
+    STREAMING: str = "fhir.client_sdk.streaming"
+    GRAPH_TARGET_TYPE: str = "fhir.client_sdk.graph.target.type"
+    TIMING_DNS_SECONDS: str = "fhir.client_sdk.timing.dns_seconds"
+    TIMING_CONNECTION_QUEUED_SECONDS: str = "fhir.client_sdk.timing.connection_queued_seconds"
+    TIMING_CONNECT_SECONDS: str = "fhir.client_sdk.timing.connect_seconds"
+    TIMING_CONNECTION_REUSED: str = "fhir.client_sdk.timing.connection_reused"
+    TIMING_TIME_TO_FIRST_BYTE_SECONDS: str = "fhir.client_sdk.timing.time_to_first_byte_seconds"
+    TIMING_BODY_SECONDS: str = "fhir.client_sdk.timing.body_seconds"
+    TIMING_PARSE_SECONDS: str = "fhir.client_sdk.timing.parse_seconds"
+    TIMING_FACTORY_SECONDS: str = "fhir.client_sdk.timing.factory_seconds"
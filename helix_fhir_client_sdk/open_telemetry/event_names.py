@@ -0,0 +1,9 @@
+class FhirClientSdkOpenTelemetryEventNames:
+    """Span event names for OpenTelemetry tracing in the FHIR Client SDK."""
+
+    CIRCUIT_BREAKER_STATE_CHANGE: str = "fhir.client_sdk.circuit_breaker.state_change"
+    CIRCUIT_BREAKER_REJECTED: str = "fhir.client_sdk.circuit_breaker.rejected"
+    RETRY_BUDGET_EXHAUSTED: str = "fhir.client_sdk.retry_budget.exhausted"
+    RATE_LIMIT_PAUSE: str = "fhir.client_sdk.rate_limit.pause"
+    CONCURRENCY_LIMIT_DECREASE: str = "fhir.client_sdk.concurrency_limit.decrease"
+    HEDGE_SENT: str = "fhir.client_sdk.hedge.sent"
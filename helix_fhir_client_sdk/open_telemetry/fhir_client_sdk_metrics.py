@@ -0,0 +1,253 @@
+from typing import ClassVar
+from urllib.parse import urlsplit
+
+from opentelemetry import metrics
+from opentelemetry.metrics import Counter, Histogram, MeterProvider, UpDownCounter
+
+from helix_fhir_client_sdk.open_telemetry.attribute_names import FhirClientSdkOpenTelemetryAttributeNames
+from helix_fhir_client_sdk.open_telemetry.metric_names import FhirClientSdkOpenTelemetryMetricNames
+
+
+class FhirClientSdkMetrics:
+    """
+    OpenTelemetry metrics of the FHIR Client SDK: HTTP request duration, retries, 429s, hedges, response sizes, JSON
+    parse time, RequestCache hits/misses/evictions, max_concurrent_requests wait time and in-flight requests, and the
+    fan-out of graph links.
+
+    The instruments come from the global MeterProvider unless use_meter_provider() is called.  When no MeterProvider
+    is configured (e.g., only opentelemetry-api is installed), the record methods return before building any
+    attributes, so the call sites on the hot paths cost a method call.
+    """
+
+    __slots__ = [
+        "_meter_provider",
+        "_http_request_duration",
+        "_http_retries",
+        "_http_rate_limited",
+        "_http_hedges",
+        "_http_response_body_size",
+        "_http_requests_in_flight",
+        "_concurrency_wait_duration",
+        "_json_parse_duration",
+        "_request_cache_hits",
+        "_request_cache_misses",
+        "_request_cache_evictions",
+        "_graph_link_fan_out",
+    ]
+
+    _instance: ClassVar["FhirClientSdkMetrics | None"] = None
+
+    def __init__(self, *, meter_provider: MeterProvider | None = None) -> None:
+        """
+        Creates the instruments
+
+        :param meter_provider: provider to create the instruments with.  If None the global MeterProvider is used,
+                               including one set after this call.
+        """
+        self._meter_provider: MeterProvider | None = meter_provider
+        meter = metrics.get_meter("helix_fhir_client_sdk", meter_provider=meter_provider)
+        names = FhirClientSdkOpenTelemetryMetricNames
+        self._http_request_duration: Histogram = meter.create_histogram(
+            names.HTTP_REQUEST_DURATION, unit="s", description="Time until the response headers were received"
+        )
+        self._http_retries: Counter = meter.create_counter(
+            names.HTTP_RETRIES, unit="{retry}", description="Requests sent again after a failure"
+        )
+        self._http_rate_limited: Counter = meter.create_counter(
+            names.HTTP_RATE_LIMITED, unit="{response}", description="429 (Too Many Requests) responses"
+        )
+        self._http_hedges: Counter = meter.create_counter(
+            names.HTTP_HEDGES, unit="{request}", description="GETs sent a second time because they were slow"
+        )
+        self._http_response_body_size: Histogram = meter.create_histogram(
+            names.HTTP_RESPONSE_BODY_SIZE, unit="By", description="Size of the response bodies read"
+        )
+        self._http_requests_in_flight: UpDownCounter = meter.create_up_down_counter(
+            names.HTTP_REQUESTS_IN_FLIGHT, unit="{request}", description="Requests sent and not answered yet"
+        )
+        self._concurrency_wait_duration: Histogram = meter.create_histogram(
+            names.CONCURRENCY_WAIT_DURATION,
+            unit="s",
+            description="Time requests waited for a slot when max_concurrent_requests is set",
+        )
+        self._json_parse_duration: Histogram = meter.create_histogram(
+            names.JSON_PARSE_DURATION, unit="s", description="Time to parse a response page"
+        )
+        self._request_cache_hits: Counter = meter.create_counter(
+            names.REQUEST_CACHE_HITS, unit="{lookup}", description="RequestCache lookups that found an entry"
+        )
+        self._request_cache_misses: Counter = meter.create_counter(
+            names.REQUEST_CACHE_MISSES, unit="{lookup}", description="RequestCache lookups that found no entry"
+        )
+        self._request_cache_evictions: Counter = meter.create_counter(
+            names.REQUEST_CACHE_EVICTIONS, unit="{entry}", description="Entries removed from a RequestCache"
+        )
+        self._graph_link_fan_out: Histogram = meter.create_histogram(
+            names.GRAPH_LINK_FAN_OUT,
+            unit="{resource}",
+            description="Resources returned for a target of a graph link from one group of parents",
+        )
+
+    @classmethod
+    def get(cls) -> "FhirClientSdkMetrics":
+        """
+        Returns the metrics used by the SDK
+        """
+        if cls._instance is None:
+            cls._instance = FhirClientSdkMetrics()
+        return cls._instance
+
+    @classmethod
+    def use_meter_provider(cls, meter_provider: MeterProvider | None) -> None:
+        """
+        Records the metrics of the SDK with meter_provider instead of the global MeterProvider
+
+        :param meter_provider: provider to use.  None goes back to the global MeterProvider.
+        """
+        cls._instance = FhirClientSdkMetrics(meter_provider=meter_provider)
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether a MeterProvider is configured.  The no-op and proxy providers of opentelemetry-api drop everything.
+        """
+        meter_provider: MeterProvider = self._meter_provider or metrics.get_meter_provider()
+        return not type(meter_provider).__module__.startswith("opentelemetry.metrics")
+
+    def record_http_request(self, *, method: str, url: str, status_code: int, duration_in_seconds: float) -> None:
+        """
+        Records the duration of an HTTP request (one attempt)
+
+        :param method: HTTP method
+        :param url: url requested
+        :param status_code: status code of the response
+        :param duration_in_seconds: time until the response headers were received
+        """
+        if not self.enabled:
+            return
+        attributes: dict[str, str | int] = FhirClientSdkMetrics._get_url_attributes(url)
+        attributes[FhirClientSdkOpenTelemetryAttributeNames.HTTP_METHOD] = method
+        attributes[FhirClientSdkOpenTelemetryAttributeNames.HTTP_STATUS_CODE] = status_code
+        self._http_request_duration.record(duration_in_seconds, attributes)
+        if status_code == 429:
+            self._http_rate_limited.add(1, attributes)
+
+    def record_retry(self, *, method: str, url: str, reason: str) -> None:
+        """
+        Records that a request is sent again
+
+        :param method: HTTP method
+        :param url: url requested
+        :param reason: status code or exception type that caused the retry
+        """
+        if not self.enabled:
+            return
+        attributes: dict[str, str | int] = FhirClientSdkMetrics._get_url_attributes(url)
+        attributes[FhirClientSdkOpenTelemetryAttributeNames.HTTP_METHOD] = method
+        attributes[FhirClientSdkOpenTelemetryAttributeNames.ERROR_TYPE] = reason
+        self._http_retries.add(1, attributes)
+
+    def record_hedge(self, *, url: str, won: bool) -> None:
+        """
+        Records that a GET was sent a second time (hedged)
+
+        :param url: url requested
+        :param won: whether the response of the second request was used
+        """
+        if not self.enabled:
+            return
+        attributes: dict[str, str | int] = FhirClientSdkMetrics._get_url_attributes(url)
+        attributes[FhirClientSdkOpenTelemetryAttributeNames.HEDGE_WON] = str(won).lower()
+        self._http_hedges.add(1, attributes)
+
+    def record_response_body_size(self, *, url: str, size_in_bytes: int, streaming: bool) -> None:
+        """
+        Records the size of a response body
+
+        :param url: url requested
+        :param size_in_bytes: size of the body
+        :param streaming: whether the body was read as a stream
+        """
+        if not self.enabled:
+            return
+        attributes: dict[str, str | int] = FhirClientSdkMetrics._get_url_attributes(url)
+        attributes[FhirClientSdkOpenTelemetryAttributeNames.STREAMING] = str(streaming).lower()
+        self._http_response_body_size.record(size_in_bytes, attributes)
+
+    def add_request_in_flight(self, count: int) -> None:
+        """
+        Adds count (1 when a request is sent, -1 when it is answered) to the requests in flight
+
+        :param count: change of the number of requests in flight
+        """
+        if self.enabled:
+            self._http_requests_in_flight.add(count)
+
+    def record_concurrency_wait(self, duration_in_seconds: float) -> None:
+        """
+        Records how long a request waited for a slot when max_concurrent_requests is set
+
+        :param duration_in_seconds: time waited
+        """
+        if self.enabled:
+            self._concurrency_wait_duration.record(duration_in_seconds)
+
+    def record_json_parse(self, *, duration_in_seconds: float, url: str) -> None:
+        """
+        Records the time to parse a response page
+
+        :param duration_in_seconds: time to parse
+        :param url: url of the page
+        """
+        if self.enabled:
+            self._json_parse_duration.record(duration_in_seconds, FhirClientSdkMetrics._get_url_attributes(url))
+
+    def record_request_cache_lookup(self, *, resource_type: str, hit: bool) -> None:
+        """
+        Records a lookup in a RequestCache
+
+        :param resource_type: resource type looked up
+        :param hit: whether an entry was found
+        """
+        if not self.enabled:
+            return
+        attributes: dict[str, str] = {FhirClientSdkOpenTelemetryAttributeNames.RESOURCE: resource_type}
+        (self._request_cache_hits if hit else self._request_cache_misses).add(1, attributes)
+
+    def record_request_cache_evictions(self, count: int) -> None:
+        """
+        Records entries removed from a RequestCache
+
+        :param count: number of entries removed
+        """
+        if self.enabled and count:
+            self._request_cache_evictions.add(count)
+
+    def record_graph_link_fan_out(self, *, target_type: str, resource_count: int) -> None:
+        """
+        Records the number of resources returned for a target of a graph link
+
+        :param target_type: resource type of the target
+        :param resource_count: number of resources returned
+        """
+        if self.enabled:
+            self._graph_link_fan_out.record(
+                resource_count, {FhirClientSdkOpenTelemetryAttributeNames.GRAPH_TARGET_TYPE: target_type}
+            )
+
+    @staticmethod
+    def _get_url_attributes(url: str) -> dict[str, str | int]:
+        """
+        Returns the host and the resource type of url.  The resource type is the first segment of the path starting
+        with an uppercase letter (FHIR resource types are PascalCase) e.g., Patient for
+        https://fhir.example.com/4_0_0/Patient/1/$everything
+
+        :param url: url
+        :return: attributes
+        """
+        parts = urlsplit(url)
+        resource_type: str = next((segment for segment in parts.path.split("/") if segment[:1].isupper()), "")
+        return {
+            FhirClientSdkOpenTelemetryAttributeNames.HOST: parts.hostname or "",
+            FhirClientSdkOpenTelemetryAttributeNames.RESOURCE: resource_type,
+        }
@@ -0,0 +1,15 @@
+class FhirClientSdkOpenTelemetryMetricNames:
+    """Metric names for OpenTelemetry metrics in the FHIR Client SDK."""
+
+    HTTP_REQUEST_DURATION: str = "fhir.client_sdk.http.request.duration"
+    HTTP_RETRIES: str = "fhir.client_sdk.http.retries"
+    HTTP_RATE_LIMITED: str = "fhir.client_sdk.http.rate_limited"
+    HTTP_HEDGES: str = "fhir.client_sdk.http.hedges"
+    HTTP_RESPONSE_BODY_SIZE: str = "fhir.client_sdk.http.response.body.size"
+    HTTP_REQUESTS_IN_FLIGHT: str = "fhir.client_sdk.http.requests.in_flight"
+    CONCURRENCY_WAIT_DURATION: str = "fhir.client_sdk.concurrency.wait.duration"
+    JSON_PARSE_DURATION: str = "fhir.client_sdk.json.parse.duration"
+    REQUEST_CACHE_HITS: str = "fhir.client_sdk.request_cache.hits"
+    REQUEST_CACHE_MISSES: str = "fhir.client_sdk.request_cache.misses"
+    REQUEST_CACHE_EVICTIONS: str = "fhir.client_sdk.request_cache.evictions"
+    GRAPH_LINK_FAN_OUT: str = "fhir.client_sdk.graph.link.fan_out"
@@ -10,19 +10,30 @@ from typing import (
     Any,
 )
 
+from aiohttp import ClientConnectionError, ClientResponseError
+
 from helix_fhir_client_sdk.exceptions.fhir_sender_exception import FhirSenderException
 from helix_fhir_client_sdk.function_types import (
     HandleStreamingChunkFunction,
 )
+from helix_fhir_client_sdk.graph.graph_execution_profile import GraphTargetProfile
+from helix_fhir_client_sdk.open_telemetry.fhir_client_sdk_metrics import FhirClientSdkMetrics
+from helix_fhir_client_sdk.queue.request_scheduler import RequestScheduler
 from helix_fhir_client_sdk.responses.fhir_client_protocol import FhirClientProtocol
 from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+from helix_fhir_client_sdk.responses.fhir_response_headers import FhirResponseHeaders
 from helix_fhir_client_sdk.responses.fhir_response_processor import (
     FhirResponseProcessor,
 )
 from helix_fhir_client_sdk.structures.get_access_token_result import (
     GetAccessTokenResult,
 )
+from helix_fhir_client_sdk.structures.raw_sink_result import RawSinkResult
+from helix_fhir_client_sdk.utilities.bundle_link_reader import BundleLinkReader
 from helix_fhir_client_sdk.utilities.fhir_client_logger import FhirClientLogger
+from helix_fhir_client_sdk.utilities.host_resilience.adaptive_concurrency_limiter import AdaptiveConcurrencyLimiter
+from helix_fhir_client_sdk.utilities.ndjson_line_splitter import NdJsonLineSplitter
+from helix_fhir_client_sdk.utilities.raw_sinks.fhir_raw_sink import FhirRawSink
 from helix_fhir_client_sdk.utilities.retryable_aiohttp_client import (
     RetryableAioHttpClient,
 )
@@ -131,6 +142,9 @@ class RequestQueueMixin(ABC, FhirClientProtocol):
                 log_all_url_results=self._log_all_response_urls,
                 access_token=self._access_token,
                 access_token_expiry_date=self._access_token_expiry_date,
+                host_resilience_registry=self._host_resilience_registry,
+                maximum_time_to_retry_on_429=self._maximum_time_to_retry_on_429,
+                hedging_policy=self._hedging_policy,
             ) as client:
                 while next_url:
                     # set access token in request if present
@@ -162,7 +176,7 @@ class RequestQueueMixin(ABC, FhirClientProtocol):
                         self.set_access_token_expiry_date(response.access_token_expiry_date)
 
                     last_status_code = response.status
-                    response_headers: list[str] = [f"{key}:{value}" for key, value in response.response_headers.items()]
+                    response_headers: FhirResponseHeaders = FhirResponseHeaders.from_mapping(response.response_headers)
                     await FhirResponseProcessor.log_response(
                         full_url=next_url,
                         response_status=response.status,
@@ -174,7 +188,7 @@ class RequestQueueMixin(ABC, FhirClientProtocol):
                         uuid=self._uuid,
                     )
 
-                    request_id = response.response_headers.get("X-Request-ID", None)
+                    request_id = response_headers.request_id
                     self._internal_logger.debug(f"X-Request-ID={request_id}")
 
                     async for r in FhirResponseProcessor.handle_response(
@@ -197,6 +211,9 @@ class RequestQueueMixin(ABC, FhirClientProtocol):
                         fn_handle_streaming_chunk=fn_handle_streaming_chunk,
                         storage_mode=self._storage_mode,
                         create_operation_outcome_for_error=self._create_operation_outcome_for_error,
+                        streaming_batch_size=self._streaming_batch_size,
+                        streaming_queue_sizes=self._streaming_queue_sizes,
+                        json_parser=self._json_parser,
                     ):
                         yield r
                         # https://icanbwell.atlassian.net/browse/RNGR-177
@@ -300,6 +317,9 @@ class RequestQueueMixin(ABC, FhirClientProtocol):
                 log_all_url_results=self._log_all_response_urls,
                 access_token=self._access_token,
                 access_token_expiry_date=self._access_token_expiry_date,
+                host_resilience_registry=self._host_resilience_registry,
+                maximum_time_to_retry_on_429=self._maximum_time_to_retry_on_429,
+                hedging_policy=self._hedging_policy,
             ) as client:
                 while next_url:
                     # set access token in request if present
@@ -412,6 +432,191 @@ class RequestQueueMixin(ABC, FhirClientProtocol):
                 elapsed_time=time.time() - start_time,
             ) from ex
 
+    async def _get_raw_to_sink_with_session_async(
+        self,
+        *,
+        sink: FhirRawSink,
+        split_lines: bool,
+        page_number: int | None,
+        ids: list[str] | None,
+        id_above: str | None,
+        additional_parameters: list[str] | None,
+        resource_type: str | None,
+    ) -> RawSinkResult:
+        """
+        issues a GET call with the specified session, page_number and ids and writes the raw bytes of the responses
+        to the sink without decoding or parsing them.  For a Bundle page, only the top level "link" element is parsed
+        to find the next page.
+
+
+        :param sink: where to write the bytes
+        :param split_lines: write each NDJSON line separately instead of the chunks as received
+        :param page_number:
+        :param ids:
+        :param id_above: return ids greater than this
+        :param additional_parameters: additional parameters to add to the request
+        :param resource_type: resource type to request
+        :return: result
+        """
+        assert self._url, "No FHIR server url was set"
+        assert resource_type or self._resource, "No Resource was set"
+
+        # create url and query to request from FHIR server
+        full_url = await self.build_url(
+            ids=ids,
+            id_above=id_above,
+            page_number=page_number,
+            additional_parameters=additional_parameters,
+            resource_type=resource_type or self._resource,
+        )
+
+        # set up headers
+        payload: dict[str, str] | None = self._action_payload if self._action_payload else None
+        headers = {
+            "Accept": self._accept,
+            "Content-Type": self._content_type,
+            "Accept-Encoding": self._accept_encoding,
+        }
+        headers.update(self._additional_request_headers)
+        self._internal_logger.debug(f"Request headers: {headers}")
+
+        start_time: float = time.time()
+        result: RawSinkResult = RawSinkResult(url=full_url)
+        next_url: str | None = full_url
+        try:
+            await FhirResponseProcessor.log_request(
+                full_url=full_url,
+                client_id=self._client_id,
+                auth_scopes=self._auth_scopes,
+                log_level=self._log_level,
+                uuid=self._uuid,
+                logger=self._logger,
+                internal_logger=self._internal_logger,
+            )
+
+            async with RetryableAioHttpClient(
+                fn_get_session=self._fn_create_http_session or self.create_http_session,
+                caller_managed_session=self._fn_create_http_session is not None,
+                refresh_token_func=self._refresh_token_function,
+                tracer_request_func=self._trace_request_function,
+                retries=self._retry_count,
+                exclude_status_codes_from_retry=self._exclude_status_codes_from_retry,
+                # always stream so the body is read as bytes instead of being decoded to text
+                use_data_streaming=True,
+                compress=self._compress,
+                throw_exception_on_error=self._throw_exception_on_error,
+                log_all_url_results=self._log_all_response_urls,
+                access_token=self._access_token,
+                access_token_expiry_date=self._access_token_expiry_date,
+                host_resilience_registry=self._host_resilience_registry,
+                maximum_time_to_retry_on_429=self._maximum_time_to_retry_on_429,
+                hedging_policy=self._hedging_policy,
+            ) as client:
+                while next_url:
+                    # set access token in request if present
+                    access_token_result: GetAccessTokenResult = await self.get_access_token_async()
+                    access_token: str | None = access_token_result.access_token
+                    if access_token:
+                        headers["Authorization"] = f"Bearer {access_token}"
+
+                    if not UrlChecker.is_absolute_url(url=next_url):
+                        next_url = UrlChecker.convert_relative_url_to_absolute_url(
+                            base_url=self._url, relative_url=next_url
+                        )
+                    else:
+                        # INC-285: Preserve port from base URL when next_url is absolute
+                        # but missing the port (FHIR server bug workaround)
+                        next_url = UrlChecker.preserve_port_from_base_url(base_url=self._url, next_url=next_url)
+                    response: RetryableAioHttpResponse = await self._send_fhir_request_async(
+                        client=client,
+                        full_url=next_url,
+                        headers=headers,
+                        payload=payload,
+                    )
+                    assert isinstance(response, RetryableAioHttpResponse)
+
+                    if response.access_token:
+                        self.set_access_token(response.access_token)
+                    if response.access_token_expiry_date:
+                        self.set_access_token_expiry_date(response.access_token_expiry_date)
+
+                    result.status = response.status
+                    result.response_headers = [f"{key}:{value}" for key, value in response.response_headers.items()]
+                    await FhirResponseProcessor.log_response(
+                        full_url=next_url,
+                        response_status=response.status,
+                        client_id=self._client_id,
+                        internal_logger=self._internal_logger,
+                        log_level=self._log_level,
+                        logger=self._logger,
+                        auth_scopes=self._auth_scopes,
+                        uuid=self._uuid,
+                    )
+
+                    result.request_id = response.response_headers.get("X-Request-ID", None)
+                    self._internal_logger.debug(f"X-Request-ID={result.request_id}")
+
+                    if response.status != 200:
+                        result.error = await response.get_text_async()
+                        break
+
+                    # NDJSON responses are not paged so only JSON pages need to be looked at for the next link
+                    content_type: str = response.response_headers.get("Content-Type", "")
+                    link_reader: BundleLinkReader | None = None if "ndjson" in content_type else BundleLinkReader()
+                    line_splitter: NdJsonLineSplitter | None = NdJsonLineSplitter() if split_lines else None
+                    async for chunk in self._get_raw_chunk_iterator(response=response):
+                        if link_reader is not None and not link_reader.done:
+                            link_reader.feed(chunk)
+                        if line_splitter is not None:
+                            for line in line_splitter.add_chunk(chunk):
+                                await sink.write_async(line)
+                        else:
+                            await sink.write_async(chunk)
+                        result.bytes_written += len(chunk)
+                    if line_splitter is not None:
+                        last_line: bytes | None = line_splitter.flush()
+                        if last_line is not None:
+                            await sink.write_async(last_line)
+                    result.page_count += 1
+
+                    next_url = link_reader.get_next_url() if link_reader is not None else None
+
+            return result
+
+        except Exception as ex:
+            raise FhirSenderException(
+                request_id=result.request_id,
+                exception=ex,
+                url=str(next_url),
+                headers=headers,
+                json_data="",
+                variables=FhirClientLogger.get_variables_to_log(vars(self)),
+                response_text=result.error,
+                response_status_code=result.status,
+                message="",
+                elapsed_time=time.time() - start_time,
+            ) from ex
+
+    async def _get_raw_chunk_iterator(self, *, response: RetryableAioHttpResponse) -> AsyncGenerator[bytes, None]:
+        """
+        Reads the body of the response as byte chunks
+
+        :param response: response to read
+        :return: chunks of bytes
+        """
+        if response.content is None:
+            # the body was already read
+            text: str = await response.get_text_async()
+            if text:
+                yield text.encode("utf-8")
+        # for Transfer-Encoding: chunked, we can't use response.content.iter_chunked()
+        elif response.response_headers.get("Transfer-Encoding") == "chunked":
+            async for chunk, _ in response.content.iter_chunks():
+                yield chunk
+        else:
+            async for chunk in response.content.iter_chunked(self._chunk_size):
+                yield chunk
+
     # noinspection PyProtocol
     async def _send_fhir_request_async(
         self,
@@ -429,18 +634,85 @@ class RequestQueueMixin(ABC, FhirClientProtocol):
         :param headers: headers to send
         :param payload: payload to send
         """
-        if self._max_concurrent_requests_semaphore:
-            async with self._max_concurrent_requests_semaphore:
-                return await self._send_fhir_request_internal_async(
-                    client=client,
-                    full_url=full_url,
-                    headers=headers,
-                    payload=payload,
-                )
-        else:
-            return await self._send_fhir_request_internal_async(
-                client=client, full_url=full_url, headers=headers, payload=payload
+        sdk_metrics: FhirClientSdkMetrics = FhirClientSdkMetrics.get()
+        response: RetryableAioHttpResponse
+        semaphore_wait_seconds: float = 0.0
+        wait_start_time: float
+        limiter: AdaptiveConcurrencyLimiter | None = (
+            self._adaptive_concurrency_registry.get_limiter(url=full_url)
+            if self._adaptive_concurrency_registry
+            else None
+        )
+        scheduler: RequestScheduler | None = self._request_scheduler
+        if scheduler:
+            # the scheduler decides which waiting request goes next before the other limits are applied
+            wait_start_time = time.perf_counter()
+            await scheduler.acquire_async(priority=self._request_priority, caller=self._request_caller)
+            semaphore_wait_seconds = time.perf_counter() - wait_start_time
+        try:
+            if limiter:
+                wait_start_time = time.perf_counter()
+                acquired_at: float = await limiter.acquire_async()
+                semaphore_wait_seconds += time.perf_counter() - wait_start_time
+                sdk_metrics.record_concurrency_wait(semaphore_wait_seconds)
+                sdk_metrics.add_request_in_flight(1)
+                overloaded: bool = False
+                try:
+                    response = await self._send_fhir_request_internal_async(
+                        client=client,
+                        full_url=full_url,
+                        headers=headers,
+                        payload=payload,
+                    )
+                    # a request that had to be retried after a 429, a 503 or a timeout tells the host is struggling
+                    # even if it then succeeded, while e.g. a retry with a refreshed token does not
+                    overloaded = response.status in limiter.overloaded_status_codes or bool(
+                        response.overloaded_attempt_count
+                    )
+                except Exception as e:
+                    overloaded = isinstance(e, TimeoutError | ClientConnectionError) or (
+                        isinstance(e, ClientResponseError) and e.status in limiter.overloaded_status_codes
+                    )
+                    raise
+                finally:
+                    sdk_metrics.add_request_in_flight(-1)
+                    limiter.release(acquired_at=acquired_at, overloaded=overloaded)
+            elif self._max_concurrent_requests_semaphore:
+                wait_start_time = time.perf_counter()
+                async with self._max_concurrent_requests_semaphore:
+                    semaphore_wait_seconds += time.perf_counter() - wait_start_time
+                    sdk_metrics.record_concurrency_wait(semaphore_wait_seconds)
+                    sdk_metrics.add_request_in_flight(1)
+                    try:
+                        response = await self._send_fhir_request_internal_async(
+                            client=client,
+                            full_url=full_url,
+                            headers=headers,
+                            payload=payload,
+                        )
+                    finally:
+                        sdk_metrics.add_request_in_flight(-1)
+            else:
+                if scheduler:
+                    sdk_metrics.record_concurrency_wait(semaphore_wait_seconds)
+                sdk_metrics.add_request_in_flight(1)
+                try:
+                    response = await self._send_fhir_request_internal_async(
+                        client=client, full_url=full_url, headers=headers, payload=payload
+                    )
+                finally:
+                    sdk_metrics.add_request_in_flight(-1)
+        finally:
+            if scheduler:
+                scheduler.release(caller=self._request_caller)
+        # when a graph is profiled, charge the request to the target being processed
+        target_profile: GraphTargetProfile | None = GraphTargetProfile.get_current()
+        if target_profile:
+            target_profile.record_request(
+                semaphore_wait_seconds=semaphore_wait_seconds,
+                size_in_bytes=response.content.total_bytes if response.content is not None else 0,
             )
+        return response
 
     async def _send_fhir_request_internal_async(
         self,
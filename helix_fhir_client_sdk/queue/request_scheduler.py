@@ -0,0 +1,203 @@
+import asyncio
+import threading
+from collections import deque
+from enum import IntEnum
+
+
+class RequestPriority(IntEnum):
+    INTERACTIVE = 0
+    """ latency-sensitive requests e.g., the data of one patient for a user waiting on it """
+    NORMAL = 1
+    """ requests that did not ask for a priority """
+    BACKGROUND = 2
+    """ bulk work e.g., graph backfills, which only gets the capacity the other classes leave """
+
+
+class _Waiter:
+    __slots__ = ["future", "granted"]
+
+    def __init__(self, future: asyncio.Future[None]) -> None:
+        self.future: asyncio.Future[None] = future
+        self.granted: bool = False
+
+
+class _CallerQueue:
+    """
+    Requests of one caller waiting in one priority class
+    """
+
+    __slots__ = ["caller", "weight", "virtual_time", "waiters"]
+
+    def __init__(self, *, caller: str, weight: float, virtual_time: float) -> None:
+        self.caller: str = caller
+        self.weight: float = weight
+        self.virtual_time: float = virtual_time
+        """ virtual start time of the next request of the caller (weighted fair queueing) """
+        self.waiters: deque[_Waiter] = deque()
+
+
+class RequestScheduler:
+    """
+    Shares a number of concurrent requests between callers with priority classes and weighted fair queueing.
+
+    When a request finishes, the next request sent is taken from the highest priority class that has a request
+    waiting.  Within a class the callers (e.g., tenants or jobs) take turns in proportion to their weight, so a
+    caller with thousands of queued requests does not hold up the others.  A caller can also be capped at
+    max_concurrent_requests_per_caller, which leaves capacity for the other callers even when it is the only one
+    sending requests.
+
+    Give the same scheduler to every FhirClient sending requests to the server, with the priority and caller of
+    each, through FhirClient.request_scheduler().  The scheduler does not belong to an event loop, so clients running
+    on different loops or threads can share it.
+    """
+
+    __slots__ = [
+        "max_concurrent_requests",
+        "max_concurrent_requests_per_caller",
+        "caller_weights",
+        "in_flight",
+        "_in_flight_by_caller",
+        "_queues",
+        "_virtual_times",
+        "_lock",
+    ]
+
+    def __init__(
+        self,
+        *,
+        max_concurrent_requests: int,
+        max_concurrent_requests_per_caller: int | None = None,
+        caller_weights: dict[str, float] | None = None,
+    ) -> None:
+        """
+        Shares a number of concurrent requests between callers
+
+
+        :param max_concurrent_requests: maximum number of requests in flight across all callers
+        :param max_concurrent_requests_per_caller: maximum number of requests in flight for each caller.  None for no
+                                                    limit other than max_concurrent_requests.
+        :param caller_weights: share of each caller within a priority class.  Callers not listed have a weight of 1.
+        """
+        assert max_concurrent_requests >= 1, "max_concurrent_requests must be at least 1"
+        self.max_concurrent_requests: int = max_concurrent_requests
+        self.max_concurrent_requests_per_caller: int | None = max_concurrent_requests_per_caller
+        self.caller_weights: dict[str, float] = caller_weights or {}
+        self.in_flight: int = 0
+        """ requests holding a slot """
+        self._in_flight_by_caller: dict[str, int] = {}
+        self._queues: dict[RequestPriority, dict[str, _CallerQueue]] = {priority: {} for priority in RequestPriority}
+        # virtual time of each class: the virtual start time of the last request sent
+        self._virtual_times: dict[RequestPriority, float] = dict.fromkeys(RequestPriority, 0.0)
+        self._lock: threading.Lock = threading.Lock()
+
+    async def acquire_async(self, *, priority: RequestPriority = RequestPriority.NORMAL, caller: str | None) -> None:
+        """
+        Waits until the request can be sent.  Every call must be followed by a call to release() with the same caller.
+
+        :param priority: priority class of the request
+        :param caller: caller (e.g., tenant) the request is sent for.  None for the default caller.
+        """
+        caller_key: str = caller or ""
+        with self._lock:
+            if (
+                self.in_flight < self.max_concurrent_requests
+                and self._is_under_caller_limit_locked(caller_key)
+                and not any(self._queues.values())
+            ):
+                self._start_locked(caller_key)
+                return
+            caller_queue: _CallerQueue | None = self._queues[priority].get(caller_key)
+            if caller_queue is None:
+                # a caller that was idle starts at the current virtual time so it cannot claim the turns it skipped
+                caller_queue = _CallerQueue(
+                    caller=caller_key,
+                    weight=self.caller_weights.get(caller_key, 1.0),
+                    virtual_time=self._virtual_times[priority],
+                )
+                self._queues[priority][caller_key] = caller_queue
+            waiter: _Waiter = _Waiter(asyncio.get_running_loop().create_future())
+            caller_queue.waiters.append(waiter)
+            self._dispatch_locked()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    # the slot was given to this waiter just before it was cancelled so pass it on
+                    self._finish_locked(caller_key)
+                    self._dispatch_locked()
+                elif waiter in caller_queue.waiters:
+                    caller_queue.waiters.remove(waiter)
+                    if not caller_queue.waiters and self._queues[priority].get(caller_key) is caller_queue:
+                        del self._queues[priority][caller_key]
+            raise
+
+    def release(self, *, caller: str | None) -> None:
+        """
+        Frees the slot of a request and sends the next one
+
+        :param caller: caller passed to acquire_async()
+        """
+        with self._lock:
+            self._finish_locked(caller or "")
+            self._dispatch_locked()
+
+    def _is_under_caller_limit_locked(self, caller_key: str) -> bool:
+        return (
+            self.max_concurrent_requests_per_caller is None
+            or self._in_flight_by_caller.get(caller_key, 0) < self.max_concurrent_requests_per_caller
+        )
+
+    def _start_locked(self, caller_key: str) -> None:
+        self.in_flight += 1
+        self._in_flight_by_caller[caller_key] = self._in_flight_by_caller.get(caller_key, 0) + 1
+
+    def _finish_locked(self, caller_key: str) -> None:
+        self.in_flight -= 1
+        remaining: int = self._in_flight_by_caller.get(caller_key, 0) - 1
+        if remaining > 0:
+            self._in_flight_by_caller[caller_key] = remaining
+        else:
+            self._in_flight_by_caller.pop(caller_key, None)
+
+    def _dispatch_locked(self) -> None:
+        """
+        Gives the free slots to the waiting requests.  Must be called with the lock held.
+        """
+        while self.in_flight < self.max_concurrent_requests:
+            next_queue: tuple[RequestPriority, _CallerQueue] | None = self._get_next_queue_locked()
+            if next_queue is None:
+                return
+            priority, caller_queue = next_queue
+            waiter: _Waiter = caller_queue.waiters.popleft()
+            if not caller_queue.waiters:
+                del self._queues[priority][caller_queue.caller]
+            if waiter.future.done():
+                # cancelled while waiting
+                continue
+            self._virtual_times[priority] = caller_queue.virtual_time
+            caller_queue.virtual_time += 1 / caller_queue.weight
+            waiter.granted = True
+            self._start_locked(caller_queue.caller)
+            # the waiter may be on another loop (or thread)
+            waiter.future.get_loop().call_soon_threadsafe(self._wake, waiter.future)
+
+    def _get_next_queue_locked(self) -> tuple[RequestPriority, _CallerQueue] | None:
+        """
+        Returns the queue of the caller whose request goes next: from the highest priority class with a request
+        that can be sent, the caller with the smallest virtual time
+        """
+        for priority in RequestPriority:
+            candidates: list[_CallerQueue] = [
+                caller_queue
+                for caller_queue in self._queues[priority].values()
+                if self._is_under_caller_limit_locked(caller_queue.caller)
+            ]
+            if candidates:
+                return priority, min(candidates, key=lambda caller_queue: caller_queue.virtual_time)
+        return None
+
+    @staticmethod
+    def _wake(future: asyncio.Future[None]) -> None:
+        if not future.done():
+            future.set_result(None)
@@ -0,0 +1,116 @@
+import asyncio
+
+import aiohttp
+from aioresponses import aioresponses
+
+from helix_fhir_client_sdk.fhir_client import FhirClient
+from helix_fhir_client_sdk.queue.request_scheduler import RequestPriority, RequestScheduler
+
+
+async def start_waiting_async(
+    scheduler: RequestScheduler, order: list[str], *, name: str, priority: RequestPriority, caller: str
+) -> asyncio.Task[None]:
+    async def acquire_async() -> None:
+        await scheduler.acquire_async(priority=priority, caller=caller)
+        order.append(name)
+
+    task: asyncio.Task[None] = asyncio.create_task(acquire_async())
+    await asyncio.sleep(0)
+    return task
+
+
+async def test_interactive_requests_go_before_background_ones() -> None:
+    scheduler = RequestScheduler(max_concurrent_requests=1)
+    await scheduler.acquire_async(priority=RequestPriority.BACKGROUND, caller="backfill")
+    order: list[str] = []
+    tasks: list[asyncio.Task[None]] = [
+        await start_waiting_async(
+            scheduler, order, name=f"background{i}", priority=RequestPriority.BACKGROUND, caller="backfill"
+        )
+        for i in range(2)
+    ]
+    tasks.append(
+        await start_waiting_async(
+            scheduler, order, name="interactive", priority=RequestPriority.INTERACTIVE, caller="user"
+        )
+    )
+
+    for caller in ["backfill", "user", "backfill"]:
+        scheduler.release(caller=caller)
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    assert order == ["interactive", "background0", "background1"]
+
+
+async def test_callers_take_turns_in_proportion_to_their_weight() -> None:
+    scheduler = RequestScheduler(max_concurrent_requests=1, caller_weights={"tenant_a": 2})
+    await scheduler.acquire_async(caller="tenant_b")
+    order: list[str] = []
+    tasks: list[asyncio.Task[None]] = []
+    # tenant_b queues all its requests before tenant_a queues any
+    for caller in ["tenant_b", "tenant_a"]:
+        for _ in range(4):
+            tasks.append(
+                await start_waiting_async(scheduler, order, name=caller, priority=RequestPriority.NORMAL, caller=caller)
+            )
+
+    scheduler.release(caller="tenant_b")
+    for sent in range(1, 8):
+        while len(order) < sent:
+            await asyncio.sleep(0)
+        # the request that was just sent finishes
+        scheduler.release(caller=order[-1])
+    await asyncio.gather(*tasks)
+    assert order[:6] == ["tenant_b", "tenant_a", "tenant_a", "tenant_b", "tenant_a", "tenant_a"]
+    assert scheduler.in_flight == 1
+
+
+async def test_caller_is_capped_even_when_capacity_is_free() -> None:
+    scheduler = RequestScheduler(max_concurrent_requests=4, max_concurrent_requests_per_caller=2)
+    for _ in range(2):
+        await scheduler.acquire_async(caller="backfill")
+    order: list[str] = []
+    capped: asyncio.Task[None] = await start_waiting_async(
+        scheduler, order, name="backfill", priority=RequestPriority.BACKGROUND, caller="backfill"
+    )
+    await scheduler.acquire_async(caller="user")
+    assert order == []
+    assert scheduler.in_flight == 3
+
+    scheduler.release(caller="backfill")
+    await capped
+    assert order == ["backfill"]
+    assert scheduler.in_flight == 3
+
+
+async def test_cancelled_waiters_do_not_keep_a_slot() -> None:
+    scheduler = RequestScheduler(max_concurrent_requests=1)
+    await scheduler.acquire_async(caller="a")
+    order: list[str] = []
+    cancelled: asyncio.Task[None] = await start_waiting_async(
+        scheduler, order, name="cancelled", priority=RequestPriority.INTERACTIVE, caller="a"
+    )
+    last: asyncio.Task[None] = await start_waiting_async(
+        scheduler, order, name="last", priority=RequestPriority.NORMAL, caller="b"
+    )
+    cancelled.cancel()
+    await asyncio.sleep(0)
+
+    scheduler.release(caller="a")
+    await last
+    assert order == ["last"]
+    assert scheduler.in_flight == 1
+
+
+async def test_clones_send_requests_through_the_scheduler() -> None:
+    scheduler = RequestScheduler(max_concurrent_requests=2)
+    with aioresponses() as m:
+        m.get("http://example.com/fhir/Patient/1", payload={"resourceType": "Patient", "id": "1"})
+
+        fhir_client = FhirClient().url("http://example.com/fhir").set_access_token("token")
+        fhir_client = fhir_client.request_scheduler(scheduler, priority=RequestPriority.INTERACTIVE, caller="user")
+        fhir_client.create_http_session = lambda: aiohttp.ClientSession()  # type: ignore[method-assign]
+        response = await fhir_client.clone().resource("Patient").id_("1").get_async()
+        assert response.status == 200
+
+    assert scheduler.in_flight == 0
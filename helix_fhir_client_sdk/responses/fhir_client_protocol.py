@@ -24,6 +24,7 @@ from helix_fhir_client_sdk.function_types import (
     RefreshTokenFunction,
     TraceRequestFunction,
 )
+from helix_fhir_client_sdk.queue.request_scheduler import RequestPriority, RequestScheduler
 from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
 from helix_fhir_client_sdk.responses.merge.fhir_merge_resource_response import (
     FhirMergeResourceResponse,
@@ -31,6 +32,12 @@ from helix_fhir_client_sdk.responses.merge.fhir_merge_resource_response import (
 from helix_fhir_client_sdk.structures.get_access_token_result import (
     GetAccessTokenResult,
 )
+from helix_fhir_client_sdk.structures.streaming_batch_size import StreamingBatchSize
+from helix_fhir_client_sdk.structures.streaming_queue_sizes import StreamingQueueSizes
+from helix_fhir_client_sdk.utilities.host_resilience.adaptive_concurrency_registry import AdaptiveConcurrencyRegistry
+from helix_fhir_client_sdk.utilities.host_resilience.hedging_policy import HedgingPolicy
+from helix_fhir_client_sdk.utilities.host_resilience.host_resilience_registry import HostResilienceRegistry
+from helix_fhir_client_sdk.utilities.offloaded_json_parser import OffloadedJsonParser
 from helix_fhir_client_sdk.utilities.retryable_aiohttp_client import (
     RetryableAioHttpClient,
 )
@@ -102,6 +109,16 @@ class FhirClientProtocol(Protocol):
 
     _retry_count: int
     _exclude_status_codes_from_retry: list[int] | None
+    _host_resilience_registry: HostResilienceRegistry | None
+    """ shared per-host retry budget and circuit breaker """
+    _adaptive_concurrency_registry: AdaptiveConcurrencyRegistry | None
+    """ shared per-host concurrency limits that adapt to the load (replace max_concurrent_requests when set) """
+    _request_scheduler: RequestScheduler | None
+    """ scheduler shared with other clients that orders waiting requests by priority and caller """
+    _request_priority: RequestPriority
+    _request_caller: str | None
+    _hedging_policy: HedgingPolicy | None
+    """ sends slow reads a second time and uses the first response """
 
     _uuid: uuid.UUID
     _log_level: str | None
@@ -109,6 +126,9 @@ class FhirClientProtocol(Protocol):
     _refresh_token_function: RefreshTokenFunction
     _trace_request_function: TraceRequestFunction | None
     _chunk_size: int
+    _streaming_batch_size: StreamingBatchSize | None
+    _streaming_queue_sizes: StreamingQueueSizes | None
+    _json_parser: OffloadedJsonParser | None
     _time_to_live_in_secs_for_cache: int
     _well_known_configuration_cache_lock: Lock
 
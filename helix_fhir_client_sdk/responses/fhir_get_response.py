@@ -1,7 +1,7 @@
 import json
 from abc import abstractmethod
-from collections.abc import AsyncGenerator, Generator
-from datetime import UTC, datetime
+from collections.abc import AsyncGenerator, Callable, Generator
+from datetime import datetime
 from logging import Logger
 from typing import Any, Optional, cast
 
@@ -15,8 +15,8 @@ from compressedfhir.fhir.fhir_resource_map import FhirResourceMap
 from compressedfhir.utilities.compressed_dict.v1.compressed_dict_storage_mode import (
     CompressedDictStorageMode,
 )
-from dateutil import parser
 
+from helix_fhir_client_sdk.responses.fhir_response_headers import FhirResponseHeaders
 from helix_fhir_client_sdk.utilities.cache.request_cache import RequestCache
 from helix_fhir_client_sdk.utilities.retryable_aiohttp_url_result import (
     RetryableAioHttpUrlResult,
@@ -45,7 +45,7 @@ class FhirGetResponse:
         "next_url",
         "extra_context_to_return",
         "successful",
-        "response_headers",
+        "_response_headers",
         "chunk_number",
         "cache_hits",
         "results_by_url",
@@ -65,7 +65,7 @@ class FhirGetResponse:
         extra_context_to_return: dict[str, Any] | None,
         resource_type: str | None,
         id_: list[str] | str | None,
-        response_headers: list[str] | None,  # header name and value separated by a colon
+        response_headers: FhirResponseHeaders | list[str] | None,  # header name and value separated by a colon
         chunk_number: int | None = None,
         cache_hits: int | None = None,
         results_by_url: list[RetryableAioHttpUrlResult],
@@ -111,8 +111,8 @@ class FhirGetResponse:
         """ Extra context to return with every row (separate_bundle_resources is set) or with FhirGetResponse"""
         self.successful: bool = status == 200
         """ True if the request was successful """
-        self.response_headers: list[str] | None = response_headers
-        """ Headers returned by the server (can have duplicate header names) """ ""
+        self._response_headers: FhirResponseHeaders | None = FhirResponseHeaders.create(response_headers)
+        """ Headers returned by the server (can have duplicate header names) """
         self.chunk_number: int | None = chunk_number
         """ Chunk number for streaming """
         self.cache_hits: int | None = cache_hits
@@ -143,29 +143,34 @@ class FhirGetResponse:
         """
 
         result: FhirGetResponse = self._append(other_response=other_response)
+        result.append_metadata(other_response=other_response)
+        return result
+
+    def append_metadata(self, other_response: "FhirGetResponse") -> None:
+        """
+        Merges everything except the resources of other_response (chunk number, next url, cache hits, urls,
+        access token and request id) into self
 
-        if other_response.chunk_number and (other_response.chunk_number or 0) > (result.chunk_number or 0):
-            result.chunk_number = other_response.chunk_number
+        :param other_response: FhirGetResponse object whose metadata to merge
+        """
+        if other_response.chunk_number and (other_response.chunk_number or 0) > (self.chunk_number or 0):
+            self.chunk_number = other_response.chunk_number
         if other_response.next_url:
-            result.next_url = other_response.next_url
-            result.access_token = other_response.access_token
-        result.cache_hits = (result.cache_hits or 0) + (other_response.cache_hits or 0)
+            self.next_url = other_response.next_url
+            self.access_token = other_response.access_token
+        self.cache_hits = (self.cache_hits or 0) + (other_response.cache_hits or 0)
 
         if other_response.results_by_url:
-            if result.results_by_url is None:
-                result.results_by_url = other_response.results_by_url
+            if self.results_by_url is None:
+                self.results_by_url = other_response.results_by_url
             else:
-                result.results_by_url.extend(
-                    [u for u in other_response.results_by_url if u not in result.results_by_url]
-                )
+                self.results_by_url.extend([u for u in other_response.results_by_url if u not in self.results_by_url])
 
         if other_response.access_token:
-            result.access_token = other_response.access_token
+            self.access_token = other_response.access_token
 
         if other_response.request_id:
-            result.request_id = other_response.request_id
-
-        return result
+            self.request_id = other_response.request_id
 
     @abstractmethod
     def _extend(self, others: list["FhirGetResponse"]) -> "FhirGetResponse": ...
@@ -313,6 +318,31 @@ class FhirGetResponse:
         instance_variables_text = json.dumps(self.to_dict())
         return f"FhirGetResponse: {instance_variables_text}"
 
+    @property
+    def headers(self) -> FhirResponseHeaders | None:
+        """
+        Returns the headers returned by the server as a case-insensitive map.  The same instance is shared by all the
+        responses created from one HTTP response.
+
+        :return: headers
+        """
+        return self._response_headers
+
+    @property
+    def response_headers(self) -> tuple[str, ...] | None:
+        """
+        Returns the headers returned by the server as "name:value" strings (can have duplicate header names).  The
+        headers cannot be changed in place since they are shared with the other responses created from the same HTTP
+        response: assign a new list to replace them.
+
+        :return: tuple of headers
+        """
+        return self._response_headers.lines if self._response_headers is not None else None
+
+    @response_headers.setter
+    def response_headers(self, value: FhirResponseHeaders | list[str] | None) -> None:
+        self._response_headers = FhirResponseHeaders.create(value)
+
     # noinspection PyPep8Naming
     @property
     def lastModified(self) -> datetime | None:
@@ -321,27 +351,7 @@ class FhirGetResponse:
 
         :return: last modified date
         """
-        if self.response_headers is None:
-            return None
-        header: str
-        for header in self.response_headers:
-            header_name: str = header.split(":")[0].strip()
-            header_value: str = header.split(":")[1].strip()
-            if header_name == "Last-Modified":
-                last_modified_str: str | None = header_value
-                if last_modified_str is None:
-                    return None
-                if isinstance(last_modified_str, datetime):
-                    return last_modified_str
-
-                try:
-                    last_modified_datetime: datetime = parser.parse(last_modified_str)
-                    if last_modified_datetime.tzinfo is None:
-                        last_modified_datetime = last_modified_datetime.replace(tzinfo=UTC)
-                    return last_modified_datetime
-                except ValueError:
-                    return None
-        return None
+        return self._response_headers.last_modified if self._response_headers is not None else None
 
     @property
     def etag(self) -> str | None:
@@ -350,17 +360,7 @@ class FhirGetResponse:
 
         :return: etag
         """
-        if self.response_headers is None:
-            return None
-        header: str
-        for header in self.response_headers:
-            if ":" not in header:
-                continue
-            header_name: str = header.split(":")[0].strip()
-            header_value: str = header.split(":")[1].strip()
-            if header_name == "ETag":
-                return header_value
-        return None
+        return self._response_headers.etag if self._response_headers is not None else None
 
     @abstractmethod
     def remove_duplicates(self) -> "FhirGetResponse":
@@ -383,6 +383,16 @@ class FhirGetResponse:
         """
         ...
 
+    @abstractmethod
+    def remove_resources(self, *, should_remove: Callable[[FhirResource], bool]) -> "FhirGetResponse":
+        """
+        removes the resources for which should_remove returns True from this response
+
+        :param should_remove: function that is passed each resource
+        :return: self
+        """
+        ...
+
     def get_resource_type_and_ids(self) -> list[str]:
         """
         Gets the ids of the resources from the response
@@ -447,7 +457,7 @@ class FhirGetResponse:
             "next_url": self.next_url,
             "extra_context_to_return": self.extra_context_to_return,
             "successful": self.successful,
-            "response_headers": self.response_headers,
+            "response_headers": self._response_headers.to_list() if self._response_headers is not None else None,
             "chunk_number": self.chunk_number,
             "cache_hits": self.cache_hits,
             "results_by_url": [r.to_dict() for r in self.results_by_url],
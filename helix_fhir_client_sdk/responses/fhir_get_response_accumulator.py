@@ -0,0 +1,108 @@
+from collections import deque
+
+from compressedfhir.fhir.fhir_bundle_entry_list import FhirBundleEntryList
+
+from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+from helix_fhir_client_sdk.responses.get.fhir_get_bundle_response import FhirGetBundleResponse
+
+
+class FhirGetResponseAccumulator:
+    """
+    Collects the entries of responses into a response as the responses arrive, e.g. the responses for the links of a
+    graph, so the responses themselves do not have to be kept until the end.
+
+    Duplicates are dropped when an entry is added by looking up its resourceType/id in an index, instead of comparing
+    it to every entry collected so far as FhirBundleEntryList.append() does.  The first entry with a resourceType/id
+    is kept and the metadata of the responses is merged, as with extend().  The entries are collected in a separate
+    list (the entries of the response may still be iterated while responses arrive) and added to the response in one
+    step by get_response().
+    """
+
+    __slots__ = ["response", "remove_duplicates", "_entries", "_keys", "_last_chunk_number"]
+
+    def __init__(self, *, response: FhirGetResponse, remove_duplicates: bool = True) -> None:
+        """
+        Collects the entries of responses into response
+
+        :param response: response to add the entries to
+        :param remove_duplicates: drop entries whose resourceType/id has already been collected (or is in response)
+                                  and merge the metadata of the responses as extend() does.  If False, the entries are
+                                  added as they are, as _append_without_duplicate_removal() does.
+        """
+        self.response: FhirGetResponse = response
+        self.remove_duplicates: bool = remove_duplicates
+        self._entries: FhirBundleEntryList = FhirBundleEntryList()
+        self._keys: set[str] = (
+            {key for entry in response.get_bundle_entries() if (key := entry.resource_type_and_id) is not None}
+            if remove_duplicates
+            else set()
+        )
+        self._last_chunk_number: int | None = None
+
+    def add(self, other_response: FhirGetResponse) -> None:
+        """
+        Adds the entries of other_response
+
+        :param other_response: response to add
+        """
+        if not self.remove_duplicates:
+            deque.extend(self._entries, other_response.get_bundle_entries())
+            return
+
+        for entry in other_response.get_bundle_entries():
+            key: str | None = entry.resource_type_and_id
+            if key is not None:
+                if key in self._keys:
+                    continue
+                self._keys.add(key)
+            # skip the duplicate check of FhirBundleEntryList.append() since the index already did it
+            deque.append(self._entries, entry)
+        self.response.append_metadata(other_response=other_response)
+        self._last_chunk_number = other_response.chunk_number
+
+    def add_all(self, others: list[FhirGetResponse]) -> None:
+        """
+        Adds the entries of the responses
+
+        :param others: responses to add
+        """
+        for other_response in others:
+            self.add(other_response)
+
+    @property
+    def entry_count(self) -> int:
+        """Number of entries collected so far (not counting the entries already in the response)"""
+        return len(self._entries)
+
+    def get_response(self) -> FhirGetResponse:
+        """
+        Adds the collected entries to the response
+
+        :return: the response
+        """
+        if self._entries:
+            entries: FhirBundleEntryList = self._entries
+            self._entries = FhirBundleEntryList()
+            self.response = self.response._append_without_duplicate_removal(
+                [
+                    FhirGetBundleResponse(
+                        request_id=None,
+                        url=self.response.url,
+                        response_text="",
+                        error=None,
+                        access_token=None,
+                        total_count=len(entries),
+                        status=200,
+                        extra_context_to_return=None,
+                        resource_type=None,
+                        id_=None,
+                        response_headers=None,
+                        results_by_url=[],
+                        storage_mode=self.response.storage_mode,
+                        bundle_entries=entries,
+                    )
+                ]
+            )
+        if self._last_chunk_number:
+            self.response.chunk_number = self._last_chunk_number
+        return self.response
@@ -0,0 +1,162 @@
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import UTC, datetime
+from typing import Any, Union
+
+from dateutil import parser
+
+_NOT_SET: Any = object()
+
+
+class FhirResponseHeaders:
+    """
+    Immutable, case-insensitive map of the headers returned by the FHIR server.
+
+    The headers are kept as one "name:value" string per header (the same form as FhirGetResponse.to_dict() returns)
+    so one instance is compact and can be shared by reference between all the responses created from one HTTP
+    response.  The name to value index and the parsed Last-Modified, ETag and X-Request-ID values are only computed
+    on first use and then memoized.
+    """
+
+    __slots__ = ["_lines", "_index", "_last_modified", "_etag", "_request_id"]
+
+    def __init__(self, lines: Iterable[str] | None = None) -> None:
+        """
+        Immutable, case-insensitive map of response headers
+
+
+        :param lines: headers as "name:value" strings (there can be duplicate header names)
+        """
+        self._lines: tuple[str, ...] = tuple(lines) if lines else ()
+        self._index: dict[str, list[str]] | None = None
+        self._last_modified: datetime | None = _NOT_SET
+        self._etag: str | None = _NOT_SET
+        self._request_id: str | None = _NOT_SET
+
+    @classmethod
+    def from_mapping(cls, headers: Mapping[str, str]) -> "FhirResponseHeaders":
+        """
+        Creates the headers from a mapping of header name to value e.g., the headers of a RetryableAioHttpResponse
+
+        :param headers: headers
+        :return: FhirResponseHeaders
+        """
+        return cls([f"{key}:{value}" for key, value in headers.items()])
+
+    @classmethod
+    def create(cls, headers: Union["FhirResponseHeaders", Iterable[str], None]) -> Union["FhirResponseHeaders", None]:
+        """
+        Returns the passed headers as FhirResponseHeaders.  Existing FhirResponseHeaders are returned as is so they
+        are shared instead of copied.
+
+        :param headers: FhirResponseHeaders or "name:value" strings
+        :return: FhirResponseHeaders or None if headers is None
+        """
+        if headers is None or isinstance(headers, FhirResponseHeaders):
+            return headers
+        return cls(headers)
+
+    def _get_index(self) -> dict[str, list[str]]:
+        if self._index is None:
+            index: dict[str, list[str]] = {}
+            for line in self._lines:
+                # split on the first colon only since values such as dates and urls contain colons
+                name, _, value = line.partition(":")
+                index.setdefault(name.strip().lower(), []).append(value.strip())
+            self._index = index
+        return self._index
+
+    def get(self, name: str, default: str | None = None) -> str | None:
+        """
+        Returns the value of the first header with this name (case-insensitive)
+
+        :param name: header name
+        :param default: value to return if the header is not present
+        :return: header value
+        """
+        values: list[str] | None = self._get_index().get(name.lower())
+        return values[0] if values else default
+
+    def getall(self, name: str) -> list[str]:
+        """
+        Returns the values of all the headers with this name (case-insensitive)
+
+        :param name: header name
+        :return: list of header values
+        """
+        return list(self._get_index().get(name.lower(), []))
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and name.lower() in self._get_index()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._lines)
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __bool__(self) -> bool:
+        return bool(self._lines)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FhirResponseHeaders):
+            return self._lines == other._lines
+        if isinstance(other, list | tuple):
+            return list(self._lines) == list(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._lines)
+
+    def __repr__(self) -> str:
+        return f"FhirResponseHeaders({list(self._lines)!r})"
+
+    @property
+    def lines(self) -> tuple[str, ...]:
+        """
+        Headers as "name:value" strings.  The tuple is not copied.
+        """
+        return self._lines
+
+    def to_list(self) -> list[str]:
+        """
+        Returns the headers as "name:value" strings
+
+        :return: list of headers
+        """
+        return list(self._lines)
+
+    @property
+    def last_modified(self) -> datetime | None:
+        """
+        Parsed Last-Modified header (in UTC if it has no timezone)
+        """
+        if self._last_modified is _NOT_SET:
+            last_modified: datetime | None = None
+            value: str | None = self.get("Last-Modified")
+            if value:
+                try:
+                    last_modified = parser.parse(value)
+                    if last_modified.tzinfo is None:
+                        last_modified = last_modified.replace(tzinfo=UTC)
+                except (ValueError, OverflowError):
+                    last_modified = None
+            self._last_modified = last_modified
+        return self._last_modified
+
+    @property
+    def etag(self) -> str | None:
+        """
+        ETag header
+        """
+        if self._etag is _NOT_SET:
+            self._etag = self.get("ETag")
+        return self._etag
+
+    @property
+    def request_id(self) -> str | None:
+        """
+        X-Request-ID header
+        """
+        if self._request_id is _NOT_SET:
+            self._request_id = self.get("X-Request-ID")
+        return self._request_id
@@ -1,6 +1,6 @@
 import json
 import time
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator
 from datetime import datetime
 from logging import Logger
 from typing import Any
@@ -8,6 +8,10 @@ from uuid import UUID
 
 # noinspection PyProtectedMember
 from aiohttp.streams import AsyncStreamIterator
+from compressedfhir.fhir.fhir_bundle_entry import FhirBundleEntry
+from compressedfhir.fhir.fhir_bundle_entry_list import FhirBundleEntryList
+from compressedfhir.fhir.fhir_bundle_entry_request import FhirBundleEntryRequest
+from compressedfhir.fhir.fhir_bundle_entry_response import FhirBundleEntryResponse
 from compressedfhir.utilities.compressed_dict.v1.compressed_dict_storage_mode import (
     CompressedDictStorageMode,
 )
@@ -17,12 +21,17 @@ from opentelemetry.trace import Status, StatusCode
 from helix_fhir_client_sdk.function_types import (
     HandleStreamingChunkFunction,
 )
+from helix_fhir_client_sdk.open_telemetry.fhir_client_sdk_metrics import FhirClientSdkMetrics
 from helix_fhir_client_sdk.open_telemetry.span_names import FhirClientSdkOpenTelemetrySpanNames
 from helix_fhir_client_sdk.responses.bundle_expander import (
     BundleExpander,
     BundleExpanderResult,
 )
 from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+from helix_fhir_client_sdk.responses.fhir_response_headers import FhirResponseHeaders
+from helix_fhir_client_sdk.responses.get.fhir_get_bundle_response import (
+    FhirGetBundleResponse,
+)
 from helix_fhir_client_sdk.responses.get.fhir_get_error_response import (
     FhirGetErrorResponse,
 )
@@ -33,9 +42,13 @@ from helix_fhir_client_sdk.responses.resource_separator import (
     ResourceSeparator,
     ResourceSeparatorResult,
 )
+from helix_fhir_client_sdk.structures.streaming_batch_size import StreamingBatchSize
+from helix_fhir_client_sdk.structures.streaming_queue_sizes import StreamingQueueSizes
+from helix_fhir_client_sdk.utilities.async_stream_prefetcher import AsyncStreamPrefetcher
 from helix_fhir_client_sdk.utilities.ndjson_chunk_streaming_parser import (
     NdJsonChunkStreamingParser,
 )
+from helix_fhir_client_sdk.utilities.offloaded_json_parser import OffloadedJsonParser
 from helix_fhir_client_sdk.utilities.retryable_aiohttp_response import (
     RetryableAioHttpResponse,
 )
@@ -55,7 +68,7 @@ class FhirResponseProcessor:
         response: RetryableAioHttpResponse,
         full_url: str,
         request_id: str | None,
-        response_headers: list[str],
+        response_headers: FhirResponseHeaders | list[str],
         access_token: str | None,
         resources_json: str,
         fn_handle_streaming_chunk: HandleStreamingChunkFunction | None,
@@ -71,6 +84,9 @@ class FhirResponseProcessor:
         use_data_streaming: bool,
         storage_mode: CompressedDictStorageMode,
         create_operation_outcome_for_error: bool | None,
+        streaming_batch_size: StreamingBatchSize | None = None,
+        streaming_queue_sizes: StreamingQueueSizes | None = None,
+        json_parser: OffloadedJsonParser | None = None,
     ) -> AsyncGenerator[FhirGetResponse, None]:
         """
         This method is responsible for handling the response from the FHIR server.
@@ -95,6 +111,11 @@ class FhirResponseProcessor:
         :param use_data_streaming: Whether to use data streaming.
         :param storage_mode: The storage mode.
         :param create_operation_outcome_for_error: Whether to create an operation outcome for error.
+        :param streaming_batch_size: When streaming, yield the resources in batches of this size instead of one
+                                     response per resource.
+        :param streaming_queue_sizes: When streaming, read, parse and consume the response in separate stages
+                                      connected by bounded queues of these sizes.
+        :param json_parser: When not streaming, parses large pages off the event loop.
 
         :return: An async generator of FhirGetResponse objects.
         """
@@ -121,6 +142,9 @@ class FhirResponseProcessor:
                     separate_bundle_resources=separate_bundle_resources,
                     storage_mode=storage_mode,
                     create_operation_outcome_for_error=create_operation_outcome_for_error,
+                    streaming_batch_size=streaming_batch_size,
+                    streaming_queue_sizes=streaming_queue_sizes,
+                    json_parser=json_parser,
                 ):
                     yield r
             elif response.status == 404:  # not found
@@ -164,6 +188,8 @@ class FhirResponseProcessor:
             raise
 
         finally:
+            if response.timing is not None:
+                response.timing.set_processing_span_attributes(span)
             # Ensure span is ended after generator is exhausted or error occurs
             span.end()
 
@@ -173,7 +199,7 @@ class FhirResponseProcessor:
         full_url: str,
         request_id: str | None,
         response: RetryableAioHttpResponse,
-        response_headers: list[str],
+        response_headers: FhirResponseHeaders | list[str],
         logger: Logger | None,
         internal_logger: Logger | None,
         access_token: str | None,
@@ -231,7 +257,7 @@ class FhirResponseProcessor:
         full_url: str,
         request_id: str | None,
         response: RetryableAioHttpResponse,
-        response_headers: list[str],
+        response_headers: FhirResponseHeaders | list[str],
         access_token: str | None,
         extra_context_to_return: dict[str, Any] | None,
         resource: str | None,
@@ -282,7 +308,7 @@ class FhirResponseProcessor:
         full_url: str,
         response: RetryableAioHttpResponse,
         request_id: str | None,
-        response_headers: list[str],
+        response_headers: FhirResponseHeaders | list[str],
         resources_json: str,
         fn_handle_streaming_chunk: HandleStreamingChunkFunction | None,
         use_data_streaming: bool,
@@ -296,6 +322,9 @@ class FhirResponseProcessor:
         url: str | None,
         storage_mode: CompressedDictStorageMode,
         create_operation_outcome_for_error: bool | None,
+        streaming_batch_size: StreamingBatchSize | None = None,
+        streaming_queue_sizes: StreamingQueueSizes | None = None,
+        json_parser: OffloadedJsonParser | None = None,
     ) -> AsyncGenerator[FhirGetResponse, None]:
         """
         This method is responsible for handling a 200 response from the FHIR server. A 200 response indicates that the
@@ -316,6 +345,9 @@ class FhirResponseProcessor:
         :param expand_fhir_bundle: Whether to expand the FHIR bundle.
         :param separate_bundle_resources: Whether to separate the bundle resources.
         :param url: The URL.
+        :param streaming_batch_size: When streaming, yield the resources in batches of this size.
+        :param streaming_queue_sizes: When streaming, sizes of the queues between the read and parse stages.
+        :param json_parser: When not streaming, parses large pages off the event loop.
 
         :return: An async generator of FhirGetResponse objects.
         """
@@ -344,6 +376,8 @@ class FhirResponseProcessor:
                 url=url,
                 storage_mode=storage_mode,
                 create_operation_outcome_for_error=create_operation_outcome_for_error,
+                streaming_batch_size=streaming_batch_size,
+                streaming_queue_sizes=streaming_queue_sizes,
             ):
                 yield r
         else:
@@ -365,6 +399,7 @@ class FhirResponseProcessor:
                 url=url,
                 storage_mode=storage_mode,
                 create_operation_outcome_for_error=create_operation_outcome_for_error,
+                json_parser=json_parser,
             ):
                 yield r
 
@@ -375,7 +410,7 @@ class FhirResponseProcessor:
         response: RetryableAioHttpResponse,
         request_id: str | None,
         access_token: str | None,
-        response_headers: list[str],
+        response_headers: FhirResponseHeaders | list[str],
         resources_json: str,
         next_url: str | None,
         total_count: int,
@@ -388,6 +423,7 @@ class FhirResponseProcessor:
         url: str | None,
         storage_mode: CompressedDictStorageMode,
         create_operation_outcome_for_error: bool | None,
+        json_parser: OffloadedJsonParser | None = None,
     ) -> AsyncGenerator[FhirGetResponse, None]:
         """
         This method is responsible for handling a 200 response from the FHIR server. A 200 response indicates that the
@@ -408,17 +444,26 @@ class FhirResponseProcessor:
         :param resource: The resource type.
         :param id_: The ID of the resource.
         :param url: The URL.
+        :param json_parser: parses large pages off the event loop.  If None the page is parsed with json.loads.
 
         :return: An async generator of FhirGetResponse objects.
         """
         if logger:
             logger.debug(f"Successfully retrieved: {full_url}")
         text: str | None = None
+        result_json: dict[str, Any] | list[dict[str, Any]] | None = None
         # noinspection PyBroadException
         try:
             text = await response.get_text_async()
             if len(text) > 0:
-                response_json: dict[str, Any] = json.loads(text)
+                parse_start_time: float = time.perf_counter()
+                response_json: dict[str, Any] = (
+                    await json_parser.loads_async(text) if json_parser is not None else json.loads(text)
+                )
+                parse_seconds: float = time.perf_counter() - parse_start_time
+                FhirClientSdkMetrics.get().record_json_parse(duration_in_seconds=parse_seconds, url=full_url)
+                if response.timing is not None:
+                    response.timing.parse_seconds = parse_seconds
                 if "resourceType" in response_json and response_json["resourceType"] == "Bundle":
                     # get next url if present
                     if "link" in response_json:
@@ -428,10 +473,11 @@ class FhirResponseProcessor:
                             next_link: dict[str, Any] = next_links[0]
                             next_url = next_link.get("url")
 
+                # pass the parsed result on so the page is not serialized and parsed again
                 (
-                    resources_json,
+                    result_json,
                     total_count,
-                ) = await FhirResponseProcessor.expand_or_separate_bundle_async(
+                ) = await FhirResponseProcessor._expand_or_separate_bundle_to_json_async(
                     access_token=access_token,
                     expand_fhir_bundle=expand_fhir_bundle,
                     extra_context_to_return=extra_context_to_return,
@@ -440,10 +486,12 @@ class FhirResponseProcessor:
                     total_count=total_count,
                     url=url,
                 )
-            yield FhirGetResponseFactory.create(
+            factory_start_time: float = time.perf_counter()
+            fhir_get_response: FhirGetResponse = FhirGetResponseFactory.create(
                 request_id=request_id,
                 url=full_url,
-                response_text=resources_json,
+                response_text=resources_json if result_json is None else "",
+                response_json=result_json,
                 error=None,
                 access_token=access_token,
                 total_count=total_count,
@@ -457,6 +505,9 @@ class FhirResponseProcessor:
                 storage_mode=storage_mode,
                 create_operation_outcome_for_error=create_operation_outcome_for_error,
             )
+            if response.timing is not None:
+                response.timing.factory_seconds = time.perf_counter() - factory_start_time
+            yield fhir_get_response
         except Exception as e:
             if logger:
                 logger.error(f"Error processing response from {full_url} with error: {str(e)}")
@@ -489,6 +540,33 @@ class FhirResponseProcessor:
         total_count: int,
         url: str | None,
     ) -> tuple[str, int]:
+        result_json: dict[str, Any] | list[dict[str, Any]]
+        result_json, total_count = await FhirResponseProcessor._expand_or_separate_bundle_to_json_async(
+            access_token=access_token,
+            expand_fhir_bundle=expand_fhir_bundle,
+            extra_context_to_return=extra_context_to_return,
+            resource_or_bundle=resource_or_bundle,
+            separate_bundle_resources=separate_bundle_resources,
+            total_count=total_count,
+            url=url,
+        )
+        return json.dumps(result_json), total_count
+
+    @staticmethod
+    async def _expand_or_separate_bundle_to_json_async(
+        *,
+        access_token: str | None,
+        expand_fhir_bundle: bool | None,
+        extra_context_to_return: dict[str, Any] | None,
+        resource_or_bundle: dict[str, Any],
+        separate_bundle_resources: bool,
+        total_count: int,
+        url: str | None,
+    ) -> tuple[dict[str, Any] | list[dict[str, Any]], int]:
+        """
+        Same as expand_or_separate_bundle_async() but returns the result without serializing it to JSON text
+
+        """
         # see if this is a Resource Bundle and un-bundle it
         if (
             expand_fhir_bundle
@@ -514,18 +592,17 @@ class FhirResponseProcessor:
                     extra_context_to_return=extra_context_to_return,
                 )
             )
-            resources_json = json.dumps(resource_separator_result.resources_dicts)
+            result_json: dict[str, Any] | list[dict[str, Any]] = resource_separator_result.resources_dicts
             total_count = resource_separator_result.total_count
-        elif len(resources) > 0:
-            total_count = len(resources)
-            if len(resources) == 1:
-                resources_json = json.dumps(resources[0])
-            else:
-                resources_json = json.dumps(resources)
+        elif len(resources) == 1:
+            total_count = 1
+            result_json = resources[0]
         else:
-            resources_json = json.dumps(resources)
+            if len(resources) > 0:
+                total_count = len(resources)
+            result_json = resources
 
-        return resources_json, total_count
+        return result_json, total_count
 
     @staticmethod
     async def _handle_response_200_streaming(
@@ -537,7 +614,7 @@ class FhirResponseProcessor:
         next_url: str | None,
         request_id: str | None,
         response: RetryableAioHttpResponse,
-        response_headers: list[str],
+        response_headers: FhirResponseHeaders | list[str],
         total_count: int,
         chunk_size: int,
         extra_context_to_return: dict[str, Any] | None,
@@ -549,6 +626,8 @@ class FhirResponseProcessor:
         url: str | None,
         storage_mode: CompressedDictStorageMode,
         create_operation_outcome_for_error: bool | None,
+        streaming_batch_size: StreamingBatchSize | None = None,
+        streaming_queue_sizes: StreamingQueueSizes | None = None,
     ) -> AsyncGenerator[FhirGetResponse, None]:
         """
         This method is responsible for handling a 200 response from the FHIR server. A 200 response indicates that the
@@ -567,12 +646,17 @@ class FhirResponseProcessor:
         :param resource: The resource type.
         :param id_: The ID of the resource.
         :param logger: The logger object.
+        :param streaming_batch_size: If set, yield a FhirGetBundleResponse per batch of resources instead of one
+                                     response per resource (not supported with separate_bundle_resources).
+        :param streaming_queue_sizes: If set, a reader task and a parser task fill bounded queues of these sizes
+                                      so reading from the network overlaps with parsing and with the consumer.
 
         :return: An async generator of FhirGetResponse objects.
 
         """
         chunk_number = 0
-        chunk_bytes: bytes
+        # create the header map once so all the responses created from this page share it
+        response_headers = FhirResponseHeaders.create(response_headers) or FhirResponseHeaders()
 
         async def get_iter_chunk_iterator() -> AsyncGenerator[bytes, None]:
             """
@@ -600,8 +684,76 @@ class FhirResponseProcessor:
 
         total_resources: int = 0
         total_kilobytes: int = 0
+        total_bytes: int = 0
         start_time: float = time.time()
         chunk: str | None = None
+        parsed_chunks: AsyncGenerator[tuple[int, int, list[dict[str, Any]]], None] | None = None
+
+        async def parse_chunks(
+            chunks: AsyncIterator[bytes],
+        ) -> AsyncGenerator[tuple[int, int, list[dict[str, Any]]], None]:
+            """
+            Parses the chunks and returns the chunk number, chunk length and the resources completed by each chunk
+
+            """
+            nonlocal chunk
+            number: int = 0
+            async for chunk_bytes in chunks:
+                # # https://stackoverflow.com/questions/56346811/response-payload-is-not-completed-using-asyncio-aiohttp
+                # await asyncio.sleep(0)
+                number += 1
+                if fn_handle_streaming_chunk:
+                    await fn_handle_streaming_chunk(chunk_bytes, number)
+                chunk = chunk_bytes.decode("utf-8")
+                yield number, len(chunk_bytes), nd_json_chunk_streaming_parser.add_chunk(chunk=chunk, logger=logger)
+
+        # separated resources are grouped by resource type so they can't be put in a bundle
+        batch_resources: list[dict[str, Any]] | None = (
+            [] if streaming_batch_size is not None and not separate_bundle_resources else None
+        )
+        batch_bytes: int = 0
+
+        def create_batch_response(resources: list[dict[str, Any]]) -> FhirGetResponse:
+            """
+            Creates one response containing a batch of streamed resources
+
+            """
+            # the request and response are the same for every entry so share them
+            entry_request: FhirBundleEntryRequest = FhirBundleEntryRequest(url=full_url)
+            entry_response: FhirBundleEntryResponse = FhirBundleEntryResponse(
+                status=str(response.status),
+                lastModified=response_headers.last_modified,
+                etag=response_headers.etag,
+            )
+            return FhirGetBundleResponse(
+                request_id=request_id,
+                url=full_url,
+                response_text="",
+                error=None,
+                access_token=access_token,
+                total_count=len(resources),
+                status=response.status,
+                next_url=next_url,
+                extra_context_to_return=extra_context_to_return,
+                resource_type=resource,
+                id_=id_,
+                response_headers=response_headers,
+                chunk_number=chunk_number,
+                results_by_url=response.results_by_url,
+                storage_mode=storage_mode,
+                bundle_entries=FhirBundleEntryList(
+                    [
+                        FhirBundleEntry(
+                            resource=r,
+                            request=entry_request,
+                            response=entry_response,
+                            storage_mode=storage_mode,
+                        )
+                        for r in resources
+                    ]
+                ),
+            )
+
         try:
             # Check if the response content is empty or the stream has reached the end. If either condition is true,
             # yield a FhirGetResponse indicating no content was received from the request.
@@ -625,19 +777,26 @@ class FhirResponseProcessor:
                 )
             else:
                 # iterate over the chunks and return the completed resources as we get them
-                async for chunk_bytes in get_chunk_iterator():
-                    # # https://stackoverflow.com/questions/56346811/response-payload-is-not-completed-using-asyncio-aiohttp
-                    # await asyncio.sleep(0)
-                    chunk_number += 1
-                    if fn_handle_streaming_chunk:
-                        await fn_handle_streaming_chunk(chunk_bytes, chunk_number)
-                    chunk = chunk_bytes.decode("utf-8")
-                    chunk_length = len(chunk_bytes)
-                    total_kilobytes += chunk_length // 1024
-                    completed_resources: list[dict[str, Any]] = nd_json_chunk_streaming_parser.add_chunk(
-                        chunk=chunk,
-                        logger=logger,
+                if streaming_queue_sizes is None:
+                    parsed_chunks = parse_chunks(get_chunk_iterator())
+                else:
+                    # read from the network, parse and let the caller consume in separate stages connected by
+                    # bounded queues, so reading continues while the caller is busy but memory stays bounded
+                    parsed_chunks = AsyncStreamPrefetcher.prefetch_async(
+                        parse_chunks(
+                            AsyncStreamPrefetcher.prefetch_async(
+                                get_chunk_iterator(), max_queue_size=streaming_queue_sizes.chunk_queue_size
+                            )
+                        ),
+                        max_queue_size=streaming_queue_sizes.parsed_queue_size,
                     )
+                completed_resources: list[dict[str, Any]]
+                async for chunk_number, chunk_length, completed_resources in parsed_chunks:
+                    total_kilobytes += chunk_length // 1024
+                    total_bytes += chunk_length
+                    if batch_resources is not None:
+                        # count every chunk: a large resource spans chunks that complete no resource
+                        batch_bytes += chunk_length
                     if completed_resources:
                         total_time: float = time.time() - start_time
                         if total_time == 0:
@@ -657,7 +816,36 @@ class FhirResponseProcessor:
                                 + f" | Total time: {total_time_str}"
                             )
 
+                        if batch_resources is not None:
+                            assert streaming_batch_size is not None
+                            for completed_resource in completed_resources:
+                                if expand_fhir_bundle and completed_resource.get("resourceType") == "Bundle":
+                                    bundle_expander_result: BundleExpanderResult = (
+                                        await BundleExpander.expand_bundle_async(
+                                            bundle=completed_resource, total_count=total_count
+                                        )
+                                    )
+                                    batch_resources.extend(bundle_expander_result.resources)
+                                else:
+                                    batch_resources.append(completed_resource)
+                                max_resources: int | None = streaming_batch_size.max_resources
+                                while max_resources and len(batch_resources) >= max_resources:
+                                    # the bytes of each resource are not known so the resources left in the batch
+                                    # keep their share of the bytes read
+                                    batch_bytes -= batch_bytes * max_resources // len(batch_resources)
+                                    yield create_batch_response(batch_resources[:max_resources])
+                                    del batch_resources[:max_resources]
+                            if batch_resources and (
+                                (streaming_batch_size.max_resources is None and streaming_batch_size.max_bytes is None)
+                                or (streaming_batch_size.max_bytes and batch_bytes >= streaming_batch_size.max_bytes)
+                            ):
+                                yield create_batch_response(batch_resources)
+                                batch_resources = []
+                                batch_bytes = 0
+                            continue
+
                         for completed_resource in completed_resources:
+                            resource_json: dict[str, Any] | None = None
                             if expand_fhir_bundle or separate_bundle_resources:
                                 (
                                     resources_json,
@@ -672,12 +860,15 @@ class FhirResponseProcessor:
                                     url=url,
                                 )
                             else:
-                                resources_json = json.dumps(completed_resource)
+                                # pass the parsed resource on instead of serializing it just to parse it again
+                                resources_json = ""
+                                resource_json = completed_resource
 
                             yield FhirGetResponseFactory.create(
                                 request_id=request_id,
                                 url=full_url,
                                 response_text=resources_json,
+                                response_json=resource_json,
                                 # responses=(
                                 #     json.dumps(completed_resources[0])
                                 #     if len(completed_resources) == 1
@@ -697,6 +888,9 @@ class FhirResponseProcessor:
                                 storage_mode=storage_mode,
                                 create_operation_outcome_for_error=create_operation_outcome_for_error,
                             )
+                # return the resources left over at the end of the stream
+                if batch_resources:
+                    yield create_batch_response(batch_resources)
         except Exception as e:
             if logger:
                 logger.error(f"Error processing response from {full_url} with error: {str(e)}")
@@ -717,6 +911,13 @@ class FhirResponseProcessor:
                 storage_mode=storage_mode,
                 create_operation_outcome_for_error=create_operation_outcome_for_error,
             )
+        finally:
+            if parsed_chunks is not None:
+                # stops the reader and parser tasks if the caller stops reading early
+                await parsed_chunks.aclose()
+            FhirClientSdkMetrics.get().record_response_body_size(
+                url=full_url, size_in_bytes=total_bytes, streaming=True
+            )
 
     @staticmethod
     async def log_response(
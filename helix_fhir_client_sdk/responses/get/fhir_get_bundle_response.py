@@ -1,5 +1,6 @@
 import json
-from collections.abc import AsyncGenerator, Generator
+from collections import deque
+from collections.abc import AsyncGenerator, Callable, Generator
 from datetime import datetime
 from logging import Logger
 from typing import Any, cast, override
@@ -20,6 +21,7 @@ from compressedfhir.utilities.compressed_dict.v1.compressed_dict_storage_mode im
 
 from helix_fhir_client_sdk.fhir_bundle_appender import FhirBundleAppender
 from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+from helix_fhir_client_sdk.responses.fhir_response_headers import FhirResponseHeaders
 from helix_fhir_client_sdk.utilities.cache.request_cache import RequestCache
 from helix_fhir_client_sdk.utilities.hash_util import ResourceHash
 from helix_fhir_client_sdk.utilities.retryable_aiohttp_url_result import (
@@ -35,7 +37,8 @@ class FhirGetBundleResponse(FhirGetResponse):
 
     """
 
-    __slots__ = FhirGetResponse.__slots__ + [
+    # only the slots added by this subclass: repeating the base class slots would allocate them twice per instance
+    __slots__ = [
         # Specific to this subclass
         "_bundle_entries",
         "_bundle_metadata",
@@ -55,12 +58,22 @@ class FhirGetBundleResponse(FhirGetResponse):
         extra_context_to_return: dict[str, Any] | None,
         resource_type: str | None,
         id_: list[str] | str | None,
-        response_headers: list[str] | None,  # header name and value separated by a colon
+        response_headers: FhirResponseHeaders | list[str] | None,  # header name and value separated by a colon
         chunk_number: int | None = None,
         cache_hits: int | None = None,
         results_by_url: list[RetryableAioHttpUrlResult],
         storage_mode: CompressedDictStorageMode,
+        bundle_entries: FhirBundleEntryList | None = None,
+        response_json: dict[str, Any] | None = None,
     ) -> None:
+        """
+        Response containing a Bundle of resources
+
+        :param response_text: response text from the server
+        :param bundle_entries: the entries if they have already been created (e.g., a batch of streamed resources)
+                               so they are not serialized to and parsed from response_text
+        :param response_json: the Bundle (or resource) if it has already been parsed so response_text is not parsed
+        """
         super().__init__(
             request_id=request_id,
             url=url,
@@ -78,16 +91,19 @@ class FhirGetBundleResponse(FhirGetResponse):
             results_by_url=results_by_url,
             storage_mode=storage_mode,
         )
-        bundle_entries: FhirBundleEntryList
         bundle: FhirBundle
-        bundle_entries, bundle = self._parse_bundle_entries(
-            responses=response_text,
-            url=url,
-            status=status,
-            last_modified=self.lastModified,
-            etag=self.etag,
-            storage_mode=self.storage_mode,
-        )
+        if bundle_entries is not None:
+            bundle = FhirBundle(id_=None, timestamp=None, type_="collection")
+        else:
+            bundle_entries, bundle = self._parse_bundle_entries(
+                responses=response_text,
+                response_json=response_json,
+                url=url,
+                status=status,
+                last_modified=self.lastModified,
+                etag=self.etag,
+                storage_mode=self.storage_mode,
+            )
         bundle_entries = FhirBundleAppender.add_operation_outcomes_to_bundle_entries(
             bundle_entries=bundle_entries,
             error=error,
@@ -198,10 +214,12 @@ class FhirGetBundleResponse(FhirGetResponse):
         last_modified: datetime | None,
         etag: str | None,
         storage_mode: CompressedDictStorageMode,
+        response_json: dict[str, Any] | None = None,
     ) -> tuple[FhirBundleEntryList, FhirBundle]:
         """
         Gets the Bundle entries from the response
 
+        :param response_json: the parsed response, if already parsed, in which case responses is not used
 
         :return: list of bundle entries and a bundle with metadata but without any entries
         """
@@ -209,7 +227,7 @@ class FhirGetBundleResponse(FhirGetResponse):
             f"Expected CompressedDictStorageMode but got {type(storage_mode)}"
         )
 
-        if not responses:
+        if not responses and response_json is None:
             return FhirBundleEntryList(), FhirBundle(
                 id_=None,
                 timestamp=None,
@@ -217,7 +235,9 @@ class FhirGetBundleResponse(FhirGetResponse):
             )
         try:
             # This is either a list of resources or a Bundle resource containing a list of resources
-            child_response_resources: dict[str, Any] | list[dict[str, Any]] = cls.parse_json(responses)
+            child_response_resources: dict[str, Any] | list[dict[str, Any]] = (
+                response_json if response_json is not None else cls.parse_json(responses)
+            )
             assert isinstance(child_response_resources, dict)
 
             timestamp: str | None = cast(str | None, child_response_resources.get("timestamp"))
@@ -242,24 +262,31 @@ class FhirGetBundleResponse(FhirGetResponse):
             # otherwise it is a bundle so parse out the resources
             if "entry" in child_response_resources:
                 bundle_entries: list[dict[str, Any]] = child_response_resources["entry"]
+                # FhirBundleEntryList.append() drops an entry whose resourceType/id is already in the list by scanning
+                # the list, which is quadratic for a large Bundle, so the keys seen are kept in a set instead
+                keys_seen: set[str] = set()
                 for entry in bundle_entries:
-                    result.append(
-                        FhirBundleEntry(
-                            resource=entry["resource"],
-                            request=(
-                                FhirBundleEntryRequest.from_dict(cast(dict[str, Any], entry.get("request")))
-                                if entry.get("request") and isinstance(entry.get("request"), dict)
-                                else request
-                            ),
-                            response=(
-                                FhirBundleEntryResponse.from_dict(cast(dict[str, Any], entry.get("response")))
-                                if entry.get("response") and isinstance(entry.get("response"), dict)
-                                else response
-                            ),
-                            fullUrl=entry.get("fullUrl"),
-                            storage_mode=storage_mode,
-                        )
+                    bundle_entry: FhirBundleEntry = FhirBundleEntry(
+                        resource=entry["resource"],
+                        request=(
+                            FhirBundleEntryRequest.from_dict(cast(dict[str, Any], entry.get("request")))
+                            if entry.get("request") and isinstance(entry.get("request"), dict)
+                            else request
+                        ),
+                        response=(
+                            FhirBundleEntryResponse.from_dict(cast(dict[str, Any], entry.get("response")))
+                            if entry.get("response") and isinstance(entry.get("response"), dict)
+                            else response
+                        ),
+                        fullUrl=entry.get("fullUrl"),
+                        storage_mode=storage_mode,
                     )
+                    key: str | None = bundle_entry.resource_type_and_id
+                    if key is not None:
+                        if key in keys_seen:
+                            continue
+                        keys_seen.add(key)
+                    deque.append(result, bundle_entry)
                 return result, bundle
             else:
                 result.append(
@@ -296,30 +323,30 @@ class FhirGetBundleResponse(FhirGetResponse):
             # remove duplicates from the list if they have the same resourceType and id
             resource_type_plus_id_seen: set[str] = set()
             entry_request_url_seen: set[str] = set()
-            i = 0
-            while i < len(self._bundle_entries):
-                if self._bundle_entries[i] is not None:
-                    # Create a tuple of values for specified keys
-                    resource = self._bundle_entries[i].resource
+            # One pass filter; rebuild list to avoid many deque.remove calls
+            kept: list[FhirBundleEntry] = []
+            for bundle_entry in self._bundle_entries:
+                if bundle_entry is not None:
+                    resource = bundle_entry.resource
                     resource_id: str | None = resource.id if resource is not None else None
                     resource_type_plus_id: str | None = resource.resource_type_and_id if resource is not None else None
-                    request = self._bundle_entries[i].request
+                    request = bundle_entry.request
                     entry_request_url: str | None = request.url if request is not None else None
 
                     if resource_id is None and entry_request_url is not None:
                         # check only the entry request url if the resource has no id
                         if entry_request_url in entry_request_url_seen:
-                            # Remove duplicate entry
-                            self._bundle_entries.remove(self._bundle_entries[i])
-                        else:
-                            entry_request_url_seen.add(entry_request_url)
+                            continue
+                        entry_request_url_seen.add(entry_request_url)
                     elif resource_type_plus_id is not None:  # resource has an id
                         if resource_type_plus_id in resource_type_plus_id_seen:
-                            # Remove duplicate entry
-                            self._bundle_entries.remove(self._bundle_entries[i])
-                        else:
-                            resource_type_plus_id_seen.add(resource_type_plus_id)
-                i += 1
+                            continue
+                        resource_type_plus_id_seen.add(resource_type_plus_id)
+                kept.append(bundle_entry)
+            if len(kept) != len(self._bundle_entries):
+                self._bundle_entries = FhirBundleEntryList()
+                # skip the duplicate check of FhirBundleEntryList.append() since the entries are already distinct
+                deque.extend(self._bundle_entries, kept)
             return self
         except Exception as e:
             raise Exception(f"Could not get parse json from: {bundle}") from e
@@ -377,6 +404,23 @@ class FhirGetBundleResponse(FhirGetResponse):
         self._bundle_entries = FhirBundleEntryList(kept)
         return self
 
+    @override
+    def remove_resources(self, *, should_remove: Callable[[FhirResource], bool]) -> "FhirGetBundleResponse":
+        """
+        Removes the resources for which should_remove returns True from the bundle
+
+        :param should_remove: function that is passed each resource
+        :return: self
+        """
+        kept: list[FhirBundleEntry] = [
+            entry for entry in self._bundle_entries if entry.resource is None or not should_remove(entry.resource)
+        ]
+        if len(kept) != len(self._bundle_entries):
+            self._bundle_entries.clear()
+            # skip the duplicate check of FhirBundleEntryList.append() since the entries were already distinct
+            deque.extend(self._bundle_entries, kept)
+        return self
+
     @classmethod
     @override
     def from_response(cls, other_response: "FhirGetResponse") -> "FhirGetBundleResponse":
@@ -408,7 +452,7 @@ class FhirGetBundleResponse(FhirGetResponse):
             extra_context_to_return=other_response.extra_context_to_return,
             resource_type=other_response.resource_type,
             id_=other_response.id_,
-            response_headers=other_response.response_headers,
+            response_headers=other_response.headers,
             chunk_number=other_response.chunk_number,
             cache_hits=other_response.cache_hits,
             results_by_url=other_response.results_by_url,
@@ -479,7 +523,7 @@ class FhirGetBundleResponse(FhirGetResponse):
             extra_context_to_return=self.extra_context_to_return,
             resource_type=self.resource_type,
             id_=self.id_,
-            response_headers=self.response_headers,
+            response_headers=self._response_headers.to_list() if self._response_headers is not None else None,
             chunk_number=self.chunk_number,
             cache_hits=self.cache_hits,
             results_by_url=[r.to_dict() for r in self.results_by_url],
@@ -1,5 +1,5 @@
 import json
-from collections.abc import AsyncGenerator, Generator
+from collections.abc import AsyncGenerator, Callable, Generator
 from logging import Logger
 from typing import (
     Any,
@@ -23,6 +23,7 @@ from compressedfhir.utilities.fhir_json_encoder import FhirJSONEncoder
 
 from helix_fhir_client_sdk.fhir_bundle_appender import FhirBundleAppender
 from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+from helix_fhir_client_sdk.responses.fhir_response_headers import FhirResponseHeaders
 from helix_fhir_client_sdk.responses.get.fhir_get_bundle_response import (
     FhirGetBundleResponse,
 )
@@ -40,7 +41,8 @@ class FhirGetErrorResponse(FhirGetResponse):
 
     """
 
-    __slots__ = FhirGetResponse.__slots__ + [
+    # only the slots added by this subclass: repeating the base class slots would allocate them twice per instance
+    __slots__ = [
         # Specific to this subclass
         "_error_text",
         "_resource",
@@ -60,7 +62,7 @@ class FhirGetErrorResponse(FhirGetResponse):
         extra_context_to_return: dict[str, Any] | None,
         resource_type: str | None,
         id_: list[str] | str | None,
-        response_headers: list[str] | None,  # header name and value separated by a colon
+        response_headers: FhirResponseHeaders | list[str] | None,  # header name and value separated by a colon
         chunk_number: int | None = None,
         cache_hits: int | None = None,
         results_by_url: list[RetryableAioHttpUrlResult],
@@ -191,6 +193,18 @@ class FhirGetErrorResponse(FhirGetResponse):
         """
         return self
 
+    @override
+    def remove_resources(self, *, should_remove: Callable[[FhirResource], bool]) -> "FhirGetErrorResponse":
+        """
+        Removes the resource if should_remove returns True for it
+
+        :param should_remove: function that is passed the resource
+        :return: self
+        """
+        if self._resource is not None and should_remove(self._resource):
+            self._resource = None
+        return self
+
     @classmethod
     @override
     def from_response(cls, other_response: "FhirGetResponse") -> "FhirGetResponse":
@@ -332,7 +346,7 @@ class FhirGetErrorResponse(FhirGetResponse):
             extra_context_to_return=self.extra_context_to_return,
             resource_type=self.resource_type,
             id_=self.id_,
-            response_headers=self.response_headers,
+            response_headers=self._response_headers.to_list() if self._response_headers is not None else None,
             chunk_number=self.chunk_number,
             cache_hits=self.cache_hits,
             results_by_url=[r.to_dict() for r in self.results_by_url],
@@ -1,5 +1,5 @@
 import json
-from collections.abc import AsyncGenerator, Generator
+from collections.abc import AsyncGenerator, Callable, Generator
 from logging import Logger
 from typing import (
     Any,
@@ -20,6 +20,7 @@ from compressedfhir.utilities.fhir_json_encoder import FhirJSONEncoder
 
 from helix_fhir_client_sdk.exceptions.fhir_get_exception import FhirGetException
 from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+from helix_fhir_client_sdk.responses.fhir_response_headers import FhirResponseHeaders
 from helix_fhir_client_sdk.utilities.cache.request_cache import RequestCache
 from helix_fhir_client_sdk.utilities.retryable_aiohttp_url_result import (
     RetryableAioHttpUrlResult,
@@ -34,7 +35,8 @@ class FhirGetListByResourceTypeResponse(FhirGetResponse):
 
     """
 
-    __slots__ = FhirGetResponse.__slots__ + [
+    # only the slots added by this subclass: repeating the base class slots would allocate them twice per instance
+    __slots__ = [
         # Specific to this subclass
         "_resource_map",
     ]
@@ -53,7 +55,7 @@ class FhirGetListByResourceTypeResponse(FhirGetResponse):
         extra_context_to_return: dict[str, Any] | None,
         resource_type: str | None,
         id_: list[str] | str | None,
-        response_headers: list[str] | None,  # header name and value separated by a colon
+        response_headers: FhirResponseHeaders | list[str] | None,  # header name and value separated by a colon
         chunk_number: int | None = None,
         cache_hits: int | None = None,
         results_by_url: list[RetryableAioHttpUrlResult],
@@ -238,6 +240,22 @@ class FhirGetListByResourceTypeResponse(FhirGetResponse):
                 del self._resource_map[resource_type]
         return self
 
+    @override
+    def remove_resources(self, *, should_remove: Callable[[FhirResource], bool]) -> "FhirGetResponse":
+        """
+        Removes the resources for which should_remove returns True
+
+        :param should_remove: function that is passed each resource
+        :return: self
+        """
+        for resource_type, resources in list(self._resource_map.items()):
+            kept: FhirResourceList = FhirResourceList([r for r in resources if not should_remove(r)])
+            if kept:
+                self._resource_map[resource_type] = kept
+            else:
+                del self._resource_map[resource_type]
+        return self
+
     @classmethod
     @override
     def from_response(cls, other_response: "FhirGetResponse") -> "FhirGetResponse":
@@ -256,7 +274,7 @@ class FhirGetListByResourceTypeResponse(FhirGetResponse):
             extra_context_to_return=other_response.extra_context_to_return,
             resource_type=other_response.resource_type,
             id_=other_response.id_,
-            response_headers=other_response.response_headers,
+            response_headers=other_response.headers,
             chunk_number=other_response.chunk_number,
             cache_hits=other_response.cache_hits,
             results_by_url=other_response.results_by_url,
@@ -373,7 +391,7 @@ class FhirGetListByResourceTypeResponse(FhirGetResponse):
             extra_context_to_return=self.extra_context_to_return,
             resource_type=self.resource_type,
             id_=self.id_,
-            response_headers=self.response_headers,
+            response_headers=self._response_headers.to_list() if self._response_headers is not None else None,
             chunk_number=self.chunk_number,
             cache_hits=self.cache_hits,
             results_by_url=[r.to_dict() for r in self.results_by_url],
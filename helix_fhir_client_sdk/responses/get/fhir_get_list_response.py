@@ -1,5 +1,6 @@
 import json
-from collections.abc import AsyncGenerator, Generator
+from collections import deque
+from collections.abc import AsyncGenerator, Callable, Generator
 from logging import Logger
 from typing import (
     Any,
@@ -22,6 +23,7 @@ from compressedfhir.utilities.fhir_json_encoder import FhirJSONEncoder
 
 from helix_fhir_client_sdk.fhir_bundle_appender import FhirBundleAppender
 from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+from helix_fhir_client_sdk.responses.fhir_response_headers import FhirResponseHeaders
 from helix_fhir_client_sdk.utilities.cache.request_cache import RequestCache
 from helix_fhir_client_sdk.utilities.retryable_aiohttp_url_result import (
     RetryableAioHttpUrlResult,
@@ -36,7 +38,8 @@ class FhirGetListResponse(FhirGetResponse):
 
     """
 
-    __slots__ = FhirGetResponse.__slots__ + [
+    # only the slots added by this subclass: repeating the base class slots would allocate them twice per instance
+    __slots__ = [
         # Specific to this subclass
         "_resources",
     ]
@@ -55,12 +58,19 @@ class FhirGetListResponse(FhirGetResponse):
         extra_context_to_return: dict[str, Any] | None,
         resource_type: str | None,
         id_: list[str] | str | None,
-        response_headers: list[str] | None,  # header name and value separated by a colon
+        response_headers: FhirResponseHeaders | list[str] | None,  # header name and value separated by a colon
         chunk_number: int | None = None,
         cache_hits: int | None = None,
         results_by_url: list[RetryableAioHttpUrlResult],
         storage_mode: CompressedDictStorageMode,
+        response_json: list[dict[str, Any]] | None = None,
     ) -> None:
+        """
+        Response containing a list of resources
+
+        :param response_text: response text from the server
+        :param response_json: the list of resources if it has already been parsed so response_text is not parsed
+        """
         super().__init__(
             request_id=request_id,
             url=url,
@@ -78,8 +88,10 @@ class FhirGetListResponse(FhirGetResponse):
             results_by_url=results_by_url,
             storage_mode=storage_mode,
         )
-        self._resources: FhirResourceList | None = self._parse_resources(
-            response_text=response_text, storage_mode=storage_mode
+        self._resources: FhirResourceList | None = (
+            FhirResourceList([FhirResource(initial_dict=r, storage_mode=storage_mode) for r in response_json])
+            if response_json is not None
+            else self._parse_resources(response_text=response_text, storage_mode=storage_mode)
         )
 
     @override
@@ -232,6 +244,23 @@ class FhirGetListResponse(FhirGetResponse):
 
         return self
 
+    @override
+    def remove_resources(self, *, should_remove: Callable[[FhirResource], bool]) -> "FhirGetListResponse":
+        """
+        Removes the resources for which should_remove returns True
+
+        :param should_remove: function that is passed each resource
+        :return: self
+        """
+        if not self._resources:
+            return self
+
+        kept: list[FhirResource] = [resource for resource in self._resources if not should_remove(resource)]
+        if len(kept) != len(self._resources):
+            self._resources.clear()
+            deque.extend(self._resources, kept)
+        return self
+
     @classmethod
     @override
     def from_response(cls, other_response: "FhirGetResponse") -> "FhirGetResponse":
@@ -252,7 +281,7 @@ class FhirGetListResponse(FhirGetResponse):
             extra_context_to_return=other_response.extra_context_to_return,
             resource_type=other_response.resource_type,
             id_=other_response.id_,
-            response_headers=other_response.response_headers,
+            response_headers=other_response.headers,
             chunk_number=other_response.chunk_number,
             cache_hits=other_response.cache_hits,
             results_by_url=other_response.results_by_url,
@@ -318,7 +347,7 @@ class FhirGetListResponse(FhirGetResponse):
             extra_context_to_return=self.extra_context_to_return,
             resource_type=self.resource_type,
             id_=self.id_,
-            response_headers=self.response_headers,
+            response_headers=self._response_headers.to_list() if self._response_headers is not None else None,
             chunk_number=self.chunk_number,
             cache_hits=self.cache_hits,
             results_by_url=[r.to_dict() for r in self.results_by_url],
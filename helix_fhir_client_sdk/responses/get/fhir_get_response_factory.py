@@ -7,6 +7,7 @@ from compressedfhir.utilities.compressed_dict.v1.compressed_dict_storage_mode im
 
 from helix_fhir_client_sdk.exceptions.fhir_get_exception import FhirGetException
 from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+from helix_fhir_client_sdk.responses.fhir_response_headers import FhirResponseHeaders
 from helix_fhir_client_sdk.responses.get.fhir_get_bundle_response import (
     FhirGetBundleResponse,
 )
@@ -43,14 +44,45 @@ class FhirGetResponseFactory:
         extra_context_to_return: dict[str, Any] | None,
         resource_type: str | None,
         id_: list[str] | str | None,
-        response_headers: list[str] | None,  # header name and value separated by a colon
+        response_headers: FhirResponseHeaders | list[str] | None,  # header name and value separated by a colon
         chunk_number: int | None = None,
         cache_hits: int | None = None,
         results_by_url: list[RetryableAioHttpUrlResult],
         storage_mode: CompressedDictStorageMode,
         create_operation_outcome_for_error: bool | None,
+        response_json: dict[str, Any] | list[dict[str, Any]] | None = None,
     ) -> FhirGetResponse:
+        """
+        Creates the FhirGetResponse subclass matching the response
+
+        :param response_text: response text from the server
+        :param response_json: the response if it has already been parsed (e.g., a streamed resource or a page
+                              parsed off the event loop).  The response is then created from it without
+                              serializing it to text and parsing it again.
+        :return: FhirGetResponse
+        """
         try:
+            if response_json is not None and status == 200 and not error:
+                return FhirGetResponseFactory._create_from_json(
+                    request_id=request_id,
+                    url=url,
+                    response_json=response_json,
+                    access_token=access_token,
+                    total_count=total_count,
+                    status=status,
+                    next_url=next_url,
+                    extra_context_to_return=extra_context_to_return,
+                    resource_type=resource_type,
+                    id_=id_,
+                    response_headers=response_headers,
+                    chunk_number=chunk_number,
+                    cache_hits=cache_hits,
+                    results_by_url=results_by_url,
+                    storage_mode=storage_mode,
+                )
+            if response_json is not None and not response_text:
+                response_text = json.dumps(response_json)
+
             if not error and response_text:
                 # test if responses is valid json
                 try:
@@ -172,3 +204,86 @@ class FhirGetResponseFactory:
                     "cache_hits": cache_hits,
                 },
             ) from e
+
+    @staticmethod
+    def _create_from_json(
+        *,
+        request_id: str | None,
+        url: str,
+        response_json: dict[str, Any] | list[dict[str, Any]],
+        access_token: str | None,
+        total_count: int | None,
+        status: int,
+        next_url: str | None,
+        extra_context_to_return: dict[str, Any] | None,
+        resource_type: str | None,
+        id_: list[str] | str | None,
+        response_headers: FhirResponseHeaders | list[str] | None,
+        chunk_number: int | None,
+        cache_hits: int | None,
+        results_by_url: list[RetryableAioHttpUrlResult],
+        storage_mode: CompressedDictStorageMode,
+    ) -> FhirGetResponse:
+        """
+        Creates the response from an already parsed successful response, choosing the subclass the same way
+        create() does for the response text
+        """
+        if isinstance(response_json, list):
+            return FhirGetListResponse(
+                request_id=request_id,
+                url=url,
+                response_text="",
+                error=None,
+                access_token=access_token,
+                total_count=total_count,
+                status=status,
+                next_url=next_url,
+                extra_context_to_return=extra_context_to_return,
+                resource_type=resource_type,
+                id_=id_,
+                response_headers=response_headers,
+                chunk_number=chunk_number,
+                cache_hits=cache_hits,
+                results_by_url=results_by_url,
+                storage_mode=storage_mode,
+                response_json=response_json,
+            )
+        if "entry" in response_json or str(response_json.get("resourceType", "")).lower() == "bundle":
+            return FhirGetBundleResponse(
+                request_id=request_id,
+                url=url,
+                response_text="",
+                error=None,
+                access_token=access_token,
+                total_count=total_count,
+                status=status,
+                next_url=next_url,
+                extra_context_to_return=extra_context_to_return,
+                resource_type=resource_type,
+                id_=id_,
+                response_headers=response_headers,
+                chunk_number=chunk_number,
+                cache_hits=cache_hits,
+                results_by_url=results_by_url,
+                storage_mode=storage_mode,
+                response_json=response_json,
+            )
+        return FhirGetSingleResponse(
+            request_id=request_id,
+            url=url,
+            response_text="",
+            error=None,
+            access_token=access_token,
+            total_count=total_count,
+            status=status,
+            next_url=next_url,
+            extra_context_to_return=extra_context_to_return,
+            resource_type=resource_type,
+            id_=id_,
+            response_headers=response_headers,
+            chunk_number=chunk_number,
+            cache_hits=cache_hits,
+            results_by_url=results_by_url,
+            storage_mode=storage_mode,
+            resource_json=response_json,
+        )
@@ -1,4 +1,4 @@
-from collections.abc import AsyncGenerator, Generator
+from collections.abc import AsyncGenerator, Callable, Generator
 from logging import Logger
 from typing import (
     Any,
@@ -19,6 +19,7 @@ from compressedfhir.utilities.compressed_dict.v1.compressed_dict_storage_mode im
 )
 
 from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+from helix_fhir_client_sdk.responses.fhir_response_headers import FhirResponseHeaders
 from helix_fhir_client_sdk.responses.get.fhir_get_bundle_response import (
     FhirGetBundleResponse,
 )
@@ -36,7 +37,8 @@ class FhirGetSingleResponse(FhirGetResponse):
 
     """
 
-    __slots__ = FhirGetResponse.__slots__ + [
+    # only the slots added by this subclass: repeating the base class slots would allocate them twice per instance
+    __slots__ = [
         # Specific to this subclass
         "_resource"
     ]
@@ -55,12 +57,21 @@ class FhirGetSingleResponse(FhirGetResponse):
         extra_context_to_return: dict[str, Any] | None,
         resource_type: str | None,
         id_: list[str] | str | None,
-        response_headers: list[str] | None,  # header name and value separated by a colon
+        response_headers: FhirResponseHeaders | list[str] | None,  # header name and value separated by a colon
         chunk_number: int | None = None,
         cache_hits: int | None = None,
         results_by_url: list[RetryableAioHttpUrlResult],
         storage_mode: CompressedDictStorageMode,
+        resource_json: dict[str, Any] | None = None,
     ) -> None:
+        """
+        Response containing a single resource
+
+        :param response_text: response text from the server
+        :param resource_json: the resource if it has already been parsed (e.g., when streaming) so it is not
+                              serialized to and parsed from response_text again.  The text is then only created
+                              if get_response_text() is called.
+        """
         super().__init__(
             request_id=request_id,
             url=url,
@@ -78,8 +89,10 @@ class FhirGetSingleResponse(FhirGetResponse):
             results_by_url=results_by_url,
             storage_mode=storage_mode,
         )
-        self._resource: FhirResource | None = self._parse_single_resource(
-            responses=response_text, storage_mode=storage_mode
+        self._resource: FhirResource | None = (
+            FhirResource(initial_dict=resource_json, storage_mode=storage_mode)
+            if resource_json is not None
+            else self._parse_single_resource(responses=response_text, storage_mode=storage_mode)
         )
 
     @override
@@ -205,6 +218,18 @@ class FhirGetSingleResponse(FhirGetResponse):
         except Exception as e:
             raise Exception(f"Could not get resources from: {responses}") from e
 
+    @override
+    def remove_resources(self, *, should_remove: Callable[[FhirResource], bool]) -> "FhirGetSingleResponse":
+        """
+        Removes the resource if should_remove returns True for it
+
+        :param should_remove: function that is passed the resource
+        :return: self
+        """
+        if self._resource is not None and should_remove(self._resource):
+            self._resource = None
+        return self
+
     @classmethod
     @override
     def from_response(cls, other_response: "FhirGetResponse") -> "FhirGetResponse":
@@ -272,7 +297,7 @@ class FhirGetSingleResponse(FhirGetResponse):
             extra_context_to_return=self.extra_context_to_return,
             resource_type=self.resource_type,
             id_=self.id_,
-            response_headers=self.response_headers,
+            response_headers=self._response_headers.to_list() if self._response_headers is not None else None,
             chunk_number=self.chunk_number,
             cache_hits=self.cache_hits,
             results_by_url=[r.to_dict() for r in self.results_by_url],
@@ -166,6 +166,7 @@ class TestFhirGetListResponse:
         mock_response.resource_type = "Patient"
         mock_response.id_ = ["123"]
         mock_response.response_headers = None
+        mock_response.headers = None
         mock_response.chunk_number = 1
         mock_response.cache_hits = 0
         mock_response.get_resources.return_value = FhirResourceList(
@@ -1,5 +1,4 @@
 import dataclasses
-from copy import deepcopy
 from typing import Any, cast
 
 
@@ -40,22 +39,24 @@ class ResourceSeparator:
         resource_count: int = 0
         resource: dict[str, Any]
         for resource in resources:
-            # make a copy so we are not changing the original resource
-            cloned_resource: dict[str, Any] = deepcopy(resource)
             # This dict will hold the separated resources where the key is resourceType
             # have to split these here otherwise when Spark loads them
             # it can't handle that items in the entry array can have different schemas
             resources_dict: dict[str, str | None | list[dict[str, Any]]] = {}
+            # copy only the top level of the resource, without the contained array, so the original resource is not
+            # changed.  The rest of the resource and the contained resources are shared with the original instead of
+            # being cloned.
+            parent_resource: dict[str, Any] = {key: value for key, value in resource.items() if key != "contained"}
             # add the parent resource to the resources_dict
-            resource_type = str(cloned_resource["resourceType"]).lower()
+            resource_type = str(parent_resource["resourceType"]).lower()
             if resource_type not in resources_dict:
                 resources_dict[resource_type] = []
             if isinstance(resources_dict[resource_type], list):
-                cast(list[dict[str, Any]], resources_dict[resource_type]).append(cloned_resource)
+                cast(list[dict[str, Any]], resources_dict[resource_type]).append(parent_resource)
                 resource_count += 1
             # now see if this resource has a contained array and if so, add those to the resources_dict
-            if "contained" in cloned_resource:
-                contained_resources = cloned_resource.pop("contained")
+            contained_resources: list[dict[str, Any]] | None = resource.get("contained")
+            if contained_resources:
                 for contained_resource in contained_resources:
                     resource_type = str(contained_resource["resourceType"]).lower()
                     if resource_type not in resources_dict:
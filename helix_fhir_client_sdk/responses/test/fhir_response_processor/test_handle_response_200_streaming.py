@@ -102,3 +102,48 @@ async def test_handle_response_200_streaming() -> None:
     ]
 
     assert result[0].to_dict() == expected_result[0]
+
+
+async def test_handle_response_200_streaming_shares_page_headers() -> None:
+    response = MagicMock(RetryableAioHttpResponse)
+    response.status = 200
+    response.results_by_url = []
+    response.response_headers = {}
+    response.content = MagicMock()
+
+    async def async_iterator(chunk_size1: int) -> AsyncGenerator[bytes, None]:
+        yield b'{"resourceType": "Patient", "id": "1"}\n{"resourceType": "Patient", "id": "2"}\n'
+
+    response.content.iter_chunked = async_iterator
+    response.content.at_eof = MagicMock(return_value=False)
+
+    result = [
+        r
+        async for r in FhirResponseProcessor._handle_response_200_streaming(
+            access_token=None,
+            fn_handle_streaming_chunk=None,
+            full_url="http://example.com",
+            nd_json_chunk_streaming_parser=NdJsonChunkStreamingParser(),
+            next_url=None,
+            request_id=None,
+            response=response,
+            response_headers=["Content-Type:application/fhir+ndjson"],
+            total_count=0,
+            chunk_size=1024,
+            extra_context_to_return=None,
+            resource="Patient",
+            id_=None,
+            logger=None,
+            expand_fhir_bundle=False,
+            separate_bundle_resources=False,
+            url="http://example.com",
+            storage_mode=CompressedDictStorageMode(),
+            create_operation_outcome_for_error=False,
+        )
+    ]
+
+    assert [r.get_resources()[0]["id"] for r in result] == ["1", "2"]
+    # the header list is converted once per page and shared by all the responses of the page
+    assert result[0].headers is result[1].headers
+    # the text is only created when asked for
+    assert json.loads(result[1].get_response_text()) == {"resourceType": "Patient", "id": "2"}
@@ -0,0 +1,180 @@
+from collections.abc import AsyncGenerator
+from typing import Any
+from unittest.mock import MagicMock
+
+from compressedfhir.utilities.compressed_dict.v1.compressed_dict_storage_mode import (
+    CompressedDictStorageMode,
+)
+
+from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+from helix_fhir_client_sdk.responses.fhir_response_processor import (
+    FhirResponseProcessor,
+)
+from helix_fhir_client_sdk.responses.get.fhir_get_bundle_response import FhirGetBundleResponse
+from helix_fhir_client_sdk.structures.streaming_batch_size import StreamingBatchSize
+from helix_fhir_client_sdk.structures.streaming_queue_sizes import StreamingQueueSizes
+from helix_fhir_client_sdk.utilities.ndjson_chunk_streaming_parser import (
+    NdJsonChunkStreamingParser,
+)
+from helix_fhir_client_sdk.utilities.retryable_aiohttp_response import (
+    RetryableAioHttpResponse,
+)
+
+
+async def stream_patients(
+    *, chunks: list[bytes], streaming_batch_size: StreamingBatchSize | None, expand_fhir_bundle: bool = False
+) -> list[FhirGetResponse]:
+    response = MagicMock(RetryableAioHttpResponse)
+    response.status = 200
+    response.results_by_url = []
+    response.response_headers = {}
+    response.content = MagicMock()
+
+    async def async_iterator(chunk_size1: int) -> AsyncGenerator[bytes, None]:
+        for chunk in chunks:
+            yield chunk
+
+    response.content.iter_chunked = async_iterator
+    response.content.at_eof = MagicMock(return_value=False)
+
+    return [
+        r
+        async for r in FhirResponseProcessor._handle_response_200_streaming(
+            access_token=None,
+            fn_handle_streaming_chunk=None,
+            full_url="http://example.com/Patient",
+            nd_json_chunk_streaming_parser=NdJsonChunkStreamingParser(),
+            next_url=None,
+            request_id=None,
+            response=response,
+            response_headers=[],
+            total_count=0,
+            chunk_size=1024,
+            extra_context_to_return=None,
+            resource="Patient",
+            id_=None,
+            logger=None,
+            expand_fhir_bundle=expand_fhir_bundle,
+            separate_bundle_resources=False,
+            url="http://example.com",
+            storage_mode=CompressedDictStorageMode(),
+            create_operation_outcome_for_error=False,
+            streaming_batch_size=streaming_batch_size,
+        )
+    ]
+
+
+def patient_lines(*ids: int) -> bytes:
+    return b"".join(b'{"resourceType": "Patient", "id": "%d"}\n' % i for i in ids)
+
+
+def get_ids(response: FhirGetResponse) -> list[Any]:
+    return [entry.resource["id"] for entry in response.get_bundle_entries() if entry.resource]
+
+
+async def test_one_batch_per_chunk() -> None:
+    result = await stream_patients(
+        chunks=[patient_lines(1, 2), patient_lines(3), patient_lines(4, 5, 6)],
+        streaming_batch_size=StreamingBatchSize(),
+    )
+
+    assert all(isinstance(r, FhirGetBundleResponse) for r in result)
+    assert [get_ids(r) for r in result] == [["1", "2"], ["3"], ["4", "5", "6"]]
+    assert [r.chunk_number for r in result] == [1, 2, 3]
+
+
+async def test_batches_by_resource_count() -> None:
+    result = await stream_patients(
+        chunks=[patient_lines(1, 2, 3), patient_lines(4, 5, 6, 7)],
+        streaming_batch_size=StreamingBatchSize(max_resources=3),
+    )
+
+    # the last, partial batch is returned at the end of the stream
+    assert [get_ids(r) for r in result] == [["1", "2", "3"], ["4", "5", "6"], ["7"]]
+    assert result[0].total_count == 3
+
+
+async def test_batches_by_bytes() -> None:
+    result = await stream_patients(
+        chunks=[patient_lines(1), patient_lines(2), patient_lines(3), patient_lines(4)],
+        streaming_batch_size=StreamingBatchSize(max_bytes=len(patient_lines(1)) * 2),
+    )
+
+    assert [get_ids(r) for r in result] == [["1", "2"], ["3", "4"]]
+
+
+async def test_batches_by_bytes_count_chunks_that_complete_no_resource() -> None:
+    large: bytes = b'{"resourceType": "Patient", "id": "1", "text": "%s"}\n' % (b"x" * 100)
+    # the large resource spans three chunks and only the last one completes it
+    result = await stream_patients(
+        chunks=[large[:50], large[50:100], large[100:], patient_lines(2), patient_lines(3)],
+        streaming_batch_size=StreamingBatchSize(max_bytes=len(large)),
+    )
+
+    assert [get_ids(r) for r in result] == [["1"], ["2", "3"]]
+
+
+async def test_batches_expand_bundles() -> None:
+    bundle: bytes = (
+        b'{"resourceType": "Bundle", "entry": [{"resource": {"resourceType": "Patient", "id": "1"}},'
+        b' {"resource": {"resourceType": "Patient", "id": "2"}}]}\n'
+    )
+    result = await stream_patients(
+        chunks=[bundle + patient_lines(3)], streaming_batch_size=StreamingBatchSize(), expand_fhir_bundle=True
+    )
+
+    assert [get_ids(r) for r in result] == [["1", "2", "3"]]
+
+
+async def test_streaming_with_queues() -> None:
+    response = MagicMock(RetryableAioHttpResponse)
+    response.status = 200
+    response.results_by_url = []
+    response.response_headers = {}
+    response.content = MagicMock()
+    requested_chunk_sizes: list[int] = []
+
+    async def async_iterator(chunk_size1: int) -> AsyncGenerator[bytes, None]:
+        requested_chunk_sizes.append(chunk_size1)
+        for i in range(1, 21):
+            yield patient_lines(i)
+
+    response.content.iter_chunked = async_iterator
+    response.content.at_eof = MagicMock(return_value=False)
+    handled_chunks: list[int] = []
+
+    async def handle_chunk(line: bytes, chunk_number: int | None = None) -> bool:
+        assert chunk_number is not None
+        handled_chunks.append(chunk_number)
+        return True
+
+    result = [
+        r
+        async for r in FhirResponseProcessor._handle_response_200_streaming(
+            access_token=None,
+            fn_handle_streaming_chunk=handle_chunk,
+            full_url="http://example.com/Patient",
+            nd_json_chunk_streaming_parser=NdJsonChunkStreamingParser(),
+            next_url=None,
+            request_id=None,
+            response=response,
+            response_headers=[],
+            total_count=0,
+            chunk_size=4096,
+            extra_context_to_return=None,
+            resource="Patient",
+            id_=None,
+            logger=None,
+            expand_fhir_bundle=False,
+            separate_bundle_resources=False,
+            url="http://example.com",
+            storage_mode=CompressedDictStorageMode(),
+            create_operation_outcome_for_error=False,
+            streaming_queue_sizes=StreamingQueueSizes(chunk_queue_size=2, parsed_queue_size=2),
+        )
+    ]
+
+    assert [r.get_resources()[0]["id"] for r in result] == [str(i) for i in range(1, 21)]
+    assert [r.chunk_number for r in result] == list(range(1, 21))
+    assert handled_chunks == list(range(1, 21))
+    assert requested_chunk_sizes == [4096]
@@ -1,5 +1,5 @@
 import json
-from collections.abc import AsyncGenerator, Generator
+from collections.abc import AsyncGenerator, Callable, Generator
 from datetime import UTC, datetime
 from logging import Logger
 from typing import (
@@ -22,6 +22,7 @@ from compressedfhir.utilities.compressed_dict.v1.compressed_dict_storage_mode im
 )
 
 from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+from helix_fhir_client_sdk.responses.fhir_response_headers import FhirResponseHeaders
 from helix_fhir_client_sdk.utilities.cache.request_cache import RequestCache
 from helix_fhir_client_sdk.utilities.retryable_aiohttp_url_result import (
     RetryableAioHttpUrlResult,
@@ -48,7 +49,7 @@ class TestFhirGetResponse(FhirGetResponse):
         extra_context_to_return: dict[str, Any] | None,
         resource_type: str | None,
         id_: list[str] | str | None,
-        response_headers: list[str] | None,  # header name and value separated by a colon
+        response_headers: FhirResponseHeaders | list[str] | None,  # header name and value separated by a colon
         chunk_number: int | None = None,
         cache_hits: int | None = None,
         results_by_url: list[RetryableAioHttpUrlResult],
@@ -146,6 +147,11 @@ class TestFhirGetResponse(FhirGetResponse):
         """
         return self
 
+    @override
+    def remove_resources(self, *, should_remove: Callable[[FhirResource], bool]) -> "TestFhirGetResponse":
+        self._resources = FhirResourceList([r for r in self._resources if not should_remove(r)])
+        return self
+
     @classmethod
     def from_response(cls, other_response: "FhirGetResponse") -> "FhirGetResponse":
         # Simple implementation for testing
@@ -160,7 +166,7 @@ class TestFhirGetResponse(FhirGetResponse):
             extra_context_to_return=other_response.extra_context_to_return,
             resource_type=other_response.resource_type,
             id_=other_response.id_,
-            response_headers=other_response.response_headers,
+            response_headers=other_response.headers,
             chunk_number=other_response.chunk_number,
             cache_hits=other_response.cache_hits,
             results_by_url=other_response.results_by_url,
@@ -241,6 +247,22 @@ class TestFhirGetResponseClass:
 
         assert response.etag == 'W/"abc123"'
 
+    def test_response_headers_are_replaced_not_changed_in_place(self, sample_response_data: dict[str, Any]) -> None:
+        """Test that response_headers is read-only in place and can be replaced."""
+        response = TestFhirGetResponse(**sample_response_data)
+        headers: tuple[str, ...] | None = response.response_headers
+        assert headers is not None
+        assert list(headers) == ["Last-Modified: 2023-12-01T12:00:00Z", 'ETag: W/"abc123"']
+        # the headers are shared, not copied on each access
+        assert response.response_headers is headers
+        with pytest.raises(AttributeError):
+            headers.append("X-Request-ID:1")  # type: ignore[attr-defined]
+
+        response.response_headers = [*headers, "X-Request-ID:1"]
+        assert response.response_headers == (*headers, "X-Request-ID:1")
+        assert response.headers is not None and response.headers.request_id == "1"
+        assert response.to_dict()["response_headers"] == [*headers, "X-Request-ID:1"]
+
     def test_parse_json(self) -> None:
         """Test parse_json method."""
         # Test valid JSON
@@ -0,0 +1,61 @@
+import json
+
+from compressedfhir.utilities.compressed_dict.v1.compressed_dict_storage_mode import (
+    CompressedDictStorageMode,
+)
+
+from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+from helix_fhir_client_sdk.responses.fhir_get_response_accumulator import FhirGetResponseAccumulator
+from helix_fhir_client_sdk.responses.get.fhir_get_bundle_response import FhirGetBundleResponse
+
+
+def create_response(
+    *resource_keys: str, cache_hits: int | None = None, chunk_number: int | None = None
+) -> FhirGetResponse:
+    resources = [{"resourceType": key.split("/")[0], "id": key.split("/")[1]} for key in resource_keys]
+    return FhirGetBundleResponse(
+        request_id=None,
+        url="http://fhir.example.com",
+        response_text=json.dumps({"resourceType": "Bundle", "entry": [{"resource": r} for r in resources]}),
+        error=None,
+        access_token=None,
+        total_count=len(resources),
+        status=200,
+        extra_context_to_return=None,
+        resource_type=None,
+        id_=None,
+        response_headers=None,
+        cache_hits=cache_hits,
+        chunk_number=chunk_number,
+        results_by_url=[],
+        storage_mode=CompressedDictStorageMode(),
+    )
+
+
+def get_keys(response: FhirGetResponse) -> list[str | None]:
+    return [entry.resource_type_and_id for entry in response.get_bundle_entries()]
+
+
+def test_accumulator_matches_extend() -> None:
+    children: list[FhirGetResponse] = [
+        create_response("Observation/1", "Patient/1", cache_hits=1, chunk_number=2),
+        create_response("Observation/2", "Observation/1", cache_hits=2, chunk_number=1),
+    ]
+    expected: FhirGetResponse = create_response("Patient/1").extend(children)
+
+    accumulator = FhirGetResponseAccumulator(response=create_response("Patient/1"))
+    for child in children:
+        accumulator.add(child)
+    assert accumulator.entry_count == 2
+    response: FhirGetResponse = accumulator.get_response()
+
+    assert get_keys(response) == get_keys(expected) == ["Patient/1", "Observation/1", "Observation/2"]
+    assert response.cache_hits == expected.cache_hits == 3
+    assert response.chunk_number == expected.chunk_number == 1
+
+
+def test_accumulator_without_duplicate_removal() -> None:
+    accumulator = FhirGetResponseAccumulator(response=create_response("Patient/1"), remove_duplicates=False)
+    accumulator.add_all([create_response("Patient/1", "Observation/1"), create_response("Observation/1")])
+
+    assert get_keys(accumulator.get_response()) == ["Patient/1", "Patient/1", "Observation/1", "Observation/1"]
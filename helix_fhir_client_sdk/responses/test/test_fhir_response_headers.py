@@ -0,0 +1,48 @@
+from datetime import UTC, datetime
+
+from helix_fhir_client_sdk.responses.fhir_response_headers import FhirResponseHeaders
+
+
+def test_lookup_is_case_insensitive_and_keeps_colons_in_values() -> None:
+    headers = FhirResponseHeaders(
+        [
+            "Content-Type:application/fhir+json",
+            "Location:https://fhir.example.com:8443/Patient/1",
+            "Set-Cookie:a=1",
+            "Set-Cookie:b=2",
+        ]
+    )
+
+    assert headers.get("content-type") == "application/fhir+json"
+    assert headers.get("LOCATION") == "https://fhir.example.com:8443/Patient/1"
+    assert headers.getall("set-cookie") == ["a=1", "b=2"]
+    assert "Set-Cookie" in headers
+    assert headers.get("X-Missing") is None
+
+
+def test_parsed_values_are_memoized() -> None:
+    headers = FhirResponseHeaders.from_mapping(
+        {
+            "last-modified": "Fri, 01 Dec 2023 12:00:00 GMT",
+            "etag": 'W/"abc123"',
+            "x-request-id": "request-1",
+        }
+    )
+
+    assert headers.last_modified == datetime(2023, 12, 1, 12, 0, 0, tzinfo=UTC)
+    assert headers.last_modified is headers.last_modified
+    assert headers.etag == 'W/"abc123"'
+    assert headers.request_id == "request-1"
+
+
+def test_keeps_list_form_and_is_shared() -> None:
+    lines = ["mock_header", "Last-Modified: not a date"]
+    headers = FhirResponseHeaders(lines)
+
+    # the original strings are kept as is for to_dict()
+    assert headers.to_list() == lines
+    assert headers == lines
+    assert headers.last_modified is None
+    # existing instances are not copied
+    assert FhirResponseHeaders.create(headers) is headers
+    assert FhirResponseHeaders.create(None) is None
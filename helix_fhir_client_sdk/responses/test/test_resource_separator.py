@@ -133,3 +133,22 @@ async def test_separate_contained_resources_async_empty_list() -> None:
 
     assert result.resources_dicts == expected_result
     assert result.total_count == 0
+
+
+async def test_separate_contained_resources_async_does_not_clone_resources() -> None:
+    contained_resource: dict[str, Any] = {"resourceType": "Observation", "id": "obs1"}
+    name: list[dict[str, Any]] = [{"family": "Smith"}]
+    resource: dict[str, Any] = {"resourceType": "Patient", "id": "1", "name": name, "contained": [contained_resource]}
+
+    result = await ResourceSeparator.separate_contained_resources_async(
+        resources=[resource], access_token=None, url=None, extra_context_to_return=None
+    )
+
+    resources_dict: dict[str, Any] = result.resources_dicts[0]
+    patient: dict[str, Any] = resources_dict["patient"][0]
+    assert "contained" not in patient
+    # the nested values and the contained resources are shared with the original resource
+    assert patient["name"] is name
+    assert resources_dict["observation"][0] is contained_resource
+    # the original resource is not changed
+    assert resource["contained"] == [contained_resource]
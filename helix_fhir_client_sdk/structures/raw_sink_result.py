@@ -0,0 +1,29 @@
+import dataclasses
+
+
+@dataclasses.dataclass(slots=True)
+class RawSinkResult:
+    """
+    Result of streaming the raw bytes of a GET call to a sink
+    """
+
+    url: str
+    """ Url of the first page """
+
+    status: int | None = None
+    """ Status code of the last page requested """
+
+    request_id: str | None = None
+    """ X-Request-ID of the last page requested """
+
+    page_count: int = 0
+    """ Number of pages written to the sink """
+
+    bytes_written: int = 0
+    """ Number of bytes written to the sink """
+
+    error: str | None = None
+    """ Response text of the page that failed, if any """
+
+    response_headers: list[str] = dataclasses.field(default_factory=list)
+    """ Headers of the last page requested """
@@ -0,0 +1,17 @@
+import dataclasses
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class StreamingBatchSize:
+    """
+    How the streamed resources are grouped into responses when streaming in batches.
+
+    A batch is yielded as soon as it reaches max_resources resources or max_bytes bytes have been received since the
+    last batch.  If neither is set, one batch is yielded for each chunk received from the server.
+    """
+
+    max_resources: int | None = None
+    """ Maximum number of resources in a batch """
+
+    max_bytes: int | None = None
+    """ Yield the batch once this many bytes have been received since the last batch """
@@ -0,0 +1,18 @@
+import dataclasses
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class StreamingQueueSizes:
+    """
+    Depths of the bounded queues between the stages of a streamed response.
+
+    A reader task reads the byte chunks from the network into the chunk queue, a parser task turns them into
+    resources in the parsed queue and the consumer drains the parsed queue.  A stage waits when its output queue is
+    full, so at most chunk_queue_size chunks and parsed_queue_size parsed chunks are held in memory.
+    """
+
+    chunk_queue_size: int = 8
+    """ Maximum number of byte chunks read ahead of the parser """
+
+    parsed_queue_size: int = 8
+    """ Maximum number of parsed chunks waiting for the consumer """
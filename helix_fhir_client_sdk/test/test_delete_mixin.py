@@ -1,9 +1,13 @@
+import json
 import logging
+import re
+from collections.abc import AsyncGenerator
 from datetime import datetime
+from typing import Any
 
 import aiohttp
 import pytest
-from aioresponses import aioresponses
+from aioresponses import CallbackResult, aioresponses
 from furl import furl
 
 from helix_fhir_client_sdk.fhir_client import FhirClient
@@ -171,3 +175,116 @@ class TestFhirDeleteMixin:
                 assert response.status == 500
                 assert response.error == "500"
                 assert response.request_id == "test-request-id"
+
+    @pytest.mark.asyncio
+    async def test_delete_resources_by_ids_async_chunks_by_url_length(self, fhir_delete_mixin: FhirDeleteMixin) -> None:
+        """Test delete_resources_by_ids_async splits the ids across urls and adds up the deleted counts"""
+
+        async def get_ids() -> AsyncGenerator[str, None]:
+            for i in range(10):
+                yield f"id{i}"
+
+        deleted_urls: list[str] = []
+
+        def callback(url: Any, **kwargs: Any) -> CallbackResult:
+            deleted_urls.append(str(url))
+            return CallbackResult(status=200, payload={"deleted": str(url).rsplit("/", 1)[-1].count(",") + 1})
+
+        async with aiohttp.ClientSession() as session:
+            with aioresponses() as m:
+                fhir_delete_mixin.create_http_session = lambda: session  # type: ignore[method-assign]
+                m.delete(re.compile(r"https://example\.com/Patient/.*"), callback=callback, repeat=True)
+
+                # "https://example.com/Patient/" is 28 characters so each url has room for 3 ids
+                response: FhirDeleteResponse = await fhir_delete_mixin.delete_resources_by_ids_async(
+                    ids=get_ids(), max_url_length=40, max_concurrent_requests=2
+                )
+
+                assert response.count == 10
+                assert response.error is None
+                assert response.status == 200
+                assert all(len(url) <= 40 for url in deleted_urls)
+                assert sorted(i for url in deleted_urls for i in url.rsplit("/", 1)[-1].split(",")) == [
+                    f"id{i}" for i in range(10)
+                ]
+
+    @pytest.mark.asyncio
+    async def test_delete_resources_by_ids_async_as_transaction_bundle(
+        self, fhir_delete_mixin: FhirDeleteMixin
+    ) -> None:
+        """Test delete_resources_by_ids_async sends DELETE entries in Bundles and counts the successful entries"""
+        posted_bundles: list[dict[str, Any]] = []
+
+        def callback(url: Any, **kwargs: Any) -> CallbackResult:
+            bundle: dict[str, Any] = json.loads(kwargs["data"])
+            posted_bundles.append(bundle)
+            statuses = [
+                "204 No Content" if e["request"]["url"] != "Patient/2" else "404 Not Found" for e in bundle["entry"]
+            ]
+            return CallbackResult(
+                status=200,
+                payload={"resourceType": "Bundle", "entry": [{"response": {"status": s}} for s in statuses]},
+            )
+
+        async with aiohttp.ClientSession() as session:
+            with aioresponses() as m:
+                fhir_delete_mixin.create_http_session = lambda: session  # type: ignore[method-assign]
+                m.post("https://example.com", callback=callback, repeat=True)
+
+                response: FhirDeleteResponse = await fhir_delete_mixin.delete_resources_by_ids_async(
+                    ids=[str(i) for i in range(5)], bundle_type="transaction", bundle_size=2
+                )
+
+                assert [len(b["entry"]) for b in posted_bundles] == [2, 2, 1]
+                assert posted_bundles[0]["entry"][0]["request"] == {"method": "DELETE", "url": "Patient/0"}
+                assert response.count == 4
+                assert response.error == "404"
+
+    @pytest.mark.asyncio
+    async def test_delete_resources_by_ids_async_keeps_only_counts_and_distinct_errors(
+        self, fhir_delete_mixin: FhirDeleteMixin
+    ) -> None:
+        """Test delete_resources_by_ids_async does not keep the response texts and joins distinct errors"""
+
+        def callback(url: Any, **kwargs: Any) -> CallbackResult:
+            id_: str = str(url).rsplit("/", 1)[-1]
+            status: int = {"1": 404, "2": 500, "3": 404}.get(id_, 200)
+            return CallbackResult(status=status, payload={"deleted": 1} if status == 200 else {"issue": []})
+
+        async with aiohttp.ClientSession() as session:
+            with aioresponses() as m:
+                fhir_delete_mixin.create_http_session = lambda: session  # type: ignore[method-assign]
+                fhir_delete_mixin._exclude_status_codes_from_retry = [404, 500]
+                m.delete(re.compile(r"https://example\.com/Patient/.*"), callback=callback, repeat=True)
+
+                # one id per url
+                response: FhirDeleteResponse = await fhir_delete_mixin.delete_resources_by_ids_async(
+                    ids=[str(i) for i in range(5)], max_url_length=30
+                )
+
+                assert response.count == 2
+                assert response.error == "404,500"
+                assert response.status in (404, 500)
+                assert response.responses == ""
+
+    @pytest.mark.asyncio
+    async def test_delete_by_queries_async_adds_up_the_counts(self, fhir_delete_mixin: FhirDeleteMixin) -> None:
+        """Test delete_by_queries_async sends one DELETE per query and adds up the deleted counts"""
+        deleted_urls: list[str] = []
+
+        def callback(url: Any, **kwargs: Any) -> CallbackResult:
+            deleted_urls.append(str(url))
+            return CallbackResult(status=200, payload={"deleted": 2})
+
+        async with aiohttp.ClientSession() as session:
+            with aioresponses() as m:
+                fhir_delete_mixin.create_http_session = lambda: session  # type: ignore[method-assign]
+                m.delete(re.compile(r"https://example\.com/Patient\?.*"), callback=callback, repeat=True)
+
+                response: FhirDeleteResponse = await fhir_delete_mixin.delete_by_queries_async(
+                    queries=[[f"name=test{i}"] for i in range(3)], max_concurrent_requests=2
+                )
+
+                assert response.count == 6
+                assert response.error is None
+                assert sorted(deleted_urls) == [f"https://example.com/Patient?name=test{i}" for i in range(3)]
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import logging
+from collections.abc import Generator
+from typing import Any
+
+import aiohttp
+import pytest
+from aioresponses import CallbackResult, aioresponses
+
+from helix_fhir_client_sdk.fhir_client import FhirClient
+from helix_fhir_client_sdk.open_telemetry.fhir_client_sdk_metrics import FhirClientSdkMetrics
+from helix_fhir_client_sdk.open_telemetry.metric_names import FhirClientSdkOpenTelemetryMetricNames
+from helix_fhir_client_sdk.utilities.cache.request_cache import RequestCache
+from helix_fhir_client_sdk.utilities.host_resilience.hedging_policy import HedgingPolicy
+
+sdk_metrics = pytest.importorskip("opentelemetry.sdk.metrics")
+sdk_metrics_export = pytest.importorskip("opentelemetry.sdk.metrics.export")
+
+
+@pytest.fixture
+def metric_reader() -> Generator[Any, None, None]:
+    reader = sdk_metrics_export.InMemoryMetricReader()
+    FhirClientSdkMetrics.use_meter_provider(sdk_metrics.MeterProvider(metric_readers=[reader]))
+    try:
+        yield reader
+    finally:
+        FhirClientSdkMetrics.use_meter_provider(None)
+
+
+def get_data_points(reader: Any) -> dict[str, list[Any]]:
+    metrics_data = reader.get_metrics_data()
+    return {
+        metric.name: list(metric.data.data_points)
+        for resource_metrics in metrics_data.resource_metrics
+        for scope_metrics in resource_metrics.scope_metrics
+        for metric in scope_metrics.metrics
+    }
+
+
+async def test_records_request_metrics(metric_reader: Any) -> None:
+    names = FhirClientSdkOpenTelemetryMetricNames
+    body: str = json.dumps({"resourceType": "Patient", "id": "1"})
+    async with aiohttp.ClientSession() as session:
+        with aioresponses() as m:
+            m.get("http://fhir.example.com/4_0_0/Patient/1", status=500)
+            m.get("http://fhir.example.com/4_0_0/Patient/1", status=200, body=body)
+
+            fhir_client = FhirClient().url("http://fhir.example.com/4_0_0").resource("Patient").id_("1")
+            fhir_client._internal_logger = logging.getLogger("FhirClient")
+            fhir_client.use_http_session(lambda: session)
+            fhir_client.set_access_token("token")
+            fhir_client.set_max_concurrent_requests(2)
+            response = await fhir_client.get_async()
+    assert response.status == 200
+
+    data_points: dict[str, list[Any]] = get_data_points(metric_reader)
+    durations = data_points[names.HTTP_REQUEST_DURATION]
+    assert sorted(point.attributes["http.response.status_code"] for point in durations) == [200, 500]
+    assert all(point.attributes["fhir.client_sdk.resource"] == "Patient" for point in durations)
+    assert all(point.attributes["fhir.client_sdk.host"] == "fhir.example.com" for point in durations)
+    assert [point.value for point in data_points[names.HTTP_RETRIES]] == [1]
+    assert [point.attributes["error.type"] for point in data_points[names.HTTP_RETRIES]] == ["500"]
+    assert sum(point.sum for point in data_points[names.HTTP_RESPONSE_BODY_SIZE]) == len(body)
+    assert data_points[names.JSON_PARSE_DURATION][0].count == 1
+    assert data_points[names.CONCURRENCY_WAIT_DURATION][0].count == 1
+    assert [point.value for point in data_points[names.HTTP_REQUESTS_IN_FLIGHT]] == [0]
+
+
+async def test_records_request_cache_metrics(metric_reader: Any) -> None:
+    names = FhirClientSdkOpenTelemetryMetricNames
+    cache = RequestCache()
+    await cache.add_async(
+        resource_type="Patient",
+        resource_id="1",
+        bundle_entry=None,
+        status=404,
+        last_modified=None,
+        etag=None,
+        from_input_cache=False,
+        raw_hash="",
+    )
+    await cache.get_async(resource_type="Patient", resource_id="1")
+    await cache.get_async(resource_type="Patient", resource_id="2")
+    await cache.remove_async(resource_key="Patient/1")
+
+    data_points: dict[str, list[Any]] = get_data_points(metric_reader)
+    assert [point.value for point in data_points[names.REQUEST_CACHE_HITS]] == [1]
+    assert [point.value for point in data_points[names.REQUEST_CACHE_MISSES]] == [1]
+    assert [point.value for point in data_points[names.REQUEST_CACHE_EVICTIONS]] == [1]
+
+
+async def test_records_hedge_metrics(metric_reader: Any) -> None:
+    names = FhirClientSdkOpenTelemetryMetricNames
+    policy = HedgingPolicy(min_delay_in_seconds=0.05, min_samples=1, max_hedge_ratio=1)
+    policy.record_latency(host="fhir.example.com", latency_in_seconds=0.01)
+    delays: list[float] = [5, 0]
+
+    # noinspection PyUnusedLocal
+    async def respond(url: str, **kwargs: Any) -> CallbackResult:
+        # the first request is slow so it gets hedged and the hedge answers at once
+        await asyncio.sleep(delays.pop(0))
+        return CallbackResult(status=200, body=json.dumps({"resourceType": "Patient", "id": "1"}))
+
+    async with aiohttp.ClientSession() as session:
+        with aioresponses() as m:
+            m.get("http://fhir.example.com/4_0_0/Patient/1", callback=respond, repeat=True)
+
+            fhir_client = FhirClient().url("http://fhir.example.com/4_0_0").resource("Patient").id_("1")
+            fhir_client.use_http_session(lambda: session)
+            fhir_client.set_access_token("token")
+            response = await fhir_client.hedge_requests(policy).get_async()
+    assert response.status == 200
+
+    hedges = get_data_points(metric_reader)[names.HTTP_HEDGES]
+    assert [(point.attributes["fhir.client_sdk.hedge.won"], point.value) for point in hedges] == [("true", 1)]
+
+
+def test_disabled_without_meter_provider() -> None:
+    # only the no-op (or proxy) provider of opentelemetry-api is configured in the tests
+    assert not FhirClientSdkMetrics.get().enabled
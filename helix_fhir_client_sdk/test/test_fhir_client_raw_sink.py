@@ -0,0 +1,86 @@
+import gzip
+import json
+import logging
+from pathlib import Path
+
+import aiohttp
+from aioresponses import aioresponses
+
+from helix_fhir_client_sdk.fhir_client import FhirClient
+from helix_fhir_client_sdk.structures.raw_sink_result import RawSinkResult
+from helix_fhir_client_sdk.utilities.raw_sinks.async_file_sink import AsyncFileSink
+
+
+class ListSink:
+    def __init__(self) -> None:
+        self.items: list[bytes] = []
+
+    async def write_async(self, data: bytes | memoryview) -> None:
+        self.items.append(bytes(data))
+
+
+def create_client(session: aiohttp.ClientSession) -> FhirClient:
+    fhir_client = FhirClient().url("http://fhir.example.com").resource("Patient")
+    fhir_client._internal_logger = logging.getLogger("FhirClient")
+    fhir_client.use_http_session(lambda: session)
+    return fhir_client
+
+
+async def test_get_raw_to_sink_follows_next_links(tmp_path: Path) -> None:
+    page1: bytes = json.dumps(
+        {
+            "resourceType": "Bundle",
+            "link": [{"relation": "next", "url": "http://fhir.example.com/Patient?page=2"}],
+            "entry": [{"resource": {"resourceType": "Patient", "id": "1"}}],
+        }
+    ).encode("utf-8")
+    page2: bytes = json.dumps(
+        {"resourceType": "Bundle", "entry": [{"resource": {"resourceType": "Patient", "id": "2"}}]}
+    ).encode("utf-8")
+    async with aiohttp.ClientSession() as session:
+        with aioresponses() as m:
+            m.get("http://fhir.example.com/Patient", status=200, body=page1)
+            m.get("http://fhir.example.com/Patient?page=2", status=200, body=page2)
+
+            file_path: Path = tmp_path / "patients.json.gz"
+            async with AsyncFileSink(file_path, compress=True) as sink:
+                result: RawSinkResult = await create_client(session).get_raw_to_sink_async(sink)
+
+    assert result.status == 200
+    assert result.page_count == 2
+    assert result.bytes_written == len(page1) + len(page2)
+    # the pages are written as received
+    assert gzip.decompress(file_path.read_bytes()) == page1 + page2
+
+
+async def test_get_raw_to_sink_splits_ndjson_lines() -> None:
+    lines: list[bytes] = [
+        json.dumps({"resourceType": "Patient", "id": str(i)}).encode("utf-8") + b"\n" for i in range(5)
+    ]
+    async with aiohttp.ClientSession() as session:
+        with aioresponses() as m:
+            m.get(
+                "http://fhir.example.com/Patient",
+                status=200,
+                body=b"".join(lines),
+                headers={"Content-Type": "application/fhir+ndjson"},
+            )
+
+            sink = ListSink()
+            result: RawSinkResult = await create_client(session).get_raw_to_sink_async(sink, split_lines=True)
+
+    assert result.page_count == 1
+    assert sink.items == lines
+
+
+async def test_get_raw_to_sink_error() -> None:
+    async with aiohttp.ClientSession() as session:
+        with aioresponses() as m:
+            m.get("http://fhir.example.com/Patient", status=404, body=b"not found")
+
+            sink = ListSink()
+            result: RawSinkResult = await create_client(session).get_raw_to_sink_async(sink)
+
+    assert result.status == 404
+    assert result.page_count == 0
+    assert sink.items == []
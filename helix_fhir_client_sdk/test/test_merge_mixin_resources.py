@@ -1,4 +1,6 @@
 import json
+from pathlib import Path
+from typing import Any
 
 import pytest
 from aioresponses import aioresponses
@@ -6,6 +8,7 @@ from compressedfhir.fhir.fhir_resource import FhirResource
 from compressedfhir.fhir.fhir_resource_list import FhirResourceList
 
 from helix_fhir_client_sdk.fhir_client import FhirClient
+from helix_fhir_client_sdk.fixers.fix_fhir_bundle import FhirBundleFixer
 from helix_fhir_client_sdk.responses.merge.fhir_merge_resource_response import (
     FhirMergeResourceResponse,
 )
@@ -145,3 +148,57 @@ async def test_validate_content_error() -> None:
         issue = errors[0].issue
         assert issue is not None
         assert issue[0]["code"] == "invalid"
+
+
+@pytest.mark.asyncio
+async def test_merge_resources_from_files_async(tmp_path: Path) -> None:
+    """Test merge_resources_from_files_async batches NDJSON by resource type and fixes resources."""
+    path = tmp_path / "resources.ndjson"
+    path.write_text(
+        "\n".join(
+            [
+                json.dumps({"resourceType": "Patient", "id": "1"}),
+                json.dumps({"resourceType": "Observation", "id": "2"}),
+                json.dumps({"resourceType": "Patient", "id": "3"}),
+            ]
+        )
+    )
+    fhir_client = FhirClient().url("http://example.com")
+    sent_payloads: list[Any] = []
+
+    def record_payload(url: Any, **kwargs: Any) -> None:
+        sent_payloads.append(json.loads(kwargs["data"]))
+
+    with aioresponses() as m:
+        m.post(
+            "http://example.com/Patient/1/$merge",
+            status=200,
+            payload=[{"resourceType": "Patient", "id": "1", "created": True}, {"resourceType": "Patient", "id": "3"}],
+            callback=record_payload,
+        )
+        m.post(
+            "http://example.com/Observation/1/$merge",
+            status=200,
+            payload={"resourceType": "Observation", "id": "2", "created": True},
+            callback=record_payload,
+        )
+
+        responses: list[FhirMergeResourceResponse] = [
+            response
+            async for response in fhir_client.merge_resources_from_files_async(
+                paths=[path],
+                fixer=FhirBundleFixer(meta_source="http://example.org", owner="bwell"),
+                max_concurrent_batches=2,
+            )
+        ]
+
+    assert sorted(r.url for r in responses) == [
+        "http://example.com/Observation/1/$merge",
+        "http://example.com/Patient/1/$merge",
+    ]
+    assert all(r.status == 200 for r in responses)
+    assert sum(len(r.responses) for r in responses) == 3
+    # both Patients were sent together in one batch and the fixer was applied
+    patient_payload = next(p for p in sent_payloads if isinstance(p, list))
+    assert [r["id"] for r in patient_payload] == ["1", "3"]
+    assert all(r["meta"]["source"] == "http://example.org" for r in patient_payload)
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import logging
+import re
+from typing import Any
+
+import aiohttp
+import pytest
+from aioresponses import CallbackResult, aioresponses
+from compressedfhir.fhir.fhir_resource import FhirResource
+from compressedfhir.fhir.fhir_resource_list import FhirResourceList
+
+from helix_fhir_client_sdk.fhir_client import FhirClient
+from helix_fhir_client_sdk.responses.fhir_update_response import FhirUpdateResponse
+
+
+class TestFhirUpdateMixin:
+    @pytest.fixture
+    def fhir_client(self) -> FhirClient:
+        client = FhirClient()
+        client._url = "https://example.com"
+        client._resource = "Patient"
+        client._internal_logger = logging.getLogger("FhirClient")
+        client._access_token = "fake_token"
+        return client
+
+    @staticmethod
+    def patients(count: int) -> FhirResourceList:
+        return FhirResourceList([FhirResource({"resourceType": "Patient", "id": str(i)}) for i in range(count)])
+
+    async def test_update_async_with_explicit_id(self, fhir_client: FhirClient) -> None:
+        async with aiohttp.ClientSession() as session:
+            with aioresponses() as m:
+                fhir_client.create_http_session = lambda: session  # type: ignore[method-assign]
+                m.put("https://example.com/Patient/1", status=200, payload={"id": "1"})
+
+                response: FhirUpdateResponse = await fhir_client.update_async(
+                    id_="1", json_data=json.dumps({"resourceType": "Patient", "id": "1"})
+                )
+
+                assert response.status == 200
+                assert response.error is None
+                assert response.url == "https://example.com/Patient/1"
+
+    async def test_update_resources_async_concurrently(self, fhir_client: FhirClient) -> None:
+        async with aiohttp.ClientSession() as session:
+            with aioresponses() as m:
+                fhir_client.create_http_session = lambda: session  # type: ignore[method-assign]
+                for i in range(5):
+                    m.put(f"https://example.com/Patient/{i}", status=200, payload={"id": str(i)})
+
+                responses: list[FhirUpdateResponse] = [
+                    r
+                    async for r in fhir_client.update_resources_async(
+                        resources=self.patients(5), max_concurrent_requests=3
+                    )
+                ]
+
+                assert sorted(r.url for r in responses) == [f"https://example.com/Patient/{i}" for i in range(5)]
+                assert all(r.status == 200 for r in responses)
+
+    async def test_update_resources_async_is_sequential_unless_asked(self, fhir_client: FhirClient) -> None:
+        fhir_client._max_concurrent_requests = 5
+
+        async def respond(url: Any, **kwargs: Any) -> CallbackResult:
+            # the first PUT answers last so out of order yields would show
+            id_: str = str(url).rsplit("/", 1)[-1]
+            await asyncio.sleep(0.05 if id_ == "0" else 0)
+            return CallbackResult(status=200, payload={"id": id_})
+
+        async with aiohttp.ClientSession() as session:
+            with aioresponses() as m:
+                fhir_client.create_http_session = lambda: session  # type: ignore[method-assign]
+                m.put(re.compile(r"https://example\.com/Patient/.*"), callback=respond, repeat=True)
+
+                responses: list[FhirUpdateResponse] = [
+                    r async for r in fhir_client.update_resources_async(resources=self.patients(3))
+                ]
+
+                assert [r.url for r in responses] == [f"https://example.com/Patient/{i}" for i in range(3)]
+
+    async def test_update_resources_async_as_transaction_bundle(self, fhir_client: FhirClient) -> None:
+        posted_bundles: list[dict[str, Any]] = []
+
+        def callback(url: Any, **kwargs: Any) -> CallbackResult:
+            bundle: dict[str, Any] = json.loads(kwargs["data"])
+            posted_bundles.append(bundle)
+            return CallbackResult(
+                status=200,
+                payload={
+                    "resourceType": "Bundle",
+                    "type": "transaction-response",
+                    "entry": [{"response": {"status": "200 OK"}} for _ in bundle["entry"]],
+                },
+            )
+
+        async with aiohttp.ClientSession() as session:
+            with aioresponses() as m:
+                fhir_client.create_http_session = lambda: session  # type: ignore[method-assign]
+                m.post("https://example.com", callback=callback, repeat=True)
+
+                responses: list[FhirUpdateResponse] = [
+                    r
+                    async for r in fhir_client.update_resources_async(
+                        resources=self.patients(5), bundle_type="transaction", bundle_size=2
+                    )
+                ]
+
+                assert len(responses) == 5
+                assert all(r.status == 200 and r.error is None for r in responses)
+                assert [len(b["entry"]) for b in posted_bundles] == [2, 2, 1]
+                assert posted_bundles[0]["type"] == "transaction"
+                assert posted_bundles[0]["entry"][1]["request"] == {"method": "PUT", "url": "Patient/1"}
+
+    async def test_update_resources_async_as_batch_bundle_raises_on_entry_error(self, fhir_client: FhirClient) -> None:
+        async with aiohttp.ClientSession() as session:
+            with aioresponses() as m:
+                fhir_client.create_http_session = lambda: session  # type: ignore[method-assign]
+                m.post(
+                    "https://example.com",
+                    status=200,
+                    payload={
+                        "resourceType": "Bundle",
+                        "type": "batch-response",
+                        "entry": [{"response": {"status": "201 Created"}}, {"response": {"status": "400 Bad Request"}}],
+                    },
+                )
+
+                with pytest.raises(ValueError, match="400"):
+                    async for _ in fhir_client.update_resources_async(resources=self.patients(2), bundle_type="batch"):
+                        pass
@@ -1,6 +1,7 @@
 import asyncio
 from asyncio import Task
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterable, AsyncIterator, Iterable, Iterator, Sized
+from contextlib import suppress
 from dataclasses import dataclass
 from typing import (
     Any,
@@ -8,6 +9,8 @@ from typing import (
     runtime_checkable,
 )
 
+from helix_fhir_client_sdk.utilities.host_resilience.adaptive_concurrency_limiter import AdaptiveConcurrencyLimiter
+
 
 @dataclass(slots=True)
 class ParallelFunctionContext:
@@ -24,8 +27,8 @@ class ParallelFunctionContext:
     """ index of the task """
     task_index: int
 
-    """ total number of tasks """
-    total_task_count: int
+    """ total number of tasks (None when the rows are streamed and their number is not known) """
+    total_task_count: int | None
 
 
 @runtime_checkable
@@ -55,6 +58,7 @@ class AsyncParallelProcessor:
         *,
         name: str,
         max_concurrent_tasks: int | None = None,
+        concurrency_limiter: AdaptiveConcurrencyLimiter | None = None,
     ) -> None:
         """
         This class is used to process rows in parallel
@@ -62,9 +66,14 @@ class AsyncParallelProcessor:
         :param name: name of the processor
         :param max_concurrent_tasks: maximum number of concurrent tasks. If None, there is no limit.
                                     If 1 then the tasks are processed sequentially else they are processed in parallel
+        :param concurrency_limiter: limits the concurrent tasks with a limit that adapts to how long they take and
+                                    whether they fail.  Used instead of max_concurrent_tasks when set.  Do not pass
+                                    the limiter the requests made by the tasks use: a task would hold a slot while its
+                                    requests wait for another.
         """
         self.name: str = name
         self.max_concurrent_tasks: int | None = max_concurrent_tasks
+        self.concurrency_limiter: AdaptiveConcurrencyLimiter | None = concurrency_limiter
         self.semaphore: asyncio.Semaphore | None = (
             asyncio.Semaphore(max_concurrent_tasks) if max_concurrent_tasks else None
         )
@@ -93,7 +102,7 @@ class AsyncParallelProcessor:
         :return: results of processing
         """
 
-        if self.max_concurrent_tasks == 1:
+        if self.max_concurrent_tasks == 1 and self.concurrency_limiter is None:
             for i, row in enumerate(rows):
                 yield await process_row_fn(
                     context=ParallelFunctionContext(
@@ -108,67 +117,180 @@ class AsyncParallelProcessor:
                 )
             return
 
-        # noinspection PyShadowingNames
-        async def process_with_semaphore_async(
-            *, name: str, row1: TInput, task_index: int, total_task_count: int
-        ) -> TOutput:
-            if self.semaphore is None:
-                return await process_row_fn(
+        async for result in self.process_stream_in_parallel(
+            rows=rows,
+            process_row_fn=process_row_fn,
+            parameters=parameters,
+            log_level=log_level,
+            **kwargs,
+        ):
+            yield result
+
+    async def process_stream_in_parallel[
+        TInput,
+        TOutput,
+        TParameters: dict[str, Any] | object,
+    ](
+        self,
+        *,
+        rows: Iterable[TInput] | AsyncIterable[TInput],
+        process_row_fn: ParallelFunction[TInput, TOutput, TParameters],
+        parameters: TParameters | None,
+        ordered: bool = False,
+        log_level: str | None = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[TOutput, None]:
+        """
+        Calls the process_row_fn for each row of an iterable or async iterable in parallel and yields the results.
+
+        Rows are only read from rows when there is room for another task, so at most max_concurrent_tasks tasks
+        (the max_limit of the concurrency_limiter when one is set) exist at any time and the rows do not all have to
+        be in memory.  When neither is set, a task is created for every row as soon as it is read.
+
+        If process_row_fn raises, the exception is raised to the caller after the other tasks are cancelled.  If the
+        caller stops early (or is cancelled), the tasks still running are cancelled too.
+
+        :param rows: rows to process
+        :param process_row_fn: function to process each row
+        :param parameters: parameters to pass to the process_row_fn
+        :param ordered: yield the results in the order of the rows instead of as they complete.  Results that
+                        complete early wait for the ones before them and count towards max_concurrent_tasks.
+        :param log_level: log level
+        :param kwargs: additional parameters
+        :return: results of processing
+        """
+        max_tasks: int | None = (
+            self.concurrency_limiter.max_limit if self.concurrency_limiter is not None else self.max_concurrent_tasks
+        )
+        total_task_count: int | None = len(rows) if isinstance(rows, Sized) else None
+        sync_rows: Iterator[TInput] | None = iter(rows) if isinstance(rows, Iterable) else None
+        async_rows: AsyncIterator[TInput] | None = aiter(rows) if isinstance(rows, AsyncIterable) else None
+        rows_exhausted: bool = False
+        next_row_task: Task[TInput] | None = None
+        pending: dict[Task[TOutput], int] = {}
+        """ running tasks and the index of their row """
+        completed: dict[int, TOutput] = {}
+        """ results waiting for the results of the rows before them (ordered only) """
+        next_index_to_yield: int = 0
+        task_index: int = 0
+
+        def create_task(row: TInput) -> None:
+            nonlocal task_index
+            task: Task[TOutput] = asyncio.create_task(
+                self._process_row_async(
+                    process_row_fn=process_row_fn,
                     context=ParallelFunctionContext(
-                        name=name,
+                        name=self.name,
                         log_level=log_level,
                         task_index=task_index,
                         total_task_count=total_task_count,
                     ),
-                    row=row1,
+                    row=row,
                     parameters=parameters,
                     additional_parameters=kwargs,
-                )
-            else:
-                async with self.semaphore:
-                    return await process_row_fn(
-                        context=ParallelFunctionContext(
-                            name=name,
-                            log_level=log_level,
-                            task_index=task_index,
-                            total_task_count=total_task_count,
-                        ),
-                        row=row1,
-                        parameters=parameters,
-                        additional_parameters=kwargs,
-                    )
-
-        total_task_count: int = len(rows)
-
-        # Create all tasks at once with their indices
-        pending: set[Task[TOutput]] = {
-            asyncio.create_task(
-                process_with_semaphore_async(
-                    name=self.name,
-                    row1=row,
-                    task_index=i,
-                    total_task_count=total_task_count,
                 ),
-                name=f"task_{i}",  # Optionally set task name for easier debugging
+                name=f"task_{task_index}",  # Optionally set task name for easier debugging
             )
-            for i, row in enumerate(rows)
-        }
+            pending[task] = task_index
+            task_index += 1
+
+        async def read_next_row_async() -> TInput:
+            assert async_rows is not None
+            return await anext(async_rows)
+
+        def has_room() -> bool:
+            return max_tasks is None or len(pending) + len(completed) < max_tasks
 
         try:
-            while pending:
-                done: set[Task[TOutput]]
-                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            while True:
+                if not rows_exhausted and has_room():
+                    if sync_rows is not None:
+                        while has_room():
+                            try:
+                                create_task(next(sync_rows))
+                            except StopIteration:
+                                rows_exhausted = True
+                                break
+                    elif next_row_task is None:
+                        # read the next row in a task so results are yielded while the source is slow
+                        next_row_task = asyncio.create_task(read_next_row_async())
+                if not pending and next_row_task is None:
+                    break
+
+                waiting_for: set[asyncio.Future[Any]] = set(pending)
+                if next_row_task is not None:
+                    waiting_for.add(next_row_task)
+                done: set[asyncio.Future[Any]]
+                done, _ = await asyncio.wait(waiting_for, return_when=asyncio.FIRST_COMPLETED)
 
-                # Process completed tasks
-                for task in done:
+                if next_row_task is not None and next_row_task in done:
                     try:
-                        yield await task
-                    except Exception:
-                        # Handle or re-raise error
-                        # logger.error(f"Error processing row: {e}")
-                        raise
+                        create_task(next_row_task.result())
+                    except StopAsyncIteration:
+                        rows_exhausted = True
+                    finally:
+                        next_row_task = None
 
+                # Process completed tasks (in row order so ordered output needs fewer passes)
+                for task in sorted((t for t in pending if t in done), key=pending.__getitem__):
+                    index: int = pending.pop(task)
+                    result: TOutput = task.result()
+                    if not ordered:
+                        yield result
+                        continue
+                    completed[index] = result
+                    while next_index_to_yield in completed:
+                        yield completed.pop(next_index_to_yield)
+                        next_index_to_yield += 1
         finally:
-            # Cancel any pending tasks if something goes wrong
-            for task in pending:
-                task.cancel()
+            # Cancel any pending tasks if something goes wrong or the caller stopped early
+            unfinished: list[Task[Any]] = [*pending, *([next_row_task] if next_row_task is not None else [])]
+            for task in unfinished:
+                if task.done():
+                    if not task.cancelled():
+                        # retrieve the exception so it is not logged as never retrieved
+                        task.exception()
+                else:
+                    task.cancel()
+            with suppress(asyncio.CancelledError):
+                await asyncio.gather(*unfinished, return_exceptions=True)
+            if not rows_exhausted and isinstance(async_rows, AsyncGenerator):
+                await async_rows.aclose()
+
+    async def _process_row_async[
+        TInput,
+        TOutput,
+        TParameters: dict[str, Any] | object,
+    ](
+        self,
+        *,
+        process_row_fn: ParallelFunction[TInput, TOutput, TParameters],
+        context: ParallelFunctionContext,
+        row: TInput,
+        parameters: TParameters | None,
+        additional_parameters: dict[str, Any] | None,
+    ) -> TOutput:
+        """
+        Calls process_row_fn once there is a free slot in the concurrency_limiter or semaphore
+        """
+        if self.concurrency_limiter is not None:
+            acquired_at: float = await self.concurrency_limiter.acquire_async()
+            failed: bool = False
+            try:
+                return await process_row_fn(
+                    context=context, row=row, parameters=parameters, additional_parameters=additional_parameters
+                )
+            except Exception:
+                failed = True
+                raise
+            finally:
+                self.concurrency_limiter.release(acquired_at=acquired_at, overloaded=failed)
+        elif self.semaphore is None:
+            return await process_row_fn(
+                context=context, row=row, parameters=parameters, additional_parameters=additional_parameters
+            )
+        else:
+            async with self.semaphore:
+                return await process_row_fn(
+                    context=context, row=row, parameters=parameters, additional_parameters=additional_parameters
+                )
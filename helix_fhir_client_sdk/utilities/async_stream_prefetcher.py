@@ -0,0 +1,130 @@
+import asyncio
+from collections.abc import AsyncGenerator, AsyncIterator, Iterable
+from contextlib import suppress
+
+
+class _StreamEnd:
+    """
+    Put in the queue when the source is exhausted
+    """
+
+    __slots__ = ["exception"]
+
+    def __init__(self, exception: BaseException | None) -> None:
+        self.exception: BaseException | None = exception
+
+
+class AsyncStreamPrefetcher:
+    """
+    Reads an async iterator in a background task into a bounded queue so the producer (e.g., reading from the
+    network) keeps running while the consumer is busy.  When the queue is full the producer waits, so memory stays
+    bounded and a slow consumer slows down the producer instead of letting data pile up.
+    """
+
+    @staticmethod
+    async def prefetch_async[T](
+        source: AsyncIterator[T],
+        *,
+        max_queue_size: int,
+    ) -> AsyncGenerator[T, None]:
+        """
+        Yields the items of source in order while a background task reads up to max_queue_size items ahead
+
+        An exception raised by the source is raised to the consumer after the items read before it.  If the consumer
+        stops early, the background task is cancelled and the source is closed.
+
+        :param source: async iterator to read
+        :param max_queue_size: maximum number of items read ahead of the consumer
+        :return: the items of source
+        """
+        assert max_queue_size > 0, "max_queue_size must be greater than 0"
+        queue: asyncio.Queue[T | _StreamEnd] = asyncio.Queue(maxsize=max_queue_size)
+
+        async def produce() -> None:
+            try:
+                async for item in source:
+                    await queue.put(item)
+            except Exception as e:
+                await queue.put(_StreamEnd(e))
+            else:
+                await queue.put(_StreamEnd(None))
+            finally:
+                if isinstance(source, AsyncGenerator):
+                    await source.aclose()
+
+        producer: asyncio.Task[None] = asyncio.create_task(produce())
+        try:
+            while True:
+                item: T | _StreamEnd = await queue.get()
+                if isinstance(item, _StreamEnd):
+                    if item.exception is not None:
+                        raise item.exception
+                    break
+                yield item
+        finally:
+            if not producer.done():
+                producer.cancel()
+            with suppress(asyncio.CancelledError):
+                await producer
+
+    @staticmethod
+    async def merge_async[T](
+        sources: Iterable[AsyncIterator[T]],
+        *,
+        max_queue_size: int,
+        max_concurrent_sources: int | None = None,
+    ) -> AsyncGenerator[T, None]:
+        """
+        Yields the items of several sources as they arrive while background tasks read up to max_concurrent_sources
+        of the sources at the same time into one bounded queue
+
+        Items of a source are yielded in order but items of different sources are interleaved.  An exception raised by
+        a source is raised to the consumer and the other sources are cancelled.  If the consumer stops early, the
+        background tasks are cancelled and the sources are closed.
+
+        :param sources: async iterators to read
+        :param max_queue_size: maximum number of items read ahead of the consumer
+        :param max_concurrent_sources: maximum number of sources read at the same time.  If None all the sources are
+                                       read at the same time.
+        :return: the items of the sources
+        """
+        assert max_queue_size > 0, "max_queue_size must be greater than 0"
+        assert max_concurrent_sources is None or max_concurrent_sources > 0, (
+            "max_concurrent_sources must be greater than 0"
+        )
+        source_list: list[AsyncIterator[T]] = list(sources)
+        if not source_list:
+            return
+        queue: asyncio.Queue[T | _StreamEnd] = asyncio.Queue(maxsize=max_queue_size)
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(max_concurrent_sources or len(source_list))
+
+        async def produce(source: AsyncIterator[T]) -> None:
+            try:
+                async with semaphore:
+                    async for item in source:
+                        await queue.put(item)
+            except Exception as e:
+                await queue.put(_StreamEnd(e))
+            else:
+                await queue.put(_StreamEnd(None))
+            finally:
+                if isinstance(source, AsyncGenerator):
+                    await source.aclose()
+
+        producers: list[asyncio.Task[None]] = [asyncio.create_task(produce(source)) for source in source_list]
+        try:
+            remaining: int = len(producers)
+            while remaining:
+                item: T | _StreamEnd = await queue.get()
+                if isinstance(item, _StreamEnd):
+                    if item.exception is not None:
+                        raise item.exception
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            for producer in producers:
+                if not producer.done():
+                    producer.cancel()
+            with suppress(asyncio.CancelledError):
+                await asyncio.gather(*producers)
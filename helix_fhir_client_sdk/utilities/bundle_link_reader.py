@@ -0,0 +1,175 @@
+import json
+import re
+from typing import Any
+
+# a JSON string (possibly cut off by the end of the buffer) or one of the structural characters.  Numbers, literals
+# and whitespace are skipped since only the nesting and the keys matter.
+_TOKEN_PATTERN: re.Pattern[bytes] = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*("?)|[{}\[\]:,]')
+_LINK_KEY: bytes = b'"link"'
+_ENTRY_KEY: bytes = b'"entry"'
+
+_LOOKING_FOR_KEY: int = 0
+_FOUND_LINK_KEY: int = 1
+_FOUND_LINK_COLON: int = 2
+_READING_LINK: int = 3
+_FOUND_ENTRY_KEY: int = 4
+_SKIPPING_ENTRIES: int = 5
+_DONE: int = 6
+
+
+class BundleLinkReader:
+    """
+    Finds the next url of a Bundle page from the raw bytes of the page without parsing the rest of the page.
+
+    The bytes are fed in the chunks they are received in.  Until the entries start, the reader tokenizes just enough
+    of the JSON to track the nesting, so it only picks up the top level "link" element of the Bundle (resources have
+    "link" elements too) and parses that element alone.  Most servers send the links before the entries so the rest of
+    the page is not looked at.  Once the entries start, tokenizing them would cost more than parsing the page, so the
+    reader only keeps the last tail_size_in_bytes bytes and looks for the link element after the entries in them.
+    """
+
+    __slots__ = ["tail_size_in_bytes", "_buffer", "_depth", "_state", "_link_start", "_links"]
+
+    def __init__(self, *, tail_size_in_bytes: int = 64 * 1024) -> None:
+        """
+        Finds the next url of a Bundle page
+
+        :param tail_size_in_bytes: bytes to keep from the end of the page to find a link element after the entries
+        """
+        self.tail_size_in_bytes: int = tail_size_in_bytes
+
+        self._buffer: bytes = b""
+        """ bytes not processed yet (the start of an unfinished token, the link element so far or the tail) """
+
+        self._depth: int = 0
+        """ nesting depth at the start of the buffer """
+
+        self._state: int = _LOOKING_FOR_KEY
+
+        self._link_start: int | None = None
+        """ offset of the link element in the buffer """
+
+        self._links: list[dict[str, Any]] | None = None
+        """ the parsed link element """
+
+    @property
+    def done(self) -> bool:
+        """True once the link element has been read; the rest of the page does not need to be fed"""
+        return self._state == _DONE
+
+    def feed(self, data: bytes | memoryview) -> None:
+        """
+        Feeds the next chunk of the page
+
+        :param data: chunk of bytes
+        """
+        if self._state == _DONE:
+            return
+        if self._state == _SKIPPING_ENTRIES:
+            self._buffer = (self._buffer + bytes(data))[-self.tail_size_in_bytes :]
+            return
+
+        buffer: bytes = self._buffer + bytes(data) if self._buffer else bytes(data)
+        position: int = 0
+        depth: int = self._depth
+        state: int = self._state
+        for match in _TOKEN_PATTERN.finditer(buffer):
+            token: bytes = match.group()
+            if token[0] == 0x22:  # '"'
+                if not match.group(1):
+                    # the string continues in the next chunk
+                    break
+                if depth == 1 and state == _LOOKING_FOR_KEY and token == _LINK_KEY:
+                    state = _FOUND_LINK_KEY
+                elif depth == 1 and state == _LOOKING_FOR_KEY and token == _ENTRY_KEY:
+                    state = _FOUND_ENTRY_KEY
+                elif state != _READING_LINK:
+                    state = _LOOKING_FOR_KEY
+            elif token == b":":
+                if state == _FOUND_LINK_KEY:
+                    state = _FOUND_LINK_COLON
+                elif state == _FOUND_ENTRY_KEY:
+                    self._state = _SKIPPING_ENTRIES
+                    self._buffer = buffer[match.end() :][-self.tail_size_in_bytes :]
+                    return
+                elif state != _READING_LINK:
+                    state = _LOOKING_FOR_KEY
+            elif token in (b"{", b"["):
+                if state == _FOUND_LINK_COLON:
+                    state = _READING_LINK
+                    self._link_start = match.start()
+                elif state != _READING_LINK:
+                    state = _LOOKING_FOR_KEY
+                depth += 1
+            elif token in (b"}", b"]"):
+                depth -= 1
+                if state == _READING_LINK and depth == 1:
+                    assert self._link_start is not None
+                    self._set_links(json.loads(buffer[self._link_start : match.end()]))
+                    return
+            elif state != _READING_LINK:
+                state = _LOOKING_FOR_KEY
+            position = match.end()
+
+        if state == _READING_LINK:
+            # keep the whole link element until it is complete.  Its tokens are read again with the next chunk.
+            assert self._link_start is not None
+            self._buffer = buffer[self._link_start :]
+            self._link_start = 0
+            self._depth = 1
+            self._state = _FOUND_LINK_COLON
+        else:
+            self._buffer = buffer[position:]
+            self._depth = depth
+            self._state = state
+
+    def _set_links(self, links: Any) -> None:
+        self._links = links if isinstance(links, list) else []
+        self._state = _DONE
+        self._buffer = b""
+
+    def _find_links_in_tail(self) -> None:
+        """
+        Looks for the top level link element in the bytes kept from the end of the page.  A link element of a
+        resource is followed by the closing brackets of the entries, so only the top level one parses as the rest of
+        the Bundle.
+        """
+        tail: bytes = self._buffer
+        position: int = tail.rfind(_LINK_KEY)
+        while position >= 0:
+            try:
+                rest_of_bundle: Any = json.loads(b"{" + tail[position:])
+            except ValueError:
+                pass
+            else:
+                self._set_links(rest_of_bundle.get("link"))
+                return
+            position = tail.rfind(_LINK_KEY, 0, position)
+        self._set_links(None)
+
+    def get_next_url(self) -> str | None:
+        """
+        Returns the url of the "next" link of the Bundle.  Call it after the whole page has been fed, unless done is
+        True.
+
+        :return: next url or None if the page has no next link
+        """
+        if self._state == _SKIPPING_ENTRIES:
+            self._find_links_in_tail()
+        for link in self._links or []:
+            if isinstance(link, dict) and link.get("relation") == "next":
+                url: Any = link.get("url")
+                return url if isinstance(url, str) else None
+        return None
+
+    @staticmethod
+    def read_next_url(data: bytes) -> str | None:
+        """
+        Returns the url of the "next" link of a complete Bundle page
+
+        :param data: bytes of the page
+        :return: next url or None if the page has no next link
+        """
+        reader: BundleLinkReader = BundleLinkReader()
+        reader.feed(data)
+        return reader.get_next_url()
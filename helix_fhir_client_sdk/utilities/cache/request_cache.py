@@ -5,6 +5,7 @@ from typing import Any
 
 from compressedfhir.fhir.fhir_bundle_entry import FhirBundleEntry
 
+from helix_fhir_client_sdk.open_telemetry.fhir_client_sdk_metrics import FhirClientSdkMetrics
 from helix_fhir_client_sdk.utilities.cache.request_cache_entry import RequestCacheEntry
 
 
@@ -20,6 +21,7 @@ class RequestCache:
         "cache_misses",
         "_cache",
         "_clear_cache_at_the_end",
+        "_store_bundle_entries",
     ]
 
     def __init__(
@@ -27,11 +29,20 @@ class RequestCache:
         *,
         initial_dict: dict[str, Any] | None = None,
         clear_cache_at_the_end: bool | None = True,
+        store_bundle_entries: bool = True,
     ) -> None:
+        """
+        :param initial_dict: entries to start with
+        :param clear_cache_at_the_end: clear the cache when entering and exiting the context manager
+        :param store_bundle_entries: keep the bundle entry of each request.  If False only the status, dates and hash
+                                     are kept, so the cache stays small when it is only used to skip requests made
+                                     before.
+        """
         self.cache_hits: int = 0
         self.cache_misses: int = 0
         self._cache: dict[str, RequestCacheEntry] = initial_dict or {}
         self._clear_cache_at_the_end: bool | None = clear_cache_at_the_end
+        self._store_bundle_entries: bool = store_bundle_entries
 
     async def __aenter__(self) -> "RequestCache":
         """
@@ -72,6 +83,9 @@ class RequestCache:
 
         cached_entry = self._cache.get(key)
 
+        FhirClientSdkMetrics.get().record_request_cache_lookup(
+            resource_type=resource_type, hit=cached_entry is not None
+        )
         if cached_entry is not None:
             self.cache_hits += 1
             return cached_entry
@@ -110,7 +124,7 @@ class RequestCache:
             id_=resource_id,
             resource_type=resource_type,
             status=status,
-            bundle_entry=bundle_entry,
+            bundle_entry=bundle_entry if self._store_bundle_entries else None,
             last_modified=last_modified,
             etag=etag,
             from_input_cache=from_input_cache,
@@ -131,6 +145,7 @@ class RequestCache:
             return False
 
         del self._cache[resource_key]
+        FhirClientSdkMetrics.get().record_request_cache_evictions(1)
 
         return True
 
@@ -138,6 +153,7 @@ class RequestCache:
         """
         This method clears the cache.
         """
+        FhirClientSdkMetrics.get().record_request_cache_evictions(len(self._cache))
         self._cache.clear()
 
     async def get_entries_async(self) -> AsyncGenerator[RequestCacheEntry, None]:
@@ -1,26 +1,43 @@
 import threading
+from logging import Logger
 from typing import Any
 
+from helix_fhir_client_sdk.dictionary_writer import convert_dict_to_str
+
+_LOCK_TYPE: type = type(threading.Lock())
+
 
 class FhirClientLogger:
     @staticmethod
     def get_variables_to_log(vars_dict: dict[str, Any]) -> dict[str, Any]:
         """
-        Method to return the variables which we need to log
+        Method to return the variables which we need to log.  The values are not copied so this is cheap enough to
+        call when raising an exception, e.g., for FhirSenderException.variables.
 
 
         :param vars_dict: (dict) dictionary of variables names with their values
         :return: (dict) dictionary of variables names with their values
         """
-        variables_to_log = {}
-        for key, value in vars_dict.items():
-            if not value or (
-                not callable(value)
-                and not isinstance(value, type(threading.Lock))
-                and not str(type(value)) == "<class '_thread.lock'>"
-            ):
-                variables_to_log[key] = value
+        variables_to_log = {
+            key: value
+            for key, value in vars_dict.items()
+            if not value or (not callable(value) and not isinstance(value, _LOCK_TYPE))
+        }
         variables_to_log.pop("_access_token", None)
         variables_to_log.pop("_access_token_expiry_date", None)
         variables_to_log.pop("_login_token", None)
         return variables_to_log
+
+    @staticmethod
+    def log_variables(*, logger: Logger, level: int, vars_dict: dict[str, Any]) -> None:
+        """
+        Logs the variables as "parameters: ..." at level.  Building the text walks all the attributes of the client and
+        this is called on every request, so it is only done when logger is enabled for level.
+
+
+        :param logger: logger to log to
+        :param level: (int) logging level e.g., logging.DEBUG
+        :param vars_dict: (dict) dictionary of variables names with their values
+        """
+        if logger.isEnabledFor(level):
+            logger.log(level, f"parameters: {convert_dict_to_str(FhirClientLogger.get_variables_to_log(vars_dict))}")
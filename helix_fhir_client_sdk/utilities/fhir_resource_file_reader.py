@@ -0,0 +1,194 @@
+import asyncio
+import dataclasses
+import gzip
+import json
+from collections.abc import AsyncGenerator, Callable
+from pathlib import Path
+from typing import IO, Any, cast
+
+
+@dataclasses.dataclass(slots=True)
+class FhirResourceFileBatch:
+    """
+    A batch of resources of a single resource type read from one or more files
+    """
+
+    resource_type: str
+    """ resource type of every resource in the batch """
+
+    resources: list[dict[str, Any]]
+    """ resources in the batch """
+
+    size_in_bytes: int
+    """ approximate serialized size of the resources in the batch """
+
+
+class FhirResourceFileReader:
+    """
+    Reads FHIR resources incrementally from NDJSON or JSON files (optionally gzipped) and groups them into
+    batches by resource type and size.
+
+    NDJSON files (.ndjson, .jsonl or any other extension) are read a block of lines at a time so memory is bounded
+    by the batch size and not by the file size.  JSON files (.json) hold a single document (Bundle, list of resources
+    or a single resource) so each one is parsed as a whole; memory is then bounded by the largest single file.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_batch_size_in_bytes: int,
+        max_resources_per_batch: int | None = None,
+        read_block_size_in_bytes: int = 1024 * 1024,
+        fn_fix_payload: Callable[[dict[str, Any]], dict[str, Any]] | None = None,
+    ) -> None:
+        """
+        Reads FHIR resources incrementally from files
+
+
+        :param max_batch_size_in_bytes: a batch is emitted once its resources add up to this many bytes
+        :param max_resources_per_batch: (Optional) a batch is emitted once it has this many resources
+        :param read_block_size_in_bytes: approximate number of bytes of NDJSON lines to read from disk at a time
+        :param fn_fix_payload: (Optional) function applied to each resource (or whole Bundle for JSON files)
+                                before it is batched e.g., FhirBundleFixer
+        """
+        assert max_batch_size_in_bytes > 0, "max_batch_size_in_bytes must be greater than 0"
+        self.max_batch_size_in_bytes: int = max_batch_size_in_bytes
+        self.max_resources_per_batch: int | None = max_resources_per_batch
+        self.read_block_size_in_bytes: int = read_block_size_in_bytes
+        self.fn_fix_payload: Callable[[dict[str, Any]], dict[str, Any]] | None = fn_fix_payload
+        self._pending: dict[str, FhirResourceFileBatch] = {}
+
+    @staticmethod
+    def open_file(path: Path) -> IO[bytes]:
+        """
+        Opens the file for binary reading, decompressing it if it ends with .gz
+
+        :param path: path of the file
+        :return: file object
+        """
+        if path.suffix == ".gz":
+            return cast(IO[bytes], gzip.open(path, "rb"))
+        return path.open("rb")
+
+    @staticmethod
+    def is_ndjson(path: Path) -> bool:
+        """
+        Returns whether the file should be read as NDJSON.  Only .json (or .json.gz) is read as a single document.
+
+        :param path: path of the file
+        :return: True if NDJSON
+        """
+        suffixes: list[str] = [s for s in path.suffixes if s != ".gz"]
+        return not suffixes or suffixes[-1] != ".json"
+
+    @staticmethod
+    def expand_payload(payload: dict[str, Any] | list[Any]) -> list[dict[str, Any]]:
+        """
+        Returns the resources in a Bundle, a list of resources or a single resource
+
+        :param payload: parsed json
+        :return: list of resources
+        """
+        if isinstance(payload, list):
+            return [r for r in payload if isinstance(r, dict)]
+        if payload.get("resourceType") == "Bundle":
+            return [entry["resource"] for entry in payload.get("entry", []) if "resource" in entry]
+        return [payload]
+
+    async def read_batches_async(self, *, paths: list[Path]) -> AsyncGenerator[FhirResourceFileBatch, None]:
+        """
+        Reads the files in order and yields batches of resources as they fill up.  Partially filled batches are
+        yielded at the end.
+
+        :param paths: files to read
+        :return: async generator of batches
+        """
+        for path in paths:
+            if self.is_ndjson(path):
+                async for batch in self._read_ndjson_file_async(path=path):
+                    yield batch
+            else:
+                async for batch in self._read_json_file_async(path=path):
+                    yield batch
+        for batch in list(self._pending.values()):
+            if batch.resources:
+                yield batch
+        self._pending.clear()
+
+    async def _read_ndjson_file_async(self, *, path: Path) -> AsyncGenerator[FhirResourceFileBatch, None]:
+        file: IO[bytes] = await asyncio.to_thread(self.open_file, path)
+        line_number: int = 0
+        try:
+            while True:
+                # read a block of complete lines off the event loop
+                lines: list[bytes] = await asyncio.to_thread(file.readlines, self.read_block_size_in_bytes)
+                if not lines:
+                    break
+                for line in lines:
+                    line_number += 1
+                    line = line.strip()
+                    if not line:
+                        continue
+                    payload: Any = json.loads(line)
+                    if not isinstance(payload, dict):
+                        raise ValueError(
+                            f"{path}, line {line_number}: expected a resource or a Bundle but got"
+                            f" a JSON {type(payload).__name__}"
+                        )
+                    if payload.get("resourceType") == "Bundle":
+                        async for batch in self._add_payload_async(payload=payload, size_in_bytes=None):
+                            yield batch
+                    else:
+                        async for batch in self._add_payload_async(payload=payload, size_in_bytes=len(line)):
+                            yield batch
+        finally:
+            file.close()
+
+    async def _read_json_file_async(self, *, path: Path) -> AsyncGenerator[FhirResourceFileBatch, None]:
+        def load() -> Any:
+            with self.open_file(path) as file:
+                return json.load(file)
+
+        payload: Any = await asyncio.to_thread(load)
+        if not isinstance(payload, dict | list):
+            raise ValueError(
+                f"{path}: expected a Bundle, a list of resources or a resource but got a JSON {type(payload).__name__}"
+            )
+        if isinstance(payload, list):
+            for item in self.expand_payload(payload):
+                async for batch in self._add_payload_async(payload=item, size_in_bytes=None):
+                    yield batch
+        else:
+            async for batch in self._add_payload_async(payload=payload, size_in_bytes=None):
+                yield batch
+
+    async def _add_payload_async(
+        self, *, payload: dict[str, Any], size_in_bytes: int | None
+    ) -> AsyncGenerator[FhirResourceFileBatch, None]:
+        """
+        Fixes the payload (if a fixer was passed), expands it into resources and adds them to the pending batch for
+        their resource type.  Yields any batches that became full.
+        """
+        if self.fn_fix_payload:
+            payload = self.fn_fix_payload(payload)
+            # the fixer may have changed the size
+            size_in_bytes = None
+        resources: list[dict[str, Any]] = self.expand_payload(payload)
+        for resource in resources:
+            resource_size: int = (
+                size_in_bytes
+                if size_in_bytes is not None and len(resources) == 1
+                else len(json.dumps(resource, separators=(",", ":")))
+            )
+            resource_type: str = resource.get("resourceType") or "unknown"
+            batch: FhirResourceFileBatch | None = self._pending.get(resource_type)
+            if batch is None:
+                batch = FhirResourceFileBatch(resource_type=resource_type, resources=[], size_in_bytes=0)
+                self._pending[resource_type] = batch
+            batch.resources.append(resource)
+            batch.size_in_bytes += resource_size
+            if batch.size_in_bytes >= self.max_batch_size_in_bytes or (
+                self.max_resources_per_batch and len(batch.resources) >= self.max_resources_per_batch
+            ):
+                del self._pending[resource_type]
+                yield batch
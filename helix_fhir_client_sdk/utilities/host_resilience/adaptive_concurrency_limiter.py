@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+
+from opentelemetry import trace
+
+from helix_fhir_client_sdk.open_telemetry.attribute_names import FhirClientSdkOpenTelemetryAttributeNames
+from helix_fhir_client_sdk.open_telemetry.event_names import FhirClientSdkOpenTelemetryEventNames
+
+logger = logging.getLogger(__name__)
+
+
+class _Waiter:
+    __slots__ = ["future", "granted"]
+
+    def __init__(self, future: asyncio.Future[None]) -> None:
+        self.future: asyncio.Future[None] = future
+        self.granted: bool = False
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limit on the concurrent requests to a host that adapts to how the host copes with the load (AIMD).
+
+    Each time limit requests complete in time the limit grows by one (additive increase) up to max_limit.  When a
+    request is throttled (429), finds the server unavailable (503), fails or takes longer than
+    target_latency_in_seconds the limit is multiplied by decrease_factor (multiplicative decrease) down to min_limit.
+    Only the first such signal from the requests sent at the current limit lowers it: the requests that were already
+    in flight when the limit was lowered do not lower it again.
+
+    The limiter does not belong to an event loop, so clients running on different loops or threads can share it.
+    """
+
+    __slots__ = [
+        "host",
+        "min_limit",
+        "max_limit",
+        "target_latency_in_seconds",
+        "decrease_factor",
+        "limit",
+        "in_flight",
+        "_successes",
+        "_last_decrease_at",
+        "_waiters",
+        "_lock",
+        "_clock",
+    ]
+
+    overloaded_status_codes: tuple[int, ...] = (429, 503)
+    """ responses that mean the host is overloaded """
+
+    def __init__(
+        self,
+        *,
+        host: str,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        initial_limit: int = 10,
+        target_latency_in_seconds: float | None = None,
+        decrease_factor: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Limit on the concurrent requests to a host that adapts to how the host copes with the load
+
+
+        :param host: host this limiter paces
+        :param min_limit: the limit never goes below this (floor)
+        :param max_limit: the limit never goes above this (ceiling)
+        :param initial_limit: limit to start with
+        :param target_latency_in_seconds: requests slower than this lower the limit.  None to only react to errors.
+        :param decrease_factor: the limit is multiplied by this when the host is overloaded
+        :param clock: function returning the current time in seconds
+        """
+        assert 1 <= min_limit <= max_limit, "min_limit must be at least 1 and at most max_limit"
+        assert 0 < decrease_factor < 1, "decrease_factor must be between 0 and 1"
+        self.host: str = host
+        self.min_limit: int = min_limit
+        self.max_limit: int = max_limit
+        self.target_latency_in_seconds: float | None = target_latency_in_seconds
+        self.decrease_factor: float = decrease_factor
+        self.limit: int = min(max(initial_limit, min_limit), max_limit)
+        """ current number of requests that can be in flight """
+        self.in_flight: int = 0
+        """ requests holding a slot """
+        self._successes: int = 0
+        self._last_decrease_at: float = float("-inf")
+        self._waiters: deque[_Waiter] = deque()
+        self._lock: threading.Lock = threading.Lock()
+        self._clock: Callable[[], float] = clock
+
+    async def acquire_async(self) -> float:
+        """
+        Waits until a request can be sent to the host.  Every call must be followed by a call to release().
+
+        :return: time the slot was acquired, to pass to release()
+        """
+        with self._lock:
+            if self.in_flight < self.limit and not self._waiters:
+                self.in_flight += 1
+                return self._clock()
+            waiter: _Waiter = _Waiter(asyncio.get_running_loop().create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    # the slot was given to this waiter just before it was cancelled so pass it on
+                    self.in_flight -= 1
+                    self._grant_locked()
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            raise
+        return self._clock()
+
+    def release(self, *, acquired_at: float, overloaded: bool) -> None:
+        """
+        Frees the slot of a request and adapts the limit to how the request went
+
+        :param acquired_at: value returned by acquire_async()
+        :param overloaded: whether the host signalled it is overloaded e.g., a 429 or 503 response or a timeout
+        """
+        now: float = self._clock()
+        decreased_to: int | None = None
+        with self._lock:
+            self.in_flight -= 1
+            too_slow: bool = (
+                self.target_latency_in_seconds is not None and now - acquired_at > self.target_latency_in_seconds
+            )
+            if overloaded or too_slow:
+                if acquired_at >= self._last_decrease_at:
+                    self.limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+                    self._last_decrease_at = now
+                    self._successes = 0
+                    decreased_to = self.limit
+            else:
+                self._successes += 1
+                if self._successes >= self.limit:
+                    self._successes = 0
+                    self.limit = min(self.max_limit, self.limit + 1)
+            self._grant_locked()
+        if decreased_to is not None:
+            logger.info(
+                f"Lowering concurrent requests to {self.host} to {decreased_to}"
+                f" since it {'is overloaded' if overloaded else 'is slower than the target latency'}"
+            )
+            trace.get_current_span().add_event(
+                FhirClientSdkOpenTelemetryEventNames.CONCURRENCY_LIMIT_DECREASE,
+                {
+                    FhirClientSdkOpenTelemetryAttributeNames.HOST: self.host,
+                    FhirClientSdkOpenTelemetryAttributeNames.CONCURRENCY_LIMIT: decreased_to,
+                },
+            )
+
+    def _grant_locked(self) -> None:
+        """
+        Gives the free slots to the waiters in the order they arrived.  Must be called with the lock held.
+        """
+        while self._waiters and self.in_flight < self.limit:
+            waiter: _Waiter = self._waiters.popleft()
+            if waiter.future.done():
+                # cancelled while waiting
+                continue
+            waiter.granted = True
+            self.in_flight += 1
+            # the waiter may be on another loop (or thread)
+            waiter.future.get_loop().call_soon_threadsafe(self._wake, waiter.future)
+
+    @staticmethod
+    def _wake(future: asyncio.Future[None]) -> None:
+        if not future.done():
+            future.set_result(None)
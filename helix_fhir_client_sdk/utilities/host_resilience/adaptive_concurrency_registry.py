@@ -0,0 +1,95 @@
+import threading
+import time
+from collections.abc import Callable
+
+from helix_fhir_client_sdk.utilities.host_resilience.adaptive_concurrency_limiter import AdaptiveConcurrencyLimiter
+from helix_fhir_client_sdk.utilities.host_resilience.host_resilience_registry import HostResilienceRegistry
+
+
+class AdaptiveConcurrencyRegistry:
+    """
+    Keeps one AdaptiveConcurrencyLimiter per host so that every FhirClient (and every clone of one) that is given the
+    same registry shares the concurrency limit of a host.
+
+    Pass the registry to FhirClient.adaptive_concurrency().  Use AdaptiveConcurrencyRegistry.default() to share one
+    registry across the whole process.
+    """
+
+    __slots__ = [
+        "min_concurrent_requests",
+        "max_concurrent_requests",
+        "initial_concurrent_requests",
+        "target_latency_in_seconds",
+        "decrease_factor",
+        "_clock",
+        "_limiters",
+        "_lock",
+    ]
+
+    _default: "AdaptiveConcurrencyRegistry | None" = None
+
+    def __init__(
+        self,
+        *,
+        min_concurrent_requests: int = 1,
+        max_concurrent_requests: int = 100,
+        initial_concurrent_requests: int = 10,
+        target_latency_in_seconds: float | None = None,
+        decrease_factor: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Keeps one AdaptiveConcurrencyLimiter per host
+
+
+        :param min_concurrent_requests: the limit of a host never goes below this
+        :param max_concurrent_requests: the limit of a host never goes above this
+        :param initial_concurrent_requests: limit of a host until it adapts
+        :param target_latency_in_seconds: requests slower than this lower the limit.  None to only react to 429s,
+                                            503s and failures.
+        :param decrease_factor: the limit is multiplied by this when the host is overloaded
+        :param clock: function returning the current time in seconds
+        """
+        self.min_concurrent_requests: int = min_concurrent_requests
+        self.max_concurrent_requests: int = max_concurrent_requests
+        self.initial_concurrent_requests: int = initial_concurrent_requests
+        self.target_latency_in_seconds: float | None = target_latency_in_seconds
+        self.decrease_factor: float = decrease_factor
+        self._clock: Callable[[], float] = clock
+        self._limiters: dict[str, AdaptiveConcurrencyLimiter] = {}
+        # clients on different threads (e.g., AsyncRunner) may share the registry
+        self._lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> "AdaptiveConcurrencyRegistry":
+        """
+        Returns the registry shared by the whole process
+        """
+        if cls._default is None:
+            cls._default = AdaptiveConcurrencyRegistry()
+        return cls._default
+
+    def get_limiter(self, *, url: str) -> AdaptiveConcurrencyLimiter:
+        """
+        Returns the limiter for the host of the url, creating it on first use
+
+        :param url: url of the request
+        :return: limiter of the host
+        """
+        host: str = HostResilienceRegistry.get_host(url)
+        limiter: AdaptiveConcurrencyLimiter | None = self._limiters.get(host)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.get(host)
+                if limiter is None:
+                    limiter = AdaptiveConcurrencyLimiter(
+                        host=host,
+                        min_limit=self.min_concurrent_requests,
+                        max_limit=self.max_concurrent_requests,
+                        initial_limit=self.initial_concurrent_requests,
+                        target_latency_in_seconds=self.target_latency_in_seconds,
+                        decrease_factor=self.decrease_factor,
+                        clock=self._clock,
+                    )
+                    self._limiters[host] = limiter
+        return limiter
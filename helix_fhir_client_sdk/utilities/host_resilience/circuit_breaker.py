@@ -0,0 +1,168 @@
+import logging
+import time
+from collections.abc import Callable
+from enum import Enum
+
+from opentelemetry import trace
+
+from helix_fhir_client_sdk.open_telemetry.attribute_names import FhirClientSdkOpenTelemetryAttributeNames
+from helix_fhir_client_sdk.open_telemetry.event_names import FhirClientSdkOpenTelemetryEventNames
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreakerState(Enum):
+    CLOSED = "closed"
+    """ requests are sent normally """
+    OPEN = "open"
+    """ requests fail fast without being sent """
+    HALF_OPEN = "half_open"
+    """ a limited number of trial requests are sent to find out whether the host has recovered """
+
+
+class CircuitBreakerOpenError(Exception):
+    """
+    Raised when a request is not sent because the circuit breaker for the host is open
+    """
+
+    def __init__(self, *, host: str, retry_after_in_seconds: float) -> None:
+        self.host: str = host
+        self.retry_after_in_seconds: float = retry_after_in_seconds
+        super().__init__(f"Circuit breaker is open for {host}; retry after {retry_after_in_seconds:.1f}s")
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+
+    After failure_threshold consecutive failures the breaker opens and requests to the host fail fast.  Once
+    reset_timeout_in_seconds has passed, up to half_open_max_requests trial requests are let through: a success closes
+    the breaker and a failure opens it again.
+
+    State changes are recorded as events on the current OpenTelemetry span and logged.
+    """
+
+    __slots__ = [
+        "host",
+        "failure_threshold",
+        "reset_timeout_in_seconds",
+        "half_open_max_requests",
+        "_state",
+        "_consecutive_failures",
+        "_opened_at",
+        "_half_open_requests",
+        "_clock",
+    ]
+
+    def __init__(
+        self,
+        *,
+        host: str,
+        failure_threshold: int = 20,
+        reset_timeout_in_seconds: float = 30,
+        half_open_max_requests: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Per-host circuit breaker
+
+
+        :param host: host this breaker protects
+        :param failure_threshold: number of consecutive failures that opens the breaker
+        :param reset_timeout_in_seconds: how long the breaker stays open before trial requests are let through
+        :param half_open_max_requests: number of trial requests allowed at the same time while half open
+        :param clock: function returning the current time in seconds
+        """
+        assert failure_threshold > 0, "failure_threshold must be greater than 0"
+        self.host: str = host
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout_in_seconds: float = reset_timeout_in_seconds
+        self.half_open_max_requests: int = half_open_max_requests
+        self._clock: Callable[[], float] = clock
+        self._state: CircuitBreakerState = CircuitBreakerState.CLOSED
+        self._consecutive_failures: int = 0
+        self._opened_at: float = 0
+        self._half_open_requests: int = 0
+
+    @property
+    def state(self) -> CircuitBreakerState:
+        """
+        Current state.  An open breaker whose reset timeout has passed is reported as half open.
+        """
+        if self._state == CircuitBreakerState.OPEN and self.retry_after_in_seconds <= 0:
+            self._transition(CircuitBreakerState.HALF_OPEN)
+        return self._state
+
+    @property
+    def retry_after_in_seconds(self) -> float:
+        """
+        Seconds until an open breaker lets trial requests through
+        """
+        if self._state != CircuitBreakerState.OPEN:
+            return 0
+        return max(0.0, self._opened_at + self.reset_timeout_in_seconds - self._clock())
+
+    def allow_request(self) -> bool:
+        """
+        Returns whether a request can be sent now.  Every allowed request must be followed by a call to
+        record_success() or record_failure().
+
+        :return: True if the request can be sent
+        """
+        state: CircuitBreakerState = self.state
+        if state == CircuitBreakerState.CLOSED:
+            return True
+        if state == CircuitBreakerState.HALF_OPEN and self._half_open_requests < self.half_open_max_requests:
+            self._half_open_requests += 1
+            return True
+        trace.get_current_span().add_event(
+            FhirClientSdkOpenTelemetryEventNames.CIRCUIT_BREAKER_REJECTED,
+            {
+                FhirClientSdkOpenTelemetryAttributeNames.HOST: self.host,
+                FhirClientSdkOpenTelemetryAttributeNames.CIRCUIT_BREAKER_STATE: state.value,
+            },
+        )
+        return False
+
+    def record_success(self) -> None:
+        """
+        Records a request that got a response from the host
+        """
+        self._consecutive_failures = 0
+        if self._state != CircuitBreakerState.CLOSED:
+            self._transition(CircuitBreakerState.CLOSED)
+
+    def record_failure(self) -> None:
+        """
+        Records a request that failed because the host was unhealthy e.g., a timeout or a 5xx response
+        """
+        self._consecutive_failures += 1
+        if self._state == CircuitBreakerState.HALF_OPEN or (
+            self._state == CircuitBreakerState.CLOSED and self._consecutive_failures >= self.failure_threshold
+        ):
+            self._transition(CircuitBreakerState.OPEN)
+
+    def release(self) -> None:
+        """
+        Records an allowed request that ended without an outcome e.g., it was cancelled, so its trial slot is freed
+        """
+        if self._state == CircuitBreakerState.HALF_OPEN and self._half_open_requests > 0:
+            self._half_open_requests -= 1
+
+    def _transition(self, new_state: CircuitBreakerState) -> None:
+        previous_state: CircuitBreakerState = self._state
+        self._state = new_state
+        self._half_open_requests = 0
+        if new_state == CircuitBreakerState.OPEN:
+            self._opened_at = self._clock()
+        elif new_state == CircuitBreakerState.CLOSED:
+            self._consecutive_failures = 0
+        logger.warning(f"Circuit breaker for {self.host} changed from {previous_state.value} to {new_state.value}")
+        trace.get_current_span().add_event(
+            FhirClientSdkOpenTelemetryEventNames.CIRCUIT_BREAKER_STATE_CHANGE,
+            {
+                FhirClientSdkOpenTelemetryAttributeNames.HOST: self.host,
+                FhirClientSdkOpenTelemetryAttributeNames.CIRCUIT_BREAKER_PREVIOUS_STATE: previous_state.value,
+                FhirClientSdkOpenTelemetryAttributeNames.CIRCUIT_BREAKER_STATE: new_state.value,
+            },
+        )
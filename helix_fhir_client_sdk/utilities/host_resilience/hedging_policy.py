@@ -0,0 +1,142 @@
+import math
+import threading
+from collections import deque
+
+
+class _HostLatencies:
+    __slots__ = ["latencies", "hedge_delay_in_seconds", "samples_since_update"]
+
+    def __init__(self, *, window_size: int) -> None:
+        self.latencies: deque[float] = deque(maxlen=window_size)
+        self.hedge_delay_in_seconds: float | None = None
+        """ percentile of latencies when it was last computed.  None until there are enough samples. """
+        self.samples_since_update: int = 0
+
+
+class HedgingPolicy:
+    """
+    Decides when a GET that has not returned yet is sent a second time (a hedge) to cut the tail latency of a host.
+
+    The hedge is sent once the first attempt has taken longer than the given percentile of the recent latencies of
+    the host.  The first response wins and the other attempt is cancelled.  Hedges are paid for by a budget shared by
+    every request that uses the policy: each request adds max_hedge_ratio of a token (up to max_hedge_burst) and each
+    hedge takes one, so at most that share of the requests is sent twice and a slow host does not get twice the load.
+
+    Pass the policy to FhirClient.hedge_requests().  The policy is thread-safe so clients on different threads can
+    share it.
+    """
+
+    __slots__ = [
+        "percentile",
+        "min_delay_in_seconds",
+        "max_delay_in_seconds",
+        "min_samples",
+        "window_size",
+        "max_hedge_ratio",
+        "max_hedge_burst",
+        "_tokens",
+        "_hosts",
+        "_lock",
+    ]
+
+    def __init__(
+        self,
+        *,
+        percentile: float = 0.95,
+        min_delay_in_seconds: float = 0.05,
+        max_delay_in_seconds: float | None = None,
+        min_samples: int = 20,
+        window_size: int = 1000,
+        max_hedge_ratio: float = 0.05,
+        max_hedge_burst: float = 10,
+    ) -> None:
+        """
+        Decides when a GET that has not returned yet is sent a second time
+
+
+        :param percentile: a hedge is sent once the request has taken longer than this percentile (0 to 1) of the
+                            recent latencies of the host
+        :param min_delay_in_seconds: a hedge is never sent sooner than this
+        :param max_delay_in_seconds: (Optional) a hedge is always sent by this time if the budget allows it
+        :param min_samples: no hedge is sent to a host until this many of its requests completed
+        :param window_size: number of recent latencies kept per host
+        :param max_hedge_ratio: share of the requests that can be hedged
+        :param max_hedge_burst: largest number of hedges that can be sent in a row
+        """
+        assert 0 < percentile < 1, "percentile must be between 0 and 1"
+        assert 0 < max_hedge_ratio <= 1, "max_hedge_ratio must be greater than 0 and at most 1"
+        assert min_samples >= 1, "min_samples must be at least 1"
+        self.percentile: float = percentile
+        self.min_delay_in_seconds: float = min_delay_in_seconds
+        self.max_delay_in_seconds: float | None = max_delay_in_seconds
+        self.min_samples: int = min_samples
+        self.window_size: int = max(window_size, min_samples)
+        self.max_hedge_ratio: float = max_hedge_ratio
+        self.max_hedge_burst: float = max_hedge_burst
+        self._tokens: float = 0
+        self._hosts: dict[str, _HostLatencies] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        """
+        Number of hedges that can be sent right now
+        """
+        return self._tokens
+
+    def get_hedge_delay_in_seconds(self, *, host: str) -> float | None:
+        """
+        Returns how long to wait for a request to the host before hedging it and adds the share of the request to the
+        hedge budget
+
+        :param host: host of the request
+        :return: delay, or None if the host does not have enough latencies yet
+        """
+        with self._lock:
+            self._tokens = min(self.max_hedge_burst, self._tokens + self.max_hedge_ratio)
+            host_latencies: _HostLatencies | None = self._hosts.get(host)
+            if host_latencies is None or host_latencies.hedge_delay_in_seconds is None:
+                return None
+            return host_latencies.hedge_delay_in_seconds
+
+    def try_acquire_hedge(self) -> bool:
+        """
+        Takes a hedge from the budget if one is available
+
+        :return: True if the hedge can be sent
+        """
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def record_latency(self, *, host: str, latency_in_seconds: float) -> None:
+        """
+        Records how long a request to the host took
+
+        :param host: host of the request
+        :param latency_in_seconds: time from sending the request to receiving the response
+        """
+        with self._lock:
+            host_latencies: _HostLatencies | None = self._hosts.get(host)
+            if host_latencies is None:
+                host_latencies = _HostLatencies(window_size=self.window_size)
+                self._hosts[host] = host_latencies
+            host_latencies.latencies.append(latency_in_seconds)
+            host_latencies.samples_since_update += 1
+            if len(host_latencies.latencies) < self.min_samples:
+                return
+            # sorting the window on every request would cost more than the requests being hedged save, so the
+            # percentile is refreshed every tenth of a window
+            if (
+                host_latencies.hedge_delay_in_seconds is None
+                or host_latencies.samples_since_update * 10 >= self.window_size
+            ):
+                latencies: list[float] = sorted(host_latencies.latencies)
+                delay: float = latencies[min(len(latencies) - 1, math.ceil(self.percentile * len(latencies)) - 1)]
+                delay = max(delay, self.min_delay_in_seconds)
+                if self.max_delay_in_seconds is not None:
+                    delay = min(delay, self.max_delay_in_seconds)
+                host_latencies.hedge_delay_in_seconds = delay
+                host_latencies.samples_since_update = 0
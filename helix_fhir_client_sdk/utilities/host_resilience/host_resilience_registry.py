@@ -0,0 +1,130 @@
+import threading
+import time
+from collections.abc import Callable
+from urllib.parse import urlparse
+
+from helix_fhir_client_sdk.utilities.host_resilience.circuit_breaker import CircuitBreaker
+from helix_fhir_client_sdk.utilities.host_resilience.rate_governor import RateGovernor
+from helix_fhir_client_sdk.utilities.host_resilience.retry_budget import RetryBudget
+
+
+class HostResilienceState:
+    """
+    Retry budget, circuit breaker and 429 rate governor shared by all the requests to one host
+    """
+
+    __slots__ = ["host", "retry_budget", "circuit_breaker", "rate_governor"]
+
+    def __init__(
+        self, *, host: str, retry_budget: RetryBudget, circuit_breaker: CircuitBreaker, rate_governor: RateGovernor
+    ) -> None:
+        self.host: str = host
+        self.retry_budget: RetryBudget = retry_budget
+        self.circuit_breaker: CircuitBreaker = circuit_breaker
+        self.rate_governor: RateGovernor = rate_governor
+
+
+class HostResilienceRegistry:
+    """
+    Keeps one HostResilienceState per host so that every RetryableAioHttpClient (and so every FhirClient) that is
+    given the same registry shares the retry budget, circuit breaker and 429 pause of a host.
+
+    Pass the registry to FhirClient.host_resilience().  Use HostResilienceRegistry.default() to share one registry
+    across the whole process.  The 429 pause is always shared: clients without a registry use the rate governors of
+    the default registry.
+    """
+
+    __slots__ = [
+        "retry_budget_capacity",
+        "retry_budget_refill_per_second",
+        "circuit_breaker_failure_threshold",
+        "circuit_breaker_reset_timeout_in_seconds",
+        "rate_limit_ramp_up_in_seconds",
+        "_clock",
+        "_states",
+        "_lock",
+    ]
+
+    _default: "HostResilienceRegistry | None" = None
+
+    def __init__(
+        self,
+        *,
+        retry_budget_capacity: float = 100,
+        retry_budget_refill_per_second: float = 10,
+        circuit_breaker_failure_threshold: int = 20,
+        circuit_breaker_reset_timeout_in_seconds: float = 30,
+        rate_limit_ramp_up_in_seconds: float = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Keeps one HostResilienceState per host
+
+
+        :param retry_budget_capacity: maximum number of retries that can be sent to a host in a burst
+        :param retry_budget_refill_per_second: number of retries per second a host can sustain
+        :param circuit_breaker_failure_threshold: number of consecutive failures that opens the circuit breaker
+        :param circuit_breaker_reset_timeout_in_seconds: how long the circuit breaker stays open
+        :param rate_limit_ramp_up_in_seconds: period over which requests paused by a 429 are released
+        :param clock: function returning the current time in seconds
+        """
+        self.retry_budget_capacity: float = retry_budget_capacity
+        self.retry_budget_refill_per_second: float = retry_budget_refill_per_second
+        self.circuit_breaker_failure_threshold: int = circuit_breaker_failure_threshold
+        self.circuit_breaker_reset_timeout_in_seconds: float = circuit_breaker_reset_timeout_in_seconds
+        self.rate_limit_ramp_up_in_seconds: float = rate_limit_ramp_up_in_seconds
+        self._clock: Callable[[], float] = clock
+        self._states: dict[str, HostResilienceState] = {}
+        # clients on different threads (e.g., AsyncRunner) may share the registry
+        self._lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> "HostResilienceRegistry":
+        """
+        Returns the registry shared by the whole process
+        """
+        if cls._default is None:
+            cls._default = HostResilienceRegistry()
+        return cls._default
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        """
+        Returns the host (and port) of the url
+        """
+        return urlparse(url).netloc or url
+
+    def get_state(self, *, url: str) -> HostResilienceState:
+        """
+        Returns the state for the host of the url, creating it on first use
+
+        :param url: url of the request
+        :return: state of the host
+        """
+        host: str = self.get_host(url)
+        state: HostResilienceState | None = self._states.get(host)
+        if state is None:
+            with self._lock:
+                state = self._states.get(host)
+                if state is None:
+                    state = HostResilienceState(
+                        host=host,
+                        retry_budget=RetryBudget(
+                            capacity=self.retry_budget_capacity,
+                            refill_per_second=self.retry_budget_refill_per_second,
+                            clock=self._clock,
+                        ),
+                        circuit_breaker=CircuitBreaker(
+                            host=host,
+                            failure_threshold=self.circuit_breaker_failure_threshold,
+                            reset_timeout_in_seconds=self.circuit_breaker_reset_timeout_in_seconds,
+                            clock=self._clock,
+                        ),
+                        rate_governor=RateGovernor(
+                            host=host,
+                            ramp_up_in_seconds=self.rate_limit_ramp_up_in_seconds,
+                            clock=self._clock,
+                        ),
+                    )
+                    self._states[host] = state
+        return state
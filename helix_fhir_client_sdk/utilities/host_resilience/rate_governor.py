@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Callable
+
+from opentelemetry import trace
+
+from helix_fhir_client_sdk.open_telemetry.attribute_names import FhirClientSdkOpenTelemetryAttributeNames
+from helix_fhir_client_sdk.open_telemetry.event_names import FhirClientSdkOpenTelemetryEventNames
+
+logger = logging.getLogger(__name__)
+
+
+class RateGovernor:
+    """
+    Per-host pause shared by all the requests to a host.
+
+    When any request gets a 429 (Too Many Requests) the host is paused until the Retry-After deadline and every
+    request to the host waits for it before being sent, instead of each request only backing off after it gets its
+    own 429.  When the pause ends, the waiting requests are released spread out over ramp_up_in_seconds so they don't
+    all hit the server at the same moment.
+    """
+
+    __slots__ = ["host", "ramp_up_in_seconds", "_resume_at", "_clock"]
+
+    def __init__(
+        self,
+        *,
+        host: str,
+        ramp_up_in_seconds: float = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Per-host pause shared by all the requests to a host
+
+
+        :param host: host this governor paces
+        :param ramp_up_in_seconds: requests waiting on a pause are released at random times over this period
+        :param clock: function returning the current time in seconds
+        """
+        self.host: str = host
+        self.ramp_up_in_seconds: float = ramp_up_in_seconds
+        self._clock: Callable[[], float] = clock
+        self._resume_at: float = 0
+
+    @property
+    def seconds_until_resume(self) -> float:
+        """
+        Seconds until the host is no longer paused
+        """
+        return max(0.0, self._resume_at - self._clock())
+
+    def pause(self, *, seconds: float) -> None:
+        """
+        Pauses all requests to the host for the given time.  A pause never shortens one that is already in effect.
+
+        :param seconds: how long to pause e.g., the Retry-After of a 429 response
+        """
+        resume_at: float = self._clock() + seconds
+        if resume_at > self._resume_at:
+            self._resume_at = resume_at
+            logger.warning(f"Pausing requests to {self.host} for {seconds:.1f}s after 429 (Too Many Requests)")
+            trace.get_current_span().add_event(
+                FhirClientSdkOpenTelemetryEventNames.RATE_LIMIT_PAUSE,
+                {
+                    FhirClientSdkOpenTelemetryAttributeNames.HOST: self.host,
+                    FhirClientSdkOpenTelemetryAttributeNames.RATE_LIMIT_PAUSE_IN_SECONDS: seconds,
+                },
+            )
+
+    async def wait_async(self) -> float:
+        """
+        Waits until the host is no longer paused.  Returns immediately if it is not paused.
+
+        :return: seconds waited
+        """
+        waited: float = 0
+        # loop since the host may be paused again by another request while this one is waiting
+        while (delay := self.seconds_until_resume) > 0:
+            delay += random.uniform(0, self.ramp_up_in_seconds)
+            await asyncio.sleep(delay)
+            waited += delay
+        return waited
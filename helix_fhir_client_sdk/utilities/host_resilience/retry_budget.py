@@ -0,0 +1,63 @@
+import time
+from collections.abc import Callable
+
+
+class RetryBudget:
+    """
+    Token bucket that limits how many retries can be sent to a host.
+
+    Every retry takes one token and tokens are added back at a fixed rate up to the capacity.  When the host is
+    failing, the concurrent requests to it drain the bucket and further failures are returned to the caller instead of
+    being retried, so retries cannot multiply the load on a server that is already overloaded.
+    """
+
+    __slots__ = ["capacity", "refill_per_second", "_tokens", "_last_refill", "_clock"]
+
+    def __init__(
+        self,
+        *,
+        capacity: float = 100,
+        refill_per_second: float = 10,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Token bucket that limits how many retries can be sent to a host
+
+
+        :param capacity: maximum number of tokens i.e., the largest burst of retries allowed
+        :param refill_per_second: number of tokens added back per second
+        :param clock: function returning the current time in seconds
+        """
+        assert capacity > 0, "capacity must be greater than 0"
+        self.capacity: float = capacity
+        self.refill_per_second: float = refill_per_second
+        self._clock: Callable[[], float] = clock
+        self._tokens: float = capacity
+        self._last_refill: float = clock()
+
+    @property
+    def tokens(self) -> float:
+        """
+        Number of tokens currently available
+        """
+        self._refill()
+        return self._tokens
+
+    def try_acquire(self) -> bool:
+        """
+        Takes a token if one is available
+
+        :return: True if a retry can be sent
+        """
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def _refill(self) -> None:
+        now: float = self._clock()
+        elapsed: float = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_second)
+            self._last_refill = now
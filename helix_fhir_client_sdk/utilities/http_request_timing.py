@@ -0,0 +1,185 @@
+import dataclasses
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from aiohttp import (
+    ClientSession,
+    TraceConfig,
+    TraceConnectionCreateEndParams,
+    TraceConnectionCreateStartParams,
+    TraceConnectionQueuedEndParams,
+    TraceConnectionQueuedStartParams,
+    TraceConnectionReuseconnParams,
+    TraceDnsResolveHostEndParams,
+    TraceDnsResolveHostStartParams,
+)
+from opentelemetry.trace import Span
+
+from helix_fhir_client_sdk.open_telemetry.attribute_names import FhirClientSdkOpenTelemetryAttributeNames
+
+
+@dataclasses.dataclass(slots=True)
+class HttpRequestTiming:
+    """
+    Where the time of one HTTP request (one attempt) went, in seconds.  A field is None when that step did not happen
+    or was not measured.
+
+    time_to_first_byte_seconds and body_seconds are measured by RetryableAioHttpClient for every request.  The
+    connection fields need the aiohttp hooks of create_trace_config() on the session: the SDK's default session has
+    them, a session passed to use_http_session() needs trace_configs=[HttpRequestTiming.create_trace_config()].
+    parse_seconds and factory_seconds are set when the response is turned into FhirGetResponse objects.
+
+    Subtracting dns, queued and connect from time_to_first_byte leaves the time spent by the server (plus one round
+    trip), so a slow request can be put down to the network, the server or the SDK.
+    """
+
+    dns_seconds: float | None = None
+    """ time to resolve the host name (None on a DNS cache hit or a reused connection) """
+
+    connection_queued_seconds: float | None = None
+    """ time waiting for a free connection in the pool (TCPConnector limit) """
+
+    connect_seconds: float | None = None
+    """ time to open a new connection: TCP connect and TLS handshake (aiohttp does not report them separately) """
+
+    connection_reused: bool | None = None
+    """ whether a keep-alive connection from the pool was reused """
+
+    time_to_first_byte_seconds: float | None = None
+    """ time from sending the request (including DNS and connect) until the response headers were received """
+
+    body_seconds: float | None = None
+    """ time to read the response body after the headers (not measured when streaming) """
+
+    parse_seconds: float | None = None
+    """ time to parse the JSON of the response """
+
+    factory_seconds: float | None = None
+    """ time to create the FhirGetResponse from the parsed JSON """
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Converts the object to a dictionary
+
+        :return: dictionary
+        """
+        return {
+            "dns_seconds": self.dns_seconds,
+            "connection_queued_seconds": self.connection_queued_seconds,
+            "connect_seconds": self.connect_seconds,
+            "connection_reused": self.connection_reused,
+            "time_to_first_byte_seconds": self.time_to_first_byte_seconds,
+            "body_seconds": self.body_seconds,
+            "parse_seconds": self.parse_seconds,
+            "factory_seconds": self.factory_seconds,
+        }
+
+    def set_network_span_attributes(self, span: Span) -> None:
+        """
+        Sets the DNS, connection, time to first byte and body times on span
+
+        :param span: span of the HTTP request
+        """
+        if not span.is_recording():
+            return
+        names = FhirClientSdkOpenTelemetryAttributeNames
+        for name, value in (
+            (names.TIMING_DNS_SECONDS, self.dns_seconds),
+            (names.TIMING_CONNECTION_QUEUED_SECONDS, self.connection_queued_seconds),
+            (names.TIMING_CONNECT_SECONDS, self.connect_seconds),
+            (names.TIMING_CONNECTION_REUSED, self.connection_reused),
+            (names.TIMING_TIME_TO_FIRST_BYTE_SECONDS, self.time_to_first_byte_seconds),
+            (names.TIMING_BODY_SECONDS, self.body_seconds),
+        ):
+            if value is not None:
+                span.set_attribute(name, value)
+
+    def set_processing_span_attributes(self, span: Span) -> None:
+        """
+        Sets the parse and factory times on span
+
+        :param span: span of the processing of the response
+        """
+        if not span.is_recording():
+            return
+        names = FhirClientSdkOpenTelemetryAttributeNames
+        if self.parse_seconds is not None:
+            span.set_attribute(names.TIMING_PARSE_SECONDS, self.parse_seconds)
+        if self.factory_seconds is not None:
+            span.set_attribute(names.TIMING_FACTORY_SECONDS, self.factory_seconds)
+
+    @staticmethod
+    def create_trace_config() -> TraceConfig:
+        """
+        Creates an aiohttp TraceConfig that records the DNS and connection times in the HttpRequestTiming passed by
+        RetryableAioHttpClient as trace_request_ctx.  Requests without one are ignored.
+        """
+        trace_config = TraceConfig()
+        trace_config.on_dns_resolvehost_start.append(HttpRequestTiming._on_dns_resolvehost_start)
+        trace_config.on_dns_resolvehost_end.append(HttpRequestTiming._on_dns_resolvehost_end)
+        trace_config.on_connection_queued_start.append(HttpRequestTiming._on_connection_queued_start)
+        trace_config.on_connection_queued_end.append(HttpRequestTiming._on_connection_queued_end)
+        trace_config.on_connection_create_start.append(HttpRequestTiming._on_connection_create_start)
+        trace_config.on_connection_create_end.append(HttpRequestTiming._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(HttpRequestTiming._on_connection_reuseconn)
+        return trace_config
+
+    # noinspection PyUnusedLocal
+    @staticmethod
+    async def _on_dns_resolvehost_start(
+        session: ClientSession, trace_config_ctx: SimpleNamespace, params: TraceDnsResolveHostStartParams
+    ) -> None:
+        trace_config_ctx.dns_start = time.perf_counter()
+
+    # noinspection PyUnusedLocal
+    @staticmethod
+    async def _on_dns_resolvehost_end(
+        session: ClientSession, trace_config_ctx: SimpleNamespace, params: TraceDnsResolveHostEndParams
+    ) -> None:
+        timing = trace_config_ctx.trace_request_ctx
+        if isinstance(timing, HttpRequestTiming) and hasattr(trace_config_ctx, "dns_start"):
+            timing.dns_seconds = time.perf_counter() - trace_config_ctx.dns_start
+
+    # noinspection PyUnusedLocal
+    @staticmethod
+    async def _on_connection_queued_start(
+        session: ClientSession, trace_config_ctx: SimpleNamespace, params: TraceConnectionQueuedStartParams
+    ) -> None:
+        trace_config_ctx.queued_start = time.perf_counter()
+
+    # noinspection PyUnusedLocal
+    @staticmethod
+    async def _on_connection_queued_end(
+        session: ClientSession, trace_config_ctx: SimpleNamespace, params: TraceConnectionQueuedEndParams
+    ) -> None:
+        timing = trace_config_ctx.trace_request_ctx
+        if isinstance(timing, HttpRequestTiming) and hasattr(trace_config_ctx, "queued_start"):
+            timing.connection_queued_seconds = time.perf_counter() - trace_config_ctx.queued_start
+
+    # noinspection PyUnusedLocal
+    @staticmethod
+    async def _on_connection_create_start(
+        session: ClientSession, trace_config_ctx: SimpleNamespace, params: TraceConnectionCreateStartParams
+    ) -> None:
+        trace_config_ctx.create_start = time.perf_counter()
+
+    # noinspection PyUnusedLocal
+    @staticmethod
+    async def _on_connection_create_end(
+        session: ClientSession, trace_config_ctx: SimpleNamespace, params: TraceConnectionCreateEndParams
+    ) -> None:
+        timing = trace_config_ctx.trace_request_ctx
+        if isinstance(timing, HttpRequestTiming) and hasattr(trace_config_ctx, "create_start"):
+            # DNS resolution happens while the connection is created
+            timing.connect_seconds = time.perf_counter() - trace_config_ctx.create_start - (timing.dns_seconds or 0)
+            timing.connection_reused = False
+
+    # noinspection PyUnusedLocal
+    @staticmethod
+    async def _on_connection_reuseconn(
+        session: ClientSession, trace_config_ctx: SimpleNamespace, params: TraceConnectionReuseconnParams
+    ) -> None:
+        timing = trace_config_ctx.trace_request_ctx
+        if isinstance(timing, HttpRequestTiming):
+            timing.connection_reused = True
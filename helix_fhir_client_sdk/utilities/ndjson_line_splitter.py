@@ -0,0 +1,54 @@
+class NdJsonLineSplitter:
+    """
+    Splits NDJSON byte chunks into lines without decoding or parsing them.
+
+    Lines that are complete within a chunk are returned as views of the chunk so they are not copied.  Only a line
+    that continues in the next chunk is kept.
+    """
+
+    __slots__ = ["_remainder"]
+
+    def __init__(self) -> None:
+        self._remainder: bytes = b""
+        """ start of a line that continues in the next chunk """
+
+    def add_chunk(self, chunk: bytes) -> list[memoryview]:
+        """
+        Adds the next chunk and returns the lines completed by it, each ending with its newline
+
+        :param chunk: chunk of NDJSON bytes
+        :return: complete lines
+        """
+        if self._remainder:
+            end_of_first_line: int = chunk.find(b"\n")
+            if end_of_first_line < 0:
+                self._remainder += chunk
+                return []
+            first_line: bytes = self._remainder + chunk[: end_of_first_line + 1]
+            self._remainder = b""
+            lines: list[memoryview] = [memoryview(first_line)]
+            start: int = end_of_first_line + 1
+        else:
+            lines = []
+            start = 0
+
+        view: memoryview = memoryview(chunk)
+        end: int = chunk.find(b"\n", start)
+        while end >= 0:
+            if end > start:
+                lines.append(view[start : end + 1])
+            start = end + 1
+            end = chunk.find(b"\n", start)
+        if start < len(chunk):
+            self._remainder = chunk[start:]
+        return lines
+
+    def flush(self) -> bytes | None:
+        """
+        Returns the last line if the data did not end with a newline
+
+        :return: last line or None
+        """
+        remainder: bytes = self._remainder
+        self._remainder = b""
+        return remainder if remainder.strip() else None
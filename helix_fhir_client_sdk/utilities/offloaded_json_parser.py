@@ -0,0 +1,176 @@
+import asyncio
+import dataclasses
+import gc
+import json
+import pickle
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any
+
+
+@dataclasses.dataclass(slots=True)
+class JsonParsingStatistics:
+    """
+    How long JSON parsing blocked the event loop
+    """
+
+    parse_count: int = 0
+    """ Number of payloads parsed """
+
+    offloaded_count: int = 0
+    """ Number of payloads parsed by the executor """
+
+    blocking_seconds: float = 0
+    """ Total time the event loop was blocked by parsing """
+
+    max_blocking_seconds: float = 0
+    """ Longest time the event loop was blocked at once """
+
+    offloaded_seconds: float = 0
+    """ Total time spent waiting for the executor (the event loop is free during this time) """
+
+    def record_blocking(self, seconds: float) -> None:
+        self.blocking_seconds += seconds
+        self.max_blocking_seconds = max(self.max_blocking_seconds, seconds)
+
+
+@dataclasses.dataclass(slots=True)
+class _PickledJson:
+    """
+    Parsed JSON sent back from a worker process: the top level object and its items (Bundle entries or list items)
+    are pickled separately so they can be unpickled a few at a time
+    """
+
+    envelope: bytes | None
+    """ pickled top level object without its entries, None if the top level object is a list """
+
+    items: list[bytes] | None
+    """ pickled Bundle entries or list items, None if the object has neither """
+
+
+def _parse_to_pickled_json(text: str, loads: Callable[[str], Any]) -> _PickledJson:
+    """
+    Runs in the worker process
+    """
+    parsed: Any = loads(text)
+    if isinstance(parsed, list):
+        return _PickledJson(envelope=None, items=[pickle.dumps(item, protocol=5) for item in parsed])
+    if isinstance(parsed, dict) and isinstance(parsed.get("entry"), list):
+        entries: list[Any] = parsed.pop("entry")
+        return _PickledJson(
+            envelope=pickle.dumps(parsed, protocol=5),
+            items=[pickle.dumps(entry, protocol=5) for entry in entries],
+        )
+    return _PickledJson(envelope=pickle.dumps(parsed, protocol=5), items=None)
+
+
+class OffloadedJsonParser:
+    """
+    Parses large JSON payloads (e.g., 30 MB Bundle pages) in an executor so the event loop can keep serving the other
+    requests, heartbeats and token refreshes.  Payloads smaller than min_size_in_bytes are parsed on the event loop
+    since handing them to the executor costs more than parsing them.
+
+    With a ProcessPoolExecutor, the worker parses the payload with loads and sends the Bundle entries (or list items)
+    back as separate pickles.  They are unpickled on the event loop in slices of items_per_slice, yielding to the event
+    loop between slices, so no single step blocks it for long.  With a ThreadPoolExecutor, the parsed object is used
+    as is, which only frees the event loop if loads releases the GIL (the standard json module does not).
+
+    The many small objects created by unpickling trigger repeated garbage collections that can cost several times more
+    than the unpickling itself.  With pause_gc_while_unpickling the garbage collector is disabled while a slice is
+    unpickled.  The garbage collector is global, so this also pauses it for every other thread of the process (and
+    the host application) for the duration of the slice: only turn it on if nothing else relies on it running.
+
+    The time parsing blocked the event loop is recorded in statistics, with or without an executor, so the two can be
+    compared.
+    """
+
+    __slots__ = [
+        "executor",
+        "min_size_in_bytes",
+        "items_per_slice",
+        "loads",
+        "pause_gc_while_unpickling",
+        "statistics",
+    ]
+
+    def __init__(
+        self,
+        *,
+        executor: Executor | None = None,
+        min_size_in_bytes: int = 1024 * 1024,
+        items_per_slice: int = 100,
+        loads: Callable[[str], Any] = json.loads,
+        pause_gc_while_unpickling: bool = False,
+    ) -> None:
+        """
+        Parses large JSON payloads in an executor
+
+        :param executor: executor to parse in.  If None, everything is parsed on the event loop (useful to measure
+                         the blocking time before turning on an executor).
+        :param min_size_in_bytes: payloads smaller than this are parsed on the event loop
+        :param items_per_slice: number of Bundle entries or list items to unpickle before yielding to the event loop
+        :param loads: function to parse JSON.  Must be picklable (e.g., a module level function) for a process pool.
+        :param pause_gc_while_unpickling: disable the garbage collector, for the whole process, while a slice is
+                                          unpickled
+        """
+        self.executor: Executor | None = executor
+        self.min_size_in_bytes: int = min_size_in_bytes
+        self.items_per_slice: int = items_per_slice
+        self.loads: Callable[[str], Any] = loads
+        self.pause_gc_while_unpickling: bool = pause_gc_while_unpickling
+        self.statistics: JsonParsingStatistics = JsonParsingStatistics()
+
+    async def loads_async(self, text: str) -> Any:
+        """
+        Parses the JSON text
+
+        :param text: JSON text
+        :return: parsed object
+        """
+        self.statistics.parse_count += 1
+        start: float = time.perf_counter()
+        if self.executor is None or len(text) < self.min_size_in_bytes:
+            result: Any = self.loads(text)
+            self.statistics.record_blocking(time.perf_counter() - start)
+            return result
+
+        self.statistics.offloaded_count += 1
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        if not isinstance(self.executor, ProcessPoolExecutor):
+            result = await loop.run_in_executor(self.executor, self.loads, text)
+            self.statistics.offloaded_seconds += time.perf_counter() - start
+            return result
+
+        pickled_json: _PickledJson = await loop.run_in_executor(self.executor, _parse_to_pickled_json, text, self.loads)
+        self.statistics.offloaded_seconds += time.perf_counter() - start
+        return await self._unpickle_async(pickled_json)
+
+    async def _unpickle_async(self, pickled_json: _PickledJson) -> Any:
+        start: float = time.perf_counter()
+        envelope: Any = pickle.loads(pickled_json.envelope) if pickled_json.envelope is not None else None
+        if pickled_json.items is None:
+            self.statistics.record_blocking(time.perf_counter() - start)
+            return envelope
+
+        items: list[Any] = []
+        for slice_start in range(0, len(pickled_json.items), self.items_per_slice):
+            slice_items: list[bytes] = pickled_json.items[slice_start : slice_start + self.items_per_slice]
+            if self.pause_gc_while_unpickling:
+                gc_was_enabled: bool = gc.isenabled()
+                gc.disable()
+                try:
+                    items.extend(pickle.loads(item) for item in slice_items)
+                finally:
+                    if gc_was_enabled:
+                        gc.enable()
+            else:
+                items.extend(pickle.loads(item) for item in slice_items)
+            self.statistics.record_blocking(time.perf_counter() - start)
+            await asyncio.sleep(0)
+            start = time.perf_counter()
+
+        if envelope is None:
+            return items
+        envelope["entry"] = items
+        return envelope
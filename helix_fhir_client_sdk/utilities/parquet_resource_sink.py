@@ -0,0 +1,237 @@
+import asyncio
+from collections.abc import Iterable
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+from compressedfhir.fhir.fhir_resource import FhirResource
+
+from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    _PYARROW_AVAILABLE = True
+except ImportError:
+    _PYARROW_AVAILABLE = False
+
+
+class ParquetResourceSink:
+    """
+    Writes FHIR resources to one Parquet file per resource type (e.g., Patient.parquet, Observation.parquet) so
+    analytics pipelines can load them directly instead of parsing JSON.
+
+    Resources are collected per resource type and converted to an Arrow record batch once rows_per_batch resources of
+    that type have been collected.  When more than max_buffered_resources resources are waiting in total, the
+    resource type with the most waiting resources is written, so memory stays bounded however many resource types
+    are written.  Converting and writing the batches is done in a worker thread.
+
+    The schema of a resource type is taken from schemas or else inferred from its first batch.  A Parquet file has a
+    single schema, so when a later batch has fields that are not in it or needs a wider type (e.g., a float where the
+    first batch only had integers), the file is closed and the batch starts a new part (e.g., Observation.1.parquet)
+    whose schema also covers every earlier part: get_file_paths() returns the parts and the schema of the last one
+    reads them all.  A batch that does not fit a schema passed in schemas raises a ValueError instead, so values are
+    never truncated or dropped.
+
+    Requires the optional pyarrow dependency (pip install helix.fhir.client.sdk[parquet]).
+    """
+
+    __slots__ = [
+        "directory",
+        "schemas",
+        "rows_per_batch",
+        "max_buffered_resources",
+        "separate_contained_resources",
+        "compression",
+        "row_counts",
+        "_writers",
+        "_file_paths",
+        "_buffers",
+        "_buffered_count",
+    ]
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        schemas: dict[str, "pa.Schema"] | None = None,
+        rows_per_batch: int = 10_000,
+        max_buffered_resources: int = 50_000,
+        separate_contained_resources: bool = False,
+        compression: str = "zstd",
+    ) -> None:
+        """
+        Writes FHIR resources to one Parquet file per resource type
+
+        :param directory: directory to write the files in.  Existing files of the same resource types are overwritten.
+        :param schemas: schema to use by resource type.  Resources with fields or types outside it raise a
+                        ValueError.  Other resource types get a schema inferred from their batches.
+        :param rows_per_batch: resources of one resource type to collect before writing them as a batch
+        :param max_buffered_resources: maximum resources (of all resource types) waiting to be written
+        :param separate_contained_resources: write contained resources to the file of their own resource type instead
+                                             of in the contained field of their parent
+        :param compression: Parquet compression codec
+        """
+        if not _PYARROW_AVAILABLE:
+            raise ImportError(
+                "pyarrow is required for ParquetResourceSink. Install it with: pip install helix.fhir.client.sdk[parquet]"
+            )
+        assert rows_per_batch > 0, "rows_per_batch must be greater than 0"
+        self.directory: Path = Path(directory)
+        self.schemas: dict[str, pa.Schema] = dict(schemas or {})
+        self.rows_per_batch: int = rows_per_batch
+        self.max_buffered_resources: int = max_buffered_resources
+        self.separate_contained_resources: bool = separate_contained_resources
+        self.compression: str = compression
+        self.row_counts: dict[str, int] = {}
+        """ Number of resources written by resource type """
+        self._writers: dict[str, pq.ParquetWriter] = {}
+        self._file_paths: dict[str, list[Path]] = {}
+        self._buffers: dict[str, list[dict[str, Any]]] = {}
+        self._buffered_count: int = 0
+
+    async def __aenter__(self) -> "ParquetResourceSink":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.close_async()
+
+    def get_file_path(self, resource_type: str) -> Path:
+        """
+        Returns the file the resources of resource_type are written to
+
+        :param resource_type: resource type
+        :return: path of the Parquet file
+        """
+        return self.directory / f"{resource_type}.parquet"
+
+    def get_file_paths(self, resource_type: str) -> list[Path]:
+        """
+        Returns the files the resources of resource_type were written to: get_file_path() followed by the parts
+        started when the schema had to be widened.  The schema of the last file covers all of them.
+
+        :param resource_type: resource type
+        :return: paths of the Parquet files
+        """
+        return list(self._file_paths.get(resource_type, []))
+
+    async def write_resource_async(self, resource: dict[str, Any] | FhirResource) -> None:
+        """
+        Writes a resource.  A dictionary without a resourceType, as created by ResourceSeparator, is written as the
+        resources in its lists.
+
+        :param resource: resource to write
+        """
+        resource_dict: dict[str, Any] = resource.to_plain_dict() if isinstance(resource, FhirResource) else resource
+        resource_type: Any = resource_dict.get("resourceType")
+        if resource_type is None:
+            for value in resource_dict.values():
+                if isinstance(value, list):
+                    await self.write_resources_async(
+                        item for item in value if isinstance(item, dict) and "resourceType" in item
+                    )
+            return
+
+        if self.separate_contained_resources and "contained" in resource_dict:
+            # copy only the top level so the caller's resource is not changed
+            contained_resources: list[dict[str, Any]] = resource_dict["contained"]
+            resource_dict = {key: value for key, value in resource_dict.items() if key != "contained"}
+            await self.write_resources_async(contained_resources)
+
+        buffer: list[dict[str, Any]] = self._buffers.setdefault(str(resource_type), [])
+        buffer.append(resource_dict)
+        self._buffered_count += 1
+        if len(buffer) >= self.rows_per_batch:
+            await self._write_batch_async(str(resource_type))
+        elif self._buffered_count > self.max_buffered_resources:
+            await self._write_batch_async(max(self._buffers, key=lambda key: len(self._buffers[key])))
+
+    async def write_resources_async(self, resources: Iterable[dict[str, Any] | FhirResource]) -> None:
+        """
+        Writes the resources
+
+        :param resources: resources to write
+        """
+        for resource in resources:
+            await self.write_resource_async(resource)
+
+    async def write_response_async(self, response: FhirGetResponse) -> None:
+        """
+        Writes the resources in the response
+
+        :param response: response from a search or a graph call
+        """
+        if response.has_resource_map:
+            for _, resources in response.get_resource_map().items():
+                await self.write_resources_async(resources)
+        else:
+            await self.write_resources_async(response.get_resources())
+
+    async def flush_async(self) -> None:
+        """
+        Writes all the collected resources
+        """
+        for resource_type in list(self._buffers):
+            await self._write_batch_async(resource_type)
+
+    async def close_async(self) -> None:
+        """
+        Writes all the collected resources and closes the files
+        """
+        await self.flush_async()
+        writers: list[pq.ParquetWriter] = list(self._writers.values())
+        self._writers.clear()
+        for writer in writers:
+            await asyncio.to_thread(writer.close)
+
+    async def _write_batch_async(self, resource_type: str) -> None:
+        rows: list[dict[str, Any]] = self._buffers.pop(resource_type, [])
+        if not rows:
+            return
+        self._buffered_count -= len(rows)
+        await asyncio.to_thread(self._write_batch, resource_type, rows)
+        self.row_counts[resource_type] = self.row_counts.get(resource_type, 0) + len(rows)
+
+    def _write_batch(self, resource_type: str, rows: list[dict[str, Any]]) -> None:
+        """
+        Runs in a worker thread
+        """
+        batch: pa.RecordBatch = pa.RecordBatch.from_pylist(rows)
+        writer: pq.ParquetWriter | None = self._writers.get(resource_type)
+        schema: pa.Schema | None = writer.schema if writer is not None else self.schemas.get(resource_type)
+        if schema is not None and not batch.schema.equals(schema):
+            # converting to a schema silently truncates wider values and drops other fields so check it fits first
+            try:
+                unified_schema: pa.Schema = pa.unify_schemas([schema, batch.schema], promote_options="permissive")
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                raise ValueError(f"{resource_type} resources do not fit the schema of {resource_type}: {e}") from e
+            if not unified_schema.equals(schema):
+                if resource_type in self.schemas:
+                    raise ValueError(
+                        f"{resource_type} resources have fields or types that are not in the schema passed for"
+                        f" {resource_type}: {unified_schema}"
+                    )
+                if writer is not None:
+                    # a Parquet file has a single schema so continue in a new part with the wider one
+                    writer.close()
+                    del self._writers[resource_type]
+                    writer = None
+            batch = pa.RecordBatch.from_pylist(rows, schema=unified_schema)
+        if writer is None:
+            file_paths: list[Path] = self._file_paths.setdefault(resource_type, [])
+            file_path: Path = (
+                self.directory / f"{resource_type}.{len(file_paths)}.parquet"
+                if file_paths
+                else self.get_file_path(resource_type)
+            )
+            self.directory.mkdir(parents=True, exist_ok=True)
+            writer = pq.ParquetWriter(file_path, batch.schema, compression=self.compression)
+            self._writers[resource_type] = writer
+            file_paths.append(file_path)
+        writer.write_batch(batch)
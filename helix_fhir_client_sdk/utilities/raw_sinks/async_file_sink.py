@@ -0,0 +1,99 @@
+import asyncio
+import gzip
+from io import BufferedIOBase
+from pathlib import Path
+from types import TracebackType
+
+
+class AsyncFileSink:
+    """
+    Writes raw response bytes to a file, optionally gzip compressed.
+
+    The data is collected in a buffer and written (and compressed) in a worker thread once the buffer reaches
+    buffer_size_in_bytes so the event loop is not blocked by the disk or the compression and writing many small
+    NDJSON lines does not cost a thread hop each.
+    """
+
+    __slots__ = ["path", "compress", "compression_level", "buffer_size_in_bytes", "bytes_written", "_file", "_buffer"]
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        compress: bool = False,
+        compression_level: int = 6,
+        buffer_size_in_bytes: int = 1024 * 1024,
+    ) -> None:
+        """
+        Writes raw response bytes to a file
+
+        :param path: file to write.  It is overwritten if it exists.
+        :param compress: gzip the file
+        :param compression_level: gzip compression level (1 is fastest, 9 is smallest)
+        :param buffer_size_in_bytes: bytes to collect before writing to the file
+        """
+        self.path: Path = Path(path)
+        self.compress: bool = compress
+        self.compression_level: int = compression_level
+        self.buffer_size_in_bytes: int = buffer_size_in_bytes
+        self.bytes_written: int = 0
+        """ Number of (uncompressed) bytes written so far """
+        self._file: BufferedIOBase | None = None
+        self._buffer: bytearray = bytearray()
+
+    async def __aenter__(self) -> "AsyncFileSink":
+        await self.open_async()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.close_async()
+
+    async def open_async(self) -> None:
+        """
+        Opens the file
+        """
+        assert self._file is None, "File is already open"
+        self._file = await asyncio.to_thread(self._open)
+
+    def _open(self) -> BufferedIOBase:
+        if self.compress:
+            return gzip.open(self.path, "wb", compresslevel=self.compression_level)
+        return open(self.path, "wb")
+
+    async def write_async(self, data: bytes | memoryview) -> None:
+        """
+        Writes the bytes to the file
+
+        :param data: bytes to write
+        """
+        assert self._file is not None, "Call open_async() or use the sink as an async context manager first"
+        self._buffer += data
+        self.bytes_written += len(data)
+        if len(self._buffer) >= self.buffer_size_in_bytes:
+            await self.flush_async()
+
+    async def flush_async(self) -> None:
+        """
+        Writes the buffered bytes to the file
+        """
+        if self._file is None or not self._buffer:
+            return
+        buffer: bytearray = self._buffer
+        self._buffer = bytearray()
+        await asyncio.to_thread(self._file.write, buffer)
+
+    async def close_async(self) -> None:
+        """
+        Writes the buffered bytes and closes the file
+        """
+        if self._file is None:
+            return
+        await self.flush_async()
+        file: BufferedIOBase = self._file
+        self._file = None
+        await asyncio.to_thread(file.close)
@@ -0,0 +1,17 @@
+from typing import Protocol, runtime_checkable
+
+
+@runtime_checkable
+class FhirRawSink(Protocol):
+    """
+    Destination for the raw bytes of a response (e.g., a file or an object storage upload)
+    """
+
+    async def write_async(self, data: bytes | memoryview) -> None:
+        """
+        Writes the next bytes of the response.  The data may be a view of a buffer that is reused after this call
+        returns, so copy it if it has to be kept.
+
+        :param data: bytes to write
+        """
+        ...
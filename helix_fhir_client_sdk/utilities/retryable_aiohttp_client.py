@@ -1,11 +1,12 @@
 import asyncio
+import random
 import time
 from collections.abc import Callable
 from datetime import UTC, datetime
 from typing import Any, cast
 
 import async_timeout
-from aiohttp import ClientError, ClientResponse, ClientResponseError, ClientSession
+from aiohttp import ClientConnectionError, ClientError, ClientResponse, ClientResponseError, ClientSession
 from multidict import MultiMapping
 from opentelemetry import trace
 
@@ -15,7 +16,18 @@ from helix_fhir_client_sdk.function_types import (
     TraceRequestFunction,
 )
 from helix_fhir_client_sdk.open_telemetry.attribute_names import FhirClientSdkOpenTelemetryAttributeNames
+from helix_fhir_client_sdk.open_telemetry.event_names import FhirClientSdkOpenTelemetryEventNames
+from helix_fhir_client_sdk.open_telemetry.fhir_client_sdk_metrics import FhirClientSdkMetrics
 from helix_fhir_client_sdk.open_telemetry.span_names import FhirClientSdkOpenTelemetrySpanNames
+from helix_fhir_client_sdk.utilities.host_resilience.adaptive_concurrency_limiter import AdaptiveConcurrencyLimiter
+from helix_fhir_client_sdk.utilities.host_resilience.circuit_breaker import CircuitBreakerOpenError
+from helix_fhir_client_sdk.utilities.host_resilience.hedging_policy import HedgingPolicy
+from helix_fhir_client_sdk.utilities.host_resilience.host_resilience_registry import (
+    HostResilienceRegistry,
+    HostResilienceState,
+)
+from helix_fhir_client_sdk.utilities.host_resilience.rate_governor import RateGovernor
+from helix_fhir_client_sdk.utilities.http_request_timing import HttpRequestTiming
 from helix_fhir_client_sdk.utilities.retryable_aiohttp_response import (
     RetryableAioHttpResponse,
 )
@@ -46,6 +58,9 @@ class RetryableAioHttpClient:
         log_all_url_results: bool = False,
         access_token: str | None,
         access_token_expiry_date: datetime | None,
+        host_resilience_registry: HostResilienceRegistry | None = None,
+        maximum_time_to_retry_on_429: float | None = None,
+        hedging_policy: HedgingPolicy | None = None,
     ) -> None:
         """
         RetryableClient provides a way to make HTTP calls with automatic retry and automatic refreshing of access tokens.
@@ -74,6 +89,13 @@ class RetryableAioHttpClient:
         :param log_all_url_results: Whether to log all URL results
         :param access_token: Access token for authentication
         :param access_token_expiry_date: Expiry date of the access token
+        :param host_resilience_registry: (Optional) registry of the per-host retry budget and circuit breaker.
+                                        If not set, every request retries on its own.
+        :param maximum_time_to_retry_on_429: (Optional) keep retrying requests that get 429 (Too Many Requests) for up
+                                            to this many seconds without counting them against retries.  If not set,
+                                            each 429 uses up one retry.
+        :param hedging_policy: (Optional) sends GETs that are slower than usual a second time and uses the first
+                                response.  If not set, each GET is sent once.
         """
         self.retries: int = retries
         self.timeout_in_seconds: float | None = timeout_in_seconds
@@ -97,6 +119,9 @@ class RetryableAioHttpClient:
         self.log_all_url_results: bool = log_all_url_results
         self.access_token: str | None = access_token
         self.access_token_expiry_date: datetime | None = access_token_expiry_date
+        self.host_resilience_registry: HostResilienceRegistry | None = host_resilience_registry
+        self.maximum_time_to_retry_on_429: float | None = maximum_time_to_retry_on_429
+        self.hedging_policy: HedgingPolicy | None = hedging_policy
 
     async def __aenter__(self) -> "RetryableAioHttpClient":
         self.session = self.fn_get_session()
@@ -121,7 +146,15 @@ class RetryableAioHttpClient:
         :param response: The response object from the FHIR server.
         """
         try:
-            return await response.text() if (response and response.status != 504) else ""
+            if not response or response.status == 504:
+                return ""
+            text: str = await response.text()
+            sdk_metrics: FhirClientSdkMetrics = FhirClientSdkMetrics.get()
+            if sdk_metrics.enabled:
+                sdk_metrics.record_response_body_size(
+                    url=str(response.url), size_in_bytes=response.content.total_bytes, streaming=False
+                )
+            return text
         except Exception as e:
             return str(e)
 
@@ -132,15 +165,149 @@ class RetryableAioHttpClient:
         method: str = "GET",
         headers: dict[str, str] | None,
         **kwargs: Any,
+    ) -> RetryableAioHttpResponse:
+        if self.hedging_policy is not None and method == "GET":
+            return await self._fetch_hedged_async(
+                url=url, hedging_policy=self.hedging_policy, headers=headers, **kwargs
+            )
+        return await self._fetch_with_retries_async(url=url, method=method, headers=headers, **kwargs)
+
+    async def _fetch_hedged_async(
+        self,
+        *,
+        url: str,
+        hedging_policy: HedgingPolicy,
+        headers: dict[str, str] | None,
+        **kwargs: Any,
+    ) -> RetryableAioHttpResponse:
+        """
+        Sends a GET and, if it has not returned by the hedge delay of the host, sends it a second time.  The first
+        response that is not a transient failure wins and the other attempt is cancelled.  GETs are idempotent so
+        sending one twice is safe.
+        """
+        host: str = HostResilienceRegistry.get_host(url)
+        hedge_delay_in_seconds: float | None = hedging_policy.get_hedge_delay_in_seconds(host=host)
+
+        def start_attempt() -> asyncio.Task[RetryableAioHttpResponse]:
+            # each attempt gets its own headers since a token refresh changes them
+            return asyncio.create_task(
+                self._fetch_with_retries_async(
+                    url=url, method="GET", headers=dict(headers) if headers else headers, **kwargs
+                )
+            )
+
+        first_attempt: asyncio.Task[RetryableAioHttpResponse] = start_attempt()
+        attempts: list[asyncio.Task[RetryableAioHttpResponse]] = [first_attempt]
+        winner: RetryableAioHttpResponse | None = None
+        try:
+            if hedge_delay_in_seconds is not None:
+                await asyncio.wait(attempts, timeout=hedge_delay_in_seconds)
+            if first_attempt.done() or hedge_delay_in_seconds is None or not hedging_policy.try_acquire_hedge():
+                winner = await first_attempt
+                return winner
+
+            hedge: asyncio.Task[RetryableAioHttpResponse] = start_attempt()
+            attempts.append(hedge)
+            trace.get_current_span().add_event(
+                FhirClientSdkOpenTelemetryEventNames.HEDGE_SENT,
+                {
+                    FhirClientSdkOpenTelemetryAttributeNames.HOST: host,
+                    FhirClientSdkOpenTelemetryAttributeNames.HEDGE_DELAY_IN_SECONDS: hedge_delay_in_seconds,
+                },
+            )
+            running: set[asyncio.Task[RetryableAioHttpResponse]] = set(attempts)
+            failed_attempt: asyncio.Task[RetryableAioHttpResponse] | None = None
+            while running:
+                done: set[asyncio.Task[RetryableAioHttpResponse]]
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in [a for a in attempts if a in done]:
+                    if not self._is_transient_failure(attempt):
+                        # a success, or an answer like 404 that the other attempt would get too
+                        FhirClientSdkMetrics.get().record_hedge(url=url, won=attempt is hedge)
+                        winner = attempt.result()
+                        return winner
+                    # a transient failure is only returned (or raised) if the other attempt failed too
+                    failed_attempt = failed_attempt or attempt
+            FhirClientSdkMetrics.get().record_hedge(url=url, won=False)
+            assert failed_attempt is not None
+            winner = failed_attempt.result()
+            return winner
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+            # wait for the cancelled attempts so they do not outlive the session
+            await asyncio.gather(*attempts, return_exceptions=True)
+            for attempt in attempts:
+                if not attempt.cancelled() and attempt.exception() is None and attempt.result() is not winner:
+                    attempt.result().release()
+
+    @staticmethod
+    def _is_transient_failure(attempt: asyncio.Task[RetryableAioHttpResponse]) -> bool:
+        """
+        Whether the finished attempt failed in a way that a second attempt might not: a connection error or timeout
+        (returned as 500 when exceptions are not thrown), a 429 or a 5xx
+        """
+        exception: BaseException | None = attempt.exception()
+        if exception is not None:
+            return not isinstance(exception, ClientResponseError) or exception.status == 429 or exception.status >= 500
+        response: RetryableAioHttpResponse = attempt.result()
+        return not response.ok and (response.status == 429 or response.status >= 500)
+
+    async def _fetch_with_retries_async(
+        self,
+        *,
+        url: str,
+        method: str,
+        headers: dict[str, str] | None,
+        **kwargs: Any,
     ) -> RetryableAioHttpResponse:
         retry_attempts: int = -1
         results_by_url: list[RetryableAioHttpUrlResult] = []
         access_token: str | None = self.access_token
         expiry_date: datetime | None = self.access_token_expiry_date
+        resilience: HostResilienceState | None = (
+            self.host_resilience_registry.get_state(url=url) if self.host_resilience_registry else None
+        )
+        # 429 pauses are shared per host even when no registry was passed
+        rate_governor: RateGovernor = (resilience or HostResilienceRegistry.default().get_state(url=url)).rate_governor
+        first_429_time: float | None = None
+        # attempts that found the host overloaded, unlike e.g. a 401 that was retried with a new token
+        overloaded_attempt_count: int = 0
+        sdk_metrics: FhirClientSdkMetrics = FhirClientSdkMetrics.get()
+        # the hedge delay is a percentile of single HTTP attempts so backoff and 429 pauses do not inflate it
+        hedged_host: str | None = (
+            HostResilienceRegistry.get_host(url) if self.hedging_policy is not None and method == "GET" else None
+        )
 
         # run with retry
         while retry_attempts < self.retries:
             retry_attempts += 1
+            # wait if this or any other request to the host got a 429
+            await rate_governor.wait_async()
+            if resilience and not resilience.circuit_breaker.allow_request():
+                # fail fast while the host is unhealthy
+                circuit_breaker_open_error = CircuitBreakerOpenError(
+                    host=resilience.host,
+                    retry_after_in_seconds=resilience.circuit_breaker.retry_after_in_seconds,
+                )
+                if self._throw_exception_on_error:
+                    raise circuit_breaker_open_error
+                return RetryableAioHttpResponse(
+                    ok=False,
+                    status=503,
+                    response_headers={},
+                    response_text=str(circuit_breaker_open_error),
+                    content=None,
+                    use_data_streaming=self.use_data_streaming,
+                    results_by_url=results_by_url,
+                    access_token=access_token,
+                    access_token_expiry_date=expiry_date,
+                    retry_count=retry_attempts,
+                    overloaded_attempt_count=overloaded_attempt_count,
+                )
+            # whether the circuit breaker was told the outcome of this attempt
+            outcome_recorded: bool = False
             try:
                 if headers:
                     kwargs["headers"] = headers
@@ -159,13 +326,48 @@ class RetryableAioHttpClient:
                         FhirClientSdkOpenTelemetryAttributeNames.URL,
                         url,
                     )
+                    if resilience:
+                        span.set_attribute(FhirClientSdkOpenTelemetryAttributeNames.HOST, resilience.host)
+                        span.set_attribute(
+                            FhirClientSdkOpenTelemetryAttributeNames.CIRCUIT_BREAKER_STATE,
+                            resilience.circuit_breaker.state.value,
+                        )
+                        span.set_attribute(
+                            FhirClientSdkOpenTelemetryAttributeNames.RETRY_BUDGET_TOKENS,
+                            resilience.retry_budget.tokens,
+                        )
                     async with async_timeout.timeout(self.timeout_in_seconds):
                         start_time: float = time.time()
-                        response: ClientResponse = await self.session.request(
-                            method,
-                            url,
-                            **kwargs,
+                        # filled in by the hooks of HttpRequestTiming.create_trace_config() if the session has them
+                        timing: HttpRequestTiming = HttpRequestTiming()
+                        request_start: float = time.perf_counter()
+                        try:
+                            response: ClientResponse = await self.session.request(
+                                method,
+                                url,
+                                trace_request_ctx=timing,
+                                **kwargs,
+                            )
+                        finally:
+                            if hedged_host is not None and self.hedging_policy is not None:
+                                # an attempt that lost the race took at least this long so it still counts
+                                self.hedging_policy.record_latency(
+                                    host=hedged_host, latency_in_seconds=time.perf_counter() - request_start
+                                )
+                        timing.time_to_first_byte_seconds = time.perf_counter() - request_start
+                        timing.set_network_span_attributes(span)
+                        sdk_metrics.record_http_request(
+                            method=method,
+                            url=url,
+                            status_code=response.status,
+                            duration_in_seconds=timing.time_to_first_byte_seconds,
                         )
+                        if resilience:
+                            if self.retry_status_codes and response.status in self.retry_status_codes:
+                                resilience.circuit_breaker.record_failure()
+                            else:
+                                resilience.circuit_breaker.record_success()
+                            outcome_recorded = True
                         # Append the result to the list of results
                         if self.log_all_url_results:
                             results_by_url.append(
@@ -176,6 +378,7 @@ class RetryableAioHttpClient:
                                     retry_count=retry_attempts,
                                     start_time=start_time,
                                     end_time=time.time(),
+                                    timing=timing,
                                 )
                             )
                         response_headers: dict[str, str] = {
@@ -202,22 +405,28 @@ class RetryableAioHttpClient:
                             )
 
                         if response.ok:
+                            response_text: str = ""
+                            if not self.use_data_streaming:
+                                body_start: float = time.perf_counter()
+                                response_text = await self.get_safe_response_text_async(response=response)
+                                timing.body_seconds = time.perf_counter() - body_start
+                                timing.set_network_span_attributes(span)
                             # If the response is successful, return the response
                             return RetryableAioHttpResponse(
                                 ok=response.ok,
                                 status=response.status,
                                 response_headers=response_headers,
-                                response_text=(
-                                    await self.get_safe_response_text_async(response=response)
-                                    if not self.use_data_streaming
-                                    else ""
-                                ),
+                                response_text=response_text,
                                 content=response.content,
                                 use_data_streaming=self.use_data_streaming,
                                 results_by_url=results_by_url,
                                 access_token=access_token,
                                 access_token_expiry_date=expiry_date,
                                 retry_count=retry_attempts,
+                                overloaded_attempt_count=overloaded_attempt_count,
+                                timing=timing,
+                                # the body of a streamed response is read later so the connection is still open
+                                client_response=response if self.use_data_streaming else None,
                             )
                         elif (
                             self.exclude_status_codes_from_retry
@@ -234,6 +443,7 @@ class RetryableAioHttpClient:
                                 access_token=access_token,
                                 access_token_expiry_date=expiry_date,
                                 retry_count=retry_attempts,
+                                overloaded_attempt_count=overloaded_attempt_count,
                             )
                         elif response.status == 400:
                             return RetryableAioHttpResponse(
@@ -247,6 +457,7 @@ class RetryableAioHttpClient:
                                 access_token=access_token,
                                 access_token_expiry_date=expiry_date,
                                 retry_count=retry_attempts,
+                                overloaded_attempt_count=overloaded_attempt_count,
                             )
                         elif response.status in [403, 404]:
                             return RetryableAioHttpResponse(
@@ -260,9 +471,40 @@ class RetryableAioHttpClient:
                                 access_token=access_token,
                                 access_token_expiry_date=expiry_date,
                                 retry_count=retry_attempts,
+                                overloaded_attempt_count=overloaded_attempt_count,
                             )
                         elif response.status == 429:
-                            await self._handle_429(response=response, full_url=url)
+                            overloaded_attempt_count += 1
+                            # wait at least a second so a Retry-After of 0 cannot turn into a busy loop
+                            retry_after_in_seconds: float = max(
+                                1.0, self._get_retry_after_in_seconds(response=response)
+                            )
+                            if first_429_time is None:
+                                first_429_time = time.time()
+                            if self.maximum_time_to_retry_on_429 is not None:
+                                if (
+                                    time.time() - first_429_time + retry_after_in_seconds
+                                    > self.maximum_time_to_retry_on_429
+                                ):
+                                    # waiting any longer would go past the maximum time so give up
+                                    return RetryableAioHttpResponse(
+                                        ok=response.ok,
+                                        status=response.status,
+                                        response_headers=response_headers,
+                                        response_text=await self.get_safe_response_text_async(response=response),
+                                        content=response.content,
+                                        use_data_streaming=self.use_data_streaming,
+                                        results_by_url=results_by_url,
+                                        access_token=access_token,
+                                        access_token_expiry_date=expiry_date,
+                                        retry_count=retry_attempts,
+                                        overloaded_attempt_count=overloaded_attempt_count,
+                                    )
+                                # retries after a 429 are limited by time instead of by count
+                                retry_attempts -= 1
+                            # pause every request to this host, not just this one
+                            rate_governor.pause(seconds=retry_after_in_seconds)
+                            sdk_metrics.record_retry(method=method, url=url, reason="429")
                         elif response.status == 401 and self.refresh_token_func_async:
                             # Call the token refresh function if status code is 401
                             refresh_token_result: RefreshTokenResult = await self.refresh_token_func_async(
@@ -284,6 +526,7 @@ class RetryableAioHttpClient:
                                     access_token=access_token,
                                     access_token_expiry_date=expiry_date,
                                     retry_count=retry_attempts,
+                                    overloaded_attempt_count=overloaded_attempt_count,
                                 )
                             else:  # we got a valid token
                                 access_token = refresh_token_result.access_token
@@ -299,7 +542,8 @@ class RetryableAioHttpClient:
                                         history=response.history,
                                         request_info=response.request_info,
                                     )
-                                await asyncio.sleep(self.backoff_factor * (2 ** (retry_attempts - 1)))
+                                sdk_metrics.record_retry(method=method, url=url, reason="401")
+                                await asyncio.sleep(self._get_backoff_in_seconds(retry_attempts=retry_attempts))
                         elif self.retry_status_codes and response.status in self.retry_status_codes:
                             raise ClientResponseError(
                                 status=response.status,
@@ -329,9 +573,19 @@ class RetryableAioHttpClient:
                                     access_token=access_token,
                                     access_token_expiry_date=expiry_date,
                                     retry_count=retry_attempts,
+                                    overloaded_attempt_count=overloaded_attempt_count,
                                 )
             except (TimeoutError, ClientError, ClientResponseError) as e:
-                if retry_attempts >= self.retries:
+                if isinstance(e, TimeoutError | ClientConnectionError) or (
+                    isinstance(e, ClientResponseError)
+                    and e.status in AdaptiveConcurrencyLimiter.overloaded_status_codes
+                ):
+                    overloaded_attempt_count += 1
+                if resilience and not outcome_recorded:
+                    # timeouts and connection errors mean the host is unhealthy
+                    resilience.circuit_breaker.record_failure()
+                    outcome_recorded = True
+                if retry_attempts >= self.retries or (resilience and not self._try_acquire_retry(resilience)):
                     if self._throw_exception_on_error:
                         raise
                     else:
@@ -346,8 +600,14 @@ class RetryableAioHttpClient:
                             access_token=access_token,
                             access_token_expiry_date=expiry_date,
                             retry_count=retry_attempts,
+                            overloaded_attempt_count=overloaded_attempt_count,
                         )
-                await asyncio.sleep(self.backoff_factor * (2 ** (retry_attempts - 1)))
+                sdk_metrics.record_retry(
+                    method=method,
+                    url=url,
+                    reason=str(e.status) if isinstance(e, ClientResponseError) else type(e).__name__,
+                )
+                await asyncio.sleep(self._get_backoff_in_seconds(retry_attempts=retry_attempts))
             except Exception as e:
                 if self._throw_exception_on_error:
                     raise
@@ -363,7 +623,12 @@ class RetryableAioHttpClient:
                         access_token=access_token,
                         access_token_expiry_date=expiry_date,
                         retry_count=retry_attempts,
+                        overloaded_attempt_count=overloaded_attempt_count,
                     )
+            finally:
+                if resilience and not outcome_recorded:
+                    # e.g., cancelled, so neither a success nor a failure of the host
+                    resilience.circuit_breaker.release()
 
         # Raise an exception if all retries fail
         raise Exception("All retries failed")
@@ -419,8 +684,40 @@ class RetryableAioHttpClient:
     async def delete(self, *, headers: dict[str, str] | None, url: str, **kwargs: Any) -> RetryableAioHttpResponse:
         return await self.fetch(url=url, headers=headers, method="DELETE", **kwargs)
 
+    def _get_backoff_in_seconds(self, *, retry_attempts: int) -> float:
+        """
+        Returns how long to wait before the next retry using exponential backoff with full jitter
+        i.e., a random time between 0 and backoff_factor * 2^(retry_attempts - 1).  The jitter spreads out the
+        retries of concurrent requests that failed at the same time so they don't hit the server in lockstep.
+
+        :param retry_attempts: number of attempts made so far
+        :return: seconds to wait
+        """
+        return random.uniform(0, self.backoff_factor * (2 ** (retry_attempts - 1)))
+
+    @staticmethod
+    def _try_acquire_retry(resilience: HostResilienceState) -> bool:
+        """
+        Takes a token from the retry budget of the host.  If the budget is exhausted the failure is returned to the
+        caller instead of being retried.
+        """
+        if resilience.retry_budget.try_acquire():
+            return True
+        trace.get_current_span().add_event(
+            FhirClientSdkOpenTelemetryEventNames.RETRY_BUDGET_EXHAUSTED,
+            {FhirClientSdkOpenTelemetryAttributeNames.HOST: resilience.host},
+        )
+        return False
+
     @staticmethod
-    async def _handle_429(*, response: ClientResponse, full_url: str) -> None:
+    def _get_retry_after_in_seconds(*, response: ClientResponse) -> float:
+        """
+        Returns how long the server asked us to wait after a 429 (Too Many Requests) response.
+        Defaults to 60 seconds if there is no valid Retry-After header.
+
+        :param response: 429 response
+        :return: seconds to wait
+        """
         # https://developer.mozilla.org/en-US/docs/Web/HTTP/Status/429
         # read the Retry-After header
         # https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/Retry-After
@@ -429,20 +726,15 @@ class RetryableAioHttpClient:
             # noinspection PyBroadException
             try:
                 if retry_after_text.isnumeric():  # it is a number of seconds
-                    await asyncio.sleep(int(retry_after_text))
+                    return int(retry_after_text)
                 else:
                     wait_till: datetime = datetime.strptime(retry_after_text, "%a, %d %b %Y %H:%M:%S GMT")
                     # Ensure the parsed time is in UTC
                     wait_till = wait_till.replace(tzinfo=UTC)
 
                     # Calculate the time difference
-                    time_diff = (wait_till - datetime.now(UTC)).total_seconds()
-
-                    # If the time difference is positive, sleep for that amount of time
-                    if time_diff > 0:
-                        await asyncio.sleep(time_diff)
+                    return max(0.0, (wait_till - datetime.now(UTC)).total_seconds())
             except Exception:
-                # if there was some exception, parsing the Retry-After header, sleep for 60 seconds
-                await asyncio.sleep(60)
-        else:
-            await asyncio.sleep(60)
+                # if there was some exception, parsing the Retry-After header, wait for 60 seconds
+                return 60
+        return 60
@@ -2,9 +2,10 @@ import json
 from datetime import datetime
 from typing import Any, cast
 
-from aiohttp import StreamReader
+from aiohttp import ClientResponse, StreamReader
 from multidict import CIMultiDict
 
+from helix_fhir_client_sdk.utilities.http_request_timing import HttpRequestTiming
 from helix_fhir_client_sdk.utilities.retryable_aiohttp_url_result import (
     RetryableAioHttpUrlResult,
 )
@@ -27,6 +28,9 @@ class RetryableAioHttpResponse:
         "access_token",
         "access_token_expiry_date",
         "retry_count",
+        "overloaded_attempt_count",
+        "timing",
+        "_client_response",
     ]
 
     def __init__(
@@ -42,6 +46,9 @@ class RetryableAioHttpResponse:
         access_token: str | None,
         access_token_expiry_date: datetime | None,
         retry_count: int | None,
+        overloaded_attempt_count: int = 0,
+        timing: HttpRequestTiming | None = None,
+        client_response: ClientResponse | None = None,
     ) -> None:
         """
         Response object for retryable aiohttp requests
@@ -81,6 +88,23 @@ class RetryableAioHttpResponse:
         self.retry_count: int | None = retry_count
         """ retry count """
 
+        self.overloaded_attempt_count: int = overloaded_attempt_count
+        """ attempts that were throttled (429), found the server unavailable (503), timed out or could not connect """
+
+        self.timing: HttpRequestTiming | None = timing
+        """ where the time of the request that returned this response went """
+
+        self._client_response: ClientResponse | None = client_response
+        """ response whose connection is still open because its body has not been read yet """
+
+    def release(self) -> None:
+        """
+        Releases the connection of a response whose body will not be read (e.g., the attempt that lost a hedge)
+        """
+        if self._client_response is not None:
+            self._client_response.release()
+            self._client_response = None
+
     async def get_text_async(self) -> str:
         if self.content is None:
             return self._response_text
@@ -114,4 +138,6 @@ class RetryableAioHttpResponse:
             access_token=self.access_token,
             access_token_expiry_date=self.access_token_expiry_date,
             retry_count=self.retry_count,
+            overloaded_attempt_count=self.overloaded_attempt_count,
+            timing=self.timing.to_dict() if self.timing is not None else None,
         )
@@ -1,6 +1,8 @@
 import dataclasses
 from typing import Any
 
+from helix_fhir_client_sdk.utilities.http_request_timing import HttpRequestTiming
+
 
 @dataclasses.dataclass(slots=True)
 class RetryableAioHttpUrlResult:
@@ -10,6 +12,7 @@ class RetryableAioHttpUrlResult:
     retry_count: int
     start_time: float
     end_time: float
+    timing: HttpRequestTiming | None = None
 
     def to_dict(self) -> dict[str, Any]:
         """
@@ -24,4 +27,5 @@ class RetryableAioHttpUrlResult:
             "retry_count": self.retry_count,
             "start_time": self.start_time,
             "end_time": self.end_time,
+            "timing": self.timing.to_dict() if self.timing is not None else None,
         }
@@ -0,0 +1,143 @@
+import asyncio
+from typing import Any
+
+import aiohttp
+from aioresponses import aioresponses
+
+from helix_fhir_client_sdk.fhir_client import FhirClient
+from helix_fhir_client_sdk.function_types import RefreshTokenResult
+from helix_fhir_client_sdk.utilities.async_parallel_processor.v1.async_parallel_processor import (
+    AsyncParallelProcessor,
+    ParallelFunctionContext,
+)
+from helix_fhir_client_sdk.utilities.host_resilience.adaptive_concurrency_limiter import AdaptiveConcurrencyLimiter
+from helix_fhir_client_sdk.utilities.host_resilience.adaptive_concurrency_registry import AdaptiveConcurrencyRegistry
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now: float = 0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_limit_grows_additively_and_shrinks_multiplicatively() -> None:
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter(
+        host="fhir.example.com", min_limit=2, max_limit=5, initial_limit=4, target_latency_in_seconds=1, clock=clock
+    )
+
+    # the limit grows by one after limit requests completed in time and stops at max_limit
+    for _ in range(4 + 5 + 5):
+        limiter.release(acquired_at=await limiter.acquire_async(), overloaded=False)
+    assert limiter.limit == 5
+
+    # requests sent at the same limit only lower it once
+    acquired: list[float] = [await limiter.acquire_async() for _ in range(3)]
+    clock.now = 1
+    for acquired_at in acquired:
+        limiter.release(acquired_at=acquired_at, overloaded=True)
+    assert limiter.limit == 2
+
+    # a request slower than the target latency lowers it too, but never below min_limit
+    acquired_at = await limiter.acquire_async()
+    clock.now = 3
+    limiter.release(acquired_at=acquired_at, overloaded=False)
+    assert limiter.limit == 2
+    assert limiter.in_flight == 0
+
+
+async def test_waiters_get_slots_in_order_and_cancelled_waiters_do_not_keep_one() -> None:
+    limiter = AdaptiveConcurrencyLimiter(host="fhir.example.com", initial_limit=1)
+    acquired_at: float = await limiter.acquire_async()
+    order: list[str] = []
+
+    async def acquire_async(name: str) -> None:
+        await limiter.acquire_async()
+        order.append(name)
+
+    first = asyncio.create_task(acquire_async("first"))
+    cancelled = asyncio.create_task(acquire_async("cancelled"))
+    last = asyncio.create_task(acquire_async("last"))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+
+    limiter.release(acquired_at=acquired_at, overloaded=False)
+    await first
+    limiter.release(acquired_at=acquired_at, overloaded=False)
+    await last
+    assert order == ["first", "last"]
+    assert limiter.in_flight == 1
+
+
+async def test_clones_share_the_limiter_of_the_host() -> None:
+    registry = AdaptiveConcurrencyRegistry(initial_concurrent_requests=8)
+    with aioresponses() as m:
+        m.get("http://example.com/fhir/Patient/1", status=503)
+        m.get("http://example.com/fhir/Patient/1", payload={"resourceType": "Patient", "id": "1"})
+        m.get("http://example.com/fhir/Patient/2", payload={"resourceType": "Patient", "id": "2"})
+
+        fhir_client = FhirClient().url("http://example.com/fhir").set_access_token("token")
+        fhir_client = fhir_client.adaptive_concurrency(registry).retry_count(1)
+        fhir_client.create_http_session = lambda: aiohttp.ClientSession()  # type: ignore[method-assign]
+        response = await fhir_client.clone().resource("Patient").id_("1").get_async()
+        assert response.status == 200
+        response = await fhir_client.clone().resource("Patient").id_("2").get_async()
+        assert response.status == 200
+
+    limiter: AdaptiveConcurrencyLimiter = registry.get_limiter(url="http://example.com/fhir/Patient")
+    # the 503 that was retried halved the limit
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+    assert registry.get_limiter(url="http://other.example.com/fhir/Patient") is not limiter
+
+
+async def test_retry_with_a_refreshed_token_does_not_lower_the_limit() -> None:
+    registry = AdaptiveConcurrencyRegistry(initial_concurrent_requests=8)
+
+    async def refresh_token(**kwargs: Any) -> RefreshTokenResult:
+        return RefreshTokenResult(access_token="new_token", expiry_date=None, abort_request=False)
+
+    with aioresponses() as m:
+        m.get("http://example.com/fhir/Patient/1", status=401)
+        m.get("http://example.com/fhir/Patient/1", payload={"resourceType": "Patient", "id": "1"})
+
+        fhir_client = FhirClient().url("http://example.com/fhir").set_access_token("token")
+        fhir_client = fhir_client.adaptive_concurrency(registry).retry_count(1).refresh_token_function(refresh_token)
+        fhir_client.create_http_session = lambda: aiohttp.ClientSession()  # type: ignore[method-assign]
+        response = await fhir_client.resource("Patient").id_("1").get_async()
+        assert response.status == 200
+
+    limiter: AdaptiveConcurrencyLimiter = registry.get_limiter(url="http://example.com/fhir/Patient")
+    # the 401 was retried but says nothing about the load on the host
+    assert limiter.limit == 8
+    assert limiter.in_flight == 0
+
+
+async def test_async_parallel_processor_uses_the_limiter() -> None:
+    limiter = AdaptiveConcurrencyLimiter(host="tasks", min_limit=2, max_limit=2, initial_limit=2)
+    running: int = 0
+    max_running: int = 0
+
+    async def process_row_fn(
+        *, context: ParallelFunctionContext, row: int, parameters: dict[str, Any] | None, additional_parameters: Any
+    ) -> int:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return row * 2
+
+    processor = AsyncParallelProcessor(name="test", concurrency_limiter=limiter)
+    results: list[int] = [
+        result
+        async for result in processor.process_rows_in_parallel(
+            rows=list(range(6)), process_row_fn=process_row_fn, parameters=None
+        )
+    ]
+    assert sorted(results) == [0, 2, 4, 6, 8, 10]
+    assert max_running == 2
+    assert limiter.in_flight == 0
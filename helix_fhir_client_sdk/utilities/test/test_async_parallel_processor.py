@@ -0,0 +1,110 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+
+from helix_fhir_client_sdk.utilities.async_parallel_processor.v1.async_parallel_processor import (
+    AsyncParallelProcessor,
+    ParallelFunctionContext,
+)
+
+
+class RowSource:
+    def __init__(self, count: int) -> None:
+        self.count: int = count
+        self.rows_read: int = 0
+        self.closed: bool = False
+
+    async def read_async(self) -> AsyncGenerator[int, None]:
+        try:
+            for row in range(self.count):
+                await asyncio.sleep(0)
+                self.rows_read += 1
+                yield row
+        finally:
+            self.closed = True
+
+
+async def double_async(
+    *, context: ParallelFunctionContext, row: int, parameters: dict[str, Any] | None, additional_parameters: Any
+) -> int:
+    # later rows finish first
+    await asyncio.sleep(0.001 * (5 - row % 5))
+    return row * 2
+
+
+async def test_streams_rows_with_at_most_max_concurrent_tasks_read_ahead() -> None:
+    source = RowSource(20)
+    results: list[int] = []
+    async for result in AsyncParallelProcessor(name="test", max_concurrent_tasks=3).process_stream_in_parallel(
+        rows=source.read_async(), process_row_fn=double_async, parameters=None
+    ):
+        # rows are only read when a task slot is free
+        assert source.rows_read - len(results) <= 3
+        results.append(result)
+    assert sorted(results) == [row * 2 for row in range(20)]
+    assert results != sorted(results)
+
+
+async def test_ordered_results_follow_the_rows() -> None:
+    contexts: list[ParallelFunctionContext] = []
+
+    async def record_async(
+        *, context: ParallelFunctionContext, row: int, parameters: dict[str, Any] | None, additional_parameters: Any
+    ) -> int:
+        contexts.append(context)
+        return await double_async(context=context, row=row, parameters=parameters, additional_parameters=None)
+
+    results: list[int] = [
+        result
+        async for result in AsyncParallelProcessor(name="test", max_concurrent_tasks=4).process_stream_in_parallel(
+            rows=iter(range(12)), process_row_fn=record_async, parameters=None, ordered=True
+        )
+    ]
+    assert results == [row * 2 for row in range(12)]
+    assert [context.task_index for context in contexts] == list(range(12))
+    assert contexts[0].total_task_count is None
+
+
+async def test_an_error_cancels_the_other_tasks() -> None:
+    started: list[int] = []
+    cancelled: list[int] = []
+
+    async def fail_on_three_async(
+        *, context: ParallelFunctionContext, row: int, parameters: dict[str, Any] | None, additional_parameters: Any
+    ) -> int:
+        started.append(row)
+        if row == 3:
+            raise ValueError("row 3")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(row)
+            raise
+        return row
+
+    source = RowSource(100)
+    with pytest.raises(ValueError, match="row 3"):
+        async for _ in AsyncParallelProcessor(name="test", max_concurrent_tasks=5).process_stream_in_parallel(
+            rows=source.read_async(), process_row_fn=fail_on_three_async, parameters=None
+        ):
+            pass
+    # every task still running was cancelled and no more rows were read
+    assert sorted(cancelled) == [row for row in started if row != 3]
+    assert source.rows_read <= 5
+    assert source.closed
+
+
+async def test_stopping_early_cancels_running_tasks_and_closes_the_source() -> None:
+    source = RowSource(100)
+    processor = AsyncParallelProcessor(name="test", max_concurrent_tasks=2)
+    results: AsyncGenerator[int, None] = processor.process_stream_in_parallel(
+        rows=source.read_async(), process_row_fn=double_async, parameters=None
+    )
+    async for _ in results:
+        break
+    await results.aclose()
+    assert source.closed
+    assert source.rows_read <= 3
+    assert not [task for task in asyncio.all_tasks() if task.get_name().startswith("task_")]
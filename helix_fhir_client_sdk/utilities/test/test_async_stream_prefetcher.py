@@ -0,0 +1,97 @@
+import asyncio
+from collections.abc import AsyncGenerator
+
+import pytest
+
+from helix_fhir_client_sdk.utilities.async_stream_prefetcher import AsyncStreamPrefetcher
+
+
+async def test_prefetch_reads_ahead_up_to_the_queue_size() -> None:
+    produced: list[int] = []
+    closed: list[bool] = []
+
+    async def source() -> AsyncGenerator[int, None]:
+        try:
+            for i in range(100):
+                produced.append(i)
+                yield i
+        finally:
+            closed.append(True)
+
+    items = AsyncStreamPrefetcher.prefetch_async(source(), max_queue_size=3)
+    assert await anext(items) == 0
+    await asyncio.sleep(0.01)
+    # the producer waits once the queue is full instead of reading everything
+    assert len(produced) <= 5
+
+    # stopping early stops the producer and closes the source
+    await items.aclose()
+    assert closed == [True]
+    assert len(produced) <= 5
+
+
+async def test_prefetch_keeps_order_and_raises_source_errors() -> None:
+    async def source() -> AsyncGenerator[int, None]:
+        for i in range(5):
+            await asyncio.sleep(0)
+            yield i
+        raise ValueError("connection lost")
+
+    received: list[int] = []
+    with pytest.raises(ValueError, match="connection lost"):
+        async for item in AsyncStreamPrefetcher.prefetch_async(source(), max_queue_size=2):
+            received.append(item)
+
+    # everything read before the error is returned first
+    assert received == [0, 1, 2, 3, 4]
+
+
+async def test_merge_interleaves_sources_up_to_the_concurrency() -> None:
+    running: list[int] = []
+    max_running: list[int] = [0]
+
+    async def source(name: str, count: int) -> AsyncGenerator[str, None]:
+        running.append(1)
+        max_running[0] = max(max_running[0], len(running))
+        try:
+            for i in range(count):
+                await asyncio.sleep(0)
+                yield f"{name}{i}"
+        finally:
+            running.pop()
+
+    received: list[str] = [
+        item
+        async for item in AsyncStreamPrefetcher.merge_async(
+            [source("a", 3), source("b", 2), source("c", 1)], max_queue_size=2, max_concurrent_sources=2
+        )
+    ]
+
+    assert sorted(received) == ["a0", "a1", "a2", "b0", "b1", "c0"]
+    # the items of each source stay in order
+    assert [item for item in received if item.startswith("a")] == ["a0", "a1", "a2"]
+    assert max_running[0] == 2
+    assert not running
+
+
+async def test_merge_raises_source_errors_and_cancels_the_other_sources() -> None:
+    closed: list[str] = []
+
+    async def slow() -> AsyncGenerator[int, None]:
+        try:
+            while True:
+                await asyncio.sleep(0.01)
+                yield 0
+        finally:
+            closed.append("slow")
+
+    async def failing() -> AsyncGenerator[int, None]:
+        await asyncio.sleep(0.02)
+        yield 1
+        raise ValueError("connection lost")
+
+    with pytest.raises(ValueError, match="connection lost"):
+        async for _ in AsyncStreamPrefetcher.merge_async([slow(), failing()], max_queue_size=10):
+            pass
+
+    assert closed == ["slow"]
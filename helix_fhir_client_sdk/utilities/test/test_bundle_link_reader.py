@@ -0,0 +1,78 @@
+import json
+from typing import Any
+
+from helix_fhir_client_sdk.utilities.bundle_link_reader import BundleLinkReader
+from helix_fhir_client_sdk.utilities.ndjson_line_splitter import NdJsonLineSplitter
+
+
+def create_bundle(next_url: str | None, link_first: bool = True) -> bytes:
+    bundle: dict[str, Any] = {"resourceType": "Bundle", "type": "searchset"}
+    links: list[dict[str, str]] = [{"relation": "self", "url": "http://fhir/Patient"}]
+    if next_url:
+        links.append({"relation": "next", "url": next_url})
+    entries: list[dict[str, Any]] = [
+        {
+            "resource": {
+                "resourceType": "Patient",
+                "id": str(i),
+                "name": [{"text": 'with "quotes" and \\ backslash {['}],
+                # resources have link elements too
+                "link": [{"relation": "next", "url": f"http://wrong/{i}"}],
+            }
+        }
+        for i in range(20)
+    ]
+    if link_first:
+        bundle["link"] = links
+        bundle["entry"] = entries
+    else:
+        bundle["entry"] = entries
+        bundle["link"] = links
+    return json.dumps(bundle, indent=2).encode("utf-8")
+
+
+def read_in_chunks(data: bytes, chunk_size: int) -> BundleLinkReader:
+    reader = BundleLinkReader()
+    for start in range(0, len(data), chunk_size):
+        reader.feed(data[start : start + chunk_size])
+    return reader
+
+
+def test_read_next_url() -> None:
+    assert BundleLinkReader.read_next_url(create_bundle("http://fhir/Patient?page=2")) == "http://fhir/Patient?page=2"
+    assert BundleLinkReader.read_next_url(create_bundle(None)) is None
+    assert BundleLinkReader.read_next_url(b'{"resourceType": "Patient", "id": "1"}') is None
+
+
+def test_read_next_url_in_chunks() -> None:
+    for link_first in (True, False):
+        data: bytes = create_bundle("http://fhir/Patient?page=2", link_first=link_first)
+        for chunk_size in (1, 7, 64, 1000):
+            reader: BundleLinkReader = read_in_chunks(data, chunk_size)
+            # the link element after the entries is only looked for at the end of the page
+            assert reader.done == link_first
+            assert reader.get_next_url() == "http://fhir/Patient?page=2", (link_first, chunk_size)
+
+
+def test_stops_reading_once_link_is_found() -> None:
+    data: bytes = create_bundle("http://fhir/Patient?page=2", link_first=True)
+    reader = BundleLinkReader()
+    reader.feed(data[: data.index(b'"entry"')])
+    assert reader.done
+    # the rest of the page is ignored
+    reader.feed(b"not json")
+    assert reader.get_next_url() == "http://fhir/Patient?page=2"
+
+
+def test_ndjson_line_splitter() -> None:
+    data: bytes = b"".join(json.dumps({"id": str(i)}).encode("utf-8") + b"\n" for i in range(10)) + b'{"id": "10"}'
+    for chunk_size in (1, 5, 13, 1000):
+        splitter = NdJsonLineSplitter()
+        lines: list[bytes] = []
+        for start in range(0, len(data), chunk_size):
+            lines.extend(bytes(line) for line in splitter.add_chunk(data[start : start + chunk_size]))
+        last_line: bytes | None = splitter.flush()
+        assert last_line is not None
+        lines.append(last_line)
+        assert [json.loads(line)["id"] for line in lines] == [str(i) for i in range(11)]
+        assert all(line.endswith(b"\n") for line in lines[:-1])
@@ -0,0 +1,38 @@
+import logging
+import threading
+from typing import Any
+
+import pytest
+
+from helix_fhir_client_sdk.utilities.fhir_client_logger import FhirClientLogger
+
+
+def test_log_variables_builds_the_text_only_when_enabled(
+    caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    logger: logging.Logger = logging.getLogger("test_fhir_client_logger")
+    calls: list[dict[str, Any]] = []
+    get_variables_to_log = FhirClientLogger.get_variables_to_log
+
+    def counting_get_variables_to_log(vars_dict: dict[str, Any]) -> dict[str, Any]:
+        calls.append(vars_dict)
+        return get_variables_to_log(vars_dict)
+
+    monkeypatch.setattr(FhirClientLogger, "get_variables_to_log", staticmethod(counting_get_variables_to_log))
+
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        FhirClientLogger.log_variables(logger=logger, level=logging.DEBUG, vars_dict={"_id": ["1"]})
+        assert not calls
+        assert not caplog.records
+
+        FhirClientLogger.log_variables(logger=logger, level=logging.INFO, vars_dict={"_id": ["1"]})
+    assert calls == [{"_id": ["1"]}]
+    assert [record.levelno for record in caplog.records] == [logging.INFO]
+    assert caplog.messages[0].startswith("parameters: ")
+
+
+def test_get_variables_to_log_skips_functions_locks_and_tokens() -> None:
+    variables = FhirClientLogger.get_variables_to_log(
+        {"_id": ["1", "2"], "_fn": print, "_lock": threading.Lock(), "_login_token": "secret", "_limit": None}
+    )
+    assert variables == {"_id": ["1", "2"], "_limit": None}
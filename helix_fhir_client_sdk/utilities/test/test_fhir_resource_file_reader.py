@@ -0,0 +1,93 @@
+import gzip
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from helix_fhir_client_sdk.utilities.fhir_resource_file_reader import (
+    FhirResourceFileBatch,
+    FhirResourceFileReader,
+)
+
+
+async def read_all(reader: FhirResourceFileReader, paths: list[Path]) -> list[FhirResourceFileBatch]:
+    return [batch async for batch in reader.read_batches_async(paths=paths)]
+
+
+async def test_reads_ndjson_in_batches_by_size(tmp_path: Path) -> None:
+    path = tmp_path / "patients.ndjson"
+    lines = [json.dumps({"resourceType": "Patient", "id": str(i)}) for i in range(10)]
+    path.write_text("\n".join(lines) + "\n")
+
+    # each line is ~36 bytes so three resources fill a batch
+    reader = FhirResourceFileReader(max_batch_size_in_bytes=100, read_block_size_in_bytes=50)
+    batches = await read_all(reader, [path])
+
+    assert [len(b.resources) for b in batches] == [3, 3, 3, 1]
+    assert [r["id"] for b in batches for r in b.resources] == [str(i) for i in range(10)]
+    assert all(b.resource_type == "Patient" for b in batches)
+
+
+async def test_groups_resources_by_type_and_count(tmp_path: Path) -> None:
+    path = tmp_path / "mixed.jsonl.gz"
+    resources: list[dict[str, Any]] = []
+    for i in range(4):
+        resources.append({"resourceType": "Patient", "id": f"p{i}"})
+        resources.append({"resourceType": "Observation", "id": f"o{i}"})
+    with gzip.open(path, "wt") as f:
+        f.write("\n".join(json.dumps(r) for r in resources))
+
+    reader = FhirResourceFileReader(max_batch_size_in_bytes=1024 * 1024, max_resources_per_batch=3)
+    batches = await read_all(reader, [path])
+
+    assert [(b.resource_type, len(b.resources)) for b in batches] == [
+        ("Patient", 3),
+        ("Observation", 3),
+        ("Patient", 1),
+        ("Observation", 1),
+    ]
+
+
+async def test_reads_json_bundle_and_applies_fixer(tmp_path: Path) -> None:
+    path = tmp_path / "bundle.json"
+    bundle = {
+        "resourceType": "Bundle",
+        "type": "collection",
+        "entry": [
+            {"resource": {"resourceType": "Patient", "id": "1"}},
+            {"resource": {"resourceType": "Patient", "id": "2"}},
+        ],
+    }
+    path.write_text(json.dumps(bundle))
+    fixed_payloads: list[str] = []
+
+    def fix(payload: dict[str, Any]) -> dict[str, Any]:
+        fixed_payloads.append(payload["resourceType"])
+        for entry in payload["entry"]:
+            entry["resource"]["meta"] = {"source": "http://example.org"}
+        return payload
+
+    reader = FhirResourceFileReader(max_batch_size_in_bytes=1024, fn_fix_payload=fix)
+    batches = await read_all(reader, [path])
+
+    # the fixer sees the whole Bundle so it can rewrite references between entries
+    assert fixed_payloads == ["Bundle"]
+    assert len(batches) == 1
+    assert [r["meta"]["source"] for r in batches[0].resources] == ["http://example.org"] * 2
+    assert batches[0].size_in_bytes > 0
+
+
+async def test_lines_and_files_that_are_not_resources_raise(tmp_path: Path) -> None:
+    path = tmp_path / "patients.ndjson"
+    path.write_text(json.dumps({"resourceType": "Patient", "id": "1"}) + "\n\n" + json.dumps(["not", "a", "resource"]))
+    reader = FhirResourceFileReader(max_batch_size_in_bytes=1024, read_block_size_in_bytes=10)
+    with pytest.raises(
+        ValueError, match=r"patients\.ndjson, line 3: expected a resource or a Bundle but got a JSON list"
+    ):
+        await read_all(reader, [path])
+
+    path = tmp_path / "bundle.json"
+    path.write_text(json.dumps("not a bundle"))
+    with pytest.raises(ValueError, match=r"bundle\.json: expected a Bundle, .* but got a JSON str"):
+        await read_all(FhirResourceFileReader(max_batch_size_in_bytes=1024), [path])
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import time
+from typing import Any
+
+from aioresponses import CallbackResult, aioresponses
+from yarl import URL
+
+from helix_fhir_client_sdk.utilities.host_resilience.hedging_policy import HedgingPolicy
+from helix_fhir_client_sdk.utilities.retryable_aiohttp_client import RetryableAioHttpClient
+from helix_fhir_client_sdk.utilities.retryable_aiohttp_response import RetryableAioHttpResponse
+
+
+def create_client(policy: HedgingPolicy) -> RetryableAioHttpClient:
+    return RetryableAioHttpClient(
+        retries=0,
+        use_data_streaming=False,
+        access_token=None,
+        access_token_expiry_date=None,
+        refresh_token_func=None,
+        tracer_request_func=None,
+        hedging_policy=policy,
+    )
+
+
+def respond_in_turn(*responses: tuple[str, float, int]) -> Any:
+    """
+    Returns a callback that answers the n-th request with the n-th (id, delay, status).  The requests run at the same
+    time so a single callback registered with repeat=True has to tell them apart.
+    """
+    remaining: list[tuple[str, float, int]] = list(responses)
+
+    async def respond(url: str, **kwargs: Any) -> CallbackResult:
+        id_, delay, status = remaining.pop(0)
+        await asyncio.sleep(delay)
+        return CallbackResult(status=status, body=json.dumps({"resourceType": "Patient", "id": id_}))
+
+    return respond
+
+
+def test_delay_is_the_percentile_of_the_recent_latencies() -> None:
+    policy = HedgingPolicy(percentile=0.9, min_delay_in_seconds=0.05, max_delay_in_seconds=2, min_samples=10)
+    for latency in range(1, 10):
+        policy.record_latency(host="fhir.example.com", latency_in_seconds=latency / 10)
+    assert policy.get_hedge_delay_in_seconds(host="fhir.example.com") is None
+
+    policy.record_latency(host="fhir.example.com", latency_in_seconds=10)
+    assert policy.get_hedge_delay_in_seconds(host="fhir.example.com") == 0.9
+    assert policy.get_hedge_delay_in_seconds(host="other.example.com") is None
+
+    fast = HedgingPolicy(min_delay_in_seconds=0.05, min_samples=1)
+    fast.record_latency(host="fhir.example.com", latency_in_seconds=0.001)
+    assert fast.get_hedge_delay_in_seconds(host="fhir.example.com") == 0.05
+
+
+def test_budget_allows_a_share_of_the_requests() -> None:
+    policy = HedgingPolicy(max_hedge_ratio=0.25, max_hedge_burst=2)
+    for _ in range(100):
+        policy.get_hedge_delay_in_seconds(host="fhir.example.com")
+    # the budget is capped at max_hedge_burst
+    assert [policy.try_acquire_hedge() for _ in range(3)] == [True, True, False]
+    for _ in range(4):
+        policy.get_hedge_delay_in_seconds(host="fhir.example.com")
+    assert policy.try_acquire_hedge()
+
+
+async def test_slow_request_is_hedged_and_the_first_response_wins() -> None:
+    policy = HedgingPolicy(min_delay_in_seconds=0.05, min_samples=1, max_hedge_ratio=1)
+    policy.record_latency(host="fhir.example.com", latency_in_seconds=0.01)
+    with aioresponses() as m:
+        m.get(
+            "http://fhir.example.com/Patient/1",
+            callback=respond_in_turn(("slow", 5, 200), ("hedge", 0, 200)),
+            repeat=True,
+        )
+        async with create_client(policy) as client:
+            start: float = time.perf_counter()
+            response = await client.get(url="http://fhir.example.com/Patient/1")
+            # the slow request was cancelled instead of waited for
+            assert time.perf_counter() - start < 1
+    assert json.loads(await response.get_text_async())["id"] == "hedge"
+    assert policy.tokens < 1
+
+
+async def test_no_hedge_without_budget_or_for_other_methods() -> None:
+    policy = HedgingPolicy(min_delay_in_seconds=0.01, min_samples=1, max_hedge_ratio=0.01)
+    policy.record_latency(host="fhir.example.com", latency_in_seconds=0.001)
+    with aioresponses() as m:
+        m.get(
+            "http://fhir.example.com/Patient/1",
+            callback=respond_in_turn(("slow", 0.1, 200), ("hedge", 0, 200)),
+            repeat=True,
+        )
+        m.post("http://fhir.example.com/Patient/1", callback=respond_in_turn(("post", 0.1, 200)))
+        async with create_client(policy) as client:
+            response = await client.get(url="http://fhir.example.com/Patient/1")
+            assert json.loads(await response.get_text_async())["id"] == "slow"
+            response = await client.post(url="http://fhir.example.com/Patient/1", headers=None, data="{}")
+            assert json.loads(await response.get_text_async())["id"] == "post"
+
+
+async def test_transient_error_only_wins_when_both_attempts_fail() -> None:
+    policy = HedgingPolicy(min_delay_in_seconds=0.05, min_samples=1, max_hedge_ratio=1)
+    policy.record_latency(host="fhir.example.com", latency_in_seconds=0.01)
+    with aioresponses() as m:
+        m.get(
+            "http://fhir.example.com/Patient/1",
+            callback=respond_in_turn(("slow", 0.2, 200), ("hedge", 0, 503)),
+            repeat=True,
+        )
+        async with create_client(policy) as client:
+            response = await client.get(url="http://fhir.example.com/Patient/1")
+    assert response.status == 200
+    assert json.loads(await response.get_text_async())["id"] == "slow"
+
+
+async def test_definitive_error_wins_without_waiting_for_the_other_attempt() -> None:
+    policy = HedgingPolicy(min_delay_in_seconds=0.05, min_samples=1, max_hedge_ratio=1)
+    policy.record_latency(host="fhir.example.com", latency_in_seconds=0.01)
+    with aioresponses() as m:
+        m.get(
+            "http://fhir.example.com/Patient/1",
+            callback=respond_in_turn(("slow", 5, 200), ("hedge", 0, 404)),
+            repeat=True,
+        )
+        async with create_client(policy) as client:
+            start: float = time.perf_counter()
+            response = await client.get(url="http://fhir.example.com/Patient/1")
+            assert time.perf_counter() - start < 1
+    assert response.status == 404
+
+
+async def test_streamed_response_of_the_losing_attempt_is_released(monkeypatch: Any) -> None:
+    policy = HedgingPolicy(min_delay_in_seconds=0.05, min_samples=1, max_hedge_ratio=1)
+    policy.record_latency(host="fhir.example.com", latency_in_seconds=0.01)
+    responses: list[RetryableAioHttpResponse] = []
+    original_init = RetryableAioHttpResponse.__init__
+
+    def record_init(self: RetryableAioHttpResponse, **kwargs: Any) -> None:
+        original_init(self, **kwargs)
+        responses.append(self)
+
+    monkeypatch.setattr(RetryableAioHttpResponse, "__init__", record_init)
+    both_sent: asyncio.Event = asyncio.Event()
+
+    async def respond(url: str, **kwargs: Any) -> CallbackResult:
+        # the first request answers when the hedge does so both attempts can finish together
+        if len(m.requests.get(("GET", URL("http://fhir.example.com/Patient/1")), [])) > 1:
+            both_sent.set()
+        await both_sent.wait()
+        return CallbackResult(status=200, body=json.dumps({"resourceType": "Patient", "id": "1"}))
+
+    with aioresponses() as m:
+        m.get("http://fhir.example.com/Patient/1", callback=respond, repeat=True)
+        client = create_client(policy)
+        client.use_data_streaming = True
+        async with client:
+            response = await client.get(url="http://fhir.example.com/Patient/1")
+            assert json.loads(await response.get_text_async())["id"] == "1"
+    # every response other than the one returned gave its connection back
+    assert [r for r in responses if r is not response and r._client_response is not None] == []
@@ -0,0 +1,165 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import ClientResponseError
+from aioresponses import aioresponses
+
+from helix_fhir_client_sdk.utilities.host_resilience.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerOpenError,
+    CircuitBreakerState,
+)
+from helix_fhir_client_sdk.utilities.host_resilience.host_resilience_registry import HostResilienceRegistry
+from helix_fhir_client_sdk.utilities.host_resilience.retry_budget import RetryBudget
+from helix_fhir_client_sdk.utilities.retryable_aiohttp_client import RetryableAioHttpClient
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now: float = 0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def get_state(breaker: CircuitBreaker) -> CircuitBreakerState:
+    # a function call so mypy doesn't narrow the state between asserts
+    return breaker.state
+
+
+def test_retry_budget_refills_over_time() -> None:
+    clock = FakeClock()
+    budget = RetryBudget(capacity=2, refill_per_second=1, clock=clock)
+
+    assert budget.try_acquire()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+
+    clock.now = 1.5
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+
+    # never refills past the capacity
+    clock.now = 100
+    assert budget.tokens == 2
+
+
+def test_circuit_breaker_opens_half_opens_and_closes() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(host="fhir.example.com", failure_threshold=2, reset_timeout_in_seconds=10, clock=clock)
+
+    breaker.record_failure()
+    assert get_state(breaker) == CircuitBreakerState.CLOSED
+    breaker.record_failure()
+    assert get_state(breaker) == CircuitBreakerState.OPEN
+    assert not breaker.allow_request()
+
+    clock.now = 10
+    assert get_state(breaker) == CircuitBreakerState.HALF_OPEN
+    # only one trial request at a time
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    # a failed trial opens the breaker again
+    breaker.record_failure()
+    assert get_state(breaker) == CircuitBreakerState.OPEN
+
+    clock.now = 20
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert get_state(breaker) == CircuitBreakerState.CLOSED
+    assert breaker.allow_request()
+
+
+async def test_retryable_client_fails_fast_when_circuit_breaker_is_open() -> None:
+    registry = HostResilienceRegistry(circuit_breaker_failure_threshold=3, circuit_breaker_reset_timeout_in_seconds=60)
+    async with RetryableAioHttpClient(
+        retries=2,
+        backoff_factor=0,
+        use_data_streaming=False,
+        access_token=None,
+        access_token_expiry_date=None,
+        refresh_token_func=None,
+        tracer_request_func=None,
+        host_resilience_registry=registry,
+    ) as client:
+        with aioresponses() as m:
+            m.get("http://test.com/Patient/1", status=503, repeat=True)
+            with pytest.raises(ClientResponseError):
+                await client.get(url="http://test.com/Patient/1", headers=None)
+
+            state = registry.get_state(url="http://test.com/Patient/2")
+            assert get_state(state.circuit_breaker) == CircuitBreakerState.OPEN
+
+            # the next request is not sent at all
+            with pytest.raises(CircuitBreakerOpenError):
+                await client.get(url="http://test.com/Patient/2", headers=None)
+            assert len([call for calls in m.requests.values() for call in calls]) == 3
+
+
+async def test_retryable_client_stops_retrying_when_retry_budget_is_exhausted() -> None:
+    registry = HostResilienceRegistry(retry_budget_capacity=1, retry_budget_refill_per_second=0)
+    async with RetryableAioHttpClient(
+        retries=3,
+        backoff_factor=0,
+        use_data_streaming=False,
+        access_token=None,
+        access_token_expiry_date=None,
+        refresh_token_func=None,
+        tracer_request_func=None,
+        throw_exception_on_error=False,
+        host_resilience_registry=registry,
+    ) as client:
+        with aioresponses() as m:
+            m.get("http://test.com", status=500, repeat=True)
+            response = await client.get(url="http://test.com", headers=None)
+
+            assert not response.ok
+            # one first attempt plus the single retry the budget allowed
+            assert response.retry_count == 1
+
+
+async def test_429_pauses_all_requests_to_the_host() -> None:
+    registry = HostResilienceRegistry(rate_limit_ramp_up_in_seconds=0)
+    async with RetryableAioHttpClient(
+        use_data_streaming=False,
+        access_token=None,
+        access_token_expiry_date=None,
+        refresh_token_func=None,
+        tracer_request_func=None,
+        host_resilience_registry=registry,
+        maximum_time_to_retry_on_429=10,
+    ) as client:
+        with aioresponses() as m:
+            m.get("http://test.com/Patient/1", status=429, headers={"Retry-After": "1"})
+            m.get("http://test.com/Patient/1", status=200, payload={})
+            m.get("http://test.com/Patient/2", status=200, payload={})
+
+            first_task = asyncio.create_task(client.get(url="http://test.com/Patient/1", headers=None))
+            await asyncio.sleep(0.1)
+            # the other request to the host waits for the pause set by the first one
+            start = time.monotonic()
+            second_response = await client.get(url="http://test.com/Patient/2", headers=None)
+            assert time.monotonic() - start >= 0.8
+            assert second_response.ok
+            assert (await first_task).ok
+
+
+async def test_429_gives_up_after_maximum_time_to_retry() -> None:
+    async with RetryableAioHttpClient(
+        use_data_streaming=False,
+        access_token=None,
+        access_token_expiry_date=None,
+        refresh_token_func=None,
+        tracer_request_func=None,
+        host_resilience_registry=HostResilienceRegistry(),
+        maximum_time_to_retry_on_429=5,
+    ) as client:
+        with aioresponses() as m:
+            m.get("http://test.com", status=429, headers={"Retry-After": "30"})
+            response = await client.get(url="http://test.com", headers=None)
+
+            # returned right away instead of waiting past the maximum
+            assert response.status == 429
+            assert not response.ok
@@ -0,0 +1,80 @@
+from collections.abc import AsyncGenerator
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from helix_fhir_client_sdk.fhir_client import FhirClient
+from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+from helix_fhir_client_sdk.utilities.http_request_timing import HttpRequestTiming
+from helix_fhir_client_sdk.utilities.retryable_aiohttp_client import RetryableAioHttpClient
+from helix_fhir_client_sdk.utilities.retryable_aiohttp_response import RetryableAioHttpResponse
+
+
+async def get_patient(request: web.Request) -> web.Response:
+    return web.json_response({"resourceType": "Patient", "id": request.match_info["id"]})
+
+
+@pytest.fixture
+async def server() -> AsyncGenerator[TestServer, None]:
+    app = web.Application()
+    app.router.add_get("/fhir/Patient/{id}", get_patient)
+    test_server = TestServer(app)
+    await test_server.start_server()
+    try:
+        yield test_server
+    finally:
+        await test_server.close()
+
+
+async def test_timing_of_new_and_reused_connections(server: TestServer) -> None:
+    async with aiohttp.ClientSession(trace_configs=[HttpRequestTiming.create_trace_config()]) as session:
+        async with RetryableAioHttpClient(
+            fn_get_session=lambda: session,
+            caller_managed_session=True,
+            use_data_streaming=False,
+            access_token=None,
+            access_token_expiry_date=None,
+            refresh_token_func=None,
+            tracer_request_func=None,
+            log_all_url_results=True,
+        ) as client:
+            responses: list[RetryableAioHttpResponse] = [
+                await client.get(url=str(server.make_url("/fhir/Patient/1")), headers=None),
+                await client.get(url=str(server.make_url("/fhir/Patient/2")), headers=None),
+            ]
+
+    first, second = [response.timing for response in responses]
+    assert first is not None and second is not None
+    assert first.connection_reused is False
+    assert first.connect_seconds is not None and first.connect_seconds >= 0
+    assert second.connection_reused is True
+    assert second.connect_seconds is None
+    for timing in (first, second):
+        assert timing.time_to_first_byte_seconds is not None and timing.time_to_first_byte_seconds > 0
+        assert timing.body_seconds is not None
+    assert responses[0].results_by_url[0].timing is first
+    assert responses[0].results_by_url[0].to_dict()["timing"]["connection_reused"] is False
+
+
+async def test_timing_includes_parse_and_factory_time(server: TestServer) -> None:
+    fhir_client = (
+        FhirClient()
+        .url(str(server.make_url("/fhir")))
+        .resource("Patient")
+        .id_("1")
+        .set_access_token("token")
+        .set_log_all_response_urls(True)
+    )
+
+    response: FhirGetResponse = await fhir_client.get_async()
+
+    assert response.status == 200
+    timing: HttpRequestTiming | None = response.results_by_url[-1].timing
+    assert timing is not None
+    # the default session of the SDK has the connection hooks
+    assert timing.connection_reused is not None
+    assert timing.time_to_first_byte_seconds is not None
+    assert timing.parse_seconds is not None
+    assert timing.factory_seconds is not None
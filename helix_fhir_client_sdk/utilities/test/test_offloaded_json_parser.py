@@ -0,0 +1,73 @@
+import gc
+import json
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+from helix_fhir_client_sdk.utilities.offloaded_json_parser import OffloadedJsonParser, _PickledJson
+
+gc_enabled_while_unpickling: list[bool] = []
+
+
+def record_gc_state() -> str:
+    gc_enabled_while_unpickling.append(gc.isenabled())
+    return "item"
+
+
+class RecordsGcStateWhenUnpickled:
+    def __reduce__(self) -> tuple[Any, tuple[()]]:
+        return record_gc_state, ()
+
+
+def create_bundle(count: int) -> dict[str, Any]:
+    return {
+        "resourceType": "Bundle",
+        "type": "searchset",
+        "link": [{"relation": "next", "url": "http://fhir.example.com/Patient?page=2"}],
+        "entry": [{"resource": {"resourceType": "Patient", "id": str(i)}} for i in range(count)],
+    }
+
+
+async def test_parses_large_pages_in_a_process_pool() -> None:
+    bundle: dict[str, Any] = create_bundle(250)
+    resources: list[dict[str, Any]] = [entry["resource"] for entry in bundle["entry"]]
+    # forking a process that has started threads (e.g., by pyarrow) is deprecated
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        parser = OffloadedJsonParser(executor=executor, min_size_in_bytes=1000, items_per_slice=100)
+
+        assert await parser.loads_async(json.dumps(bundle)) == bundle
+        assert await parser.loads_async(json.dumps(resources)) == resources
+        # small payloads are parsed on the event loop
+        assert await parser.loads_async('{"resourceType": "Patient"}') == {"resourceType": "Patient"}
+
+    assert parser.statistics.parse_count == 3
+    assert parser.statistics.offloaded_count == 2
+    assert parser.statistics.offloaded_seconds > 0
+    assert parser.statistics.max_blocking_seconds <= parser.statistics.blocking_seconds
+
+
+async def test_parses_in_a_thread_pool_and_measures_blocking_without_executor() -> None:
+    text: str = json.dumps(create_bundle(10))
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        parser = OffloadedJsonParser(executor=executor, min_size_in_bytes=0)
+        assert await parser.loads_async(text) == create_bundle(10)
+    assert parser.statistics.offloaded_count == 1
+
+    inline_parser = OffloadedJsonParser()
+    assert await inline_parser.loads_async(text) == create_bundle(10)
+    assert inline_parser.statistics.offloaded_count == 0
+    assert inline_parser.statistics.blocking_seconds > 0
+
+
+async def test_garbage_collector_is_only_paused_when_asked() -> None:
+    pickled_json = _PickledJson(envelope=None, items=[pickle.dumps(RecordsGcStateWhenUnpickled())] * 3)
+    gc_enabled_while_unpickling.clear()
+    assert await OffloadedJsonParser(items_per_slice=2)._unpickle_async(pickled_json) == ["item"] * 3
+    assert gc_enabled_while_unpickling == [True] * 3
+
+    gc_enabled_while_unpickling.clear()
+    parser = OffloadedJsonParser(items_per_slice=2, pause_gc_while_unpickling=True)
+    assert await parser._unpickle_async(pickled_json) == ["item"] * 3
+    assert gc_enabled_while_unpickling == [False] * 3
+    assert gc.isenabled()
@@ -0,0 +1,89 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from helix_fhir_client_sdk.utilities.parquet_resource_sink import ParquetResourceSink
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+ds = pytest.importorskip("pyarrow.dataset")
+
+
+def create_patient(i: int) -> dict[str, Any]:
+    return {
+        "resourceType": "Patient",
+        "id": str(i),
+        "name": [{"family": f"Family{i}", "given": ["A", "B"]}],
+        "contained": [{"resourceType": "Practitioner", "id": f"p{i}"}],
+    }
+
+
+async def test_writes_one_file_per_resource_type(tmp_path: Path) -> None:
+    resources: list[dict[str, Any]] = [create_patient(i) for i in range(25)]
+    async with ParquetResourceSink(tmp_path, rows_per_batch=10, separate_contained_resources=True) as sink:
+        await sink.write_resources_async(resources)
+        # a dictionary split by ResourceSeparator
+        await sink.write_resource_async(
+            {"observation": [{"resourceType": "Observation", "id": "o1", "status": "final"}], "token": None}
+        )
+
+    assert sink.row_counts == {"Practitioner": 25, "Patient": 25, "Observation": 1}
+    patients = pq.read_table(sink.get_file_path("Patient"))
+    assert patients.num_rows == 25
+    assert "contained" not in patients.column_names
+    assert patients.column("name").to_pylist()[3] == [{"family": "Family3", "given": ["A", "B"]}]
+    assert pq.read_table(sink.get_file_path("Practitioner")).column("id").to_pylist()[:2] == ["p0", "p1"]
+    # the caller's resources are not changed
+    assert "contained" in resources[0]
+
+
+async def test_memory_is_bounded_and_schema_is_used(tmp_path: Path) -> None:
+    schema = pa.schema([("resourceType", pa.string()), ("id", pa.string())])
+    sink = ParquetResourceSink(tmp_path, schemas={"Patient": schema}, rows_per_batch=1000, max_buffered_resources=5)
+    for i in range(12):
+        await sink.write_resource_async({"resourceType": "Patient", "id": str(i)})
+        await sink.write_resource_async({"resourceType": "Device", "id": str(i)})
+        assert sink._buffered_count <= 5
+    await sink.close_async()
+
+    assert pq.read_table(sink.get_file_path("Patient")).schema == schema
+    assert sink.row_counts == {"Patient": 12, "Device": 12}
+
+
+async def test_batches_with_new_fields_or_wider_types_start_a_new_part(tmp_path: Path) -> None:
+    observations: list[dict[str, Any]] = [
+        {"resourceType": "Observation", "id": "1", "valueQuantity": {"value": 1}},
+        {"resourceType": "Observation", "id": "2", "valueQuantity": {"value": 2}},
+        {"resourceType": "Observation", "id": "3", "status": "final", "valueQuantity": {"value": 1.5, "unit": "mg"}},
+        {"resourceType": "Observation", "id": "4", "valueQuantity": {"value": 3}},
+    ]
+    async with ParquetResourceSink(tmp_path, rows_per_batch=1) as sink:
+        await sink.write_resources_async(observations)
+
+    paths: list[Path] = sink.get_file_paths("Observation")
+    # the batch with a float, a unit and a status needed a wider schema; the last batch fits it
+    assert paths == [tmp_path / "Observation.parquet", tmp_path / "Observation.1.parquet"]
+    assert pq.read_table(paths[0]).num_rows == 2
+    table = ds.dataset(paths, schema=pq.read_schema(paths[-1])).to_table()
+    assert table.to_pylist() == [
+        {"resourceType": "Observation", "id": "1", "valueQuantity": {"value": 1.0, "unit": None}, "status": None},
+        {"resourceType": "Observation", "id": "2", "valueQuantity": {"value": 2.0, "unit": None}, "status": None},
+        {"resourceType": "Observation", "id": "3", "valueQuantity": {"value": 1.5, "unit": "mg"}, "status": "final"},
+        {"resourceType": "Observation", "id": "4", "valueQuantity": {"value": 3.0, "unit": None}, "status": None},
+    ]
+
+
+async def test_resources_outside_the_schema_passed_raise(tmp_path: Path) -> None:
+    schema = pa.schema([("resourceType", pa.string()), ("id", pa.string()), ("value", pa.int64())])
+    sink = ParquetResourceSink(tmp_path, schemas={"Observation": schema}, rows_per_batch=1)
+    await sink.write_resource_async({"resourceType": "Observation", "id": "1", "value": 1})
+    with pytest.raises(ValueError, match="not in the schema"):
+        await sink.write_resource_async({"resourceType": "Observation", "id": "2", "value": 1.5})
+    with pytest.raises(ValueError, match="not in the schema"):
+        await sink.write_resource_async({"resourceType": "Observation", "id": "3", "status": "final"})
+    await sink.close_async()
+
+    assert pq.read_table(sink.get_file_path("Observation")).to_pylist() == [
+        {"resourceType": "Observation", "id": "1", "value": 1}
+    ]
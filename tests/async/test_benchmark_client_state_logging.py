@@ -0,0 +1,63 @@
+"""
+Benchmark for logging the state of the client on every request.
+
+get_async(), get_streaming_async(), get_raw_resources_async() and the $merge calls used to build the text of the client
+variables on every call, even when the logger was not enabled for the level of the message.  They now call
+FhirClientLogger.log_variables() which builds the text only when the logger is enabled.  The benchmark makes
+CLIENT_STATE_LOGGING_BENCHMARK_CALL_COUNT (default 10,000) calls, as many as the sub-requests of a large graph, with
+a client holding a large list of ids and a logger at INFO level and reports the time per call of both.
+
+=============================================================================
+HOW TO RUN THIS TEST
+=============================================================================
+
+RUN_CLIENT_STATE_LOGGING_BENCHMARK=1 pytest tests/async/test_benchmark_client_state_logging.py -s
+
+=============================================================================
+"""
+
+import logging
+import os
+import time
+
+import pytest
+
+from helix_fhir_client_sdk.dictionary_writer import convert_dict_to_str
+from helix_fhir_client_sdk.fhir_client import FhirClient
+from helix_fhir_client_sdk.utilities.fhir_client_logger import FhirClientLogger
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("RUN_CLIENT_STATE_LOGGING_BENCHMARK"),
+    reason="Benchmark. Set RUN_CLIENT_STATE_LOGGING_BENCHMARK=1 to run it",
+)
+
+CALL_COUNT: int = int(os.environ.get("CLIENT_STATE_LOGGING_BENCHMARK_CALL_COUNT", "10000"))
+
+
+def test_client_state_logging_benchmark() -> None:
+    logger: logging.Logger = logging.getLogger("test_benchmark_client_state_logging")
+    logger.setLevel(logging.INFO)
+    fhir_client: FhirClient = (
+        FhirClient()
+        .url("http://fhir.example.com")
+        .resource("Patient")
+        .id_([str(i) for i in range(10_000)])
+        .logger(logger)
+    )
+
+    start_time: float = time.perf_counter()
+    for _ in range(CALL_COUNT):
+        # what the call sites did before
+        instance_variables_text = convert_dict_to_str(FhirClientLogger.get_variables_to_log(vars(fhir_client)))
+        logger.debug(f"parameters: {instance_variables_text}")
+    eager_seconds: float = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for _ in range(CALL_COUNT):
+        FhirClientLogger.log_variables(logger=logger, level=logging.DEBUG, vars_dict=vars(fhir_client))
+    gated_seconds: float = time.perf_counter() - start_time
+
+    print(f"\nCalls: {CALL_COUNT:,}")
+    print(f"Text built on every call: {eager_seconds * 1_000_000 / CALL_COUNT:,.2f} µs per call")
+    print(f"Text built only when enabled: {gated_seconds * 1_000_000 / CALL_COUNT:,.2f} µs per call")
+    assert gated_seconds < eager_seconds
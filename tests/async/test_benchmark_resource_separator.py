@@ -0,0 +1,95 @@
+"""
+Benchmark for separating contained resources (separate_bundle_resources mode).
+
+ResourceSeparator used to deepcopy every resource just to remove its contained array.  It now copies only the top
+level of the resource and shares the rest, including the contained resources, with the original.  The benchmark
+separates RESOURCE_SEPARATOR_BENCHMARK_RESOURCE_COUNT (default 10,000) resources with contained children and reports
+the time and the memory allocated (measured by tracemalloc), next to the same work with a deepcopy of each resource
+for comparison.
+
+=============================================================================
+HOW TO RUN THIS TEST
+=============================================================================
+
+RUN_RESOURCE_SEPARATOR_BENCHMARK=1 pytest tests/async/test_benchmark_resource_separator.py -s
+
+=============================================================================
+"""
+
+import os
+import time
+import tracemalloc
+from copy import deepcopy
+from typing import Any
+
+import pytest
+
+from helix_fhir_client_sdk.responses.resource_separator import ResourceSeparator, ResourceSeparatorResult
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("RUN_RESOURCE_SEPARATOR_BENCHMARK"),
+    reason="Benchmark. Set RUN_RESOURCE_SEPARATOR_BENCHMARK=1 to run it",
+)
+
+RESOURCE_COUNT: int = int(os.environ.get("RESOURCE_SEPARATOR_BENCHMARK_RESOURCE_COUNT", "10000"))
+CONTAINED_PER_RESOURCE: int = 10
+
+
+def create_resource(i: int) -> dict[str, Any]:
+    return {
+        "resourceType": "ExplanationOfBenefit",
+        "id": str(i),
+        "status": "active",
+        "patient": {"reference": f"Patient/{i}"},
+        "item": [
+            {"sequence": n, "productOrService": {"coding": [{"system": "http://cpt", "code": str(99200 + n)}]}}
+            for n in range(5)
+        ],
+        "contained": [
+            {
+                "resourceType": "Practitioner" if n % 2 else "Organization",
+                "id": f"{i}-{n}",
+                "name": [{"text": f"Name {i} {n}"}],
+                "identifier": [{"system": "http://hl7.org/fhir/sid/us-npi", "value": str(1000000000 + n)}],
+                "address": [{"line": [f"{n} Main Street"], "city": "Springfield", "state": "IL"}],
+            }
+            for n in range(CONTAINED_PER_RESOURCE)
+        ],
+    }
+
+
+async def separate(resources: list[dict[str, Any]]) -> ResourceSeparatorResult:
+    return await ResourceSeparator.separate_contained_resources_async(
+        resources=resources, access_token=None, url="http://fhir.example.com", extra_context_to_return=None
+    )
+
+
+async def measure(label: str, resources: list[dict[str, Any]], clone: bool) -> tuple[float, int]:
+    # timed without tracemalloc since tracing slows down allocations a lot
+    start_time: float = time.perf_counter()
+    result: ResourceSeparatorResult = await separate(deepcopy(resources) if clone else resources)
+    elapsed_in_seconds: float = time.perf_counter() - start_time
+    assert result.total_count == len(resources) * (CONTAINED_PER_RESOURCE + 1)
+    del result
+
+    # measured while the result is still referenced: this is the memory the separated resources need
+    tracemalloc.start()
+    result = await separate(deepcopy(resources) if clone else resources)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert result.total_count > 0
+    print(f"{label}: {elapsed_in_seconds * 1000:,.0f} ms | Allocated: {current / 1024 / 1024:,.1f} MB")
+    return elapsed_in_seconds, current
+
+
+async def test_separate_contained_resources_benchmark() -> None:
+    resources: list[dict[str, Any]] = [create_resource(i) for i in range(RESOURCE_COUNT)]
+    print(f"\nResources: {RESOURCE_COUNT:,} with {CONTAINED_PER_RESOURCE} contained resources each")
+    with_deepcopy_seconds, with_deepcopy_bytes = await measure("With deepcopy", resources, clone=True)
+    seconds, allocated_bytes = await measure("ResourceSeparator", resources, clone=False)
+
+    assert seconds < with_deepcopy_seconds
+    assert allocated_bytes < with_deepcopy_bytes
+    # the contained resources are shared with the original resources
+    result: ResourceSeparatorResult = await separate(resources[:1])
+    assert result.resources_dicts[0]["organization"][0] is resources[0]["contained"][0]  # type: ignore[index]
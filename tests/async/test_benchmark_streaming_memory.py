@@ -0,0 +1,120 @@
+"""
+Memory benchmark for the responses created when streaming a large NDJSON response.
+
+Every streamed resource becomes its own FhirGetResponse so the per-object overhead of the responses (and anything
+that is copied per resource instead of being shared by the whole page) decides how much memory a large stream needs.
+The benchmark streams STREAMING_MEMORY_BENCHMARK_RESOURCE_COUNT (default 1,000,000) small resources through
+FhirResponseProcessor, keeps all the responses and reports the memory measured by tracemalloc.
+
+=============================================================================
+HOW TO RUN THIS TEST
+=============================================================================
+
+RUN_STREAMING_MEMORY_BENCHMARK=1 pytest tests/async/test_benchmark_streaming_memory.py -s
+
+To use a smaller stream:
+RUN_STREAMING_MEMORY_BENCHMARK=1 STREAMING_MEMORY_BENCHMARK_RESOURCE_COUNT=100000 \
+    pytest tests/async/test_benchmark_streaming_memory.py -s
+
+=============================================================================
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from collections.abc import AsyncGenerator
+from unittest.mock import MagicMock
+
+import pytest
+from compressedfhir.utilities.compressed_dict.v1.compressed_dict_storage_mode import (
+    CompressedDictStorageMode,
+)
+
+from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+from helix_fhir_client_sdk.responses.fhir_response_headers import FhirResponseHeaders
+from helix_fhir_client_sdk.responses.fhir_response_processor import FhirResponseProcessor
+from helix_fhir_client_sdk.utilities.ndjson_chunk_streaming_parser import NdJsonChunkStreamingParser
+from helix_fhir_client_sdk.utilities.retryable_aiohttp_response import RetryableAioHttpResponse
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("RUN_STREAMING_MEMORY_BENCHMARK"),
+    reason="Memory benchmark. Set RUN_STREAMING_MEMORY_BENCHMARK=1 to run it",
+)
+
+RESOURCE_COUNT: int = int(os.environ.get("STREAMING_MEMORY_BENCHMARK_RESOURCE_COUNT", "1000000"))
+RESOURCES_PER_CHUNK: int = 1000
+
+
+def create_streaming_response(resource_count: int) -> RetryableAioHttpResponse:
+    async def iter_chunked(chunk_size: int) -> AsyncGenerator[bytes, None]:
+        for start in range(0, resource_count, RESOURCES_PER_CHUNK):
+            yield "".join(
+                json.dumps({"resourceType": "Patient", "id": str(i), "active": True}) + "\n"
+                for i in range(start, min(start + RESOURCES_PER_CHUNK, resource_count))
+            ).encode("utf-8")
+
+    response = MagicMock(RetryableAioHttpResponse)
+    response.status = 200
+    response.results_by_url = []
+    response.response_headers = {"Content-Type": "application/fhir+ndjson"}
+    response.content = MagicMock()
+    response.content.at_eof = MagicMock(return_value=False)
+    response.content.iter_chunked = iter_chunked
+    return response
+
+
+async def test_streaming_memory_per_resource() -> None:
+    response = create_streaming_response(RESOURCE_COUNT)
+    # a realistic set of response headers for the page
+    response_headers = FhirResponseHeaders(
+        [
+            "Content-Type:application/fhir+ndjson",
+            "Transfer-Encoding:identity",
+            "Date:Fri, 01 Dec 2023 12:00:00 GMT",
+            "X-Request-ID:benchmark",
+            "Cache-Control:no-store",
+            "Strict-Transport-Security:max-age=31536000",
+        ]
+    )
+
+    tracemalloc.start()
+    start_time: float = time.perf_counter()
+    responses: list[FhirGetResponse] = [
+        r
+        async for r in FhirResponseProcessor._handle_response_200_streaming(
+            access_token="token",
+            fn_handle_streaming_chunk=None,
+            full_url="http://fhir.example.com/Patient",
+            nd_json_chunk_streaming_parser=NdJsonChunkStreamingParser(),
+            next_url=None,
+            request_id="benchmark",
+            response=response,
+            response_headers=response_headers,
+            total_count=0,
+            chunk_size=1024 * 1024,
+            extra_context_to_return=None,
+            resource="Patient",
+            id_=None,
+            logger=None,
+            expand_fhir_bundle=False,
+            separate_bundle_resources=False,
+            url="http://fhir.example.com",
+            storage_mode=CompressedDictStorageMode(storage_type="raw"),
+            create_operation_outcome_for_error=False,
+        )
+    ]
+    elapsed_in_seconds: float = time.perf_counter() - start_time
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"\nResources: {len(responses):,}"
+        + f" | Retained: {current / 1024 / 1024:,.1f} MB ({current / len(responses):,.0f} bytes/resource)"
+        + f" | Peak: {peak / 1024 / 1024:,.1f} MB"
+        + f" | Time: {elapsed_in_seconds:,.1f} s"
+    )
+
+    assert len(responses) == RESOURCE_COUNT
+    # all the responses of the page share one header map instead of each having a copy
+    assert all(r.headers is responses[0].headers for r in responses)
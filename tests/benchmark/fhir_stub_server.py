@@ -0,0 +1,253 @@
+"""
+In-process FHIR server stub for the offline benchmarks.
+
+It serves synthetic resources so the benchmarks need neither docker nor the network.  The server runs on its own
+event loop in a background thread so the code under test can use asyncio.run() for every benchmark round.
+
+Routes (under /fhir):
+- GET /{resourceType}/{id}: a single resource
+- GET /{resourceType}?_id=1,2: a searchset Bundle with those resources
+- GET /{resourceType}?patient=1,2 (or subject=): settings.children_per_parent resources for each parent
+- GET /{resourceType}: settings.resource_count resources, settings.page_size per page with a next link.
+  With Accept: application/fhir+ndjson all of them are streamed as NDJSON instead.
+- POST /{resourceType}/{id}/$merge: a merge result for each resource posted
+- PUT /{resourceType}/{id}: the resource that was sent
+"""
+
+import asyncio
+import dataclasses
+import json
+import threading
+from typing import Any
+
+from aiohttp import web
+
+
+@dataclasses.dataclass(slots=True)
+class FhirStubServerSettings:
+    resource_count: int = 100
+    """ resources returned by a search without parameters """
+
+    page_size: int = 100
+    """ resources per Bundle page when the request has no _count """
+
+    resource_size_in_bytes: int = 1024
+    """ approximate size of each resource (padded with a text.div) """
+
+    children_per_parent: int = 2
+    """ resources returned for each parent id of a reverse (e.g., patient=) search """
+
+    latency_in_seconds: float = 0.0
+    """ delay before each response """
+
+    error_every_n_requests: int | None = None
+    """ every nth request gets error_status instead of the resources """
+
+    error_status: int = 500
+    """ status of the injected errors """
+
+    ndjson_chunk_size: int = 100
+    """ resources written per NDJSON chunk """
+
+
+class FhirStubServer:
+    """
+    In-process FHIR server stub serving synthetic resources
+
+    with FhirStubServer(FhirStubServerSettings(resource_count=1000, page_size=100)) as server:
+        FhirClient().url(server.url).resource("Patient")...
+    """
+
+    __slots__ = ["settings", "request_count", "_loop", "_thread", "_runner", "_port", "_started"]
+
+    def __init__(self, settings: FhirStubServerSettings | None = None) -> None:
+        """
+        In-process FHIR server stub
+
+        :param settings: what to serve.  Can be changed while the server runs.
+        """
+        self.settings: FhirStubServerSettings = settings or FhirStubServerSettings()
+        self.request_count: int = 0
+        self._loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self._thread: threading.Thread = threading.Thread(
+            target=self._loop.run_forever, name="fhir-stub-server", daemon=True
+        )
+        self._runner: web.AppRunner | None = None
+        self._port: int | None = None
+        self._started: bool = False
+
+    @property
+    def url(self) -> str:
+        """Base url of the FHIR server"""
+        assert self._port is not None, "Server is not started"
+        return f"http://127.0.0.1:{self._port}/fhir"
+
+    def __enter__(self) -> "FhirStubServer":
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start_async(), self._loop).result()
+        self._started = True
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        if self._started:
+            asyncio.run_coroutine_threadsafe(self._stop_async(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _start_async(self) -> None:
+        app = web.Application(client_max_size=1024 * 1024 * 1024)
+        app.router.add_get("/fhir/{resource_type}", self._search_async)
+        app.router.add_get("/fhir/{resource_type}/{id}", self._read_async)
+        app.router.add_post("/fhir/{resource_type}/{id}/$merge", self._merge_async)
+        app.router.add_put("/fhir/{resource_type}/{id}", self._update_async)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        server = site._server
+        assert isinstance(server, asyncio.Server)
+        self._port = server.sockets[0].getsockname()[1]
+
+    async def _stop_async(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _get_injected_error_async(self) -> web.Response | None:
+        """
+        Counts the request, waits for the latency and returns an error response if this request gets one
+        """
+        self.request_count += 1
+        settings = self.settings
+        if settings.latency_in_seconds:
+            await asyncio.sleep(settings.latency_in_seconds)
+        if settings.error_every_n_requests and self.request_count % settings.error_every_n_requests == 0:
+            return web.json_response(
+                {
+                    "resourceType": "OperationOutcome",
+                    "issue": [{"severity": "error", "code": "transient", "diagnostics": "injected error"}],
+                },
+                status=settings.error_status,
+            )
+        return None
+
+    async def _read_async(self, request: web.Request) -> web.StreamResponse:
+        error = await self._get_injected_error_async()
+        if error is not None:
+            return error
+        return web.json_response(
+            create_resource(
+                resource_type=request.match_info["resource_type"],
+                id_=request.match_info["id"],
+                size_in_bytes=self.settings.resource_size_in_bytes,
+            )
+        )
+
+    async def _search_async(self, request: web.Request) -> web.StreamResponse:
+        error = await self._get_injected_error_async()
+        if error is not None:
+            return error
+        settings = self.settings
+        resource_type: str = request.match_info["resource_type"]
+        ids: list[str]
+        if "_id" in request.query:
+            ids = request.query["_id"].split(",")
+        elif parent_ids := request.query.get("patient") or request.query.get("subject"):
+            ids = [
+                f"{parent_id}-{index}"
+                for parent_id in parent_ids.split(",")
+                for index in range(settings.children_per_parent)
+            ]
+        else:
+            if "ndjson" in request.headers.get("Accept", ""):
+                return await self._stream_ndjson_async(request=request, resource_type=resource_type)
+            offset: int = int(request.query.get("_getpagesoffset", "0"))
+            count: int = int(request.query.get("_count", settings.page_size))
+            ids = [str(index) for index in range(offset, min(offset + count, settings.resource_count))]
+            if offset + count < settings.resource_count:
+                next_url = request.url.update_query({"_getpagesoffset": str(offset + count), "_count": str(count)})
+                return web.json_response(
+                    self._create_bundle(resource_type=resource_type, ids=ids, next_url=str(next_url))
+                )
+        return web.json_response(self._create_bundle(resource_type=resource_type, ids=ids, next_url=None))
+
+    async def _stream_ndjson_async(self, *, request: web.Request, resource_type: str) -> web.StreamResponse:
+        settings = self.settings
+        response = web.StreamResponse(headers={"Content-Type": "application/fhir+ndjson"})
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        for start in range(0, settings.resource_count, settings.ndjson_chunk_size):
+            chunk: str = "".join(
+                json.dumps(
+                    create_resource(
+                        resource_type=resource_type, id_=str(index), size_in_bytes=settings.resource_size_in_bytes
+                    )
+                )
+                + "\n"
+                for index in range(start, min(start + settings.ndjson_chunk_size, settings.resource_count))
+            )
+            await response.write(chunk.encode("utf-8"))
+        await response.write_eof()
+        return response
+
+    async def _merge_async(self, request: web.Request) -> web.StreamResponse:
+        error = await self._get_injected_error_async()
+        if error is not None:
+            return error
+        payload: list[dict[str, Any]] | dict[str, Any] = await request.json()
+        resources: list[dict[str, Any]] = payload if isinstance(payload, list) else [payload]
+        return web.json_response(
+            [
+                {"id": resource.get("id"), "resourceType": resource.get("resourceType"), "created": True}
+                for resource in resources
+            ]
+        )
+
+    async def _update_async(self, request: web.Request) -> web.StreamResponse:
+        error = await self._get_injected_error_async()
+        if error is not None:
+            return error
+        return web.Response(body=await request.read(), content_type="application/fhir+json")
+
+    def _create_bundle(self, *, resource_type: str, ids: list[str], next_url: str | None) -> dict[str, Any]:
+        bundle: dict[str, Any] = {
+            "resourceType": "Bundle",
+            "type": "searchset",
+            "entry": [
+                {
+                    "resource": create_resource(
+                        resource_type=resource_type, id_=id_, size_in_bytes=self.settings.resource_size_in_bytes
+                    )
+                }
+                for id_ in ids
+            ],
+        }
+        if next_url:
+            bundle["link"] = [{"relation": "next", "url": next_url}]
+        return bundle
+
+
+def create_resource(*, resource_type: str, id_: str, size_in_bytes: int) -> dict[str, Any]:
+    """
+    Creates a synthetic resource.  Patients reference a practitioner and an organization and every other resource
+    references a patient and an organization so graphs can be followed in both directions.
+
+    :param resource_type: resource type
+    :param id_: id of the resource
+    :param size_in_bytes: approximate size of the resource as JSON
+    """
+    resource: dict[str, Any] = {
+        "resourceType": resource_type,
+        "id": id_,
+        "meta": {"versionId": "1", "lastUpdated": "2025-01-15T10:30:00.000Z", "source": "http://example.org/fhir"},
+    }
+    if resource_type == "Patient":
+        resource["generalPractitioner"] = [{"reference": f"Practitioner/{sum(map(ord, id_)) % 10}"}]
+        resource["managingOrganization"] = {"reference": "Organization/1"}
+    elif resource_type not in ("Practitioner", "Organization"):
+        resource["subject"] = {"reference": f"Patient/{id_.split('-')[0]}"}
+        resource["serviceProvider"] = {"reference": "Organization/1"}
+    padding: int = size_in_bytes - len(json.dumps(resource)) - len(',"text":{"status":"generated","div":""}')
+    if padding > 0:
+        resource["text"] = {"status": "generated", "div": "x" * padding}
+    return resource
@@ -0,0 +1,350 @@
+"""
+Micro-benchmarks for the CPU hot paths of the FHIR client.  Nothing here does any I/O.
+
+Each scenario is benchmarked at several input sizes and a scaling check fits the exponent of time ~ size^k over
+those sizes, so an accidental O(n^2) (e.g., a list used to dedupe ids or deque.remove() in a loop) fails the check
+even when the absolute times still look fine.
+
+These measure:
+- NdJsonChunkStreamingParser.add_chunk() on an NDJSON stream split in 64 KB chunks
+- FhirGetResponseFactory.create() on a large Bundle
+- FhirGetBundleResponse.remove_duplicates() and remove_entries_in_cache_async()
+- DictionaryParser.get_nested_property() on a Bundle with many entries
+- ResourceSeparator.separate_contained_resources_async()
+- FhirBundleAppender.sort_resources()
+- FhirBundleFixer.fix()
+- FhirClient.build_url() with many ids
+
+=============================================================================
+HOW TO RUN THESE TESTS
+=============================================================================
+
+1. Run the benchmarks and the scaling checks:
+   RUN_OFFLINE_BENCHMARKS=1 pytest tests/benchmark/test_benchmark_cpu.py -v
+
+2. Run only the scaling checks:
+   RUN_OFFLINE_BENCHMARKS=1 pytest tests/benchmark/test_benchmark_cpu.py -v -k scaling --benchmark-disable
+
+3. Save and compare baselines the same way as the other benchmarks in this folder (see test_benchmark_offline.py).
+   --benchmark-only skips the scaling checks since they do not use the benchmark fixture.
+
+=============================================================================
+"""
+
+import asyncio
+import dataclasses
+import gc
+import json
+import math
+import os
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import pytest
+from compressedfhir.fhir.fhir_bundle import FhirBundle
+from compressedfhir.fhir.fhir_bundle_entry import FhirBundleEntry
+from compressedfhir.fhir.fhir_bundle_entry_list import FhirBundleEntryList
+from compressedfhir.utilities.compressed_dict.v1.compressed_dict_storage_mode import CompressedDictStorageMode
+
+from helix_fhir_client_sdk.dictionary_parser import DictionaryParser
+from helix_fhir_client_sdk.fhir_bundle_appender import FhirBundleAppender
+from helix_fhir_client_sdk.fhir_client import FhirClient
+from helix_fhir_client_sdk.fixers.fix_fhir_bundle import FhirBundleFixer
+from helix_fhir_client_sdk.responses.get.fhir_get_bundle_response import FhirGetBundleResponse
+from helix_fhir_client_sdk.responses.get.fhir_get_response_factory import FhirGetResponseFactory
+from helix_fhir_client_sdk.responses.resource_separator import ResourceSeparator
+from helix_fhir_client_sdk.utilities.cache.request_cache import RequestCache
+from helix_fhir_client_sdk.utilities.hash_util import ResourceHash
+from helix_fhir_client_sdk.utilities.ndjson_chunk_streaming_parser import NdJsonChunkStreamingParser
+from tests.benchmark.fhir_stub_server import create_resource
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("RUN_OFFLINE_BENCHMARKS"),
+    reason="Offline benchmarks are opt-in. Run with: RUN_OFFLINE_BENCHMARKS=1 pytest tests/benchmark",
+)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class CpuScenario:
+    name: str
+    setup: Callable[[int], Any]
+    """ creates the input for a size.  Called before every round so run() can change its input. """
+    run: Callable[[Any], Any]
+    """ the code to measure.  Can return an awaitable, which is then run to completion. """
+    sizes: tuple[int, ...]
+    max_exponent: float = 1.5
+    """ largest exponent k of time ~ size^k allowed.  A quadratic scales as ~2; 1.5 leaves room for n log n, cache
+    effects and noise. """
+
+
+def create_patients(count: int) -> list[dict[str, Any]]:
+    return [create_resource(resource_type="Patient", id_=str(i), size_in_bytes=1024) for i in range(count)]
+
+
+def create_bundle_json(resources: list[dict[str, Any]]) -> dict[str, Any]:
+    return {"resourceType": "Bundle", "type": "searchset", "entry": [{"resource": r} for r in resources]}
+
+
+def create_bundle_response(resources: list[dict[str, Any]]) -> FhirGetBundleResponse:
+    return FhirGetBundleResponse(
+        request_id=None,
+        url="http://example.com/fhir/Patient",
+        response_text=json.dumps(create_bundle_json(resources)),
+        error=None,
+        access_token=None,
+        total_count=None,
+        status=200,
+        next_url=None,
+        extra_context_to_return=None,
+        resource_type="Patient",
+        id_=None,
+        response_headers=None,
+        results_by_url=[],
+        storage_mode=CompressedDictStorageMode.default(),
+    )
+
+
+def setup_ndjson_chunks(count: int) -> list[str]:
+    text: str = "".join(json.dumps(patient) + "\n" for patient in create_patients(count))
+    chunk_size: int = 64 * 1024
+    return [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+
+def run_ndjson_add_chunk(chunks: list[str]) -> int:
+    parser = NdJsonChunkStreamingParser()
+    return sum(len(parser.add_chunk(chunk, None)) for chunk in chunks)
+
+
+def run_response_factory_create(response_text: str) -> int:
+    return FhirGetResponseFactory.create(
+        request_id=None,
+        url="http://example.com/fhir/Patient",
+        response_text=response_text,
+        error=None,
+        access_token=None,
+        total_count=None,
+        status=200,
+        extra_context_to_return=None,
+        resource_type="Patient",
+        id_=None,
+        response_headers=None,
+        results_by_url=[],
+        storage_mode=CompressedDictStorageMode.default(),
+        create_operation_outcome_for_error=False,
+    ).get_resource_count()
+
+
+def setup_remove_duplicates(count: int) -> FhirGetBundleResponse:
+    response: FhirGetBundleResponse = create_bundle_response(create_patients(count // 2))
+    # every resource is in the response twice.  deque.extend() skips the duplicate check of FhirBundleEntryList.
+    deque.extend(response.get_bundle_entries(), list(response.get_bundle_entries()))
+    return response
+
+
+def setup_remove_entries_in_cache(count: int) -> tuple[FhirGetBundleResponse, RequestCache]:
+    patients: list[dict[str, Any]] = create_patients(count)
+    request_cache = RequestCache()
+    resource_hash = ResourceHash()
+
+    async def add_async() -> None:
+        # half of the resources are in the cache unchanged
+        for patient in patients[::2]:
+            await request_cache.add_async(
+                resource_type="Patient",
+                resource_id=patient["id"],
+                bundle_entry=None,
+                status=200,
+                last_modified=None,
+                etag=None,
+                from_input_cache=True,
+                raw_hash=resource_hash.hash_value(json.dumps(patient, sort_keys=True)),
+            )
+
+    asyncio.run(add_async())
+    return create_bundle_response(patients), request_cache
+
+
+async def run_remove_entries_in_cache_async(response_and_cache: tuple[FhirGetBundleResponse, RequestCache]) -> int:
+    response, request_cache = response_and_cache
+    await response.remove_entries_in_cache_async(request_cache=request_cache, logger=None)
+    return response.get_resource_count()
+
+
+def setup_resources_with_contained(count: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "resourceType": "Patient",
+            "id": str(i),
+            "contained": [
+                create_resource(resource_type=resource_type, id_=f"{i}-{resource_type}", size_in_bytes=256)
+                for resource_type in ["Practitioner", "Organization", "Encounter", "Observation"]
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+def setup_sort_resources(count: int) -> FhirBundle:
+    patients: list[dict[str, Any]] = create_patients(count)
+    random.Random(count).shuffle(patients)
+    return FhirBundle(
+        type_="collection",
+        entry=FhirBundleEntryList(
+            FhirBundleEntry(resource=patient, request=None, response=None, storage_mode=CompressedDictStorageMode())
+            for patient in patients
+        ),
+    )
+
+
+def setup_bundle_fixer(count: int) -> dict[str, Any]:
+    # the patients are referenced by urn:uuid and have no meta, so every fix is applied
+    bundle: dict[str, Any] = {"resourceType": "Bundle", "type": "batch", "entry": []}
+    for i in range(count):
+        bundle["entry"].append(
+            {
+                "fullUrl": f"urn:uuid:00000000-0000-4000-8000-{i:012d}",
+                "resource": {"resourceType": "Patient", "id": f"patient-{i}", "name": [{"family": f"Doe{i}"}]},
+            }
+        )
+        bundle["entry"].append(
+            {
+                "resource": {
+                    "resourceType": "Observation",
+                    "id": f"observation-{i}",
+                    "status": "final",
+                    "subject": {"reference": f"urn:uuid:00000000-0000-4000-8000-{i:012d}"},
+                }
+            }
+        )
+    return bundle
+
+
+def run_bundle_fixer(payload: dict[str, Any]) -> int:
+    fixer = FhirBundleFixer(meta_source="http://example.org", owner="bwell", source_assigning_authority="bwell")
+    _, results = fixer.fix(payload)
+    return len(results)
+
+
+def setup_build_url(count: int) -> tuple[FhirClient, list[str]]:
+    return FhirClient().url("http://example.com/fhir"), [str(i) for i in range(count, 0, -1)]
+
+
+async def run_build_url_async(client_and_ids: tuple[FhirClient, list[str]]) -> str:
+    fhir_client, ids = client_and_ids
+    return await fhir_client.build_url(
+        additional_parameters=None, id_above=None, ids=ids, page_number=None, resource_type="Patient"
+    )
+
+
+scenarios: list[CpuScenario] = [
+    CpuScenario(
+        name="ndjson_add_chunk", setup=setup_ndjson_chunks, run=run_ndjson_add_chunk, sizes=(1_000, 4_000, 16_000)
+    ),
+    CpuScenario(
+        name="response_factory_create",
+        setup=lambda count: json.dumps(create_bundle_json(create_patients(count))),
+        run=run_response_factory_create,
+        sizes=(500, 2_000, 8_000),
+    ),
+    CpuScenario(
+        name="remove_duplicates",
+        setup=setup_remove_duplicates,
+        run=lambda response: response.remove_duplicates(),
+        sizes=(500, 2_000, 8_000),
+    ),
+    CpuScenario(
+        name="remove_entries_in_cache",
+        setup=setup_remove_entries_in_cache,
+        run=run_remove_entries_in_cache_async,
+        sizes=(500, 2_000, 8_000),
+    ),
+    CpuScenario(
+        name="get_nested_property",
+        setup=lambda count: create_bundle_json(create_patients(count)),
+        run=lambda bundle: DictionaryParser.get_nested_property(bundle, "entry[x].resource.generalPractitioner[x]"),
+        sizes=(1_000, 4_000, 16_000),
+    ),
+    CpuScenario(
+        name="resource_separator",
+        setup=setup_resources_with_contained,
+        run=lambda resources: ResourceSeparator.separate_contained_resources_async(
+            resources=resources, access_token=None, url=None, extra_context_to_return=None
+        ),
+        sizes=(1_000, 4_000, 16_000),
+    ),
+    CpuScenario(
+        name="sort_resources",
+        setup=setup_sort_resources,
+        run=lambda bundle: FhirBundleAppender.sort_resources(bundle=bundle),
+        sizes=(1_000, 4_000, 16_000),
+    ),
+    CpuScenario(name="bundle_fixer", setup=setup_bundle_fixer, run=run_bundle_fixer, sizes=(250, 1_000, 4_000)),
+    CpuScenario(name="build_url", setup=setup_build_url, run=run_build_url_async, sizes=(1_000, 4_000, 16_000)),
+]
+
+
+def run_to_completion(scenario: CpuScenario, data: Any) -> None:
+    result: Any = scenario.run(data)
+    if isinstance(result, Awaitable):
+        asyncio.run(_await(result))
+
+
+async def _await(awaitable: Awaitable[Any]) -> None:
+    # the result is not returned since asyncio.run() builds the repr of the task, and so of a large result
+    await awaitable
+
+
+def measure_seconds(scenario: CpuScenario, size: int, *, repeat: int = 5) -> float:
+    """
+    Returns the fastest of repeat runs of scenario at size.  The setup is not timed and the garbage collector is
+    paused while the scenario runs since its passes over the (large) inputs would add a superlinear term.
+    """
+    best: float = math.inf
+    for _ in range(repeat):
+        data: Any = scenario.setup(size)
+        gc.collect()
+        gc.disable()
+        try:
+            start: float = time.perf_counter()
+            run_to_completion(scenario, data)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+
+def get_scaling_exponent(sizes: tuple[int, ...], seconds: list[float]) -> float:
+    """
+    Returns the slope of the least squares fit of log(seconds) over log(size)
+    """
+    xs: list[float] = [math.log(size) for size in sizes]
+    ys: list[float] = [math.log(max(s, 1e-9)) for s in seconds]
+    mean_x: float = sum(xs) / len(xs)
+    mean_y: float = sum(ys) / len(ys)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys, strict=True)) / sum((x - mean_x) ** 2 for x in xs)
+
+
+@pytest.mark.parametrize(
+    "scenario,size",
+    [pytest.param(scenario, size, id=f"{scenario.name}-{size}") for scenario in scenarios for size in scenario.sizes],
+)
+def test_benchmark_cpu(benchmark: Any, scenario: CpuScenario, size: int) -> None:
+    benchmark.group = scenario.name
+    benchmark.pedantic(
+        run_to_completion,
+        setup=lambda: ((scenario, scenario.setup(size)), {}),
+        rounds=5,
+    )
+
+
+@pytest.mark.parametrize("scenario", [pytest.param(scenario, id=scenario.name) for scenario in scenarios])
+def test_scaling(scenario: CpuScenario) -> None:
+    seconds: list[float] = [measure_seconds(scenario, size) for size in scenario.sizes]
+    exponent: float = get_scaling_exponent(scenario.sizes, seconds)
+    timings: str = ", ".join(f"{size}: {s * 1000:.1f}ms" for size, s in zip(scenario.sizes, seconds, strict=True))
+    assert exponent <= scenario.max_exponent, (
+        f"{scenario.name} scales as size^{exponent:.2f} (max {scenario.max_exponent}): {timings}"
+    )
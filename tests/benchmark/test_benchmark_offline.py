@@ -0,0 +1,227 @@
+"""
+Offline benchmarks for the FHIR client against an in-process FHIR server stub.
+
+Unlike the benchmarks in tests/async these need neither docker nor the mock-server: the FhirStubServer in
+fhir_stub_server.py serves synthetic resources from a background thread, so the numbers only depend on the code
+under test and the machine running it.
+
+These measure:
+- get_async() of a single resource, of a list of ids and of a large search that is paged through next links
+- get_async() when the server fails some of the requests and the client retries them
+- get_streaming_async() of NDJSON
+- simulate_graph_async() of a patient graph with forward and reverse links
+- merge_async() and update_async()
+
+=============================================================================
+HOW TO RUN THESE TESTS
+=============================================================================
+
+1. Run the benchmarks:
+   RUN_OFFLINE_BENCHMARKS=1 pytest tests/benchmark -v --benchmark-only
+
+2. Save the results as a baseline (stored in .benchmarks/):
+   RUN_OFFLINE_BENCHMARKS=1 pytest tests/benchmark --benchmark-only --benchmark-autosave
+
+3. Compare with the last saved baseline and fail if any benchmark got more than 10% slower:
+   RUN_OFFLINE_BENCHMARKS=1 pytest tests/benchmark --benchmark-only --benchmark-compare \
+       --benchmark-compare-fail=mean:10%
+
+4. Compare with a specific saved run (e.g., 0001):
+   RUN_OFFLINE_BENCHMARKS=1 pytest tests/benchmark --benchmark-only --benchmark-compare=0001
+
+5. Check that the scenarios work without timing them:
+   RUN_OFFLINE_BENCHMARKS=1 pytest tests/benchmark --benchmark-disable
+
+Compare runs made on the same machine only.  The retry scenario waits for the (jittered) backoff so it is noisier
+than the others.
+
+=============================================================================
+"""
+
+import asyncio
+import json
+import os
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from helix_fhir_client_sdk.fhir_client import FhirClient
+from helix_fhir_client_sdk.responses.fhir_get_response import FhirGetResponse
+from helix_fhir_client_sdk.responses.fhir_merge_response import FhirMergeResponse
+from helix_fhir_client_sdk.responses.fhir_update_response import FhirUpdateResponse
+from tests.benchmark.fhir_stub_server import FhirStubServer, FhirStubServerSettings, create_resource
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("RUN_OFFLINE_BENCHMARKS"),
+    reason="Offline benchmarks are opt-in. Run with: RUN_OFFLINE_BENCHMARKS=1 pytest tests/benchmark",
+)
+
+graph_json: dict[str, Any] = {
+    "id": "benchmark",
+    "name": "Benchmark Graph",
+    "resourceType": "GraphDefinition",
+    "start": "Patient",
+    "link": [
+        {"path": "generalPractitioner[x]", "target": [{"type": "Practitioner"}]},
+        {"path": "managingOrganization", "target": [{"type": "Organization"}]},
+        {
+            "target": [
+                {
+                    "type": "Encounter",
+                    "params": "patient={ref}",
+                    "link": [{"path": "serviceProvider", "target": [{"type": "Organization"}]}],
+                }
+            ]
+        },
+        {"target": [{"type": "Observation", "params": "subject={ref}"}]},
+    ],
+}
+
+
+@pytest.fixture
+def stub_server() -> Iterator[FhirStubServer]:
+    with FhirStubServer() as server:
+        yield server
+
+
+def create_fhir_client(url: str) -> FhirClient:
+    # an access token skips the discovery of the auth server
+    return FhirClient().url(url).set_access_token("token")
+
+
+def test_benchmark_get_by_id(benchmark: Any, stub_server: FhirStubServer) -> None:
+    """Benchmark get_async of a single resource."""
+
+    async def run_get_async() -> FhirGetResponse:
+        fhir_client = create_fhir_client(stub_server.url).resource("Patient").id_("1")
+        return await fhir_client.get_async()
+
+    def run_sync() -> FhirGetResponse:
+        return asyncio.run(run_get_async())
+
+    result = benchmark(run_sync)
+    assert result.status == 200
+    assert result.get_resource_count() == 1
+
+
+def test_benchmark_get_by_ids(benchmark: Any, stub_server: FhirStubServer) -> None:
+    """Benchmark get_async of 100 resources by _id."""
+    stub_server.settings = FhirStubServerSettings(resource_size_in_bytes=4 * 1024)
+
+    async def run_get_async() -> FhirGetResponse:
+        fhir_client = create_fhir_client(stub_server.url).resource("Patient").id_([str(i) for i in range(100)])
+        return await fhir_client.get_async()
+
+    def run_sync() -> FhirGetResponse:
+        return asyncio.run(run_get_async())
+
+    result = benchmark(run_sync)
+    assert result.status == 200
+    assert result.get_resource_count() == 100
+
+
+def test_benchmark_get_paging(benchmark: Any, stub_server: FhirStubServer) -> None:
+    """Benchmark get_async of 2,000 resources returned in pages of 100 linked by next links."""
+    stub_server.settings = FhirStubServerSettings(resource_count=2000, page_size=100)
+
+    async def run_get_async() -> FhirGetResponse:
+        fhir_client = create_fhir_client(stub_server.url).resource("Patient")
+        return await fhir_client.get_async()
+
+    def run_sync() -> FhirGetResponse:
+        return asyncio.run(run_get_async())
+
+    result = benchmark(run_sync)
+    assert result.status == 200
+    assert result.get_resource_count() == 2000
+
+
+def test_benchmark_get_with_retries(benchmark: Any, stub_server: FhirStubServer) -> None:
+    """Benchmark get_async of 10 pages when every 4th request fails with a 503 and is retried."""
+    stub_server.settings = FhirStubServerSettings(
+        resource_count=1000, page_size=100, error_every_n_requests=4, error_status=503
+    )
+
+    async def run_get_async() -> FhirGetResponse:
+        fhir_client = create_fhir_client(stub_server.url).resource("Patient").retry_count(3)
+        return await fhir_client.get_async()
+
+    def run_sync() -> FhirGetResponse:
+        return asyncio.run(run_get_async())
+
+    result = benchmark(run_sync)
+    assert result.status == 200
+    assert result.get_resource_count() == 1000
+
+
+def test_benchmark_get_streaming_ndjson(benchmark: Any, stub_server: FhirStubServer) -> None:
+    """Benchmark get_streaming_async of 5,000 resources sent as NDJSON."""
+    stub_server.settings = FhirStubServerSettings(resource_count=5000)
+
+    async def run_get_streaming_async() -> int:
+        fhir_client = create_fhir_client(stub_server.url).resource("Patient").use_data_streaming(True)
+        resource_count: int = 0
+        async for response in fhir_client.get_streaming_async():
+            resource_count += response.get_resource_count()
+        return resource_count
+
+    def run_sync() -> int:
+        return asyncio.run(run_get_streaming_async())
+
+    result = benchmark(run_sync)
+    assert result == 5000
+
+
+def test_benchmark_simulate_graph(benchmark: Any, stub_server: FhirStubServer) -> None:
+    """Benchmark simulate_graph_async of 20 patients with their practitioners, encounters and observations."""
+    stub_server.settings = FhirStubServerSettings(children_per_parent=5, latency_in_seconds=0.001)
+
+    async def run_simulate_graph_async() -> FhirGetResponse:
+        fhir_client = create_fhir_client(stub_server.url)
+        return await fhir_client.simulate_graph_async(
+            id_=[str(i) for i in range(20)], graph_json=graph_json, contained=False, max_concurrent_tasks=10
+        )
+
+    def run_sync() -> FhirGetResponse:
+        return asyncio.run(run_simulate_graph_async())
+
+    result = benchmark(run_sync)
+    # 20 patients, 10 practitioners, 1 organization, 100 encounters and 100 observations
+    assert result.get_resource_count() == 231
+
+
+def test_benchmark_merge(benchmark: Any, stub_server: FhirStubServer) -> None:
+    """Benchmark merge_async of 100 patients."""
+    json_data_list: list[str] = [
+        json.dumps(create_resource(resource_type="Patient", id_=str(i), size_in_bytes=2 * 1024)) for i in range(100)
+    ]
+
+    async def run_merge_async() -> FhirMergeResponse | None:
+        fhir_client = create_fhir_client(stub_server.url).resource("Patient")
+        return await FhirMergeResponse.from_async_generator(
+            fhir_client.merge_async(id_="1", json_data_list=json_data_list)
+        )
+
+    def run_sync() -> FhirMergeResponse | None:
+        return asyncio.run(run_merge_async())
+
+    result = benchmark(run_sync)
+    assert result is not None
+    assert result.status == 200
+    assert len(result.responses) == 100
+
+
+def test_benchmark_update(benchmark: Any, stub_server: FhirStubServer) -> None:
+    """Benchmark update_async of a patient."""
+    json_data: str = json.dumps(create_resource(resource_type="Patient", id_="1", size_in_bytes=16 * 1024))
+
+    async def run_update_async() -> FhirUpdateResponse:
+        fhir_client = create_fhir_client(stub_server.url).resource("Patient")
+        return await fhir_client.update_async(id_="1", json_data=json_data)
+
+    def run_sync() -> FhirUpdateResponse:
+        return asyncio.run(run_update_async())
+
+    result = benchmark(run_sync)
+    assert result.status == 200
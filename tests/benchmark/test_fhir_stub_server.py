@@ -0,0 +1,32 @@
+import json
+from typing import Any
+
+import requests
+
+from tests.benchmark.fhir_stub_server import FhirStubServer, FhirStubServerSettings
+
+
+def test_fhir_stub_server_pages_through_next_links() -> None:
+    with FhirStubServer(FhirStubServerSettings(resource_count=25, page_size=10)) as server:
+        ids: list[str] = []
+        url: str | None = f"{server.url}/Patient"
+        while url:
+            bundle: dict[str, Any] = requests.get(url, timeout=10).json()
+            ids.extend(entry["resource"]["id"] for entry in bundle["entry"])
+            url = next((link["url"] for link in bundle.get("link", []) if link["relation"] == "next"), None)
+        assert ids == [str(i) for i in range(25)]
+        assert server.request_count == 3
+
+
+def test_fhir_stub_server_serves_ndjson_reverse_links_and_errors() -> None:
+    settings = FhirStubServerSettings(resource_count=5, resource_size_in_bytes=500, error_every_n_requests=3)
+    with FhirStubServer(settings) as server:
+        response = requests.get(f"{server.url}/Patient", headers={"Accept": "application/fhir+ndjson"}, timeout=10)
+        resources: list[dict[str, Any]] = [json.loads(line) for line in response.text.splitlines()]
+        assert [resource["id"] for resource in resources] == ["0", "1", "2", "3", "4"]
+        assert all(480 <= len(json.dumps(resource)) <= 520 for resource in resources)
+
+        bundle = requests.get(f"{server.url}/Encounter?patient=7", timeout=10).json()
+        assert [entry["resource"]["subject"]["reference"] for entry in bundle["entry"]] == ["Patient/7", "Patient/7"]
+
+        assert requests.get(f"{server.url}/Patient/1", timeout=10).status_code == 500